@@ -0,0 +1,275 @@
+"""
+In-memory search index for autocomplete.
+
+Every scale, arpeggio category and chord is indexed once under its
+normalized display name, with trigram postings and a sorted name list for
+prefix lookup. A query only scores the names sharing the most trigrams with
+it (plus the names it is a prefix of), so its cost depends on the number of
+similar names rather than on the size of the catalog.
+
+The index is rebuilt when the catalog version changes (see cache_utils) and
+updated in place when single Notes or ChordNotes rows are saved or deleted
+in this process, as long as no other change bumped the version meanwhile.
+"""
+import bisect
+import threading
+from collections import Counter, namedtuple
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from thefuzz import fuzz
+from thefuzz.utils import full_process
+
+from positionfinder.cache_utils import get_catalog_version
+from positionfinder.models import Notes, NotesCategory, Root
+from positionfinder.models_chords import ChordNotes, ChordPosition
+from positionfinder.positions import NotesPosition
+
+# Names scored per query, picked by shared trigrams and by prefix
+TRIGRAM_CANDIDATES = 100
+PREFIX_CANDIDATES = 50
+
+TYPE_RANK = {'scale': 0, 'arpeggio': 1, 'chord': 2}
+
+SearchEntry = namedtuple('SearchEntry', [
+    'key', 'type', 'name', 'normalized_name', 'sort_key', 'pk', 'root_pk',
+])
+
+
+def trigrams(text):
+    """Return the set of trigrams of a processed name, padded at both ends."""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _order(value):
+    # Sort None before numbers, like the database does for ChordNotes ordering
+    return (value is not None, value or 0)
+
+
+class SearchIndex:
+    """
+    Trigram and prefix index over the normalized names of catalog entries.
+
+    Entries with the same type and normalized name form one group and are
+    returned once, as the entry that sorts first.
+    """
+
+    def __init__(self, root_by_pitch, scale_category_ids):
+        """
+        Args:
+            root_by_pitch: Dict pitch -> (root pk, root name) of the first Root
+                of each pitch
+            scale_category_ids: IDs of the categories whose Notes are scales
+        """
+        self.version = None
+        self.root_by_pitch = root_by_pitch
+        self.scale_category_ids = set(scale_category_ids)
+        self.entries = {}
+        # (type, processed name) -> keys of its entries
+        self.groups = {}
+        # trigram -> groups containing it
+        self.postings = {}
+        # Sorted (processed name, type) pairs for prefix lookup
+        self.names = []
+        self.lock = threading.RLock()
+
+    @classmethod
+    def load(cls):
+        """Build the index from the database."""
+        # Imported here, views_search imports this module
+        from .views_search import normalize_search_term
+
+        root_by_pitch = {}
+        for pk, name, pitch in Root.objects.order_by('pitch', 'name').values_list('pk', 'name', 'pitch'):
+            root_by_pitch.setdefault(pitch, (pk, name))
+        scale_categories = NotesCategory.objects.filter(category_name__icontains='scale').values_list('pk', flat=True)
+        index = cls(root_by_pitch, scale_categories)
+        for scale in Notes.objects.filter(category_id__in=index.scale_category_ids):
+            index.add_scale(scale, normalize_search_term)
+        for category in NotesCategory.objects.filter(category_name__icontains='arpeggio'):
+            index.add(SearchEntry(
+                key=('arpeggio', category.pk), type='arpeggio', name=category.category_name,
+                normalized_name=normalize_search_term(category.category_name),
+                sort_key=(category.pk,), pk=category.pk, root_pk=None,
+            ))
+        for chord in ChordNotes.objects.all():
+            index.add_chord(chord, normalize_search_term)
+        return index
+
+    def add_scale(self, scale, normalize):
+        """Index a scale (Notes row)."""
+        root = self.root_by_pitch.get(scale.tonal_root)
+        self.add(SearchEntry(
+            key=('scale', scale.pk), type='scale', name=scale.note_name,
+            normalized_name=normalize(scale.note_name),
+            sort_key=(scale.note_name, scale.pk), pk=scale.pk,
+            root_pk=root[0] if root else scale.tonal_root,
+        ))
+
+    def add_chord(self, chord, normalize):
+        """Index a chord under '<root name> <chord name>'."""
+        root = self.root_by_pitch.get(chord.tonal_root)
+        display_name = normalize(f"{root[1]} {chord.chord_name}" if root else chord.chord_name)
+        self.add(SearchEntry(
+            key=('chord', chord.pk), type='chord', name=display_name,
+            normalized_name=display_name,
+            sort_key=(_order(chord.ordering), _order(chord.chord_ordering), _order(chord.range_ordering), chord.pk),
+            pk=chord.pk, root_pk=None,
+        ))
+
+    def add(self, entry):
+        """Add an entry, replacing the entry with the same key."""
+        with self.lock:
+            self.remove(entry.key)
+            self.entries[entry.key] = entry
+            group = (entry.type, full_process(entry.normalized_name))
+            members = self.groups.setdefault(group, set())
+            if not members:
+                for gram in trigrams(group[1]):
+                    self.postings.setdefault(gram, set()).add(group)
+                bisect.insort(self.names, (group[1], group[0]))
+            members.add(entry.key)
+
+    def remove(self, key):
+        """Remove the entry with the given key, if indexed."""
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return
+            group = (entry.type, full_process(entry.normalized_name))
+            members = self.groups[group]
+            members.discard(key)
+            if members:
+                return
+            del self.groups[group]
+            for gram in trigrams(group[1]):
+                self.postings[gram].discard(group)
+                if not self.postings[gram]:
+                    del self.postings[gram]
+            position = bisect.bisect_left(self.names, (group[1], group[0]))
+            del self.names[position]
+
+    def _candidates(self, processed, types):
+        counts = Counter()
+        for gram in trigrams(processed):
+            for group in self.postings.get(gram, ()):
+                if group[0] in types:
+                    counts[group] += 1
+        candidates = {group for group, _ in counts.most_common(TRIGRAM_CANDIDATES)}
+
+        position = bisect.bisect_left(self.names, (processed, ''))
+        for name, type_ in self.names[position:position + PREFIX_CANDIDATES]:
+            if not name.startswith(processed):
+                break
+            if type_ in types:
+                candidates.add((type_, name))
+        return candidates
+
+    def search(self, query, types, limit=10, min_score=0):
+        """
+        Find the best matching entries for a query.
+
+        Args:
+            query: Normalized query string
+            types: Entry types to return ('scale', 'arpeggio', 'chord')
+            limit: Maximum number of results
+            min_score: Minimum fuzz.WRatio score of a result
+
+        Returns:
+            List of (SearchEntry, score), best first
+        """
+        processed = full_process(query)
+        if not processed:
+            return []
+        with self.lock:
+            results = []
+            for group in self._candidates(processed, set(types)):
+                score = fuzz.WRatio(processed, group[1], full_process=False)
+                if score >= min_score:
+                    entry = min((self.entries[key] for key in self.groups[group]),
+                                key=lambda entry: (TYPE_RANK[entry.type], entry.sort_key))
+                    results.append((entry, score))
+        results.sort(key=lambda result: (-result[1], TYPE_RANK[result[0].type], result[0].sort_key))
+        return results[:limit]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """Return the search index of the current catalog version, building it if needed."""
+    global _index
+    version = get_catalog_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            index = _index
+            if index is None or index.version != version:
+                index = SearchIndex.load()
+                index.version = version
+                _index = index
+    return index
+
+
+def invalidate_search_index():
+    """Drop the index so the next search rebuilds it."""
+    global _index
+    _index = None
+
+
+def _next_version(index):
+    """
+    Return the catalog version an index may adopt after one local change, None if it can't.
+
+    signals.py bumps the version by one per change. Any other value means
+    changes the index hasn't seen (e.g. made by another process), or that
+    the bump hasn't happened yet; the index is dropped then.
+    """
+    global _index
+    version = get_catalog_version()
+    if not isinstance(index.version, int) or version != index.version + 1:
+        _index = None
+        return None
+    return version
+
+
+@receiver([post_save, post_delete], sender=Notes)
+@receiver([post_save, post_delete], sender=ChordNotes)
+def update_search_index(sender, instance, **kwargs):
+    """Re-index a single saved or deleted row instead of rebuilding."""
+    from .views_search import normalize_search_term
+
+    index = _index
+    if index is None:
+        return
+    version = _next_version(index)
+    if version is None:
+        return
+    key = ('chord' if sender is ChordNotes else 'scale', instance.pk)
+    index.remove(key)
+    if kwargs.get('created') is not None:
+        if sender is ChordNotes:
+            index.add_chord(instance, normalize_search_term)
+        elif instance.category_id in index.scale_category_ids:
+            index.add_scale(instance, normalize_search_term)
+    index.version = version
+
+
+@receiver([post_save, post_delete], sender=NotesPosition)
+@receiver([post_save, post_delete], sender=ChordPosition)
+def skip_search_index_version(sender, **kwargs):
+    """Positions aren't indexed, follow the version their change bumped."""
+    index = _index
+    if index is not None:
+        version = _next_version(index)
+        if version is not None:
+            index.version = version
+
+
+@receiver([post_save, post_delete], sender=Root)
+@receiver([post_save, post_delete], sender=NotesCategory)
+def reset_search_index(sender, **kwargs):
+    """Root names and category names change many entries, rebuild the index."""
+    invalidate_search_index()
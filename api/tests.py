@@ -214,3 +214,72 @@ class SearchFunctionalityTests(TestCase):
         # Check if exact name appears in results
         found = any(result['name'] == 'A Minor Pentatonic Scale' for result in data['results'])
         self.assertTrue(found, "A Minor Pentatonic Scale should be in the results")
+    
+    def test_search_index_typos_and_prefixes(self):
+        """Test the autocomplete index with typos and partial names."""
+        from api.search_index import get_search_index
+        
+        index = get_search_index()
+        typo = index.search('G Dominnat 7', ['chord'], min_score=80)
+        self.assertEqual(typo[0][0].name, 'G Dominant 7')
+        prefix = index.search('A Minor Pent', ['scale'], min_score=80)
+        self.assertEqual([entry.pk for entry, _ in prefix], [self.a_minor_pentatonic.pk])
+        
+        # Chords with the same display name are returned once
+        ChordNotes.objects.create(
+            category=self.chord_category, chord_name="Dominant 7", type_name="V2",
+            range="b - A", tonal_root=7, first_note=2, second_note=7, third_note=11, fourth_note=5,
+        )
+        names = [entry.name for entry, _ in get_search_index().search('G Dominant 7', ['chord'])]
+        self.assertEqual(names.count('G Dominant 7'), 1)
+    
+    def test_search_index_updates_in_place(self):
+        """Test that saving and deleting rows updates the index without a rebuild."""
+        from api.search_index import get_search_index
+        
+        index = get_search_index()
+        self.g7.chord_name = "Dominant 7b9"
+        self.g7.save()
+        self.assertIs(get_search_index(), index)
+        names = [entry.name for entry, _ in index.search('G Dominant 7b9', ['chord'], min_score=95)]
+        self.assertEqual(names, ['G Dominant 7b9'])
+        
+        self.g7.delete()
+        self.assertIs(get_search_index(), index)
+        self.assertEqual(index.search('G Dominant 7b9', ['chord'], min_score=95), [])
+
+    def test_search_index_drops_unseen_changes(self):
+        """Test that the index is rebuilt when the version moved without it."""
+        from api.search_index import get_search_index
+        from positionfinder.cache_utils import bump_catalog_version
+        
+        index = get_search_index()
+        bump_catalog_version()  # e.g. another process changed the catalog
+        self.g7.chord_name = "Dominant 7b9"
+        self.g7.save()
+        rebuilt = get_search_index()
+        self.assertIsNot(rebuilt, index)
+        names = [entry.name for entry, _ in rebuilt.search('G Dominant 7b9', ['chord'], min_score=95)]
+        self.assertEqual(names, ['G Dominant 7b9'])
+
+    def test_identify_endpoint(self):
+        """Test the reverse chord identification endpoint."""
+        # C E G B on the d, g, b and e strings
+        frets = {'dString': 10, 'gString': 9, 'bString': 8, 'eString': 7}
+        response = self.client.get(reverse('api:identify'), {**frets, 'string_count': 6})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['pitch_classes'], [0, 4, 7, 11])
+        self.assertIn(('Major 7', 'C'), [(c['chord_name'], c['root']['names'][0]) for c in data['chords']])
+
+        response = self.client.post(reverse('api:identify'), {'frets': frets}, content_type='application/json')
+        self.assertEqual(response.json()['pitch_classes'], [0, 4, 7, 11])
+
+        response = self.client.get(reverse('api:identify'), {**frets, '_': 1700000000, 'utm_source': 'mail'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['pitch_classes'], [0, 4, 7, 11])
+
+        response = self.client.get(reverse('api:identify'), {'lowBString': 3, 'string_count': 6})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(reverse('api:identify'), [frets], content_type='application/json')
+        self.assertEqual(response.status_code, 400)
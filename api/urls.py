@@ -19,6 +19,9 @@ urlpatterns = [
     path('fallback-positions/', views.FallbackPositionsView.as_view(), name='fallback_positions'),
     path('emergency-positions/', views.emergency_positions, name='emergency_positions'),
     path('emergency-chord-names/', views.emergency_positions, name='emergency_chord_names'),
+    path('identify/', views.IdentifyView.as_view(), name='identify'),
+    path('batch-positions/', views.BatchPositionsView.as_view(), name='batch_positions'),
+    path('voice-leading/', views.VoiceLeadingView.as_view(), name='voice_leading'),
 
     # Search API endpoints
     path('search/autocomplete/', views_search.search_autocomplete, name='search_autocomplete'),
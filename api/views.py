@@ -1,5 +1,4 @@
 from django.http import JsonResponse
-from django.views.decorators.cache import cache_page
 from django.utils.decorators import method_decorator
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -14,6 +13,16 @@ from positionfinder.models_chords import ChordNotes, ChordPosition
 from .serializers import ChordVoicingResponseSerializer
 from positionfinder.template_notes import TENSIONS, NOTES, NOTES_SHARP, SHARP_NOTES
 from positionfinder.template_notes import STRING_NOTE_OPTIONS
+from positionfinder.cache_utils import versioned_cache
+from positionfinder.menu_index import get_menu_index
+from positionfinder.chord_catalog import get_chord_catalog
+from positionfinder.voicing_difficulty import rank_by_difficulty, parse_max_difficulty
+from positionfinder.chord_identification import identify, DEFAULT_LIMIT
+from positionfinder.fretboard_model import OPEN_STRING_PITCHES
+from positionfinder.arpeggio_positions import get_arpeggio_positions
+from positionfinder.batch_positions import resolve_batch, load_roots
+from positionfinder.voice_leading import solve_voice_leading
+from positionfinder.note_setup import build_notes
 # V-system imports removed
 
 import re
@@ -37,7 +46,7 @@ class ChordVoicingView(APIView):
     """API view for chord voicings."""
     permission_classes = []  # Override default permissions that require a queryset
 
-    @method_decorator(cache_page(60 * 15))  # Cache for 15 minutes
+    @method_decorator(versioned_cache('api:chord_voicings'))
     def get(self, request, format=None):
         """
         Get chord voicings based on query parameters.
@@ -133,6 +142,7 @@ class TuningOptionsView(APIView):
     """API view for retrieving available tunings and string sets."""
     permission_classes = []  # Override default permissions that require a queryset
 
+    @method_decorator(versioned_cache('api:tuning_options'))
     def get(self, request, format=None):
         """Get all available tunings and corresponding string sets."""
         # V-system import removed
@@ -148,6 +158,7 @@ class VoicingGroupsView(APIView):
     """API view for available V-System voicing groups."""
     permission_classes = []  # Override default permissions that require a queryset
 
+    @method_decorator(versioned_cache('api:voicing_groups'))
     def get(self, request, format=None):
         """Get all available V-System voicing groups."""
         # V-system imports removed
@@ -163,6 +174,7 @@ class ChordTypesView(APIView):
     """API view for available chord types."""
     permission_classes = []  # Override default permissions that require a queryset
 
+    @method_decorator(versioned_cache('api:chord_types'))
     def get(self, request, format=None):
         """Get all available chord types with their interval structures."""
         # V-system imports removed
@@ -358,122 +370,27 @@ class ChordNamesView(APIView):
     permission_classes = []  # Override default permissions that require a queryset
     
     @method_decorator(csrf_exempt)  # Add CSRF exemption
+    @method_decorator(versioned_cache('api:chord_names'))
     def get(self, request, format=None):
         # Log the request
         
         try:
             type_name = request.query_params.get('type_name', None)
+            index = get_menu_index()
             if not type_name:
-                # Try to get the first available type from database instead of hardcoding
-                try:
-                    first_type = ChordNotes.objects.values_list('type_name', flat=True).distinct().first()
-                    if first_type:
-                        type_name = first_type
-                    else:
-                        # Only if database is empty, use a fallback
-                        type_name = 'Triads'
-                except Exception as e:
-                    type_name = 'Triads'
+                # First available type, only if the database is empty use a fallback
+                type_name = index.default_chord[1] if index.default_chord else 'Triads'
             
-            # Initialize empty list, will be populated from database
-            chord_names_list = []
+            # Chord names of the selected type, all chord names if the type has none
+            chord_names = index.get_chord_names(type_name) or index.all_chord_names
+            chord_names_list = [{'chord_name': name} for name in chord_names]
             
-            try:
-                # Debug database state
-                
-                # If database is accessible, get chord names from database
-                try:
-                    total_chords = ChordNotes.objects.count()
-                    
-                    # Add debug info
-                    from django.db import connection
-                    with connection.cursor() as cursor:
-                        cursor.execute(f"SELECT type_name, chord_name, COUNT(*) FROM positionfinder_chordnotes GROUP BY type_name, chord_name ORDER BY COUNT(*) DESC LIMIT 10")
-                        duplicates = cursor.fetchall()
-                    
-                    # Get chord names from database for the selected type
-                    db_chord_names = ChordNotes.objects.filter(type_name=type_name)\
-                                                    .values_list('chord_name', flat=True)\
-                                                    .distinct()\
-                                                    .order_by('chord_name')
-                    
-                    # Convert the db_chord_names to objects with 'chord_name' property
-                    chord_names_list = [{'chord_name': name} for name in db_chord_names]
-                    
-                    if not chord_names_list:
-                        # Try to get chord names from database
-                        db_chord_names = ChordNotes.objects.filter(type_name=type_name)\
-                                                        .values_list('chord_name', flat=True)\
-                                                        .distinct()\
-                                                        .order_by('chord_name')
-                        
-                        # Convert the db_chord_names to objects with 'chord_name' property
-                        chord_names_list = [{'chord_name': name} for name in db_chord_names]
-                    
-                    if chord_names_list:
-                        # If chord names are found for the specific type, do nothing here for now
-                        pass
-                    else:
-                        # TODO: Implement logic to fetch all chord names if specific type yields no results
-                        pass
-                        
-                        # If no results for the specific type, try to get ALL chord names available
-                        # This is better than hardcoding defaults
-                        all_chord_names = ChordNotes.objects.values_list('chord_name', flat=True).distinct().order_by('chord_name')
-                        all_chord_names_list = list(all_chord_names)
-                        
-                        if all_chord_names_list:
-                            # Convert to objects with 'chord_name' property
-                            chord_names_list = [{'chord_name': name} for name in all_chord_names_list]
-                        else:
-                            # Only as absolutely last resort, use minimal fallback values
-                            chord_names_list = [
-                                {'chord_name': 'Major'},
-                                {'chord_name': 'Minor'}
-                            ]
-                            
-                except Exception as db_error:
-                    # Try querying for ANY chord names as fallback
-                    try:
-                        all_chord_names = ChordNotes.objects.values_list('chord_name', flat=True).distinct()
-                        all_name_values = list(all_chord_names)
-                        if all_name_values:
-                            chord_names_list = [{'chord_name': name} for name in all_name_values]
-                        else:
-                            # Last resort
-                            chord_names_list = [
-                                {'chord_name': 'Major'},
-                                {'chord_name': 'Minor'}
-                            ]
-                    except Exception:
-                        # Absolute last resort
-                        chord_names_list = [
-                            {'chord_name': 'Major'},
-                            {'chord_name': 'Minor'}
-                        ]
-                
-            except Exception as e:
-                import traceback
-                
-                # Absolute last resort
-                chord_names_list = [
-                    {'chord_name': 'Major'},
-                    {'chord_name': 'Minor'}
-                ]
-                
-            # Ensure we always have at least something to return and remove duplicates
+            # Only as absolutely last resort, use minimal fallback values
             if not chord_names_list:
                 chord_names_list = [
                     {'chord_name': 'Major'},
                     {'chord_name': 'Minor'}
                 ]
-            else:
-                # Remove duplicates while preserving order
-                seen = set()
-                chord_names_list = [
-                    item for item in chord_names_list 
-                    if not (item.get('chord_name') in seen or seen.add(item.get('chord_name')))
-                ]
                 
             
             # Format the response in both formats for maximum compatibility
@@ -532,6 +449,7 @@ class ChordRangesView(APIView):
     """API view to get chord ranges based on type and name."""
     permission_classes = []  # Override default permissions that require a queryset
     
+    @method_decorator(versioned_cache('api:chord_ranges', cookies=('stringConfig',)))
     def get(self, request, format=None):
         
         try:
@@ -557,13 +475,13 @@ class ChordRangesView(APIView):
             if not type_name or not chord_name:
                 # Try to get valid values from database instead of returning error
                 try:
-                    # Get first valid type and chord name from database
-                    sample_chord = ChordNotes.objects.first()
+                    # Get first valid type and chord name from the menu index
+                    sample_chord = get_menu_index().default_chord
                     if sample_chord:
                         if not type_name:
-                            type_name = sample_chord.type_name
+                            type_name = sample_chord[1]
                         if not chord_name:
-                            chord_name = sample_chord.chord_name
+                            chord_name = sample_chord[2]
                     else:
                         return Response({'error': 'Missing required parameters and no database values found'}, 
                                         status=status.HTTP_400_BAD_REQUEST)
@@ -577,10 +495,7 @@ class ChordRangesView(APIView):
             try:
                 # First, try to get ranges specific to the requested chord type and name
                 if type_name and chord_name:
-                    specific_ranges = ChordNotes.objects.filter(type_name=type_name, chord_name=chord_name)\
-                                                      .order_by('range_ordering')\
-                                                      .values('id', 'range')
-                    specific_ranges_list = list(specific_ranges)
+                    specific_ranges_list = get_menu_index().get_ranges(type_name, chord_name)
                     
                     if specific_ranges_list:
                         ranges_list = specific_ranges_list
@@ -715,6 +630,7 @@ class ChordPositionsView(APIView):
     """API view to get chord positions/inversions based on ChordNotes ID."""
     permission_classes = []  # Override default permissions that require a queryset
     
+    @method_decorator(versioned_cache('api:chord_positions'))
     def get(self, request, format=None):
         
         try:
@@ -722,16 +638,27 @@ class ChordPositionsView(APIView):
             if not chord_notes_id:
                 # Try to get a valid ID from database instead of returning error
                 try:
-                    # Get first valid ID from database
-                    sample_chord = ChordNotes.objects.first()
+                    # Get first valid ID from the menu index
+                    sample_chord = get_menu_index().default_chord
                     if sample_chord:
-                        chord_notes_id = str(sample_chord.id)
+                        chord_notes_id = str(sample_chord[0])
                     else:
                         return Response({'error': 'Missing chord_notes_id and no database values found'}, 
                                        status=status.HTTP_400_BAD_REQUEST)
                 except Exception as e:
                     return Response({'error': 'Missing required parameter: chord_notes_id'}, 
                                    status=status.HTTP_400_BAD_REQUEST)
+
+            # Optional difficulty scores: root_pitch (0-11) picks the key,
+            # sort=difficulty orders the inversions, max_difficulty filters them
+            sort = request.query_params.get('sort')
+            try:
+                max_difficulty = parse_max_difficulty(request.query_params.get('max_difficulty'))
+                root_pitch = request.query_params.get('root_pitch')
+                root_pitch = int(root_pitch) % 12 if root_pitch not in (None, '') else None
+            except ValueError:
+                return Response({'error': 'max_difficulty and root_pitch must be numbers'},
+                                status=status.HTTP_400_BAD_REQUEST)
     
             # Initialize positions list
             positions_list = []
@@ -740,12 +667,7 @@ class ChordPositionsView(APIView):
                 # Try to fetch positions from database
                 
                 # First try to get positions for the specific chord notes ID
-                positions = ChordPosition.objects.filter(notes_name_id=chord_notes_id)\
-                                                .order_by('inversion_order')\
-                                                .values('inversion_order')
-                
-                # Convert to list for serializing
-                positions_list = list(positions)
+                positions_list = get_menu_index().get_positions(int(chord_notes_id))
                 
                 if positions_list:
                     # Positions found, do nothing here for now
@@ -809,7 +731,11 @@ class ChordPositionsView(APIView):
             # Ensure we always have at least one position
             if not positions_list:
                 positions_list = [{'inversion_order': 'Root Position'}]
-                
+
+            if sort == 'difficulty' or max_difficulty is not None or root_pitch is not None:
+                positions_list = self.rank_positions(
+                    int(chord_notes_id), positions_list, root_pitch or 0, sort == 'difficulty', max_difficulty
+                )
             
             return Response({'positions': positions_list})
             
@@ -826,11 +752,24 @@ class ChordPositionsView(APIView):
                 
             return Response({'positions': emergency_positions})
 
+    def rank_positions(self, chord_notes_id, positions_list, root_pitch, sort, max_difficulty):
+        """
+        Attach the stored difficulty of every inversion in one key, then
+        sort and / or filter the inversions by it.
+        """
+        scores = get_chord_catalog().get_inversion_scores(
+            chord_notes_id, [position['inversion_order'] for position in positions_list], root_pitch
+        )
+        annotated = [dict(position, difficulty=score._asdict() if score else None)
+                     for position, score in zip(positions_list, scores)]
+        return rank_by_difficulty(annotated, scores, max_difficulty, sort=sort)
+
 
 class ScalePositionsView(APIView):
     """API view to get scale positions based on Notes ID."""
     permission_classes = []  # Override default permissions that require a queryset
     
+    @method_decorator(versioned_cache('api:scale_positions'))
     def get(self, request, format=None):
         # Import required modules
         import traceback
@@ -958,6 +897,7 @@ class ArpeggioPositionsView(APIView):
     """API view to get arpeggio positions based on Notes ID."""
     permission_classes = []  # Override default permissions that require a queryset
     
+    @method_decorator(versioned_cache('api:arpeggio_positions'))
     def get(self, request, format=None):
         # Import required modules for debugging
         import traceback
@@ -1031,8 +971,17 @@ class ArpeggioPositionsView(APIView):
                         positions = [{'position_order': 0}]  # Keep "All Notes"
                         positions.extend(list(position_values))
                     else:
-                        # Handle case where qs is empty if needed
-                        pass
+                        # No stored positions: generate them for the root and strings
+                        root_pitch = int(request.query_params.get('root_pitch', 0)) % 12
+                        string_count = 8 if request.query_params.get('string_count') == '8' else 6
+                        generated = get_arpeggio_positions(tuple(build_notes(note)), root_pitch, string_count)
+                        if generated:
+                            positions = [{'position_order': 0}]  # Keep "All Notes"
+                            positions.extend(
+                                {'position_order': position.position_order, 'frets': list(position.frets),
+                                 'stretch': position.stretch}
+                                for position in generated
+                            )
                 except Exception as db_error:
                     # Keep the default positions set above
                     pass # Explicitly do nothing if DB error occurs
@@ -1059,3 +1008,112 @@ class ArpeggioPositionsView(APIView):
                     {'position_order': 5}
                 ]
             })
+
+
+class BatchPositionsView(APIView):
+    """API view returning the positions of many chords and scales in one response."""
+    permission_classes = []  # Override default permissions that require a queryset
+
+    def post(self, request, format=None):
+        """
+        Resolve a batch given as JSON.
+
+        Body:
+        - items: List of {"root", "type", "chord", "range", "inversion"} chord
+          items (range and inversion optional) and {"root", "scale", "position"}
+          scale / arpeggio items (position optional); roots and scales are ids
+        - string_count: 6 or 8 (default 6), for generated arpeggio positions
+        """
+        try:
+            if not isinstance(request.data, dict):
+                raise ValueError('The body must be an object')
+            string_count = int(request.data.get('string_count', 6))
+            if string_count not in (6, 8):
+                raise ValueError('string_count must be 6 or 8')
+            return Response({'results': resolve_batch(request.data.get('items'), string_count)})
+        except (TypeError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class VoiceLeadingView(APIView):
+    """API view picking the voicings of a progression that connect most smoothly."""
+    permission_classes = []  # Override default permissions that require a queryset
+
+    def post(self, request, format=None):
+        """
+        Solve a progression given as JSON.
+
+        Body:
+        - chords: List of {"root": Root id, "chord": chord name}
+        - types: Allowed chord types, e.g. ["V2", "V3"] (optional)
+        - strings: Allowed strings, e.g. ["dString", "gString", "bString", "eString"] (optional)
+        - max_fret: Highest fret voicings may reach (optional)
+        - string_count: 6 or 8 (default 6)
+        """
+        try:
+            if not isinstance(request.data, dict):
+                raise ValueError('The body must be an object')
+            chords = request.data.get('chords')
+            if not isinstance(chords, list) or not chords:
+                raise ValueError('chords must be a non-empty list')
+            try:
+                root_ids = [int(chord['root']) for chord in chords]
+                names = [str(chord['chord']) for chord in chords]
+            except (KeyError, TypeError):
+                raise ValueError('Every chord needs a root id and a chord name')
+            roots = load_roots(set(root_ids))
+            missing = [root_id for root_id in root_ids if root_id not in roots]
+            if missing:
+                raise ValueError(f'Unknown root {missing[0]}')
+            max_fret = request.data.get('max_fret')
+            string_count = int(request.data.get('string_count', 6))
+            if string_count not in (6, 8):
+                raise ValueError('string_count must be 6 or 8')
+            return Response(solve_voice_leading(
+                [(roots[root_id][1], name) for root_id, name in zip(root_ids, names)],
+                types=request.data.get('types'),
+                strings=request.data.get('strings'),
+                max_fret=int(max_fret) if max_fret is not None else None,
+                string_count=string_count,
+            ))
+        except (TypeError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class IdentifyView(APIView):
+    """API view naming the chords, scales and arpeggios of fretted notes."""
+    permission_classes = []  # Override default permissions that require a queryset
+
+    @method_decorator(versioned_cache('api:identify'))
+    def get(self, request, format=None):
+        """
+        Identify fretted notes given as query parameters.
+
+        Parameters:
+        - <string name>: Fret per string (e.g. eString=3&bString=5), 'x' for muted strings
+        - string_count: 6 or 8 (default 8)
+        - limit: Maximum number of scales / arpeggios (default 50)
+
+        Other parameters (cache busters, tracking parameters) are ignored.
+        """
+        frets = {key: value for key, value in request.query_params.items()
+                 if key in OPEN_STRING_PITCHES}
+        return self.identify(frets, request.query_params.get('string_count', 8),
+                             request.query_params.get('limit', DEFAULT_LIMIT))
+
+    def post(self, request, format=None):
+        """Identify fretted notes given as JSON: {"frets": {"eString": 3, ...}, "string_count": 6}."""
+        frets = request.data.get('frets') if isinstance(request.data, dict) else None
+        if not isinstance(frets, dict):
+            return Response({'error': 'Missing required parameter: frets'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.identify(frets, request.data.get('string_count', 8), request.data.get('limit', DEFAULT_LIMIT))
+
+    def identify(self, frets, string_count, limit):
+        try:
+            string_count = int(string_count)
+            limit = int(limit)
+            if string_count not in (6, 8):
+                raise ValueError('string_count must be 6 or 8')
+            return Response(identify(frets, string_count=string_count, limit=limit))
+        except (TypeError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
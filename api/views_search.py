@@ -10,6 +10,7 @@ from thefuzz import process, fuzz
 from urllib.parse import urlencode 
 import re
 from positionfinder.search_utils import parse_query, get_root_id_from_name, ROOT_NAME_TO_ID
+from .search_index import get_search_index
 
 # Reduce logging to WARNING or ERROR for search logic bugfixing
 import logging
@@ -55,84 +56,40 @@ def search_autocomplete(request):
         # Intent filtering: parse the query to determine the user's intent
         note, type_, quality, position, inversion = parse_query(query)
 
-        all_items = []
-        roots = Root.objects.all()
-        scales = Notes.objects.filter(category__category_name__icontains='scale').order_by('note_name')
-        arpeggio_types = NotesCategory.objects.filter(category_name__icontains='arpeggio')
-        chord_types = ChordNotes.objects.all()
-
         try:
             base_fretboard_url = reverse('fretboard')
         except Exception as e:
             logger.error(f"Could not reverse 'fretboard' URL: {e}. Falling back to '/' path.")
             base_fretboard_url = '/'
 
-        # 1. Scales
+        types = []
         if type_ == 'scale' or type_ == 'all':
-            for scale in scales:
-                name = scale.note_name
-                # Use extracted root if available, else fallback to scale.tonal_root
-                if root_pk is not None:
-                    used_root_pk = root_pk
-                    logger.debug(f"[SEARCH_AUTOCOMPLETE_FUZZY] Assigned root param: {used_root_pk} (custom mapping)")
-                else:
-                    root_obj2 = Root.objects.filter(pitch=scale.tonal_root).first()
-                    used_root_pk = root_obj2.pk if root_obj2 else scale.tonal_root
-                    logger.debug(f"[SEARCH_AUTOCOMPLETE_FUZZY] Fallback root param: {used_root_pk} -> {root_obj2.name if root_obj2 else 'UNKNOWN'}")
-                params = {'root': used_root_pk, 'models_select': 1, 'notes_options_select': scale.pk, 'position_select': 0}
-                url = f"{base_fretboard_url}?{urlencode(params)}"
-                all_items.append({
-                    'name': name,
-                    'normalized_name': normalize_search_term(name),
-                    'type': 'scale',
-                    'url': url
-                })
-        # 2. Arpeggios
+            types.append('scale')
         if type_ == 'arpeggio' or type_ == 'all':
-            for arpeggio_cat in arpeggio_types:
-                name = arpeggio_cat.category_name
-                url = f"{base_fretboard_url}?models_select=2&notes_options_select={arpeggio_cat.pk}"
-                all_items.append({
-                    'name': name,
-                    'normalized_name': normalize_search_term(name),
-                    'type': 'arpeggio',
-                    'url': url
-                })
-        # 3. Chords (only if intent is not scale-specific)
-        if type_ == 'chord' or type_ == 'all':
-            # Only suggest chords if the query does not indicate a pentatonic/scale intent
-            if not ("pentatonic" in quality.lower() or type_ == 'scale'):
-                for chord in chord_types:
-                    # --- PATCH: Use both root and chord_name for normalized display ---
-                    # If chord_name is e.g. 'Dominant 7' and root is G, display as 'G Dominant 7'
-                    root_obj = None
-                    if hasattr(chord, 'tonal_root'):
-                        root_obj = Root.objects.filter(pitch=chord.tonal_root).first()
-                    root_name = root_obj.name if root_obj else None
-                    # If chord_name already starts with a root, don't prepend
-                    display_name = normalize_search_term(f"{root_name} {chord.chord_name}" if root_name else chord.chord_name)
-                    url = f"{base_fretboard_url}?models_select=3&notes_options_select={chord.pk}"
-                    all_items.append({
-                        'name': display_name,  # Use display name for results!
-                        'normalized_name': display_name,
-                        'type': 'chord',
-                        'url': url
-                    })
+            types.append('arpeggio')
+        # Chords only if intent is not scale-specific (e.g. pentatonic)
+        if (type_ == 'chord' or type_ == 'all') and "pentatonic" not in quality.lower():
+            types.append('chord')
 
-        # Fuzzy match the query against all_items (using normalized names)
-        from thefuzz import process as fuzz_process
-        normalized_names = [item['normalized_name'] for item in all_items]
-        matches = fuzz_process.extract(normalized_query, normalized_names, limit=10)
+        # Fuzzy match the query against the prebuilt index (using normalized names)
+        matches = get_search_index().search(normalized_query, types, limit=10, min_score=MIN_SCORE_THRESHOLD)
         suggestions = []
-        for match, score in matches:
-            if score >= MIN_SCORE_THRESHOLD:
-                idx = normalized_names.index(match)
-                # Return the original name
-                suggestions.append({
-                    'name': all_items[idx]['name'],
-                    'type': all_items[idx]['type'],
-                    'url': all_items[idx]['url']
-                })
+        for entry, score in matches:
+            if entry.type == 'scale':
+                # Use extracted root if available, else fallback to the scale's tonal root
+                used_root_pk = root_pk if root_pk is not None else entry.root_pk
+                params = {'root': used_root_pk, 'models_select': 1, 'notes_options_select': entry.pk, 'position_select': 0}
+                url = f"{base_fretboard_url}?{urlencode(params)}"
+            elif entry.type == 'arpeggio':
+                url = f"{base_fretboard_url}?models_select=2&notes_options_select={entry.pk}"
+            else:
+                url = f"{base_fretboard_url}?models_select=3&notes_options_select={entry.pk}"
+            # Return the original name
+            suggestions.append({
+                'name': entry.name,
+                'type': entry.type,
+                'url': url
+            })
 
         logger.debug(f"[SEARCH_AUTOCOMPLETE_FUZZY] Returning {len(suggestions)} filtered results.")
         return JsonResponse({'results': suggestions})
@@ -12,19 +12,6 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 
 import os
 
-# --- DEBUG PRINT MIDDLEWARE FOR ALL REQUESTS ---
-class PrintRequestDebugMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
-    def __call__(self, request):
-        print("\n[DEBUG][MIDDLEWARE] Incoming request:")
-        print(f"  Path: {request.path}")
-        print(f"  Method: {request.method}")
-        print(f"  GET: {dict(request.GET)}")
-        print(f"  POST: {dict(request.POST)}")
-        response = self.get_response(request)
-        return response
-
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -53,7 +40,8 @@ INSTALLED_APPS = [
     ]
 
 MIDDLEWARE = [
-    'fretboard.settings.PrintRequestDebugMiddleware',
+    # Server-Timing header and /_stats/, only active with FRETBOARD_INSTRUMENTATION
+    'positionfinder.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     # Locale middleware removed
@@ -157,13 +145,44 @@ REST_FRAMEWORK = {
 }
 
 # Caching
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'fretboard-cache',
-        'TIMEOUT': 60 * 15,  # 15 minutes
+# FRETBOARD_CACHE selects the backend behind the versioned catalog cache
+# (positionfinder/cache_utils.py):
+#   'locmem' (default) - per-process memory, the local stand-in for Redis
+#   'file'             - file based cache shared by all workers on one host
+#   'redis'            - Redis, shared by all hosts
+# FRETBOARD_CACHE_LOCATION overrides the directory / Redis URL.
+# With 'locmem' every worker has its own catalog version and can't see
+# catalog edits made by other processes, so entries and the version expire
+# after TIMEOUT and no ETags / 304 responses are sent (see
+# cache_utils.is_shared_cache); use 'file' or 'redis' with more than one
+# process.
+FRETBOARD_CACHE = os.environ.get('FRETBOARD_CACHE', 'locmem')
+if FRETBOARD_CACHE == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('FRETBOARD_CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+            'TIMEOUT': 60 * 15,  # 15 minutes
+        }
+    }
+elif FRETBOARD_CACHE == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('FRETBOARD_CACHE_LOCATION', os.path.join(BASE_DIR, '.cache', 'fretboard')),
+            'TIMEOUT': 60 * 15,  # 15 minutes
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'fretboard-cache',
+            'TIMEOUT': 60 * 15,  # 15 minutes
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        }
     }
-}
 
 # Custom setting to enable the optimized chord view by default
 USE_OPTIMIZED_CHORD_VIEW = True
@@ -171,6 +190,18 @@ USE_OPTIMIZED_CHORD_VIEW = True
 # Application version
 VERSION = "2.1"
 
+# Per-request timing (wall time, SQL, cache, hot spans) reported in a
+# Server-Timing header and aggregated at /_stats/, see
+# positionfinder/instrumentation.py. Off by default.
+FRETBOARD_INSTRUMENTATION = os.environ.get('FRETBOARD_INSTRUMENTATION', '') == '1'
+
+# Prebuilt catalog snapshot (manage.py build_catalog_snapshot) that workers
+# map at startup instead of querying the catalog, see
+# positionfinder/catalog_snapshot.py. Used only while it matches the
+# database; an empty value disables it.
+FRETBOARD_CATALOG_SNAPSHOT = os.environ.get(
+    'FRETBOARD_CATALOG_SNAPSHOT', os.path.join(BASE_DIR, '.cache', 'catalog.snapshot'))
+
 if os.path.isfile(os.path.join(BASE_DIR, 'local_settings.py')):
     from local_settings import *
     STRIPE_DONATE_URL = locals().get('STRIPE_DONATE_URL', None)
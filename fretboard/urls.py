@@ -25,6 +25,7 @@ import positionfinder.views
 import positionfinder.views_search
 from positionfinder.views import fretboard_unified_view, chord_search_test_view
 from positionfinder.views_search import unified_search_view, search_json
+from positionfinder.instrumentation import instrumentation_stats_view
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -43,6 +44,8 @@ urlpatterns_non_i18n = [
     # JSON search endpoint (likely doesn't need i18n)
     path('search/json/', search_json, name='search_json'),
     path('search_json/', search_json, name='search_json_alt'),
+    # Per-request instrumentation aggregate (local clients only)
+    path('_stats/', instrumentation_stats_view, name='instrumentation_stats'),
     # Testing route
     path('test/chords/', chord_search_test_view, name='test_chords'),
     # SEO-related URLs
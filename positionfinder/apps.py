@@ -12,6 +12,9 @@ class PositionfinderConfig(AppConfig):
         This is called when the application is ready during Django startup.
         """
         logger.info("Initializing PositionfinderConfig")
+
+        # Connect cache invalidation handlers
+        from . import signals  # noqa: F401
         
         try:
             # We import and apply the chord search integration after 
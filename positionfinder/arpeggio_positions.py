@@ -0,0 +1,105 @@
+"""
+Generated arpeggio fingering positions.
+
+Arpeggios without stored NotesPositions get their positions from the
+fretboard itself: a window of WINDOW_WIDTHS frets slides along the pitch
+grid of the string configuration, windows that hold every pitch class of
+the arpeggio are trimmed to the frets they actually use, and the tightest
+ones (least stretch, then most notes) are kept as long as they overlap
+earlier picks by at most MAX_OVERLAP frets. The kept windows are numbered
+from the nut up, like stored positions.
+
+Positions only depend on the arpeggio's intervals, the root pitch class and
+the string configuration, so get_arpeggio_positions is memoized on exactly
+those and pages pay for the search once per process.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy
+
+from .fretboard_model import get_fretboard
+
+# Frets a window may span: one finger per fret, or a one fret stretch
+WINDOW_WIDTHS = (4, 5)
+# Frets a position may share with an already kept (tighter) one
+MAX_OVERLAP = 1
+
+
+class ArpeggioPosition(namedtuple('ArpeggioPosition', ['position_order', 'frets', 'stretch', 'note_count'])):
+    """
+    A generated arpeggio position.
+
+    Attributes:
+        position_order: Number of the position along the neck, from 1
+        frets: Ascending frets of the window
+        stretch: Highest minus lowest fret
+        note_count: Arpeggio notes inside the window, over all strings
+
+    ``pk`` mirrors NotesPosition so the views look both up alike.
+    """
+    __slots__ = ()
+
+    @property
+    def pk(self):
+        return self.position_order
+
+
+@lru_cache(maxsize=1024)
+def get_arpeggio_positions(intervals, root_pitch, string_count=6):
+    """
+    Derive the fingering positions of an arpeggio.
+
+    Args:
+        intervals: Tuple of the arpeggio's intervals above the root
+        root_pitch: Pitch (class) of the root
+        string_count: 6 or 8, the strings the positions are played on
+
+    Returns:
+        Tuple of ArpeggioPositions, ordered along the neck
+    """
+    pitch_classes = sorted({(interval + root_pitch) % 12 for interval in intervals})
+    if not pitch_classes:
+        return ()
+    fretboard = get_fretboard(string_count)
+    fret_count = len(fretboard.frets)
+
+    # strings x frets: cells sounding an arpeggio note
+    in_arpeggio = numpy.isin(fretboard.pitch_classes, pitch_classes)
+    # frets x pitch classes: which arpeggio notes a fret holds on any string
+    presence = numpy.zeros((fret_count, 12), dtype=bool)
+    string_rows, fret_columns = numpy.nonzero(in_arpeggio)
+    presence[fret_columns, fretboard.pitch_classes[string_rows, fret_columns]] = True
+    notes_per_fret = in_arpeggio.sum(axis=0)
+
+    # windows x frets masks of every width at every start
+    starts = numpy.concatenate([numpy.arange(fret_count - width + 1) for width in WINDOW_WIDTHS])
+    widths = numpy.concatenate([numpy.full(fret_count - width + 1, width) for width in WINDOW_WIDTHS])
+    columns = numpy.arange(fret_count)
+    windows = (columns[None, :] >= starts[:, None]) & (columns[None, :] < (starts + widths)[:, None])
+
+    covered = (windows.astype(int) @ presence.astype(int)) > 0
+    complete = covered[:, pitch_classes].all(axis=1)
+
+    # Trim every window to the frets holding arpeggio notes
+    used = windows & (notes_per_fret > 0)[None, :]
+    low = used.argmax(axis=1)
+    high = fret_count - 1 - used[:, ::-1].argmax(axis=1)
+    note_counts = windows.astype(int) @ notes_per_fret
+
+    candidates = sorted({
+        (int(high[row] - low[row]), -int(note_counts[row]), int(low[row]), int(high[row]))
+        for row in numpy.nonzero(complete)[0]
+    })
+    kept = []
+    for stretch, negative_count, low_index, high_index in candidates:
+        if all(min(high_index, other_high) - max(low_index, other_low) + 1 <= MAX_OVERLAP
+               for other_low, other_high, _, _ in kept):
+            kept.append((low_index, high_index, stretch, -negative_count))
+    kept.sort()
+
+    frets = fretboard.frets.tolist()
+    return tuple(
+        ArpeggioPosition(order, tuple(frets[low_index:high_index + 1]), stretch, note_count)
+        for order, (low_index, high_index, stretch, note_count) in enumerate(kept, start=1)
+    )
@@ -0,0 +1,183 @@
+"""
+Batch position lookups for progressions and practice sheets.
+
+resolve_batch answers many chord and scale items in one call. Items that
+share work share it: every chord voicing (chord, range, root) is built once
+for all inversions any item asks for, and every scale JSON (scale, root) is
+read from the scale cache and parsed once. Chords come from the in-process
+chord catalog, roots and scales from the catalog snapshot when there is one,
+so a warm batch costs at most two queries however many items it holds.
+"""
+import json
+
+from .catalog_snapshot import get_catalog_snapshot
+from .chord_catalog import get_chord_catalog
+from .menu_index import ARPEGGIO_CATEGORY_ID
+from .models import Notes, Root
+from .views_scale import ScaleView
+from .views_arpeggio import ArpeggioView
+
+MAX_BATCH_ITEMS = 64
+
+
+def load_roots(root_ids):
+    """Return {Root id: (name, pitch)} for the given ids."""
+    snapshot = get_catalog_snapshot()
+    if snapshot is not None:
+        rows = snapshot.rows('root', ['id', 'name', 'pitch'])
+    else:
+        rows = Root.objects.filter(id__in=root_ids).values_list('id', 'name', 'pitch')
+    return {row[0]: (row[1], row[2]) for row in rows if row[0] in root_ids}
+
+
+def _load_notes(notes_ids):
+    """Return {Notes id: (note_name, category_id)} for the given ids."""
+    if not notes_ids:
+        return {}
+    snapshot = get_catalog_snapshot()
+    if snapshot is not None:
+        rows = snapshot.rows('notes', ['id', 'note_name', 'category_id'])
+    else:
+        rows = Notes.objects.filter(id__in=notes_ids).values_list('id', 'note_name', 'category_id')
+    return {row[0]: (row[1], row[2]) for row in rows if row[0] in notes_ids}
+
+
+def _as_id(item, key):
+    try:
+        return int(item[key])
+    except KeyError:
+        raise ValueError(f'Missing {key}')
+    except (TypeError, ValueError):
+        raise ValueError(f'{key} must be an id')
+
+
+def _as_name(item, key):
+    value = item.get(key)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f'{key} must be a string')
+    return value
+
+
+def _parse_item(item):
+    """
+    Normalize one batch item.
+
+    Returns:
+        ('chord', root_id, type, chord, range or None, inversion or None) or
+        ('scale', root_id, notes_id, position key or None)
+
+    Raises:
+        ValueError: If the item is malformed
+    """
+    if not isinstance(item, dict):
+        raise ValueError('Items must be objects')
+    root_id = _as_id(item, 'root')
+    if 'scale' in item:
+        position = item.get('position')
+        if position is not None:
+            position = str(_as_id(item, 'position'))
+        return ('scale', root_id, _as_id(item, 'scale'), position)
+    if 'type' in item and 'chord' in item:
+        return ('chord', root_id, str(item['type']), str(item['chord']), _as_name(item, 'range'),
+                _as_name(item, 'inversion'))
+    raise ValueError('Items need either scale or type and chord')
+
+
+def resolve_batch(items, string_count=6):
+    """
+    Resolve the position dicts of many chord and scale items.
+
+    Args:
+        items: List of dicts, either {'root', 'type', 'chord', 'range',
+            'inversion'} (range and inversion optional, defaulting to the
+            chord's first range and every inversion) or {'root', 'scale',
+            'position'} (position optional, 0 is 'All Notes', default all).
+            Roots and scales are Root and Notes ids.
+        string_count: String configuration generated arpeggio positions are
+            built for
+
+    Returns:
+        One result per item, in order: the item's positions, or {'error': ...}
+        for items that can't be resolved
+
+    Raises:
+        ValueError: If items is not a list or holds more than MAX_BATCH_ITEMS
+    """
+    if not isinstance(items, list):
+        raise ValueError('items must be a list')
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ValueError(f'At most {MAX_BATCH_ITEMS} items per batch')
+
+    parsed = []
+    for item in items:
+        try:
+            parsed.append(_parse_item(item))
+        except ValueError as e:
+            parsed.append(e)
+    valid = [item for item in parsed if not isinstance(item, ValueError)]
+    roots = load_roots({item[1] for item in valid})
+    notes = _load_notes({item[2] for item in valid if item[0] == 'scale'})
+    catalog = get_chord_catalog()
+    views = {ARPEGGIO_CATEGORY_ID: ArpeggioView()}
+    scale_view = ScaleView()
+
+    voicings = {}
+    scales = {}
+
+    def chord_result(root_id, type_name, chord_name, range, inversion):
+        chord = catalog.find_chord(type_name, chord_name, range)
+        if chord is None or (chord.type_name, chord.chord_name) != (type_name, chord_name):
+            raise ValueError(f'Unknown chord {type_name} {chord_name}')
+        if range is not None and chord.range != range:
+            raise ValueError(f'Unknown range {range} of {type_name} {chord_name}')
+        root_name, root_pitch = roots[root_id]
+        key = (chord.id, root_id)
+        if key not in voicings:
+            voicings[key] = catalog.get_inversion_data(
+                [position.inversion_order for position in catalog.get_positions(chord.id)],
+                chord.chord_name, chord.range, chord.type_name, root_pitch, chord.tonal_root, root_name
+            )
+        inversions = voicings[key]
+        if inversion is not None:
+            if inversion not in inversions:
+                raise ValueError(f'Unknown inversion {inversion}')
+            inversions = {inversion: inversions[inversion]}
+        return {
+            'kind': 'chord', 'root': [root_name, root_pitch], 'type': chord.type_name,
+            'chord': chord.chord_name, 'range': chord.range, 'positions': inversions,
+        }
+
+    def scale_result(root_id, notes_id, position):
+        if notes_id not in notes:
+            raise ValueError(f'Unknown scale {notes_id}')
+        note_name, category_id = notes[notes_id]
+        root_name, root_pitch = roots[root_id]
+        key = (notes_id, root_id)
+        if key not in scales:
+            view = views.get(category_id, scale_view)
+            scales[key] = json.loads(view.build_position_json(
+                note_name, root_id, root_pitch, 0, root_name, notes_id,
+                string_count=string_count if category_id == ARPEGGIO_CATEGORY_ID else None
+            ))
+        data = scales[key]
+        positions = {name: value for name, value in data.items() if name.isdigit()}
+        if position is not None:
+            if position not in positions:
+                raise ValueError(f'Unknown position {position}')
+            positions = {position: positions[position]}
+        return {'kind': 'scale', 'root': data['root'], 'name': data['name'], 'positions': positions}
+
+    results = []
+    for item in parsed:
+        try:
+            if isinstance(item, ValueError):
+                raise item
+            if item[1] not in roots:
+                raise ValueError(f'Unknown root {item[1]}')
+            if item[0] == 'chord':
+                results.append(chord_result(*item[1:]))
+            else:
+                results.append(scale_result(*item[1:]))
+        except ValueError as e:
+            results.append({'error': str(e)})
+    return results
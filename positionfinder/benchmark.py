@@ -0,0 +1,287 @@
+"""
+End-to-end benchmark of the page, search and API views.
+
+Sweeps every scale / arpeggio x root, every chord type x chord x range x root
+and the search / menu API calls derived from the catalog through the test
+client (so middleware, caching and template rendering are included), and
+records per view the latency percentiles, SQL query count and peak Python
+memory. Reports are plain JSON so two runs can be compared with
+compare_reports; see the benchmark_views management command.
+"""
+import contextlib
+import io
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .cache_utils import bump_catalog_version
+from .chord_catalog import invalidate_chord_catalog
+from .models import Notes, Root
+from .models_chords import ChordNotes
+
+BenchmarkCase = namedtuple('BenchmarkCase', ['view', 'path', 'params'])
+
+# Metrics compare_reports checks
+LATENCY_METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+MEMORY_METRICS = ('peak_kb_max',)
+COUNT_METRICS = ('queries_max', 'errors')
+
+
+def _sample(cases, max_cases):
+    # Evenly spaced subset, so a limited run still covers the whole catalog
+    if not max_cases or len(cases) <= max_cases:
+        return cases
+    step = len(cases) / max_cases
+    return [cases[int(i * step)] for i in range(max_cases)]
+
+
+def build_cases(views=None, roots=None, max_cases=None):
+    """
+    Build the benchmark sweep from the catalog.
+
+    Args:
+        views: Names of the views to benchmark, defaults to all
+        roots: Root ids to sweep, defaults to all
+        max_cases: Maximum number of cases per view (evenly sampled)
+
+    Returns:
+        Dictionary view name -> list of BenchmarkCase
+    """
+    root_rows = list(Root.objects.order_by('pitch', 'name').values_list('id', 'name'))
+    if roots is not None:
+        root_rows = [row for row in root_rows if row[0] in set(roots)]
+    notes = list(Notes.objects.order_by('category_id', 'ordering', 'note_name').values_list('id', 'category_id', 'note_name'))
+    chords = list(ChordNotes.objects.order_by('type_name', 'chord_name', 'range_ordering', 'pk').values_list(
+        'id', 'type_name', 'chord_name', 'range'
+    ))
+    fretboard = reverse('fretboard')
+
+    cases = {name: [] for name in (
+        'scales', 'arpeggios', 'chords', 'search_json',
+        'api:chord_names', 'api:chord_ranges', 'api:chord_positions',
+        'api:scale_positions', 'api:arpeggio_positions', 'api:autocomplete',
+    )}
+    for notes_id, category_id, note_name in notes:
+        view = 'arpeggios' if category_id == 2 else 'scales'
+        for root_id, _ in root_rows:
+            cases[view].append(BenchmarkCase(view, fretboard, {
+                'models_select': category_id, 'notes_options_select': notes_id,
+                'root': root_id, 'position_select': 0,
+            }))
+        if category_id == 2:
+            cases['api:arpeggio_positions'].append(BenchmarkCase(
+                'api:arpeggio_positions', reverse('api:ajax_arpeggio_positions'), {'notes_id': notes_id}
+            ))
+        else:
+            cases['api:scale_positions'].append(BenchmarkCase(
+                'api:scale_positions', reverse('api:ajax_scale_positions'), {'notes_id': notes_id}
+            ))
+
+    chord_names = []
+    for chord_id, type_name, chord_name, range_name in chords:
+        for root_id, _ in root_rows:
+            cases['chords'].append(BenchmarkCase('chords', fretboard, {
+                'models_select': 3, 'type_options_select': type_name,
+                'chords_options_select': chord_name, 'note_range': range_name, 'root': root_id,
+            }))
+        cases['api:chord_positions'].append(BenchmarkCase(
+            'api:chord_positions', reverse('api:ajax_chord_positions'), {'chord_notes_id': chord_id}
+        ))
+        if (type_name, chord_name) not in chord_names:
+            chord_names.append((type_name, chord_name))
+            cases['api:chord_ranges'].append(BenchmarkCase(
+                'api:chord_ranges', reverse('api:ajax_chord_ranges'), {'type_name': type_name, 'chord_name': chord_name}
+            ))
+    for type_name in sorted({type_name for type_name, _ in chord_names}):
+        cases['api:chord_names'].append(BenchmarkCase(
+            'api:chord_names', reverse('api:ajax_chord_names'), {'type_name': type_name}
+        ))
+
+    # Search with the names users type: "<root> <scale>" and "<root> <chord>"
+    search_names = [note_name for _, _, note_name in notes]
+    search_names += sorted({chord_name for _, chord_name in chord_names})
+    for _, root_name in root_rows:
+        for name in search_names:
+            query = f'{root_name} {name}'
+            cases['search_json'].append(BenchmarkCase('search_json', reverse('search_json'), {'q': query}))
+            cases['api:autocomplete'].append(BenchmarkCase(
+                'api:autocomplete', reverse('api:search_autocomplete'), {'q': query}
+            ))
+
+    return {
+        name: _sample(view_cases, max_cases)
+        for name, view_cases in cases.items()
+        if views is None or name in views
+    }
+
+
+def _request(client, case):
+    # Views print debug output, keep it out of the benchmark output
+    with contextlib.redirect_stdout(io.StringIO()):
+        return client.get(case.path, case.params, HTTP_ACCEPT='application/json' if case.view.startswith('api:') else 'text/html')
+
+
+def run_case(client, case, repeat=5, cold=False):
+    """
+    Time one case.
+
+    Each request is timed without memory tracing; one extra, untimed request
+    runs under tracemalloc to measure peak memory. Responses other than
+    2xx / 3xx count as errors and are left out of the latencies and query
+    counts, a fast 404 would otherwise pass for a fast page.
+
+    Args:
+        client: Test client
+        case: BenchmarkCase
+        repeat: Timed requests
+        cold: Expire every cache before each request
+
+    Returns:
+        Dictionary with 'requests', 'latencies_ms', 'queries', 'peak_kb' and 'errors'
+    """
+    result = {'requests': repeat, 'latencies_ms': [], 'queries': [], 'errors': 0}
+    for _ in range(repeat):
+        if cold:
+            bump_catalog_version()
+            invalidate_chord_catalog()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = _request(client, case)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            result['errors'] += 1
+            continue
+        result['latencies_ms'].append(elapsed * 1000)
+        result['queries'].append(len(queries.captured_queries))
+
+    if cold:
+        bump_catalog_version()
+        invalidate_chord_catalog()
+    tracemalloc.start()
+    try:
+        _request(client, case)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result['peak_kb'] = peak / 1024
+    return result
+
+
+def summarize(results):
+    """
+    Aggregate case results of one view.
+
+    Args:
+        results: run_case results
+
+    Returns:
+        Dictionary of view metrics
+    """
+    latencies = np.array([latency for result in results for latency in result['latencies_ms']])
+    queries = np.array([count for result in results for count in result['queries']])
+    peaks = np.array([result['peak_kb'] for result in results])
+    summary = {
+        'cases': len(results),
+        'requests': sum(result['requests'] for result in results),
+        'errors': sum(result['errors'] for result in results),
+    }
+    if not len(latencies):
+        return summary
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        **summary,
+        'mean_ms': round(float(latencies.mean()), 3),
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'queries_mean': round(float(queries.mean()), 2),
+        'queries_max': int(queries.max()),
+        'peak_kb_mean': round(float(peaks.mean()), 1),
+        'peak_kb_max': round(float(peaks.max()), 1),
+    }
+
+
+def run_benchmark(cases, repeat=5, cold=False, progress=None):
+    """
+    Run a benchmark sweep.
+
+    Args:
+        cases: Dictionary view name -> list of BenchmarkCase (see build_cases)
+        repeat: Timed requests per case
+        cold: Expire every cache before each request
+        progress: Optional callable receiving (view name, summary) per view
+
+    Returns:
+        Report dictionary ('meta' and per view 'views' metrics)
+    """
+    client = Client()
+    # The string configuration most visitors have
+    client.cookies['stringConfig'] = 'six-string'
+    report = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'app_version': getattr(settings, 'VERSION', None),
+            'database': connection.vendor,
+            'repeat': repeat,
+            'cold': cold,
+        },
+        'views': {},
+    }
+    for view, view_cases in cases.items():
+        summary = summarize([run_case(client, case, repeat, cold) for case in view_cases])
+        report['views'][view] = summary
+        if progress:
+            progress(view, summary)
+    return report
+
+
+def compare_reports(baseline, current, threshold=0.1, min_ms=1.0):
+    """
+    Flag regressions of a run against a baseline run.
+
+    A latency or memory metric regresses when it grew by more than threshold
+    (relative) and, for latencies, by more than min_ms; a query or error
+    count regresses whenever it grew.
+
+    Args:
+        baseline: Report of the reference run
+        current: Report of the new run
+        threshold: Allowed relative growth, 0.1 = 10%
+        min_ms: Latency growth always tolerated, to ignore timer noise
+
+    Returns:
+        List of dictionaries (view, metric, baseline, current, change), one
+        per regression
+    """
+    regressions = []
+    for view, metrics in current.get('views', {}).items():
+        reference = baseline.get('views', {}).get(view)
+        if not reference:
+            continue
+        for metric in LATENCY_METRICS + MEMORY_METRICS + COUNT_METRICS:
+            if metric not in metrics or metric not in reference:
+                continue
+            before, after = reference[metric], metrics[metric]
+            if metric in COUNT_METRICS:
+                regressed = after > before
+            else:
+                regressed = after > before * (1 + threshold)
+                if metric in LATENCY_METRICS:
+                    regressed = regressed and after - before > min_ms
+            if regressed:
+                regressions.append({
+                    'view': view,
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'change': round((after - before) / before, 3) if before else None,
+                })
+    return regressions
@@ -0,0 +1,326 @@
+"""
+Versioned, namespaced caching shared by the API and page views.
+
+Every key is built from the app VERSION, the catalog version, a namespace
+(usually the endpoint) and the normalized request parameters:
+
+    fretboard:<VERSION>:<catalog version>:<namespace>:<params digest>
+
+The catalog version lives in the cache itself, so every worker process that
+shares the backend sees the same value. Bumping it (on any catalog change,
+see signals.py, or after import_data reloads the fixtures) makes every
+cached entry stale at once without having to enumerate keys.
+
+A per-process backend (locmem, the default) can't see bumps made by other
+processes (workers, admin, management commands). There the version itself
+expires with the backend TIMEOUT, and so does every entry unless a timeout
+is given, which bounds how long a worker serves stale data.
+
+With a shared backend the same key doubles as a strong ETag for
+versioned_cache responses (and conditional_page pages), so a client or CDN
+revalidating with If-None-Match gets a 304 before the view runs, until the
+catalog version (or the parameters) change. Per-process versions differ
+between workers and miss bumps made elsewhere, so no ETags are sent there.
+"""
+import hashlib
+import logging
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from django.utils.translation import get_language
+
+from .instrumentation import record_cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'fretboard'
+CATALOG_VERSION_KEY = f'{KEY_PREFIX}:catalog_version'
+
+
+def get_cache():
+    """Return the cache backend used for catalog data."""
+    return caches[getattr(settings, 'FRETBOARD_CACHE_ALIAS', 'default')]
+
+
+def is_shared_cache():
+    """Return True if the catalog cache is shared by all worker processes."""
+    return not isinstance(get_cache(), (LocMemCache, DummyCache))
+
+
+def _version_timeout():
+    # Only a shared version sees every bump, a per-process one must expire
+    return None if is_shared_cache() else DEFAULT_TIMEOUT
+
+
+def _new_catalog_version():
+    # Time based, so a version key lost to eviction never reuses old entries
+    return int(time.time() * 1000)
+
+
+def get_catalog_version():
+    """Return the current catalog version, creating it if needed."""
+    cache = get_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = _new_catalog_version()
+        if not cache.add(CATALOG_VERSION_KEY, version, _version_timeout()):
+            version = cache.get(CATALOG_VERSION_KEY, version)
+    return version
+
+
+def bump_catalog_version():
+    """Make every versioned cache entry stale."""
+    cache = get_cache()
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, _new_catalog_version(), _version_timeout())
+
+
+def normalize_params(params):
+    """
+    Turn request or call parameters into a stable, sorted list of pairs.
+
+    Args:
+        params: A QueryDict, a dict or an iterable of (key, value) pairs;
+            values may be lists
+
+    Returns:
+        Sorted list of (key, value) string pairs
+    """
+    if params is None:
+        return []
+    if hasattr(params, 'lists'):
+        items = params.lists()
+    elif hasattr(params, 'items'):
+        items = params.items()
+    else:
+        items = params
+    pairs = []
+    for key, value in items:
+        values = value if isinstance(value, (list, tuple)) else [value]
+        pairs.extend((str(key), '' if item is None else str(item)) for item in values)
+    return sorted(pairs)
+
+
+def make_cache_key(namespace, params=None, version=None):
+    """
+    Build a versioned cache key.
+
+    Args:
+        namespace: Endpoint or data set the entry belongs to
+        params: Parameters the entry depends on (see normalize_params)
+        version: Catalog version, defaults to the current one
+
+    Returns:
+        Cache key string
+    """
+    if version is None:
+        version = get_catalog_version()
+    digest = hashlib.md5(urlencode(normalize_params(params)).encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:{settings.VERSION}:{version}:{namespace}:{digest}'
+
+
+def get_or_set(namespace, params, build, timeout=DEFAULT_TIMEOUT):
+    """
+    Return a cached value, computing and storing it on a miss.
+
+    Cache backend errors are logged and fall back to computing the value.
+
+    Args:
+        namespace: Namespace of the entry
+        params: Parameters the entry depends on
+        build: Callable producing the value on a miss
+        timeout: Cache timeout in seconds, None to keep until invalidated;
+            defaults to the backend TIMEOUT
+
+    Returns:
+        The cached or freshly built value
+    """
+    cache = get_cache()
+    try:
+        key = make_cache_key(namespace, params)
+        value = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {namespace}: {e}")
+        return build()
+    record_cache(value is not None)
+    if value is None:
+        value = build()
+        try:
+            cache.set(key, value, timeout)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {namespace}: {e}")
+    return value
+
+
+def make_etag(key):
+    """Return the strong ETag of a versioned cache key."""
+    return quote_etag(hashlib.md5(key.encode('utf-8')).hexdigest())
+
+
+def etag_matches(request, etag):
+    """Return True if the request's If-None-Match header matches etag."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    # If-None-Match uses the weak comparison
+    return '*' in etags or any(candidate.removeprefix('W/') == etag for candidate in etags)
+
+
+def _with_etag(response, etag, vary, private=False):
+    """Add the ETag and revalidation headers of a conditional response, if there is an ETag."""
+    if etag is None:
+        return response
+    response['ETag'] = etag
+    patch_vary_headers(response, vary)
+    if 'Cache-Control' not in response:
+        # Let browsers (and CDNs, unless private) store the response but revalidate it
+        if private:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+    return response
+
+
+def _request_params(request, cookies, session_keys):
+    params = list(request.GET.lists())
+    params.append(('_path', request.path))
+    params.append(('_host', request.get_host()))
+    params.append(('_language', get_language() or ''))
+    params.append(('_accept', request.META.get('HTTP_ACCEPT', '')))
+    for cookie in cookies:
+        params.append((f'_cookie:{cookie}', request.COOKIES.get(cookie, '')))
+    session = getattr(request, 'session', None)
+    for session_key in session_keys:
+        params.append((f'_session:{session_key}', session.get(session_key, '') if session is not None else ''))
+    return params
+
+
+def versioned_cache(namespace, timeout=DEFAULT_TIMEOUT, cookies=(), session_keys=()):
+    """
+    Cache successful GET responses of a view under versioned keys.
+
+    Works for function views and, through method_decorator, for view
+    methods (including DRF APIViews, whose responses are stored once
+    rendered). Entries are keyed by the GET parameters, path, host,
+    language, Accept header and the given cookies / session keys, and
+    expire with the catalog version.
+
+    With a shared backend (see is_shared_cache) responses carry the key as
+    a strong ETag; a request whose If-None-Match matches it is answered with
+    304 Not Modified without running the view.
+
+    The stored response is served to every client, so don't use it for
+    pages that render CSRF tokens or write the session; cache the data they
+    are built from instead.
+
+    Args:
+        namespace: Name of the endpoint
+        timeout: Cache timeout in seconds, None to keep until invalidated;
+            defaults to the backend TIMEOUT
+        cookies: Cookies the response depends on
+        session_keys: Session values the response depends on
+    """
+    vary = ('Accept', 'Cookie') if cookies or session_keys else ('Accept',)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            cache = get_cache()
+            try:
+                params = _request_params(request, cookies, session_keys)
+                params.extend((f'_arg{index}', arg) for index, arg in enumerate(args))
+                params.extend((f'_kwarg:{key}', value) for key, value in kwargs.items())
+                key = make_cache_key(namespace, params)
+                etag = make_etag(key) if is_shared_cache() else None
+                if etag is not None and etag_matches(request, etag):
+                    return _with_etag(HttpResponseNotModified(), etag, vary)
+                cached = cache.get(key)
+            except Exception as e:
+                logger.warning(f"Cache read failed for {namespace}: {e}")
+                return view_func(request, *args, **kwargs)
+
+            record_cache(cached is not None)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response['X-Cache'] = 'HIT'
+                return _with_etag(response, etag, vary)
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code != 200 or getattr(response, 'streaming', False):
+                return response
+
+            def store(rendered):
+                try:
+                    cache.set(key, (rendered.content, rendered['Content-Type']), timeout)
+                except Exception as e:
+                    logger.warning(f"Cache write failed for {namespace}: {e}")
+
+            if hasattr(response, 'render') and not response.is_rendered:
+                # TemplateResponse / DRF Response: store once rendered
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            response['X-Cache'] = 'MISS'
+            return _with_etag(response, etag, vary)
+        return wrapper
+    return decorator
+
+
+def conditional_page(namespace, cookies=(), session_keys=(), bypass_params=()):
+    """
+    Answer conditional GETs of a page from the catalog version, without storing it.
+
+    For pages whose response can't be shared (CSRF tokens, session writes).
+    The ETag covers what versioned_cache keys on plus the CSRF cookie, so a
+    304 only confirms a page rendered for the same client, and responses
+    are private. Only active with a shared backend (see is_shared_cache).
+
+    Args:
+        namespace: Name of the page
+        cookies: Cookies the page depends on
+        session_keys: Session values the page depends on
+        bypass_params: GET parameters that make the view write the session;
+            requests with them always run the view
+    """
+    cookies = tuple(cookies) + (settings.CSRF_COOKIE_NAME,)
+    vary = ('Accept', 'Cookie')
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD') or not is_shared_cache()
+                    or any(param in request.GET for param in bypass_params)):
+                return view_func(request, *args, **kwargs)
+            try:
+                params = _request_params(request, cookies, session_keys)
+                params.extend((f'_arg{index}', arg) for index, arg in enumerate(args))
+                params.extend((f'_kwarg:{key}', value) for key, value in kwargs.items())
+                etag = make_etag(make_cache_key(namespace, params))
+            except Exception as e:
+                logger.warning(f"Cache read failed for {namespace}: {e}")
+                return view_func(request, *args, **kwargs)
+            if etag_matches(request, etag):
+                return _with_etag(HttpResponseNotModified(), etag, vary, private=True)
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code != 200 or getattr(response, 'streaming', False):
+                return response
+            return _with_etag(response, etag, vary, private=True)
+        return wrapper
+    return decorator
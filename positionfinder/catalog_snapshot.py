@@ -0,0 +1,418 @@
+"""
+Prebuilt binary snapshot of the theory catalog.
+
+build_catalog_snapshot compiles roots, categories, scales / arpeggios
+(Notes, NotesPosition) and chords (ChordNotes, ChordPosition, VoicingScore)
+into a single file of column arrays, plus the derived tables the read paths
+would otherwise compute at startup: the row orders the menu and catalog
+queries use and the root-relative (string, pitch class) shape of every
+voicing.
+
+Layout (all integers little-endian):
+
+    b'FPFSNAP\\0' | u32 header length | JSON header | aligned column arrays
+
+The header lists every array as [dtype, shape, offset]. Strings are stored
+once in a shared table and referenced by index, NULLs as -1. Workers map the
+file read-only and wrap the arrays with numpy.frombuffer, so nothing is
+parsed until a loader asks for rows and the pages are shared between worker
+processes through the page cache.
+
+The snapshot is only used while it matches the database: it is checked
+against a fingerprint (the CatalogRevision every catalog write bumps, row
+counts, highest primary keys and pitch-class checksums) once per process
+and again whenever the catalog version changes (see cache_utils).
+Everything falls back to the database queries when the file is missing or
+stale; rebuild it after editing the catalog.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections import namedtuple
+
+import numpy
+from django.conf import settings
+from django.db import connection
+
+from .cache_utils import get_catalog_version
+from .models import CatalogRevision, Notes, NotesCategory, Root
+from .models_chords import ChordNotes, ChordPosition, VoicingScore
+from .positions import NotesPosition
+from .voicing_templates import get_voicing_template
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'FPFSNAP\0'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+NULL = -1
+
+SnapshotTable = namedtuple('SnapshotTable', ['name', 'model', 'ordering', 'orders'])
+
+# Rows are stored in ``ordering``; ``orders`` are further row orders stored
+# as permutations, named after the read path that needs them
+SNAPSHOT_TABLES = [
+    SnapshotTable('notescategory', NotesCategory, ('pk',), {}),
+    SnapshotTable('root', Root, ('pitch', 'name'), {}),
+    SnapshotTable('notes', Notes, ('ordering', 'note_name', 'pk'), {}),
+    SnapshotTable('notesposition', NotesPosition, ('notes_name_id', 'position_order', 'pk'), {}),
+    SnapshotTable('chordnotes', ChordNotes, ('ordering', 'chord_ordering', 'range_ordering', 'pk'), {
+        'default': (),
+        'range': ('ordering', 'range_ordering', 'pk'),
+        'menu': ('range_ordering', 'pk'),
+    }),
+    SnapshotTable('chordposition', ChordPosition, ('notes_name_id', 'pk'), {
+        'menu': ('inversion_order', 'pk'),
+    }),
+    SnapshotTable('voicingscore', VoicingScore, ('position_id', 'root_pitch'), {}),
+]
+SNAPSHOT_TABLE_NAMES = [table.name for table in SNAPSHOT_TABLES]
+
+
+def get_snapshot_path():
+    """Return the configured snapshot file, '' when snapshots are disabled."""
+    return getattr(settings, 'FRETBOARD_CATALOG_SNAPSHOT', '')
+
+
+def catalog_fingerprint():
+    """
+    Summarize the catalog tables cheaply, to tell whether a snapshot is current.
+
+    One query of scalar subqueries: the catalog revision, then per table
+    the row count, highest primary key and, for tables with a
+    pitch_class_set column, its sum. Counts and sums catch bulk writes that
+    don't bump the revision; the revision catches in-place edits.
+
+    Returns:
+        Dict 'revision' -> catalog revision (None before the first write) and
+        table name -> [row count, highest pk, pitch-class checksum]
+    """
+    quote = connection.ops.quote_name
+    selects, names = [], []
+    for table in SNAPSHOT_TABLES:
+        db_table = quote(table.model._meta.db_table)
+        pk = quote(table.model._meta.pk.column)
+        checksum = 'SUM(%s)' % quote('pitch_class_set') if hasattr(table.model, 'update_pitch_class_set') else 'NULL'
+        for aggregate in ('COUNT(*)', f'MAX({pk})', checksum):
+            selects.append(f'(SELECT {aggregate} FROM {db_table})')
+        names.append(table.name)
+    revision_table = quote(CatalogRevision._meta.db_table)
+    selects.append(f"(SELECT {quote('revision')} FROM {revision_table} WHERE {quote('id')} = 1)")
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT ' + ', '.join(selects))
+        values = cursor.fetchone()
+    fingerprint = {name: [values[3 * i], values[3 * i + 1], values[3 * i + 2]] for i, name in enumerate(names)}
+    fingerprint['revision'] = values[-1]
+    return fingerprint
+
+
+def _columns(model):
+    """Return the (attname, kind) columns of a model, kind is 'string', 'float' or 'int'."""
+    kinds = {'CharField': 'string', 'TextField': 'string', 'FloatField': 'float'}
+    return [
+        (field.attname, kinds.get(field.get_internal_type(), 'int'))
+        for field in model._meta.concrete_fields
+    ]
+
+
+def _voicing_shapes(chords, positions):
+    """
+    Derive the root-relative (string, pitch class) shape of every voicing.
+
+    Args:
+        chords: Dict chord id -> (notes, strings)
+        positions: (chord id, offsets) per ChordPosition row
+
+    Returns:
+        List of ((string, relative pitch class), ...) per position
+    """
+    shapes = []
+    for chord_id, offsets in positions:
+        notes, strings = chords[chord_id]
+        template = get_voicing_template(notes, strings, offsets)
+        shapes.append(tuple((string, relative_pitch) for string, relative_pitch, _, _ in template.notes))
+    return shapes
+
+
+def build_catalog_snapshot(path=None):
+    """
+    Compile the catalog into a snapshot file.
+
+    The file is written next to the target and renamed into place, so
+    running workers keep their mapping of the previous file.
+
+    Args:
+        path: Output file (default: settings.FRETBOARD_CATALOG_SNAPSHOT)
+
+    Returns:
+        Dict table name -> number of rows
+    """
+    path = path or get_snapshot_path()
+    if not path:
+        raise ValueError('No snapshot path configured (FRETBOARD_CATALOG_SNAPSHOT)')
+    fingerprint = catalog_fingerprint()
+    strings, string_ids = [], {}
+    string_columns = []
+
+    def string_id(value):
+        if value is None:
+            return NULL
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    arrays = {}
+    counts = {}
+    rows_by_table = {}
+    for table in SNAPSHOT_TABLES:
+        columns = _columns(table.model)
+        names = [name for name, _ in columns]
+        rows = list(table.model.objects.order_by(*table.ordering).values_list(*names))
+        rows_by_table[table.name] = (names, rows)
+        counts[table.name] = len(rows)
+        for index, (name, kind) in enumerate(columns):
+            values = [row[index] for row in rows]
+            if kind == 'string':
+                string_columns.append(f'{table.name}.{name}')
+                arrays[f'{table.name}.{name}'] = numpy.array([string_id(value) for value in values], dtype='<i4')
+                continue
+            arrays[f'{table.name}.{name}'] = numpy.array(
+                [NULL if value is None else value for value in values], dtype='<f8' if kind == 'float' else '<i4')
+            if any(value is None for value in values):
+                arrays[f'{table.name}.{name}.null'] = numpy.array([value is None for value in values], dtype='?')
+        row_index = {row[names.index('id')]: index for index, row in enumerate(rows)}
+        for order_name, ordering in table.orders.items():
+            ids = table.model.objects.order_by(*ordering).values_list('id', flat=True) if ordering \
+                else table.model.objects.values_list('id', flat=True)
+            arrays[f'{table.name}.order.{order_name}'] = numpy.array([row_index[pk] for pk in ids], dtype='<i4')
+
+    # Derived voicing table: the shapes of position i are entries
+    # offsets[i]:offsets[i + 1] of strings / pitch_classes
+    chord_names, chord_rows = rows_by_table['chordnotes']
+    position_names, position_rows = rows_by_table['chordposition']
+    note_fields = list(ChordNotes.NOTE_FIELDS)
+    chords = {
+        row[chord_names.index('id')]: (
+            tuple(row[chord_names.index(name)] for name in note_fields),
+            tuple(row[chord_names.index(f'{name}_string')] for name in note_fields),
+        )
+        for row in chord_rows
+    }
+    shapes = _voicing_shapes(chords, [
+        (row[position_names.index('notes_name_id')], tuple(row[position_names.index(name)] for name in note_fields))
+        for row in position_rows
+    ])
+    arrays['voicing.offsets'] = numpy.cumsum([0] + [len(shape) for shape in shapes], dtype='<i4')
+    arrays['voicing.strings'] = numpy.array([string_id(string) for shape in shapes for string, _ in shape], dtype='<i4')
+    arrays['voicing.pitch_classes'] = numpy.array([pc for shape in shapes for _, pc in shape], dtype='<i1')
+
+    encoded = [value.encode('utf-8') for value in strings]
+    arrays['strings.offsets'] = numpy.cumsum([0] + [len(value) for value in encoded], dtype='<i8')
+    arrays['strings.data'] = numpy.frombuffer(b''.join(encoded), dtype='u1')
+
+    specs, offset = {}, 0
+    for name, array in arrays.items():
+        specs[name] = [array.dtype.str, list(array.shape), offset]
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({
+        'format_version': FORMAT_VERSION,
+        'fingerprint': fingerprint,
+        'counts': counts,
+        'string_columns': string_columns,
+        'arrays': specs,
+    }).encode('utf-8')
+    header += b' ' * (-(len(MAGIC) + 4 + len(header)) % ALIGNMENT)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<I', len(header)) + header)
+        for name, array in arrays.items():
+            data = array.tobytes()
+            f.write(data + b'\0' * (-len(data) % ALIGNMENT))
+    os.replace(temp_path, path)
+    return counts
+
+
+class CatalogSnapshot:
+    """
+    Read-only view of a snapshot file.
+
+    Attributes:
+        path: The snapshot file
+        fingerprint: catalog_fingerprint() of the database it was built from
+        counts: Dict table name -> number of rows
+    """
+
+    def __init__(self, buffer, path=None):
+        """
+        Args:
+            buffer: The file contents (an mmap or bytes)
+            path: File the buffer was read from, for messages
+
+        Raises:
+            ValueError: If the buffer is not a snapshot of this format version
+        """
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'Not a catalog snapshot: {path}')
+        (length,) = struct.unpack_from('<I', buffer, len(MAGIC))
+        data_offset = len(MAGIC) + 4 + length
+        header = json.loads(bytes(buffer[len(MAGIC) + 4:data_offset]))
+        if header.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {header.get('format_version')}: {path}")
+        self.path = path
+        self.fingerprint = header['fingerprint']
+        self.counts = header['counts']
+        self._buffer = buffer
+        self._data_offset = data_offset
+        self._specs = header['arrays']
+        self._string_columns = set(header['string_columns'])
+        self._strings = None
+        self._values = {}
+        self._groups = {}
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a snapshot file."""
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, path)
+
+    def array(self, name):
+        """Return a stored array without copying it."""
+        dtype, shape, offset = self._specs[name]
+        count = int(numpy.prod(shape))
+        if not count:
+            return numpy.empty(shape, dtype=dtype)
+        return numpy.frombuffer(self._buffer, dtype=dtype, count=count,
+                                offset=self._data_offset + offset).reshape(shape)
+
+    def strings(self):
+        """Return the string table, decoded once."""
+        if self._strings is None:
+            data = self.array('strings.data').tobytes()
+            offsets = self.array('strings.offsets').tolist()
+            self._strings = [data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+        return self._strings
+
+    def column(self, table, name, order=None):
+        """
+        Return a column as a list of Python values.
+
+        Args:
+            table: Table name (see SNAPSHOT_TABLE_NAMES)
+            name: Field attname, e.g. 'id' or 'category_id'
+            order: Name of a stored row order, default the table ordering
+
+        Returns:
+            List of ints / strings, None for NULLs
+        """
+        key = f'{table}.{name}'
+        values = self.array(key)
+        nulls = self.array(f'{key}.null') if f'{key}.null' in self._specs else None
+        if order is not None:
+            permutation = self.array(f'{table}.order.{order}')
+            values = values[permutation]
+            nulls = nulls[permutation] if nulls is not None else None
+        values = values.tolist()
+        if key in self._string_columns:
+            strings = self.strings()
+            return [None if value == NULL else strings[value] for value in values]
+        if nulls is not None:
+            return [None if null else value for value, null in zip(values, nulls.tolist())]
+        return values
+
+    def rows(self, table, names, order=None):
+        """Return a list of tuples of the given columns, like values_list()."""
+        return list(zip(*(self.column(table, name, order) for name in names)))
+
+    def values(self, table):
+        """Return every row of a table as an attname -> value dict, built once."""
+        if table not in self._values:
+            names = [name for name, _ in _columns(next(spec.model for spec in SNAPSHOT_TABLES if spec.name == table))]
+            self._values[table] = [dict(zip(names, row)) for row in self.rows(table, names)]
+        return self._values[table]
+
+    def grouped(self, table, name):
+        """Return {value of column ``name``: [row dicts in table ordering]}, built once."""
+        if (table, name) not in self._groups:
+            groups = {}
+            for row in self.values(table):
+                groups.setdefault(row[name], []).append(row)
+            self._groups[table, name] = groups
+        return self._groups[table, name]
+
+    def voicing_shapes(self):
+        """
+        Return the derived voicing table.
+
+        Returns:
+            Dict ChordPosition id -> ((string, pitch class relative to the root), ...)
+        """
+        strings = self.strings()
+        offsets = self.array('voicing.offsets').tolist()
+        string_ids = self.array('voicing.strings').tolist()
+        pitch_classes = self.array('voicing.pitch_classes').tolist()
+        return {
+            position_id: tuple(zip((strings[string] for string in string_ids[start:end]), pitch_classes[start:end]))
+            for position_id, start, end in zip(self.column('chordposition', 'id'), offsets, offsets[1:])
+        }
+
+
+_snapshot = None
+# (path, catalog version) the snapshot was checked at, None before the first check
+_snapshot_checked = None
+_snapshot_lock = threading.Lock()
+
+
+def _open_current_snapshot(path, fingerprint):
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = CatalogSnapshot.open(path)
+    except (OSError, ValueError) as e:
+        logger.warning('Ignoring catalog snapshot %s: %s', path, e)
+        return None
+    if snapshot.fingerprint != fingerprint:
+        logger.info('Catalog snapshot %s is stale, reading the catalog from the database', path)
+        return None
+    return snapshot
+
+
+def get_catalog_snapshot():
+    """
+    Return the catalog snapshot if it matches the database, else None.
+
+    The file is opened and checked against the database on first use, and
+    checked again whenever the catalog version changes (an edit, or the
+    version key expiring): the open snapshot is kept if the fingerprint still
+    matches, otherwise the file is opened again in case it was rebuilt.
+    """
+    global _snapshot, _snapshot_checked
+    path = get_snapshot_path()
+    if not path:
+        return None
+    version = get_catalog_version()
+    if _snapshot_checked == (path, version):
+        return _snapshot
+    with _snapshot_lock:
+        checked = _snapshot_checked
+        if checked != (path, version):
+            fingerprint = catalog_fingerprint()
+            if checked is None or checked[0] != path or _snapshot is None or _snapshot.fingerprint != fingerprint:
+                _snapshot = _open_current_snapshot(path, fingerprint)
+            _snapshot_checked = (path, version)
+        return _snapshot
+
+
+def reset_catalog_snapshot():
+    """Forget the checked snapshot, so the next access opens the file again."""
+    global _snapshot, _snapshot_checked
+    with _snapshot_lock:
+        _snapshot = None
+        _snapshot_checked = None
@@ -0,0 +1,359 @@
+"""
+Streaming JSONL export and diff-based import of the catalog.
+
+The export writes one JSON record per line: a header, then every category,
+root, scale / arpeggio (Notes) and chord (ChordNotes) in that order. Rows
+are identified by natural keys instead of primary keys, and positions are
+nested in their scale or chord as an ordered list, e.g.
+
+    {"format": "fretboard-catalog", "version": 2, "models": ["notescategory", ...]}
+    {"model": "chordnotes", "key": ["V2", "Major 7", "e - A", 0], "fields": {...}, "positions": [{...}, ...]}
+
+The import compares the file against the database and only writes the
+difference: new rows with bulk_create, changed rows with bulk_update, and
+positions are replaced just for rows whose position list changed. Existing
+rows keep their primary keys (page URLs contain them); categories and roots
+are created with their exported primary keys, which the code refers to.
+Database rows repeating a natural key are left alone unless the import is
+asked to delete them.
+"""
+import json
+from collections import namedtuple
+
+from django.db import transaction
+
+from .models import Notes, NotesCategory, Root
+from .models_chords import ChordNotes, ChordPosition, _chord_data_bulk_changed
+from .voicing_difficulty import update_voicing_scores
+from .positions import NotesPosition
+
+FORMAT_NAME = 'fretboard-catalog'
+FORMAT_VERSION = 2
+# Version 1 keyed chords without their tonal root
+SUPPORTED_VERSIONS = (1, 2)
+
+# Derived columns, recomputed on import
+DERIVED_FIELDS = {'pitch_class_set'}
+
+CatalogModel = namedtuple('CatalogModel', [
+    'name', 'model', 'key_fields', 'keep_pk', 'position_model',
+])
+
+# In dependency order
+CATALOG_MODELS = [
+    CatalogModel('notescategory', NotesCategory, ('category_name',), True, None),
+    CatalogModel('root', Root, ('name',), True, None),
+    CatalogModel('notes', Notes, ('category', 'note_name'), False, NotesPosition),
+    CatalogModel('chordnotes', ChordNotes, ('type_name', 'chord_name', 'range', 'tonal_root'), False, ChordPosition),
+]
+CATALOG_MODEL_NAMES = [spec.name for spec in CATALOG_MODELS]
+CATALOG_MODELS_BY_NAME = {spec.name: spec for spec in CATALOG_MODELS}
+
+
+def _record_fields(spec):
+    """Return the exported fields of a model (FKs by field name)."""
+    return [
+        field for field in spec.model._meta.concrete_fields
+        if not field.primary_key and field.name not in DERIVED_FIELDS
+    ]
+
+
+def _position_fields(spec):
+    return [
+        field for field in spec.position_model._meta.concrete_fields
+        if not field.primary_key and not field.is_relation
+    ]
+
+
+def _position_parent_field(spec):
+    return next(field for field in spec.position_model._meta.concrete_fields
+                if field.is_relation and field.related_model is spec.model)
+
+
+def _category_names():
+    return dict(NotesCategory.objects.values_list('pk', 'category_name'))
+
+
+def _live_rows(spec, category_names):
+    """
+    Return {natural key: (pk, fields)} of a model as stored in the database.
+
+    Foreign keys to NotesCategory are given by category name.
+
+    Returns:
+        Tuple (rows, primary keys of later rows repeating a natural key)
+    """
+    fields = _record_fields(spec)
+    rows = {}
+    duplicates = []
+    for values in spec.model.objects.order_by('pk').values('pk', *(field.attname for field in fields)):
+        record = {}
+        for field in fields:
+            value = values[field.attname]
+            record[field.name] = category_names.get(value) if field.is_relation else value
+        key = tuple(record[name] for name in spec.key_fields)
+        if key in rows:
+            duplicates.append(values['pk'])
+        else:
+            rows[key] = (values['pk'], record)
+    return rows, duplicates
+
+
+def _live_positions(spec, parent_pks=None):
+    """Return {parent pk: [position fields, ...]} ordered by primary key."""
+    fields = _position_fields(spec)
+    parent = _position_parent_field(spec)
+    queryset = spec.position_model.objects.order_by(parent.attname, 'pk')
+    if parent_pks is not None:
+        queryset = queryset.filter(**{f'{parent.attname}__in': parent_pks})
+    positions = {}
+    for values in queryset.values(parent.attname, *(field.name for field in fields)).iterator(chunk_size=2000):
+        parent_pk = values.pop(parent.attname)
+        positions.setdefault(parent_pk, []).append(values)
+    return positions
+
+
+def _complete_key(spec, record):
+    """Move key fields missing from an older record's key over from its fields."""
+    key = list(record['key'])
+    fields = record.setdefault('fields', {})
+    for name in spec.key_fields[len(key):]:
+        key.append(fields.pop(name, spec.model._meta.get_field(name).get_default()))
+    record['key'] = key
+    return tuple(key)
+
+
+def _compact(values):
+    return {name: value for name, value in values.items() if value is not None}
+
+
+def export_catalog(stream, models=None, chunk_size=2000):
+    """
+    Write the catalog as JSON lines.
+
+    Rows are read with server-side iterators, so memory use doesn't grow
+    with the catalog size.
+
+    Args:
+        stream: Text stream to write to
+        models: Catalog model names to export (default all, see CATALOG_MODEL_NAMES)
+        chunk_size: Rows fetched per database round trip
+
+    Returns:
+        Dict model name -> number of exported rows
+    """
+    specs = [spec for spec in CATALOG_MODELS if models is None or spec.name in models]
+    stream.write(json.dumps({
+        'format': FORMAT_NAME, 'version': FORMAT_VERSION, 'models': [spec.name for spec in specs],
+    }) + '\n')
+    category_names = _category_names()
+    counts = {}
+    for spec in specs:
+        fields = _record_fields(spec)
+        rows = spec.model.objects.order_by('pk').values('pk', *(field.attname for field in fields))
+
+        positions = iter(())
+        if spec.position_model is not None:
+            parent = _position_parent_field(spec)
+            position_fields = [field.name for field in _position_fields(spec)]
+            positions = spec.position_model.objects.order_by(parent.attname, 'pk').values_list(
+                parent.attname, *position_fields).iterator(chunk_size=chunk_size)
+        pending = next(positions, None)
+
+        counts[spec.name] = 0
+        for values in rows.iterator(chunk_size=chunk_size):
+            record = {}
+            for field in fields:
+                value = values[field.attname]
+                record[field.name] = category_names.get(value) if field.is_relation else value
+            line = {
+                'model': spec.name,
+                'key': [record.pop(name) for name in spec.key_fields],
+                'fields': _compact(record),
+            }
+            if spec.keep_pk:
+                line['pk'] = values['pk']
+            if spec.position_model is not None:
+                # Both sides are ordered by parent pk, merge them
+                line['positions'] = []
+                while pending is not None and pending[0] <= values['pk']:
+                    if pending[0] == values['pk']:
+                        line['positions'].append(_compact(dict(zip(position_fields, pending[1:]))))
+                    pending = next(positions, None)
+            stream.write(json.dumps(line, separators=(',', ':')) + '\n')
+            counts[spec.name] += 1
+    return counts
+
+
+def read_catalog(lines):
+    """
+    Parse exported JSON lines.
+
+    Returns:
+        Tuple (header, dict model name -> {natural key: record})
+
+    Raises:
+        ValueError: If the header or a record is invalid, or a natural key
+            repeats
+    """
+    lines = iter(lines)
+    try:
+        header = json.loads(next(lines))
+    except (StopIteration, ValueError):
+        raise ValueError('Missing catalog header')
+    if header.get('format') != FORMAT_NAME or header.get('version') not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported catalog format: {header.get('format')} {header.get('version')}")
+    records = {name: {} for name in header.get('models', [])}
+    for number, line in enumerate(lines, start=2):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            key = _complete_key(CATALOG_MODELS_BY_NAME[record['model']], record)
+            model_records = records[record['model']]
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise ValueError(f'Invalid catalog record on line {number}')
+        if key in model_records:
+            raise ValueError(f"Duplicate {record['model']} key {list(key)} on line {number}")
+        model_records[key] = record
+    return header, records
+
+
+def import_catalog(lines, delete=True, dry_run=False, batch_size=500, delete_duplicates=False):
+    """
+    Bring the database in line with an exported catalog, writing only the diff.
+
+    Args:
+        lines: Iterable of JSON lines (e.g. an open file)
+        delete: Remove rows of the exported models that are not in the file
+        dry_run: Compute the diff without writing anything
+        batch_size: Rows per bulk statement
+        delete_duplicates: Also remove database rows repeating the natural
+            key of an earlier row (by default they are kept and counted)
+
+    Returns:
+        Dict model name -> {'created', 'updated', 'deleted', 'unchanged',
+        'duplicates', 'positions_replaced'} counts
+    """
+    _, records = read_catalog(lines)
+    report = {}
+    with transaction.atomic():
+        for spec in CATALOG_MODELS:
+            if spec.name in records:
+                report[spec.name] = _sync_model(spec, records[spec.name], delete, dry_run, batch_size,
+                                                delete_duplicates)
+        if dry_run:
+            transaction.set_rollback(True)
+    changed = [
+        name for name, counts in report.items()
+        if counts['created'] or counts['updated'] or counts['deleted'] or counts['positions_replaced']
+    ]
+    if not dry_run and changed:
+        if 'chordnotes' in changed:
+            # Chord rows were written without save(), rescore their voicings
+            update_voicing_scores()
+        # Bulk writes send no signals, expire the caches once
+        _chord_data_bulk_changed()
+    return report
+
+
+def _sync_model(spec, incoming, delete, dry_run, batch_size, delete_duplicates=False):
+    category_names = _category_names()
+    category_ids = {name: pk for pk, name in category_names.items()}
+    fields = _record_fields(spec)
+    live, duplicates = _live_rows(spec, category_names)
+
+    def build(record, instance=None):
+        values = dict(zip(spec.key_fields, record['key']))
+        values.update(record.get('fields', {}))
+        instance = instance or spec.model(pk=record.get('pk') if spec.keep_pk else None)
+        for field in fields:
+            # Exported records leave out None values
+            value = values.get(field.name, None if field.null else field.get_default())
+            if field.is_relation:
+                if value not in category_ids:
+                    raise ValueError(f'Unknown category {value!r} for {spec.name} {record["key"]}')
+                setattr(instance, field.attname, category_ids[value])
+            else:
+                setattr(instance, field.attname, value)
+        if hasattr(instance, 'update_pitch_class_set'):
+            instance.update_pitch_class_set()
+        return instance
+
+    to_create, to_update, unchanged = [], [], 0
+    for key, record in incoming.items():
+        existing = live.get(key)
+        expected = build(record)
+        if existing is None:
+            to_create.append((record, expected))
+            continue
+        pk, current = existing
+        wanted = {field.name: (category_names.get(getattr(expected, field.attname)) if field.is_relation
+                               else getattr(expected, field.attname)) for field in fields}
+        if wanted != current:
+            expected.pk = pk
+            to_update.append((record, expected))
+        else:
+            unchanged += 1
+    deleted_pks = [pk for key, (pk, _) in live.items() if key not in incoming] if delete else []
+    if delete_duplicates:
+        deleted_pks += duplicates
+
+    positions_replaced = 0
+    if not dry_run:
+        # Deleted first, so primary keys kept from the file are free
+        if deleted_pks:
+            spec.model.objects.filter(pk__in=deleted_pks).delete()
+        created = spec.model.objects.bulk_create([instance for _, instance in to_create], batch_size=batch_size)
+        update_fields = [field.name for field in fields]
+        if hasattr(spec.model, 'update_pitch_class_set'):
+            update_fields.append('pitch_class_set')
+        spec.model.objects.bulk_update([instance for _, instance in to_update], update_fields, batch_size=batch_size)
+        if spec.keep_pk:
+            _reset_sequence(spec.model)
+        pk_by_key = {key: pk for key, (pk, _) in live.items()}
+        pk_by_key.update({tuple(record['key']): instance.pk for (record, _), instance in zip(to_create, created)})
+    else:
+        pk_by_key = {key: pk for key, (pk, _) in live.items()}
+
+    if spec.position_model is not None:
+        positions_replaced = _sync_positions(spec, incoming, pk_by_key, dry_run, batch_size)
+    return {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'deleted': len(deleted_pks),
+        'unchanged': unchanged,
+        'duplicates': len(duplicates),
+        'positions_replaced': positions_replaced,
+    }
+
+
+def _sync_positions(spec, incoming, pk_by_key, dry_run, batch_size):
+    """Replace the positions of rows whose ordered position list differs."""
+    fields = [field.name for field in _position_fields(spec)]
+    parent = _position_parent_field(spec)
+    live = _live_positions(spec)
+    stale_parents, new_positions = [], []
+    for key, record in incoming.items():
+        parent_pk = pk_by_key.get(key)
+        wanted = [{name: position.get(name) for name in fields} for position in record.get('positions', [])]
+        if parent_pk is not None and live.get(parent_pk, []) == wanted:
+            continue
+        stale_parents.append(parent_pk)
+        new_positions.extend(spec.position_model(**{parent.attname: parent_pk}, **position) for position in wanted)
+    if not dry_run and stale_parents:
+        spec.position_model.objects.filter(**{f'{parent.attname}__in': stale_parents}).delete()
+        spec.position_model.objects.bulk_create(new_positions, batch_size=batch_size)
+    return len(stale_parents)
+
+
+def _reset_sequence(model):
+    """Move the pk sequence past explicitly inserted primary keys (Postgres)."""
+    from django.core.management.color import no_style
+    from django.db import connection
+
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
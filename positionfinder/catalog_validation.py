@@ -0,0 +1,296 @@
+"""
+Whole-catalog chord validation.
+
+Loads every ChordNotes / ChordPosition row once (through the chord catalog)
+into integer arrays and runs each rule as one batched check over all chords:
+
+- note_range: chord notes outside 0-11
+- string_assignment: notes without a string, or on a string the fretboard
+  doesn't have
+- duplicate_strings: two notes of a chord on the same string
+- note_count: triads / seventh chords with the wrong number of notes
+- inversion_count: chords without one inversion per note, inversions that
+  don't cover every note, or a first inversion that isn't the basic position
+- range_coverage: chords missing ranges their chord type has, or storing a
+  range twice
+- playability: voicings that need more than MAX_FRET_SPAN frets for some
+  root; the most expensive rule, spread over a process pool
+
+The result is one report dict (see validate_catalog).
+"""
+import os
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
+from .chord_catalog import ChordCatalog
+from .fretboard_model import OPEN_STRING_PITCHES, MIN_FRET, MAX_FRET
+from .template_notes import INVERSIONS, NOTES
+
+# Widest stretch (highest minus lowest fret) a voicing may need
+MAX_FRET_SPAN = 5
+
+ORDINALS = ['First', 'Second', 'Third', 'Fourth', 'Fifth', 'Sixth']
+
+TRIAD_NAMES = ['Major', 'Minor', 'Diminished', 'Augmented', 'Sus2', 'Sus4']
+SEVENTH_NAMES = ['Major 7', 'Minor 7', 'Dominant 7', 'Minor 7b5', 'MinMaj 7',
+                 'Major 7(#5)', 'Major 7(b5)', 'Dominant 7(#5)', 'Dominant 7(b5)']
+
+STRING_NAMES = list(OPEN_STRING_PITCHES)
+OPEN_PITCH_CLASSES = numpy.array([OPEN_STRING_PITCHES[string] % 12 for string in STRING_NAMES])
+
+# Markers in the string index array
+MISSING = -1
+UNKNOWN_STRING = -2
+
+Issue = namedtuple('Issue', ['rule', 'chord_id', 'type_name', 'chord_name', 'range', 'message'])
+
+
+class CatalogArrays:
+    """
+    The chord catalog as integer arrays.
+
+    Attributes:
+        chords: ChordRecords, row i of the chord arrays
+        notes: chords x 6 note intervals, -1 for unused notes
+        strings: chords x 6 indexes into STRING_NAMES, MISSING / UNKNOWN_STRING
+        positions: PositionRecords, row i of the position arrays
+        position_chords: Chord row of every position
+        offsets: positions x 6 inversion offsets, -1 for None
+    """
+
+    def __init__(self, catalog):
+        self.chords = catalog.chords
+        self.notes = numpy.array([[MISSING if note is None else note for note in chord.notes]
+                                  for chord in self.chords], dtype=int).reshape(-1, 6)
+        string_index = {string: index for index, string in enumerate(STRING_NAMES)}
+        self.strings = numpy.array([
+            [string_index.get(string, UNKNOWN_STRING) if string else MISSING for string in chord.strings]
+            for chord in self.chords
+        ], dtype=int).reshape(-1, 6)
+
+        row_index = {chord.id: row for row, chord in enumerate(self.chords)}
+        self.positions = [position for chord in self.chords for position in catalog.get_positions(chord.id)]
+        self.position_chords = numpy.array([row_index[position.notes_name_id] for position in self.positions],
+                                           dtype=int)
+        self.offsets = numpy.array([[MISSING if offset is None else offset for offset in position.offsets]
+                                    for position in self.positions], dtype=int).reshape(-1, 6)
+
+    @classmethod
+    def load(cls):
+        """Load the arrays from the database (or catalog snapshot) in three queries."""
+        return cls(ChordCatalog.load())
+
+    def issue(self, rule, row, message):
+        chord = self.chords[row]
+        return Issue(rule, chord.id, chord.type_name, chord.chord_name, chord.range, message)
+
+
+def check_note_range(arrays):
+    present = arrays.notes != MISSING
+    bad = present & ((arrays.notes < 0) | (arrays.notes > 11))
+    return [
+        arrays.issue('note_range', row, f'{ORDINALS[column]} note is {arrays.notes[row, column]}, outside 0-11')
+        for row, column in zip(*numpy.nonzero(bad))
+    ]
+
+
+def check_string_assignment(arrays):
+    present = arrays.notes != MISSING
+    issues = []
+    for row, column in zip(*numpy.nonzero(present & (arrays.strings == MISSING))):
+        issues.append(arrays.issue('string_assignment', row, f'{ORDINALS[column]} note has no string assignment'))
+    for row, column in zip(*numpy.nonzero(present & (arrays.strings == UNKNOWN_STRING))):
+        string = arrays.chords[row].strings[column]
+        issues.append(arrays.issue('string_assignment', row, f'{ORDINALS[column]} note is on unknown string {string}'))
+    return sorted(issues, key=lambda issue: issue.chord_id)
+
+
+def check_duplicate_strings(arrays):
+    # Only assigned strings of used notes take part, others sort to the front
+    assigned = numpy.where((arrays.notes != MISSING) & (arrays.strings >= 0), arrays.strings, -1 - numpy.arange(6))
+    ordered = numpy.sort(assigned, axis=1)
+    duplicated = (ordered[:, 1:] == ordered[:, :-1]) & (ordered[:, 1:] >= 0)
+    return [
+        arrays.issue('duplicate_strings', row, 'Duplicate string assignments: ' + ', '.join(
+            sorted({STRING_NAMES[string] for string in ordered[row, 1:][duplicated[row]]})))
+        for row in numpy.nonzero(duplicated.any(axis=1))[0]
+    ]
+
+
+def check_note_count(arrays):
+    counts = (arrays.notes != MISSING).sum(axis=1)
+    issues = []
+    for row, chord in enumerate(arrays.chords):
+        if chord.chord_name in TRIAD_NAMES and counts[row] != 3:
+            issues.append(arrays.issue('note_count', row,
+                                       f'Triad chord {chord.chord_name} has {counts[row]} notes instead of 3'))
+        elif chord.chord_name in SEVENTH_NAMES and counts[row] != 4:
+            issues.append(arrays.issue('note_count', row,
+                                       f'7th chord {chord.chord_name} has {counts[row]} notes instead of 4'))
+    return issues
+
+
+def check_inversion_count(arrays):
+    note_counts = (arrays.notes != MISSING).sum(axis=1)
+    inversion_counts = numpy.bincount(arrays.position_chords, minlength=len(arrays.chords))
+    # Offsets missing for a used note of the chord
+    uncovered = ((arrays.offsets == MISSING) & (arrays.notes[arrays.position_chords] != MISSING)).any(axis=1)
+    uncovered_chords = numpy.bincount(arrays.position_chords[uncovered], minlength=len(arrays.chords))
+    first_positions = {}
+    for index, row in enumerate(arrays.position_chords.tolist()):
+        first_positions.setdefault(row, index)
+
+    issues = []
+    for row in range(len(arrays.chords)):
+        expected = min(note_counts[row], len(INVERSIONS))
+        if inversion_counts[row] != expected:
+            issues.append(arrays.issue('inversion_count', row,
+                                       f'{inversion_counts[row]} inversions stored, expected {expected}'))
+        if uncovered_chords[row]:
+            issues.append(arrays.issue('inversion_count', row,
+                                       f'{uncovered_chords[row]} inversions leave notes without an offset'))
+        first = first_positions.get(row)
+        if first is not None and (arrays.offsets[first][arrays.notes[row] != MISSING] != 0).any():
+            issues.append(arrays.issue('inversion_count', row,
+                                       f'The first stored inversion ({arrays.positions[first].inversion_order}) '
+                                       f'is not the basic position'))
+    return issues
+
+
+def check_range_coverage(arrays):
+    type_ranges = {}
+    chord_ranges = {}
+    range_rows = Counter()
+    first_row = {}
+    for row, chord in enumerate(arrays.chords):
+        type_ranges.setdefault(chord.type_name, set()).add(chord.range)
+        chord_ranges.setdefault((chord.type_name, chord.chord_name), set()).add(chord.range)
+        range_rows[chord.type_name, chord.chord_name, chord.range] += 1
+        first_row.setdefault((chord.type_name, chord.chord_name), row)
+
+    issues = []
+    for key, ranges in chord_ranges.items():
+        missing = type_ranges[key[0]] - ranges
+        if missing:
+            issues.append(arrays.issue('range_coverage', first_row[key],
+                                       'Missing ranges of its type: ' + ', '.join(sorted(missing))))
+        for range_name in sorted(ranges):
+            if range_rows[key + (range_name,)] > 1:
+                issues.append(arrays.issue('range_coverage', first_row[key],
+                                           f'Range {range_name} stored {range_rows[key + (range_name,)]} times'))
+    return issues
+
+
+def min_fret_spans(relative_pitches, string_indexes):
+    """
+    Compute the smallest stretch of voicings in every key.
+
+    Every note can be played at either fret of its pitch class between
+    MIN_FRET and MAX_FRET; all octave choices are tried at once.
+
+    Args:
+        relative_pitches: voicings x 6 pitch classes relative to the root, -1 unused
+        string_indexes: voicings x 6 indexes into STRING_NAMES, -1 unused
+
+    Returns:
+        voicings x 12 array, the smallest highest-minus-lowest fret per root
+    """
+    present = (relative_pitches >= 0) & (string_indexes >= 0)
+    roots = numpy.arange(12)
+    open_pitch_classes = OPEN_PITCH_CLASSES[numpy.maximum(string_indexes, 0)]
+    # voicings x roots x notes, lowest fret >= MIN_FRET
+    lowest = (relative_pitches[:, None, :] + roots[None, :, None] - open_pitch_classes[:, None, :]) % 12
+    lowest = numpy.where(lowest < MIN_FRET, lowest + 12, lowest)
+
+    # Octave choice per note: bit k of the combination moves note k up 12 frets
+    combinations = (numpy.arange(64)[:, None] >> numpy.arange(6)[None, :]) & 1
+    frets = lowest[:, :, None, :] + 12 * combinations[None, None, :, :]
+    usable = present[:, None, None, :]
+    valid = ((frets <= MAX_FRET) | ~usable).all(axis=3)
+    # Don't try octave moves of unused notes twice
+    valid &= ~((combinations[None, None, :, :] == 1) & ~usable).any(axis=3)
+    highest = numpy.where(usable, frets, -1).max(axis=3)
+    lowest_used = numpy.where(usable, frets, MAX_FRET + 12).min(axis=3)
+    spans = numpy.where(valid, highest - lowest_used, numpy.iinfo(int).max)
+    spans = spans.min(axis=2)
+    return numpy.where(present.any(axis=1)[:, None], spans, 0)
+
+
+def check_playability(arrays, workers=1, chunk_size=2048):
+    """
+    Find voicings that stretch over more than MAX_FRET_SPAN frets.
+
+    Args:
+        arrays: CatalogArrays
+        workers: Processes to spread the voicings over, 1 to stay in-process
+        chunk_size: Voicings per task; catalogs of a single chunk are
+            checked in-process
+    """
+    chord_notes = arrays.notes[arrays.position_chords]
+    present = (chord_notes != MISSING) & (arrays.offsets != MISSING)
+    relative_pitches = numpy.where(present, (chord_notes + numpy.maximum(arrays.offsets, 0)) % 12, -1)
+    string_indexes = numpy.where(present, arrays.strings[arrays.position_chords], -1)
+
+    chunks = [(relative_pitches[start:start + chunk_size], string_indexes[start:start + chunk_size])
+              for start in range(0, len(arrays.positions), chunk_size)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(min_fret_spans, *zip(*chunks)))
+    else:
+        results = [min_fret_spans(*chunk) for chunk in chunks]
+    spans = numpy.concatenate(results) if results else numpy.zeros((0, 12), dtype=int)
+
+    issues = []
+    for index in numpy.nonzero((spans > MAX_FRET_SPAN).any(axis=1))[0]:
+        position = arrays.positions[index]
+        roots = [NOTES[root].capitalize() for root in numpy.nonzero(spans[index] > MAX_FRET_SPAN)[0]]
+        issues.append(arrays.issue(
+            'playability', arrays.position_chords[index],
+            f'{position.inversion_order} needs more than {MAX_FRET_SPAN} frets in '
+            f'{len(roots)} keys: {", ".join(roots)}'
+        ))
+    return issues
+
+
+RULES = {
+    'note_range': check_note_range,
+    'string_assignment': check_string_assignment,
+    'duplicate_strings': check_duplicate_strings,
+    'note_count': check_note_count,
+    'inversion_count': check_inversion_count,
+    'range_coverage': check_range_coverage,
+    'playability': check_playability,
+}
+
+
+def validate_catalog(rules=None, workers=None, arrays=None):
+    """
+    Run validation rules over the whole chord catalog.
+
+    Args:
+        rules: Rule names to run (default all, see RULES)
+        workers: Processes for the playability rule (default: CPU count)
+        arrays: CatalogArrays to check, loaded from the database if None
+
+    Returns:
+        Dict with the number of 'chords' and 'positions' checked, 'valid',
+        'counts' (rule -> number of issues) and 'issues' (rule -> list of
+        {'rule', 'chord_id', 'type_name', 'chord_name', 'range', 'message'}
+        dicts)
+    """
+    arrays = arrays if arrays is not None else CatalogArrays.load()
+    workers = workers or os.cpu_count() or 1
+    issues = {}
+    for name in rules or RULES:
+        check = RULES[name]
+        found = check(arrays, workers=workers) if name == 'playability' else check(arrays)
+        issues[name] = [dict(issue._asdict(), chord_id=int(issue.chord_id)) for issue in found]
+    return {
+        'chords': len(arrays.chords),
+        'positions': len(arrays.positions),
+        'valid': not any(issues.values()),
+        'counts': {name: len(found) for name, found in issues.items()},
+        'issues': issues,
+    }
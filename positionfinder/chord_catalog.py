@@ -0,0 +1,268 @@
+"""
+In-process chord catalog.
+
+Loads every ChordNotes and ChordPosition row once into compact, indexed
+records so a chord page can be built without per-range / per-inversion
+database queries. The catalog is dropped whenever chord data changes
+(see signals.py) and rebuilt lazily on the next access.
+"""
+import threading
+from collections import namedtuple
+
+from .models_chords import ChordNotes, ChordPosition, VoicingScore
+from .get_position_dict_chords import build_position_dict
+from .note_validation import validate_and_filter_note_positions
+from .template_notes import INVERSIONS
+from .cache_utils import get_catalog_version
+from .catalog_snapshot import get_catalog_snapshot
+from .instrumentation import instrumented
+from .voicing_difficulty import SCORE_FIELDS, DifficultyScore, score_voicings
+
+ChordRecord = namedtuple('ChordRecord', [
+    'id', 'category_id', 'type_name', 'chord_name', 'range', 'tonal_root',
+    'ordering', 'chord_ordering', 'range_ordering', 'notes', 'strings',
+])
+
+PositionRecord = namedtuple('PositionRecord', [
+    'id', 'notes_name_id', 'inversion_order', 'offsets',
+])
+
+NOTE_FIELDS = ['first_note', 'second_note', 'third_note',
+               'fourth_note', 'fifth_note', 'sixth_note']
+STRING_FIELDS = [f'{field}_string' for field in NOTE_FIELDS]
+
+# Ranges that only exist on 8-string guitars
+EIGHT_STRING_MARKERS = ('highA', 'lowB')
+
+
+class ChordCatalog:
+    """
+    Immutable, indexed snapshot of all chord voicings.
+
+    Lookups mirror the ORM queries used by ChordView and get_position_dict,
+    including their "first row wins" semantics, so results are identical.
+    """
+
+    def __init__(self, chords, positions, range_rank, scores=None):
+        """
+        Args:
+            chords: ChordRecords in the default ChordNotes ordering
+            positions: PositionRecords ordered by chord and primary key
+            range_rank: Dict chord id -> rank in ('ordering', 'range_ordering') order
+            scores: Dict position id -> 12 DifficultyScores (by root pitch) of
+                the stored VoicingScores; positions without are scored here
+        """
+        self.chords = chords
+        # Catalog version the snapshot was loaded at (see cache_utils)
+        self.version = None
+        self.by_id = {chord.id: chord for chord in chords}
+        self.positions = {}
+        for position in positions:
+            self.positions.setdefault(position.notes_name_id, []).append(position)
+
+        # First matching row for each lookup key (same as queryset.first())
+        self.by_range = {}
+        self.by_name = {}
+        self.by_type = {}
+        # All rows per (type_name, chord_name), used for range options
+        self.ranges = {}
+        for chord in chords:
+            self.by_range.setdefault((chord.type_name, chord.chord_name, chord.range), chord)
+            self.by_name.setdefault((chord.type_name, chord.chord_name), chord)
+            self.by_type.setdefault(chord.type_name, chord)
+            self.ranges.setdefault((chord.type_name, chord.chord_name), []).append(chord)
+        for key, rows in self.ranges.items():
+            rows.sort(key=lambda chord: range_rank.get(chord.id, 0))
+
+        self.scores = dict(scores or {})
+        unscored = [position for position in positions if position.id not in self.scores]
+        if unscored:
+            self.scores.update(score_voicings(
+                {chord.id: (chord.notes, chord.strings) for chord in chords},
+                [(position.id, position.notes_name_id, position.offsets) for position in unscored],
+            ))
+
+    @classmethod
+    def load(cls):
+        """
+        Build a catalog from the catalog snapshot, or from the database in
+        four queries when there is no current snapshot.
+        """
+        chord_columns = [
+            'id', 'category_id', 'type_name', 'chord_name', 'range', 'tonal_root',
+            'ordering', 'chord_ordering', 'range_ordering', *NOTE_FIELDS, *STRING_FIELDS
+        ]
+        position_columns = ['id', 'notes_name_id', 'inversion_order', *NOTE_FIELDS]
+        score_columns = ['position_id', 'root_pitch', *SCORE_FIELDS]
+        snapshot = get_catalog_snapshot()
+        if snapshot is not None:
+            chord_rows = snapshot.rows('chordnotes', chord_columns)
+            position_rows = snapshot.rows('chordposition', position_columns)
+            range_ids = snapshot.column('chordnotes', 'id', order='range')
+            score_rows = snapshot.rows('voicingscore', score_columns)
+        else:
+            chord_rows = ChordNotes.objects.order_by(
+                'ordering', 'chord_ordering', 'range_ordering', 'pk'
+            ).values_list(*chord_columns)
+            position_rows = ChordPosition.objects.order_by('notes_name_id', 'pk').values_list(*position_columns)
+            range_ids = ChordNotes.objects.order_by(
+                'ordering', 'range_ordering', 'pk'
+            ).values_list('id', flat=True)
+            score_rows = VoicingScore.objects.order_by().values_list(*score_columns)
+        chords = [
+            ChordRecord(
+                id=row[0], category_id=row[1], type_name=row[2], chord_name=row[3],
+                range=row[4], tonal_root=row[5], ordering=row[6],
+                chord_ordering=row[7], range_ordering=row[8],
+                notes=tuple(row[9:15]), strings=tuple(row[15:21]),
+            )
+            for row in chord_rows
+        ]
+        positions = [
+            PositionRecord(id=row[0], notes_name_id=row[1],
+                           inversion_order=row[2], offsets=tuple(row[3:9]))
+            for row in position_rows
+        ]
+        range_rank = {chord_id: rank for rank, chord_id in enumerate(range_ids)}
+        scores = {}
+        for row in score_rows:
+            scores.setdefault(row[0], [None] * 12)[row[1]] = DifficultyScore(*row[2:])
+        # Only positions scored in every key count as scored
+        scores = {position_id: tuple(by_root) for position_id, by_root in scores.items() if None not in by_root}
+        return cls(chords, positions, range_rank, scores)
+
+    def find_chord(self, type_name, chord_name, range):
+        """
+        Find the chord for a selection, falling back like ChordView does:
+        exact range, then any range of the chord, then any chord of the type,
+        then any chord at all.
+        """
+        return (self.by_range.get((type_name, chord_name, range))
+                or self.by_name.get((type_name, chord_name))
+                or self.by_type.get(type_name)
+                or (self.chords[0] if self.chords else None))
+
+    def get_positions(self, chord_id):
+        """Return the inversions (PositionRecords) stored for a chord."""
+        return self.positions.get(chord_id, [])
+
+    def get_inversion_scores(self, chord_id, inversion_names, root_pitch):
+        """
+        Return the difficulty of inversions of a chord in one key.
+
+        Inversions are looked up by name like get_position_dict does, so the
+        scores belong to the voicings the page shows.
+
+        Returns:
+            List of DifficultyScores, None for inversions the chord lacks
+        """
+        positions = self.positions.get(chord_id, [])
+        scores = []
+        for inversion_name in inversion_names:
+            x = INVERSIONS.index(inversion_name) if inversion_name in INVERSIONS else len(positions)
+            scores.append(self.scores[positions[x].id][root_pitch % 12] if x < len(positions) else None)
+        return scores
+
+    def get_range_options(self, type_name, chord_name, is_six_string=True):
+        """
+        Return the ChordRecords for every range of a chord, unsorted by range
+        name (ChordView applies NOTE_RANGE_ORDER on top).
+        """
+        rows = self.ranges.get((type_name, chord_name), [])
+        if is_six_string:
+            rows = [chord for chord in rows
+                    if not any(marker in chord.range for marker in EIGHT_STRING_MARKERS)]
+        return rows
+
+    @instrumented('get_position_dict')
+    def get_position_dict(self, chord_inversion, chord_name, range, type_name, root_pitch, tonal_root, selected_root_name):
+        """Catalog-backed equivalent of get_position_dict_chords.get_position_dict."""
+        x = INVERSIONS.index(chord_inversion)
+        chord = self.by_range.get((type_name, chord_name, range))
+        if not chord:
+            return {}
+        positions = self.positions.get(chord.id)
+        if not positions or x >= len(positions):
+            return {}
+        return build_position_dict(
+            chord.notes, chord.strings, positions[x].offsets,
+            root_pitch, tonal_root, selected_root_name
+        )
+
+    def get_inversion_data(self, inversion_names, chord_name, range, type_name, root_pitch, tonal_root, selected_root_name):
+        """
+        Build the validated data of all inversions for a single range.
+
+        Returns:
+            Dictionary inversion name -> validated position dictionary
+        """
+        range_data = {}
+        for inversion_name in inversion_names:
+            try:
+                position_dict = self.get_position_dict(
+                    inversion_name, chord_name, range, type_name,
+                    root_pitch, tonal_root, selected_root_name
+                )
+                range_data[inversion_name] = validate_and_filter_note_positions(position_dict)
+            except Exception:
+                range_data[inversion_name] = {}
+        return range_data
+
+    def get_chord_json_data(self, inversion_names, chord_name, ranges, type_name, root_pitch, tonal_root, selected_root_name):
+        """
+        Build the per-range part of ChordView's chord_json_data in one pass.
+
+        Args:
+            inversion_names: Inversions to build for every range
+            chord_name: Selected chord name
+            ranges: Range names to build, in display order
+            type_name: Selected chord type
+            root_pitch: Pitch of the selected root
+            tonal_root: Tonal root of the selected chord
+            selected_root_name: Name of the selected root
+
+        Returns:
+            Dictionary range -> inversion name -> position dictionary
+        """
+        return {
+            range: self.get_inversion_data(
+                inversion_names, chord_name, range, type_name,
+                root_pitch, tonal_root, selected_root_name
+            )
+            for range in ranges
+        }
+
+
+_catalog = None
+_catalog_generation = 0
+_catalog_lock = threading.Lock()
+
+
+def get_chord_catalog():
+    """
+    Return the process-wide chord catalog, building it if needed.
+
+    The catalog is also rebuilt when the shared catalog version changed, so
+    edits made by another process (e.g. import_data) are picked up.
+    """
+    global _catalog
+    version = get_catalog_version()
+    catalog = _catalog
+    if catalog is None or catalog.version != version:
+        with _catalog_lock:
+            catalog = _catalog
+            if catalog is None or catalog.version != version:
+                generation = _catalog_generation
+                catalog = ChordCatalog.load()
+                catalog.version = version
+                # Don't keep a snapshot that was invalidated while loading
+                if generation == _catalog_generation:
+                    _catalog = catalog
+    return catalog
+
+
+def invalidate_chord_catalog():
+    """Drop the cached catalog so the next access reloads it."""
+    global _catalog, _catalog_generation
+    _catalog_generation += 1
+    _catalog = None
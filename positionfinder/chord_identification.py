@@ -0,0 +1,279 @@
+"""
+Reverse chord identification ("what chord is this?").
+
+Maps fretted notes back to names. The index is built once per catalog
+version from the chord catalog and the Notes pitch-class sets:
+
+- every ChordNotes / ChordPosition voicing under its root-relative shape,
+  the set of (string, pitch class relative to the root) pairs, so an exact
+  voicing is found with one dict lookup per candidate root;
+- every chord quality under its root-relative pitch-class set, for notes
+  that match a chord but not one of the stored voicings;
+- every scale and arpeggio pitch-class set, matched by containment.
+
+A query tries all 12 roots, so it costs a few dozen dict lookups and bit
+operations regardless of the catalog size.
+"""
+import threading
+from collections import namedtuple
+from urllib.parse import urlencode
+
+from django.urls import reverse
+
+from .catalog_snapshot import get_catalog_snapshot
+from .chord_catalog import get_chord_catalog
+from .fretboard_model import OPEN_STRING_PITCHES, MAX_FRET, get_fretboard
+from .instrumentation import instrumented
+from .menu_index import SCALE_CATEGORY_ID, ARPEGGIO_CATEGORY_ID
+from .models import Notes, Root
+from .pitch_class_set import PITCH_CLASSES, pitch_class_mask, rotate_mask, mask_pitch_classes
+from .template_notes import INVERSIONS, NOTES
+from .voicing_templates import get_voicing_template
+
+VoicingEntry = namedtuple('VoicingEntry', ['chord', 'inversion'])
+QualityEntry = namedtuple('QualityEntry', ['chord_name', 'type_names', 'intervals'])
+NotesEntry = namedtuple('NotesEntry', ['id', 'name', 'category_id', 'mask', 'size'])
+
+DEFAULT_LIMIT = 50
+
+
+def _fretboard_url(params):
+    return reverse('fretboard') + '?' + urlencode(params)
+
+
+def _root_relative_shape(played, root_pitch_class):
+    return frozenset((string, (pitch - root_pitch_class) % PITCH_CLASSES) for string, pitch in played)
+
+
+class IdentificationIndex:
+    """
+    Lookup tables for identify().
+
+    Attributes:
+        voicings: Root-relative shape -> VoicingEntries playing it
+        qualities: Root-relative pitch-class mask -> QualityEntries
+        notes: NotesEntries of every scale and arpeggio
+        roots: Pitch class -> Root rows (id, name) in Root ordering
+    """
+
+    def __init__(self, catalog, notes, roots, shapes=None):
+        """
+        Args:
+            catalog: ChordCatalog to index
+            notes: (id, note_name, category_id, pitch_class_set) of scales and arpeggios
+            roots: (id, name, pitch) of every Root, in Root ordering
+            shapes: Optional precomputed ChordPosition id -> ((string,
+                relative pitch class), ...), see CatalogSnapshot.voicing_shapes
+        """
+        self.version = None
+        self.voicings = {}
+        qualities = {}
+        for chord in catalog.chords:
+            # Named by index like get_position_dict does, so the result
+            # matches what the chord page shows for that inversion
+            for inversion, position in zip(INVERSIONS, catalog.get_positions(chord.id)):
+                if shapes is not None and position.id in shapes:
+                    shape = shapes[position.id]
+                else:
+                    template = get_voicing_template(chord.notes, chord.strings, position.offsets)
+                    shape = [(string, relative_pitch) for string, relative_pitch, _, _ in template.notes]
+                if not shape or any(string not in OPEN_STRING_PITCHES for string, _ in shape):
+                    continue
+                self.voicings.setdefault(frozenset(shape), []).append(VoicingEntry(chord, inversion))
+
+            # The chord notes are stored in stacking order (root, third, ...)
+            intervals = []
+            for note in chord.notes:
+                if note is not None and note % PITCH_CLASSES not in intervals:
+                    intervals.append(note % PITCH_CLASSES)
+            if not intervals:
+                continue
+            quality = qualities.setdefault(pitch_class_mask(intervals), {})
+            entry = quality.setdefault(chord.chord_name, QualityEntry(chord.chord_name, [], tuple(intervals)))
+            if chord.type_name not in entry.type_names:
+                entry.type_names.append(chord.type_name)
+        self.qualities = {mask: list(entries.values()) for mask, entries in qualities.items()}
+
+        self.notes = [
+            NotesEntry(notes_id, name, category_id, mask, bin(mask).count('1'))
+            for notes_id, name, category_id, mask in notes if mask
+        ]
+        self.roots = {}
+        for root_id, name, pitch in roots:
+            self.roots.setdefault(pitch % PITCH_CLASSES, []).append((root_id, name))
+
+    @classmethod
+    def load(cls):
+        """
+        Build the index from the chord catalog plus the catalog snapshot, or
+        two queries when there is no current snapshot.
+        """
+        snapshot = get_catalog_snapshot()
+        if snapshot is not None:
+            notes = [
+                row for row in snapshot.rows('notes', ['id', 'note_name', 'category_id', 'pitch_class_set'])
+                if row[2] in (SCALE_CATEGORY_ID, ARPEGGIO_CATEGORY_ID)
+            ]
+            # Stored by ordering and note_name, the sort is stable
+            notes.sort(key=lambda row: row[2])
+            roots = snapshot.rows('root', ['id', 'name', 'pitch'])
+            return cls(get_chord_catalog(), notes, roots, shapes=snapshot.voicing_shapes())
+        notes = Notes.objects.filter(
+            category_id__in=[SCALE_CATEGORY_ID, ARPEGGIO_CATEGORY_ID]
+        ).order_by('category', 'ordering', 'note_name').values_list('id', 'note_name', 'category_id', 'pitch_class_set')
+        roots = Root.objects.values_list('id', 'name', 'pitch')
+        return cls(get_chord_catalog(), list(notes), list(roots))
+
+    def root_info(self, pitch_class):
+        roots = self.roots.get(pitch_class, [])
+        return {
+            'pitch': pitch_class,
+            'id': roots[0][0] if roots else None,
+            'names': [name for _, name in roots] or [NOTES[pitch_class].capitalize()],
+        }
+
+    def identify(self, played, limit=DEFAULT_LIMIT):
+        """
+        Name the chords, scales and arpeggios matching fretted notes.
+
+        Args:
+            played: (string, absolute pitch) of every fretted or open string
+            limit: Maximum number of scales and arpeggios returned
+
+        Returns:
+            Dict with the played pitch classes and the 'voicings', 'chords',
+            'scales' and 'arpeggios' matches; roots are ordered by pitch.
+            Scales and arpeggios are only rooted on a played note, exact
+            matches and smaller sets first.
+        """
+        mask = pitch_class_mask(pitch for _, pitch in played)
+        bass = min(pitch for _, pitch in played) % PITCH_CLASSES if played else None
+        voicings, chords, notes = [], [], []
+        for root in range(PITCH_CLASSES):
+            # Stored voicings playing exactly these strings and pitch classes
+            for entry in self.voicings.get(_root_relative_shape(played, root), ()):
+                voicings.append(self._voicing_result(entry, root))
+
+            relative_mask = rotate_mask(mask, -root)
+            for quality in self.qualities.get(relative_mask, ()):
+                bass_interval = (bass - root) % PITCH_CLASSES
+                inversion = quality.intervals.index(bass_interval)
+                chords.append({
+                    'chord_name': quality.chord_name,
+                    'type_names': list(quality.type_names),
+                    'root': self.root_info(root),
+                    'inversion': INVERSIONS[inversion] if inversion < len(INVERSIONS) else None,
+                    'bass': self.root_info(bass),
+                })
+
+            # Scales and arpeggios containing every played pitch class
+            if not relative_mask & 1:
+                continue
+            for entry in self.notes:
+                if entry.mask & relative_mask == relative_mask:
+                    notes.append((entry.mask != relative_mask, entry.size, root, entry))
+
+        notes.sort(key=lambda match: match[:3])
+        scales, arpeggios = [], []
+        for partial, _, root, entry in notes:
+            results = scales if entry.category_id == SCALE_CATEGORY_ID else arpeggios
+            if len(results) >= limit:
+                continue
+            root_info = self.root_info(root)
+            results.append({
+                'id': entry.id,
+                'name': entry.name,
+                'root': root_info,
+                'exact': not partial,
+                'url': _fretboard_url({
+                    'root': root_info['id'], 'models_select': entry.category_id,
+                    'notes_options_select': entry.id, 'position_select': 0,
+                }),
+            })
+        return {
+            'pitch_classes': mask_pitch_classes(mask),
+            'bass': self.root_info(bass) if bass is not None else None,
+            'voicings': voicings,
+            'chords': chords,
+            'scales': scales,
+            'arpeggios': arpeggios,
+        }
+
+    def _voicing_result(self, entry, root):
+        chord = entry.chord
+        root_info = self.root_info(root)
+        return {
+            'chord_id': chord.id,
+            'type_name': chord.type_name,
+            'chord_name': chord.chord_name,
+            'range': chord.range,
+            'inversion': entry.inversion,
+            'root': root_info,
+            'url': _fretboard_url({
+                'root': root_info['id'], 'models_select': chord.category_id,
+                'type_options_select': chord.type_name, 'chords_options_select': chord.chord_name,
+                'note_range': chord.range, 'position_select': entry.inversion,
+            }),
+        }
+
+
+def parse_fretted_notes(frets, string_count=8):
+    """
+    Validate a string -> fret map and resolve the sounding pitches.
+
+    Args:
+        frets: Dict string name -> fret number; None, '' and 'x' mark muted strings
+        string_count: 6 or 8, the strings allowed in ``frets``
+
+    Returns:
+        List of (string, absolute pitch), lowest string first
+
+    Raises:
+        ValueError: On unknown strings or frets outside 0..MAX_FRET
+    """
+    fretboard = get_fretboard(string_count)
+    played = []
+    for string, fret in frets.items():
+        if string not in fretboard.strings:
+            raise ValueError(f'Unknown string for a {string_count}-string guitar: {string}')
+        if fret is None or str(fret).strip().lower() in ('', 'x'):
+            continue
+        try:
+            fret = int(fret)
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid fret for {string}: {fret}')
+        if not 0 <= fret <= MAX_FRET:
+            raise ValueError(f'Fret for {string} must be between 0 and {MAX_FRET}')
+        played.append((string, fretboard.pitch(string, fret)))
+    return sorted(played, key=lambda note: OPEN_STRING_PITCHES[note[0]])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_identification_index():
+    """Return the identification index of the current catalog version, building it if needed."""
+    global _index
+    catalog = get_chord_catalog()
+    index = _index
+    if index is None or index.version != catalog.version:
+        with _index_lock:
+            index = _index
+            if index is None or index.version != catalog.version:
+                index = IdentificationIndex.load()
+                index.version = catalog.version
+                _index = index
+    return index
+
+
+@instrumented('identify')
+def identify(frets, string_count=8, limit=DEFAULT_LIMIT):
+    """
+    Identify the chords, scales and arpeggios of a string -> fret map.
+
+    See IdentificationIndex.identify for the result and parse_fretted_notes
+    for the accepted input.
+    """
+    played = parse_fretted_notes(frets, string_count)
+    return get_identification_index().identify(played, limit=limit)
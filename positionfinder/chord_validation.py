@@ -2,7 +2,9 @@
 Chord Validation Utilities
 
 This module provides functions for validating chord formations and diagnosing issues.
+To check the whole catalog at once use catalog_validation.validate_catalog.
 """
+from .catalog_validation import ORDINALS, TRIAD_NAMES, SEVENTH_NAMES
 
 def validate_chord_notes(chord_id):
     """
@@ -31,64 +33,17 @@ def validate_chord_notes(chord_id):
         notes = []
         strings = []
         
-        # Check first note
-        if chord.first_note is not None:
-            notes.append(chord.first_note)
-            if chord.first_note_string:
-                strings.append(chord.first_note_string)
-                report['string_assignments'][chord.first_note_string] = chord.first_note
+        for ordinal, note_field in zip(ORDINALS, ChordNotes.NOTE_FIELDS):
+            note = getattr(chord, note_field)
+            if note is None:
+                continue
+            notes.append(note)
+            string = getattr(chord, f'{note_field}_string')
+            if string:
+                strings.append(string)
+                report['string_assignments'][string] = note
             else:
-                report['issues'].append("First note has no string assignment")
-                report['valid'] = False
-        
-        # Check second note
-        if chord.second_note is not None:
-            notes.append(chord.second_note)
-            if chord.second_note_string:
-                strings.append(chord.second_note_string)
-                report['string_assignments'][chord.second_note_string] = chord.second_note
-            else:
-                report['issues'].append("Second note has no string assignment")
-                report['valid'] = False
-        
-        # Check third note
-        if chord.third_note is not None:
-            notes.append(chord.third_note)
-            if chord.third_note_string:
-                strings.append(chord.third_note_string)
-                report['string_assignments'][chord.third_note_string] = chord.third_note
-            else:
-                report['issues'].append("Third note has no string assignment")
-                report['valid'] = False
-        
-        # Check fourth note if present
-        if chord.fourth_note is not None:
-            notes.append(chord.fourth_note)
-            if chord.fourth_note_string:
-                strings.append(chord.fourth_note_string)
-                report['string_assignments'][chord.fourth_note_string] = chord.fourth_note
-            else:
-                report['issues'].append("Fourth note has no string assignment")
-                report['valid'] = False
-        
-        # Check fifth note if present
-        if chord.fifth_note is not None:
-            notes.append(chord.fifth_note)
-            if chord.fifth_note_string:
-                strings.append(chord.fifth_note_string)
-                report['string_assignments'][chord.fifth_note_string] = chord.fifth_note
-            else:
-                report['issues'].append("Fifth note has no string assignment")
-                report['valid'] = False
-        
-        # Check sixth note if present
-        if chord.sixth_note is not None:
-            notes.append(chord.sixth_note)
-            if chord.sixth_note_string:
-                strings.append(chord.sixth_note_string)
-                report['string_assignments'][chord.sixth_note_string] = chord.sixth_note
-            else:
-                report['issues'].append("Sixth note has no string assignment")
+                report['issues'].append(f"{ordinal} note has no string assignment")
                 report['valid'] = False
         
         # Check for duplicate string assignments
@@ -108,29 +63,20 @@ def validate_chord_notes(chord_id):
             }
             
             # Add note offsets
-            if position.first_note is not None:
-                pos_info['note_offsets'].append(position.first_note)
-            if position.second_note is not None:
-                pos_info['note_offsets'].append(position.second_note)
-            if position.third_note is not None:
-                pos_info['note_offsets'].append(position.third_note)
-            if position.fourth_note is not None:
-                pos_info['note_offsets'].append(position.fourth_note)
-            if position.fifth_note is not None:
-                pos_info['note_offsets'].append(position.fifth_note)
-            if position.sixth_note is not None:
-                pos_info['note_offsets'].append(position.sixth_note)
+            for note_field in ChordNotes.NOTE_FIELDS:
+                offset = getattr(position, note_field)
+                if offset is not None:
+                    pos_info['note_offsets'].append(offset)
             
             report['positions'].append(pos_info)
         
         # Validate chord type has expected number of notes
-        if chord.chord_name in ['Major', 'Minor', 'Diminished', 'Augmented', 'Sus2', 'Sus4']:
+        if chord.chord_name in TRIAD_NAMES:
             # Triads should have 3 notes
             if report['note_count'] != 3:
                 report['issues'].append(f"Triad chord {chord.chord_name} has {report['note_count']} notes instead of 3")
                 report['valid'] = False
-        elif chord.chord_name in ['Major 7', 'Minor 7', 'Dominant 7', 'Minor 7b5', 'MinMaj 7', 
-                                'Major 7(#5)', 'Major 7(b5)', 'Dominant 7(#5)', 'Dominant 7(b5)']:
+        elif chord.chord_name in SEVENTH_NAMES:
             # 7th chords should have 4 notes
             if report['note_count'] != 4:
                 report['issues'].append(f"7th chord {chord.chord_name} has {report['note_count']} notes instead of 4")
@@ -0,0 +1,128 @@
+"""
+Integer fretboard model.
+
+Pitches are absolute semitone numbers that match the octave digits used in
+tone names throughout the app (pitch = octave * 12 + pitch class, so 'c0'
+is 0 and 'e1' is 16). Every string x fret cell is stored as an integer so
+position builders can work on numbers and only spell tones ('gs2') when
+serializing the result.
+
+The model reproduces STRING_NOTE_OPTIONS exactly: frets 1-17 on every
+string, strings in the same order.
+"""
+from functools import lru_cache
+
+import numpy
+
+from .template_notes import NOTES, NOTES_SHARP
+
+MIN_FRET = 1
+MAX_FRET = 17
+
+# Open string pitch of every string (fret 0, which the fretboard doesn't show)
+OPEN_STRING_PITCHES = {
+    'eString': 28,
+    'bString': 23,
+    'gString': 19,
+    'dString': 14,
+    'AString': 9,
+    'ELowString': 4,
+    'highAString': 33,
+    'lowBString': -1,
+}
+
+SIX_STRING_STRINGS = ['eString', 'bString', 'gString', 'dString', 'AString', 'ELowString']
+EIGHT_STRING_STRINGS = SIX_STRING_STRINGS + ['highAString', 'lowBString']
+
+
+class FretboardModel:
+    """
+    Numeric fretboard for one string configuration.
+
+    Attributes:
+        strings: String names, in STRING_NOTE_OPTIONS order
+        frets: Fret numbers as a numpy array
+        pitches: strings x frets array of absolute pitches
+        pitch_classes: strings x frets array of pitch classes (0-11)
+    """
+
+    def __init__(self, strings):
+        self.strings = tuple(strings)
+        self.string_index = {string: index for index, string in enumerate(self.strings)}
+        self.frets = numpy.arange(MIN_FRET, MAX_FRET + 1)
+        self.open_pitches = numpy.array([OPEN_STRING_PITCHES[string] for string in self.strings])
+        self.pitches = self.open_pitches[:, None] + self.frets[None, :]
+        self.pitch_classes = self.pitches % 12
+
+        # string -> pitch class -> ascending frets
+        self.frets_by_pitch_class = {}
+        # pitch -> ((string, fret), ...)
+        self.locations = {}
+        for row, string in enumerate(self.strings):
+            by_pitch_class = [[] for _ in range(12)]
+            for column, fret in enumerate(self.frets.tolist()):
+                pitch = int(self.pitches[row, column])
+                by_pitch_class[pitch % 12].append(fret)
+                self.locations.setdefault(pitch, []).append((string, fret))
+            self.frets_by_pitch_class[string] = tuple(tuple(frets) for frets in by_pitch_class)
+        self.locations = {pitch: tuple(cells) for pitch, cells in self.locations.items()}
+
+    def pitch(self, string, fret):
+        """Return the absolute pitch at a string/fret."""
+        return OPEN_STRING_PITCHES[string] + fret
+
+    def frets_for_pitch_class(self, string, pitch_class):
+        """Return the frets (ascending) where a pitch class sounds on a string."""
+        return self.frets_by_pitch_class[string][pitch_class % 12]
+
+    def pitches_for_pitch_class(self, string, pitch_class):
+        """Return the pitches (ascending) of a pitch class on a string."""
+        open_pitch = OPEN_STRING_PITCHES[string]
+        return tuple(open_pitch + fret for fret in self.frets_by_pitch_class[string][pitch_class % 12])
+
+    def locate(self, pitch):
+        """Return every (string, fret) that sounds an absolute pitch."""
+        return self.locations.get(pitch, ())
+
+    def has_pitch(self, string, pitch):
+        """Check whether a string can play an absolute pitch within the model's frets."""
+        return MIN_FRET <= pitch - OPEN_STRING_PITCHES[string] <= MAX_FRET
+
+
+SIX_STRING_FRETBOARD = FretboardModel(SIX_STRING_STRINGS)
+EIGHT_STRING_FRETBOARD = FretboardModel(EIGHT_STRING_STRINGS)
+
+
+def get_fretboard(string_count=8):
+    """Return the fretboard model for a 6- or 8-string guitar."""
+    return SIX_STRING_FRETBOARD if int(string_count) == 6 else EIGHT_STRING_FRETBOARD
+
+
+def pitch_to_note_name(pitch_class, use_sharps):
+    """Return the lower case note name ('cs', 'db', ...) for a pitch class."""
+    return (NOTES_SHARP if use_sharps else NOTES)[pitch_class % 12]
+
+
+def spell_tone(pitch, use_sharps):
+    """Serialize an absolute pitch as a tone name such as 'gs2' or 'ab2'."""
+    return (NOTES_SHARP if use_sharps else NOTES)[pitch % 12] + str(pitch // 12)
+
+
+@lru_cache(maxsize=512)
+def tone_to_pitch(tone):
+    """
+    Parse a tone name such as 'gs2' into its absolute pitch.
+
+    Returns:
+        The pitch, or None if the tone can't be parsed
+    """
+    name, octave = tone[:-1], tone[-1:]
+    if not octave.isdigit():
+        return None
+    if name in NOTES_SHARP:
+        pitch_class = NOTES_SHARP.index(name)
+    elif name in NOTES:
+        pitch_class = NOTES.index(name)
+    else:
+        return None
+    return int(octave) * 12 + pitch_class
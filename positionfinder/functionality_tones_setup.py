@@ -1,6 +1,7 @@
-from .models import Notes, Root
+from .models import Notes
 from .models_chords import ChordNotes
 from .note_setup import build_notes
+from .root_note_setup import get_root_name
 from .template_notes import TENSIONS, TENSIONS_OPTIONAL, NOTE_NAMES
 from .template_notes import HEPTATONIC_BASE_NOTES
 from .template_notes import SHARP_NOTES, NOTE_NAMES_OPTION
@@ -22,15 +23,26 @@ def get_notes_object(notes_options_id):
         except ChordNotes.DoesNotExist:
             return None
 
-def get_functionality_tones(notes_options_id, root):
+def get_notes_intervals(notes_options_id, theory=None):
+    """
+    Return the intervals of a Notes or ChordNotes row, None if there is none
+
+    Args:
+        notes_options_id: ID of the notes
+        theory: The request's TheoryContext, which already holds them
+    """
+    if theory is not None:
+        return theory.intervals
+    notes = get_notes_object(notes_options_id)
+    return build_notes(notes) if notes else None
+
+def get_functionality_tones(notes_options_id, root, theory=None):
     ALL_NOTES = [x for x in TENSIONS]
     ALL_NOTES_OPTIONAL = [x for x in TENSIONS_OPTIONAL]
     
-    notes = get_notes_object(notes_options_id)
-    if not notes:
+    NOTES_NOTES = get_notes_intervals(notes_options_id, theory)
+    if NOTES_NOTES is None:
         return []
-        
-    NOTES_NOTES = build_notes(notes)
     '''
     Picking out every note of range
     '''
@@ -46,15 +58,13 @@ def get_functionality_tones(notes_options_id, root):
             ALL_NOTES_LIST.append(ALL_NOTES[x])
     return ALL_NOTES_LIST
 
-def get_functionality_pitches(notes_options_id, root):
+def get_functionality_pitches(notes_options_id, root, theory=None):
     ALL_NOTES = [x for x in TENSIONS]
     ALL_NOTES_OPTIONAL = [x for x in TENSIONS_OPTIONAL]
     
-    notes = get_notes_object(notes_options_id)
-    if not notes:
+    NOTES_NOTES = get_notes_intervals(notes_options_id, theory)
+    if NOTES_NOTES is None:
         return []
-        
-    NOTES_NOTES = build_notes(notes)
     '''
     Picking out every note of range
     '''
@@ -80,33 +90,31 @@ def get_tension_final_list(tonal_root, ALL_NOTES_NOTES, ALL_NOTES, NOTES_NOTES,
             TENSION_LIST.append(ALL_NOTES[x])
     return TENSION_LIST
 
-def get_all_notes_functionality(root, root_id):
-    selected_root_name = Root.objects.get(pk=root_id).name
+def get_all_notes_functionality(root, root_id, theory=None):
+    selected_root_name = get_root_name(root_id, theory)
     if root in SHARP_NOTES or '#' in selected_root_name:
         ALL_NOTES = [x for x in NOTE_NAMES_SHARP]
     else:
         ALL_NOTES = [x for x in NOTE_NAMES]
     return ALL_NOTES
 
-def get_all_notes_functionality_optional(root, root_id):
-    selected_root_name = Root.objects.get(pk=root_id).name
+def get_all_notes_functionality_optional(root, root_id, theory=None):
+    selected_root_name = get_root_name(root_id, theory)
     if root in SHARP_NOTES or '#' in selected_root_name:
         ALL_NOTES = [x for x in NOTE_NAMES_SHARP_OPTION]
     else:
         ALL_NOTES = [x for x in NOTE_NAMES_OPTION]
     return ALL_NOTES
 
-def get_functionality_note_names(notes_options_id, root, tonal_root, root_id):
-    ALL_NOTES = get_all_notes_functionality(root, root_id)
-    ALL_NOTES_OPTIONAL = get_all_notes_functionality_optional(root, root_id)
+def get_functionality_note_names(notes_options_id, root, tonal_root, root_id, theory=None):
+    ALL_NOTES = get_all_notes_functionality(root, root_id, theory)
+    ALL_NOTES_OPTIONAL = get_all_notes_functionality_optional(root, root_id, theory)
     tonal_root += root
-    selected_root_name = Root.objects.get(pk=root_id).name
     
-    notes = get_notes_object(notes_options_id)
-    if not notes:
+    NOTES_NOTES = get_notes_intervals(notes_options_id, theory)
+    if NOTES_NOTES is None:
         return []
         
-    NOTES_NOTES = build_notes(notes)
     ALL_NOTES_NOTES = [x for x in NOTES_NOTES]
     TENSION_NOTE_FINAL = get_tension_final_list(tonal_root, ALL_NOTES_NOTES, ALL_NOTES, NOTES_NOTES, ALL_NOTES_OPTIONAL)
     return TENSION_NOTE_FINAL
@@ -1,9 +1,15 @@
+from functools import lru_cache
+
 from .positions import NotesPosition
 
-def get_notes_position(position_id, root):
-    position = NotesPosition.objects.get(pk=position_id).position
+# Stored positions are a small fixed set of strings, parse each only once
+@lru_cache(maxsize=1024)
+def position_frets(position):
+    return tuple(int(x) for x in position.split(','))
+
+def parse_notes_position(position, root):
     # Transform into List and add root_pitch
-    position_list = [int(x) + int(root) for x in position.split(',')]
+    position_list = [x + int(root) for x in position_frets(position)]
     # Check if every item in list is not bigger than fretboard
     check_range = all(x <= 17 for x in position_list)
     if check_range:
@@ -12,3 +18,7 @@ def get_notes_position(position_id, root):
         # minus octave
         position_list = [x - 12 for x in position_list]
         return position_list
+
+def get_notes_position(position_id, root):
+    position = NotesPosition.objects.get(pk=position_id).position
+    return parse_notes_position(position, root)
@@ -1,10 +1,15 @@
 from positionfinder.models import Notes
 from positionfinder.positions import NotesPosition
-from positionfinder.template_notes import NOTES, NOTES_SHARP, TENSIONS, SHARP_NOTES
-from positionfinder.template_notes import STRING_NOTE_OPTIONS, STRINGS, NOTES_SCORE
-from positionfinder.get_position import get_notes_position
-import json
+from positionfinder.catalog_snapshot import get_catalog_snapshot
+from positionfinder.template_notes import SHARP_NOTES, STRINGS, NOTES_SCORE
+from positionfinder.get_position import parse_notes_position
+from positionfinder.instrumentation import instrumented
+from positionfinder.arpeggio_positions import get_arpeggio_positions
+from positionfinder.fretboard_model import (
+    EIGHT_STRING_FRETBOARD, MIN_FRET, MAX_FRET, spell_tone, tone_to_pitch, pitch_to_note_name,
+)
 from collections import OrderedDict
+import numpy
 
 # Function for getting every transposable Position
 def get_transposable_positions(position_options, position):
@@ -17,25 +22,16 @@ def get_transposable_positions(position_options, position):
         transposition = []
         for string in STRINGS:
             try:
-                if 'tones' in actual_position[string][0] and actual_position[string][0]['tones']:
-                    lowest_tone = actual_position[string][0]['tones'][0]
-                else:
-                    continue  # Skip this string if there are no tones
                 if 'tones' in actual_position[string][0] and actual_position[string][0]['tones']:
                     actual_tones = actual_position[string][0]['tones']
                 else:
                     continue  # Skip this string if there are no tones
                 for tone in actual_tones:
-                    # Delete Range
-                    x = tone[:-1]
-                    base_note = x
-                    # Check if every base_note is available in a lower position
-                    pitch = int(tone[-1]) - 1
-                    lower_tone = base_note + str(pitch)
-                    if lower_tone in STRING_NOTE_OPTIONS[string][0][base_note][0]['tone']:
-                        transposition.append(True)
-                    else:
-                        transposition.append(False)
+                    pitch = tone_to_pitch(tone)
+                    if pitch is None:
+                        raise KeyError(tone)
+                    # Check if every tone is available an octave lower on the same string
+                    transposition.append(EIGHT_STRING_FRETBOARD.has_pitch(string, pitch - 12))
             except KeyError:
                 pass
         if not False in transposition:
@@ -43,6 +39,31 @@ def get_transposable_positions(position_options, position):
                 transposition_positions.append(i)
     return transposition_positions
 
+def get_transposable_pitch_positions(position_options, position):
+    """
+    Integer version of get_transposable_positions.
+
+    Args:
+        position_options: Number of stored positions of the scale
+        position: Dict position key -> string -> list of pitches
+
+    Returns:
+        List of position numbers whose every pitch also fits an octave lower
+    """
+    transposition_positions = []
+    for i in range(1, position_options):
+        actual_position = position.get(str(i))
+        if actual_position is None:
+            continue
+        transposable = all(
+            EIGHT_STRING_FRETBOARD.has_pitch(string, pitch - 12)
+            for string in STRINGS
+            for pitch in actual_position.get(string, ())
+        )
+        if transposable and i not in transposition_positions:
+            transposition_positions.append(i)
+    return transposition_positions
+
 # Add a helper to extract tones from a Notes object
 def get_tones_from_notes(notes_obj):
     note_fields = [
@@ -52,8 +73,8 @@ def get_tones_from_notes(notes_obj):
     ]
     return [getattr(notes_obj, f) for f in note_fields if getattr(notes_obj, f) is not None]
 
-def get_scale_position_dict(scale_name, root_note_id, root_pitch, tonal_root, selected_root_name):
-    # Retrieve scale and build base note list
+def get_scale_note(scale_name):
+    # Retrieve scale
     try:
         # First try to get the scale by ID (for arpeggios/scales selected from the search)
         # Try to convert scale_name to an integer if it's a numeric string (likely an ID)
@@ -65,10 +86,9 @@ def get_scale_position_dict(scale_name, root_note_id, root_pitch, tonal_root, se
             pass
         
         if scale_id:
-            scale_note = Notes.objects.get(id=scale_id)
-        else:
-            # Try by exact name if not found by ID
-            scale_note = Notes.objects.get(note_name=scale_name)
+            return Notes.objects.get(id=scale_id)
+        # Try by exact name if not found by ID
+        return Notes.objects.get(note_name=scale_name)
     except Notes.DoesNotExist:
         # If exact match fails, try case-insensitive contains match
         matching_notes = Notes.objects.filter(note_name__icontains=scale_name)
@@ -81,51 +101,139 @@ def get_scale_position_dict(scale_name, root_note_id, root_pitch, tonal_root, se
                 matching_notes = Notes.objects.filter(note_name__icontains=search_term)
         
         if matching_notes.exists():
-            scale_note = matching_notes.first()
-        else:
-            raise Notes.DoesNotExist(f"Cannot find Notes with name: {scale_name}")
-    
-    SCALE_NOTES = get_tones_from_notes(scale_note)
-    NOTES_LIST = []
-    for interval in SCALE_NOTES:
-        if interval is None:
-            continue
-        step = (interval + root_pitch) % 12
-        NOTES_LIST.append(NOTES_SHARP[step] if root_pitch in SHARP_NOTES or '#' in selected_root_name else NOTES[step])
+            return matching_notes.first()
+        raise Notes.DoesNotExist(f"Cannot find Notes with name: {scale_name}")
+
+def get_snapshot_scale_note(snapshot, scale_name):
+    """
+    Look a scale up in the catalog snapshot.
+
+    Only the unambiguous id and exact name matches of get_scale_note are
+    answered here; the fuzzy fallbacks still go to the database.
+
+    Returns:
+        An unsaved Notes instance, or None
+    """
+    if not isinstance(scale_name, str):
+        return None
+    if scale_name.isdigit():
+        matches = [row for row in snapshot.values('notes') if row['id'] == int(scale_name)]
+    else:
+        matches = [row for row in snapshot.values('notes') if row['note_name'] == scale_name]
+    return Notes(**matches[0]) if len(matches) == 1 else None
+
+def use_sharp_spelling(root_pitch, selected_root_name):
+    """Scales are spelled with sharps for sharp roots, flats otherwise."""
+    return root_pitch in SHARP_NOTES or '#' in selected_root_name
+
+def build_scale_pitch_positions(pitch_classes, position_lists, fretboard=EIGHT_STRING_FRETBOARD):
+    """
+    Build the pitches of every scale position on every string.
+
+    All positions are computed in one batch: a strings x frets mask of the
+    scale's pitch classes is intersected with a positions x frets mask of the
+    fret windows. Within a string, pitches follow the scale order and then
+    ascend, like the tone lists in STRING_NOTE_OPTIONS.
+
+    Args:
+        pitch_classes: Pitch classes of the scale, in scale order
+        position_lists: List of (position key, frets) for the fretted positions
+        fretboard: FretboardModel to lay the scale out on
+
+    Returns:
+        Dict position key -> string -> list of absolute pitches; key '0'
+        holds every scale tone on the fretboard
+    """
+    fret_count = len(fretboard.frets)
+
+    # Rank of every pitch class in the scale (first occurrence), -1 if absent
+    rank = numpy.full(12, -1)
+    for index, pitch_class in reversed(list(enumerate(pitch_classes))):
+        rank[pitch_class % 12] = index
+    cell_rank = rank[fretboard.pitch_classes]
+
+    # Reorder every string's frets into output order: scale rank, then fret
+    order = numpy.argsort(cell_rank * (fret_count + 1) + fretboard.frets[None, :], axis=1, kind='stable')
+    ordered_pitches = numpy.take_along_axis(fretboard.pitches, order, axis=1)
+    ordered_in_scale = numpy.take_along_axis(cell_rank >= 0, order, axis=1)
+
+    # Fret windows of all positions; row 0 is position '0' (every fret)
+    keys = ['0'] + [key for key, _ in position_lists]
+    windows = numpy.zeros((len(keys), fret_count + 1), dtype=bool)
+    windows[0, :] = True
+    if position_lists:
+        lengths = [len(frets) for _, frets in position_lists]
+        rows = numpy.repeat(numpy.arange(1, len(keys)), lengths)
+        columns = numpy.fromiter((fret for _, frets in position_lists for fret in frets), dtype=int, count=sum(lengths))
+        on_board = (columns >= MIN_FRET) & (columns <= MAX_FRET)
+        windows[rows[on_board], columns[on_board] - MIN_FRET] = True
+    # positions x strings x frets, in output order
+    masks = windows[:, order] & ordered_in_scale[None, :, :]
+
+    pitch_position_dict = {}
+    for position_index, key in enumerate(keys):
+        pitch_position_dict[key] = {
+            string: ordered_pitches[string_index][masks[position_index, string_index]].tolist()
+            for string_index, string in enumerate(fretboard.strings)
+        }
+    return pitch_position_dict
+
+@instrumented('get_scale_position_dict')
+def get_scale_pitch_positions(scale_name, root_note_id, root_pitch, tonal_root, selected_root_name, string_count=None):
+    """
+    Integer version of get_scale_position_dict.
+
+    Args:
+        string_count: 6 or 8 to generate positions (arpeggio_positions) when
+            there are no stored ones, None to show only 'All Notes' then
+
+    Returns:
+        Dict position key -> string -> list of absolute pitches
+    """
+    snapshot = get_catalog_snapshot()
+    scale_note = snapshot and get_snapshot_scale_note(snapshot, scale_name)
+    if scale_note is None:
+        scale_note = get_scale_note(scale_name)
+    intervals = get_tones_from_notes(scale_note)
+    pitch_classes = [(interval + root_pitch) % 12 for interval in intervals]
     # Fetch available positions
-    available_positions = NotesPosition.objects.filter(notes_name_id=scale_note.id)
-    POSITION_DICT = {}
-    # Position '0': open strings
-    base_dict = {}
-    for string in STRING_NOTE_OPTIONS:
-        cell = STRING_NOTE_OPTIONS[string][0]
-        tones = []
-        for note in NOTES_LIST:
-            info = cell.get(note, [{}])[0]
-            for tone in info.get('tone', []):
-                if tone not in tones:
-                    tones.append(tone)
-        base_dict[string] = [{'tones': tones}]
-    POSITION_DICT['0'] = base_dict
-    # Fretted positions
-    for pos in available_positions:
-        fretted = {}
-        pos_list = get_notes_position(pos.id, root_pitch)
-        for string in STRING_NOTE_OPTIONS:
-            cell = STRING_NOTE_OPTIONS[string][0]
-            tones = []
-            for note in NOTES_LIST:
-                info = cell.get(note, [{}])[0]
-                frets = info.get('fret', [])
-                tone_opts = info.get('tone', [])
-                for idx, fret in enumerate(frets):
-                    if idx < len(tone_opts) and fret in pos_list:
-                        tone = tone_opts[idx]
-                        if tone not in tones:
-                            tones.append(tone)
-            fretted[string] = [{'tones': tones}]
-        POSITION_DICT[str(pos.position_order)] = fretted
-    return POSITION_DICT
+    if snapshot is not None:
+        available_positions = [
+            (row['position_order'], row['position'])
+            for row in snapshot.grouped('notesposition', 'notes_name_id').get(scale_note.id, [])
+        ]
+    else:
+        available_positions = NotesPosition.objects.filter(
+            notes_name_id=scale_note.id).values_list('position_order', 'position')
+    position_lists = [
+        (str(position_order), parse_notes_position(position, root_pitch))
+        for position_order, position in available_positions
+    ]
+    if not position_lists and string_count is not None:
+        position_lists = [
+            (str(position.position_order), list(position.frets))
+            for position in get_arpeggio_positions(tuple(intervals), root_pitch % 12, string_count)
+        ]
+    return build_scale_pitch_positions(pitch_classes, position_lists)
+
+def serialize_pitch_positions(pitch_position_dict, use_sharps):
+    """Spell a pitch position dict into the {'tones': [...]} format used by the templates."""
+    return {
+        key: {
+            string: [{'tones': [spell_tone(pitch, use_sharps) for pitch in pitches]}]
+            for string, pitches in position.items()
+        }
+        for key, position in pitch_position_dict.items()
+    }
+
+@instrumented('get_scale_position_dict')
+def get_scale_position_dict(scale_name, root_note_id, root_pitch, tonal_root, selected_root_name):
+    pitch_position_dict = get_scale_pitch_positions(
+        scale_name, root_note_id, root_pitch, tonal_root, selected_root_name
+    )
+    return serialize_pitch_positions(
+        pitch_position_dict, use_sharp_spelling(root_pitch, selected_root_name)
+    )
 
 def transpose_position(y):
     y_trans = []
@@ -147,6 +255,15 @@ def transpose_actual_position(position, transposable_position):
                 continue
     return position
 
+def transpose_pitch_positions(position, transposable_position):
+    """Move every pitch of the given positions down an octave."""
+    for x in transposable_position:
+        actual_position = position[str(x)]
+        for string in STRINGS:
+            if string in actual_position:
+                actual_position[string] = [pitch - 12 for pitch in actual_position[string]]
+    return position
+
 def ordering_positions(position):
     score_board = {}
     for i in range(1, len(position)):
@@ -175,6 +292,23 @@ def ordering_positions(position):
     ordered_score = OrderedDict(sorted(score_board.items(), key=lambda t: t[1]))
     return ordered_score
 
+def ordering_pitch_positions(position, use_sharps):
+    """
+    Integer version of ordering_positions: scores each position by the
+    average (letter, octave) score of its eString tones.
+    """
+    letter_scores = [
+        NOTES_SCORE[pitch_to_note_name(pitch_class, use_sharps)[0]] for pitch_class in range(12)
+    ]
+    score_board = {}
+    for i in range(1, len(position)):
+        pitches = position[str(i)].get('eString', ())
+        if pitches:
+            score_board[i] = sum(letter_scores[pitch % 12] + (pitch // 12) * 12 for pitch in pitches) / len(pitches)
+        else:
+            score_board[i] = 0  # Default score for empty positions
+    return OrderedDict(sorted(score_board.items(), key=lambda t: t[1]))
+
 def re_ordering_positions(position):
     new_order = ordering_positions(position)
     re_order_list = list(new_order.keys())
@@ -183,3 +317,12 @@ def re_ordering_positions(position):
         new_position[str(i)] = position[str(ordering)]
     new_position['0'] = position['0']
     return new_position
+
+def re_ordering_pitch_positions(position, use_sharps):
+    """Integer version of re_ordering_positions."""
+    new_order = ordering_pitch_positions(position, use_sharps)
+    new_position = {}
+    for i, ordering in enumerate(new_order.keys(), 1):
+        new_position[str(i)] = position[str(ordering)]
+    new_position['0'] = position['0']
+    return new_position
@@ -41,15 +41,43 @@ CHORD_QUALITY_MAP = {
     '13': 'Dominant 13',
 }
 
-def improved_search_chords(search_query):
+# Chord results hydrated per page by iter_chord_result_pages
+CHORD_RESULT_PAGE_SIZE = 50
+
+def improved_search_chords(search_query, limit=None, offset=0):
     """
     Enhanced search for chords supporting combined type, root, and position queries.
     Examples: 'Gmaj7 V2', 'A Major Spread Triad', 'C#min7'
-    
+
+    Args:
+        search_query: The search query
+        limit: Maximum number of results, None for all
+        offset: Number of sorted results to skip
+
     Returns a list of chord results with full metadata.
     """
-    logger.debug(f"Entering improved_search_chords with query: '{search_query}'")
-    results = []
+    chord_ids, note = search_chord_ids(search_query)
+    end = offset + limit if limit is not None else None
+    return hydrate_chord_results(chord_ids[offset:end], root_note=note)
+
+def iter_improved_chord_results(search_query, page_size=CHORD_RESULT_PAGE_SIZE):
+    """
+    Like improved_search_chords, but yields the results in pages so large
+    result sets are never hydrated at once.
+    """
+    chord_ids, note = search_chord_ids(search_query)
+    return iter_chord_result_pages(chord_ids, root_note=note, page_size=page_size)
+
+def search_chord_ids(search_query):
+    """
+    Find and order the chords matching a query without hydrating them.
+
+    Returns:
+        Tuple (chord IDs in result order, parsed root note or None)
+    """
+    logger.debug(f"Entering search_chord_ids with query: '{search_query}'")
+    chord_ids = []
+    note = None
     
     try:
         # Import needed modules here to avoid circular imports
@@ -121,12 +149,12 @@ def improved_search_chords(search_query):
             matches = spread_matches
             logger.debug(f"Found {matches.count()} matches with broader 'Spread' search")
         
-        # 6. Process the matches into structured results
-        results = process_improved_chord_results(matches, root_note=note)
-        logger.debug(f"Processed {len(results)} final chord results")
+        # 6. Order the matches, they are hydrated page by page later
+        chord_ids = sort_chord_matches(matches)
+        logger.debug(f"Sorted {len(chord_ids)} final chord results")
         
         # 7. If no matches found but we have both root and quality, try a looser search
-        if not results and note and quality:
+        if not chord_ids and note and quality:
             logger.debug(f"No exact matches - trying looser search for {note} {quality}")
             
             # First try with just chord name
@@ -143,31 +171,100 @@ def improved_search_chords(search_query):
             
             if looser_matches.exists():
                 logger.debug(f"Looser search found {looser_matches.count()} matches")
-                results = process_improved_chord_results(looser_matches, root_note=note)
+                chord_ids = sort_chord_matches(looser_matches)
         
-        return results
+        return chord_ids, note
     
     except Exception as e:
-        logger.error(f"Error in improved_search_chords: {str(e)}")
+        logger.error(f"Error in search_chord_ids: {str(e)}")
         logger.error(traceback.format_exc())
-        return []
+        return [], note
 
-def process_improved_chord_results(queryset, root_note=None):
+def chord_result_sort_key(type_name, range_val, chord_id):
     """
-    Process chord query results into a standardized format with better display formatting.
-    Handles root note display and proper URL construction.
+    Sort key of a chord result: spread triads, then V-system types, then
+    common ranges, then everything else by ID.
+    """
+    # Special handling for "Spread Triads" - give it highest priority
+    type_name = type_name or ''
+    if "Spread" in type_name:
+        return (-1, 0)  # This will sort before everything else
+
+    # Sort V-system positions next, alphabetically
+    v_match = re.match(r'V(\d+)', type_name)
+    if v_match:
+        v_number = int(v_match.group(1))
+        return (0, v_number)
+
+    # Sort by range - prefer common ranges
+    range_val = range_val or ''
+    if 'e - g' in range_val:
+        return (1, 0)  # High priority common range
+    if 'b - d' in range_val:
+        return (1, 1)
+
+    # Everything else by ID
+    return (2, chord_id or 0)
+
+def sort_chord_matches(queryset):
+    """
+    Order matching chords for display without loading the full rows.
+
+    Args:
+        queryset: ChordNotes queryset or list of ChordNotes
+
+    Returns:
+        List of chord IDs in result order
+    """
+    if hasattr(queryset, 'values_list'):
+        rows = list(queryset.values_list('id', 'type_name', 'range'))
+    else:
+        rows = [(chord.id, chord.type_name, getattr(chord, 'range', '')) for chord in queryset]
+    # Stable sort, ties keep the queryset order
+    rows.sort(key=lambda row: chord_result_sort_key(row[1], row[2], row[0]))
+    return [row[0] for row in rows]
+
+def get_inversion_orders(chord_ids):
+    """
+    Return {chord id: inversion names} from the in-memory chord catalog.
+    """
+    from .chord_catalog import get_chord_catalog
+
+    catalog = get_chord_catalog()
+    return {
+        chord_id: [position.inversion_order for position in catalog.get_positions(chord_id)]
+        for chord_id in chord_ids
+    }
+
+def hydrate_chord_results(chord_ids, root_note=None):
+    """
+    Build the result dictionaries of a page of chords.
+
+    The rows are loaded in one query and their positions come from the
+    chord catalog, so the cost doesn't grow with queries per result.
+
+    Args:
+        chord_ids: Chord IDs in result order
+        root_note: Root name given in the query, if any
+
+    Returns:
+        List of chord result dictionaries in the order of chord_ids
     """
     # Import needed modules here to avoid circular imports
-    from .search_utils import ROOT_NAME_TO_ID
-    
-    logger.debug(f"Processing {queryset.count() if hasattr(queryset, 'count') else len(queryset)} chord results")
+    from .models_chords import ChordNotes
+    from .search_utils import ROOT_NAME_TO_ID, ROOT_ID_TO_NAME
+
+    chords = ChordNotes.objects.select_related('category').in_bulk(chord_ids)
+    inversion_orders = get_inversion_orders(chords)
     processed_results = []
-    
-    for chord in queryset:
+
+    for chord_id in chord_ids:
+        chord = chords.get(chord_id)
+        if chord is None:
+            continue
         try:
             # 1. Get chord positions
-            from .models_chords import ChordPosition
-            positions = list(ChordPosition.objects.filter(notes_name=chord).values_list('inversion_order', flat=True))
+            positions = inversion_orders.get(chord.id, [])
             
             # 2. Collect the notes from this chord
             notes = []
@@ -195,13 +292,9 @@ def process_improved_chord_results(queryset, root_note=None):
             else:
                 # Otherwise use the chord's tonal_root if available
                 tonal_root = getattr(chord, 'tonal_root', None)
-                if tonal_root is not None:
-                    # Find the root name for this tonal_root
-                    for name, root_id in ROOT_NAME_TO_ID.items():
-                        if root_id == tonal_root:
-                            display_root = name
-                            url_root_id = root_id
-                            break
+                if tonal_root in ROOT_ID_TO_NAME:
+                    display_root = ROOT_ID_TO_NAME[tonal_root]
+                    url_root_id = tonal_root
             
             # Default to C (ID 1) if we couldn't determine a root
             if not url_root_id:
@@ -242,31 +335,41 @@ def process_improved_chord_results(queryset, root_note=None):
             logger.error(f"Error processing chord {getattr(chord, 'id', 'unknown')}: {str(e)}")
             continue
     
-    # Sort results - prioritize V-system positions (V1, V2, etc.) and common ranges
-    def sort_key(item):
-        # Special handling for "Spread Triads" - give it highest priority
-        type_name = item.get('type', '')
-        if "Spread" in type_name:
-            return (-1, 0)  # This will sort before everything else
-        
-        # Sort V-system positions next, alphabetically
-        v_match = re.match(r'V(\d+)', type_name)
-        if v_match:
-            v_number = int(v_match.group(1))
-            return (0, v_number)
-        
-        # Sort by range - prefer common ranges
-        range_val = item.get('range', '')
-        if 'e - g' in range_val:
-            return (1, 0)  # High priority common range
-        if 'b - d' in range_val:
-            return (1, 1)
-        
-        # Everything else by ID
-        return (2, item.get('id', 0))
-    
-    # Apply sorting if we have results
-    if processed_results:
-        processed_results.sort(key=sort_key)
-    
     return processed_results
+
+def process_improved_chord_results(queryset, root_note=None, limit=None, offset=0):
+    """
+    Process chord query results into a standardized format with better display formatting.
+    Handles root note display and proper URL construction.
+
+    Results are sorted on (id, type, range) rows first and only the requested
+    page is loaded and hydrated.
+
+    Args:
+        queryset: ChordNotes queryset or list of ChordNotes
+        root_note: Root name given in the query, if any
+        limit: Maximum number of results, None for all
+        offset: Number of sorted results to skip
+
+    Returns:
+        List of chord result dictionaries
+    """
+    chord_ids = sort_chord_matches(queryset)
+    logger.debug(f"Processing {len(chord_ids)} chord results")
+    end = offset + limit if limit is not None else None
+    return hydrate_chord_results(chord_ids[offset:end], root_note=root_note)
+
+def iter_chord_result_pages(chord_ids, root_note=None, page_size=CHORD_RESULT_PAGE_SIZE):
+    """
+    Hydrate sorted chord IDs page by page.
+
+    Args:
+        chord_ids: Chord IDs in result order (see search_chord_ids)
+        root_note: Root name given in the query, if any
+        page_size: Results per page
+
+    Yields:
+        Lists of at most page_size chord result dictionaries
+    """
+    for start in range(0, len(chord_ids), page_size):
+        yield hydrate_chord_results(chord_ids[start:start + page_size], root_note=root_note)
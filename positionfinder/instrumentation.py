@@ -0,0 +1,237 @@
+"""
+Per-request performance instrumentation.
+
+When FRETBOARD_INSTRUMENTATION is enabled, InstrumentationMiddleware records
+for every request the wall time, SQL query count and time, versioned cache
+hits / misses and the time spent in named hot spans (functions decorated
+with @instrumented, plus template rendering). Each response gets a
+Server-Timing header, and a rolling aggregate per view is served as JSON by
+instrumentation_stats_view to local clients.
+
+When disabled the middleware is not installed at all and @instrumented
+functions only pay for one context variable lookup.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_http_methods
+
+# Samples kept per view for the rolling aggregate
+STATS_WINDOW = 1000
+
+# Metrics of the request being handled in this thread / task, None when
+# instrumentation is off
+_current = ContextVar('fretboard_request_metrics', default=None)
+
+
+def instrumentation_enabled():
+    """Return True if per-request instrumentation is switched on."""
+    return getattr(settings, 'FRETBOARD_INSTRUMENTATION', False)
+
+
+class RequestMetrics:
+    """Measurements of one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.spans = {}
+        # Nesting depth per span, only the outermost call is timed
+        self.depth = {}
+
+    def add_span(self, name, elapsed):
+        self.spans[name] = self.spans.get(name, 0.0) + elapsed
+
+    def server_timing(self):
+        """Return the Server-Timing header value (durations in ms)."""
+        entries = [
+            f'total;dur={self.total * 1000:.2f}',
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+        ]
+        entries.extend(f'{name};dur={elapsed * 1000:.2f}' for name, elapsed in self.spans.items())
+        return ', '.join(entries)
+
+    def sample(self):
+        return {
+            'total_ms': self.total * 1000,
+            'db_ms': self.db_time * 1000,
+            'queries': self.queries,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'spans': {name: elapsed * 1000 for name, elapsed in self.spans.items()},
+        }
+
+
+def instrumented(name):
+    """
+    Time calls of the decorated function as the span ``name``.
+
+    Recursive or nested calls of the same span are only counted once.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics = _current.get()
+            if metrics is None:
+                return func(*args, **kwargs)
+            depth = metrics.depth.get(name, 0)
+            metrics.depth[name] = depth + 1
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.depth[name] = depth
+                if not depth:
+                    metrics.add_span(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def record_cache(hit):
+    """Count a cache hit or miss for the current request."""
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def _query_timer(metrics):
+    def execute_wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.queries += 1
+            metrics.db_time += time.perf_counter() - started
+    return execute_wrapper
+
+
+class RollingStats:
+    """Last STATS_WINDOW request samples per view."""
+
+    def __init__(self, window=STATS_WINDOW):
+        self.window = window
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def add(self, view, sample):
+        with self.lock:
+            if view not in self.samples:
+                self.samples[view] = deque(maxlen=self.window)
+            self.samples[view].append(sample)
+
+    def clear(self):
+        with self.lock:
+            self.samples = {}
+
+    def summary(self):
+        """Return aggregated metrics per view."""
+        with self.lock:
+            samples = {view: list(view_samples) for view, view_samples in self.samples.items()}
+        result = {}
+        for view, view_samples in samples.items():
+            total = np.array([sample['total_ms'] for sample in view_samples])
+            hits = sum(sample['cache_hits'] for sample in view_samples)
+            lookups = hits + sum(sample['cache_misses'] for sample in view_samples)
+            span_names = sorted({name for sample in view_samples for name in sample['spans']})
+            p50, p95, p99 = np.percentile(total, [50, 95, 99])
+            result[view] = {
+                'requests': len(view_samples),
+                'mean_ms': round(float(total.mean()), 3),
+                'p50_ms': round(float(p50), 3),
+                'p95_ms': round(float(p95), 3),
+                'p99_ms': round(float(p99), 3),
+                'queries_mean': round(float(np.mean([sample['queries'] for sample in view_samples])), 2),
+                'db_ms_mean': round(float(np.mean([sample['db_ms'] for sample in view_samples])), 3),
+                'cache_hit_rate': round(hits / lookups, 3) if lookups else None,
+                # Mean time per request, requests without the span count as 0
+                'spans_ms_mean': {
+                    name: round(sum(sample['spans'].get(name, 0.0) for sample in view_samples) / len(view_samples), 3)
+                    for name in span_names
+                },
+            }
+        return result
+
+
+stats = RollingStats()
+
+
+_template_render_patched = False
+
+
+def _instrument_template_rendering():
+    # Django only sends template_rendered in tests, so time the backend's
+    # Template.render (one call per render(), includes are nested inside)
+    global _template_render_patched
+    if _template_render_patched:
+        return
+    from django.template.backends.django import Template
+    Template.render = instrumented('template')(Template.render)
+    _template_render_patched = True
+
+
+class InstrumentationMiddleware:
+    """
+    Record per-request timings and add a Server-Timing header.
+
+    Only installed when FRETBOARD_INSTRUMENTATION is enabled; put it first in
+    MIDDLEWARE so the total covers the other middleware too.
+    """
+
+    def __init__(self, get_response):
+        if not instrumentation_enabled():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        _instrument_template_rendering()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_query_timer(metrics)))
+                response = self.get_response(request)
+                # Streaming / unrendered responses finish later, measure what ran here
+                metrics.total = time.perf_counter() - metrics.started
+        finally:
+            _current.reset(token)
+
+        response['Server-Timing'] = metrics.server_timing()
+        match = getattr(request, 'resolver_match', None)
+        stats.add(match.view_name if match and match.view_name else request.path, metrics.sample())
+        return response
+
+
+@require_http_methods(['GET', 'POST'])
+def instrumentation_stats_view(request):
+    """
+    Rolling per-view aggregate as JSON, for staff users or with DEBUG.
+
+    Behind a reverse proxy every request comes from localhost, so the client
+    address isn't checked. A POST returns the aggregate and clears the
+    collected samples.
+    """
+    user = getattr(request, 'user', None)
+    if not instrumentation_enabled() or not (settings.DEBUG or getattr(user, 'is_staff', False)):
+        raise Http404()
+    summary = stats.summary()
+    if request.method == 'POST':
+        stats.clear()
+    return JsonResponse({'window': stats.window, 'views': summary})
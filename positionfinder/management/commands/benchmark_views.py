@@ -0,0 +1,138 @@
+"""
+Management command to benchmark the page, search and API views over the catalog.
+"""
+import json
+import os
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from positionfinder.benchmark import build_cases, run_benchmark, compare_reports
+from positionfinder.cache_utils import bump_catalog_version
+from positionfinder.chord_catalog import invalidate_chord_catalog
+
+DEFAULT_FIXTURE = 'positionfinder/fixtures/databasedump.json'
+
+
+class Command(BaseCommand):
+    help = ('Measures latency percentiles, query counts and peak memory of every view '
+            'over the full catalog and writes a JSON report')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fixture',
+            default=DEFAULT_FIXTURE,
+            help='Fixture loaded into a throwaway test database before the run',
+        )
+        parser.add_argument(
+            '--current-db',
+            action='store_true',
+            help='Benchmark the configured database instead of a test database with the fixture',
+        )
+        parser.add_argument(
+            '--views',
+            nargs='+',
+            help='Only benchmark these views (e.g. scales chords api:autocomplete)',
+        )
+        parser.add_argument(
+            '--roots',
+            type=int,
+            nargs='+',
+            help='Only sweep these Root IDs',
+        )
+        parser.add_argument(
+            '--max-cases',
+            type=int,
+            default=None,
+            help='Evenly sample at most this many cases per view',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed requests per case',
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Expire all caches before every request',
+        )
+        parser.add_argument(
+            '--output',
+            default='benchmark-report.json',
+            help='Where to write the JSON report',
+        )
+        parser.add_argument(
+            '--compare',
+            help='Baseline report to compare against; regressions fail the command',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.1,
+            help='Allowed relative latency / memory growth against the baseline (default 0.1)',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        if options['current_db']:
+            report = self.run(options)
+        else:
+            if not os.path.exists(options['fixture']):
+                raise CommandError(f"Fixture not found: {options['fixture']}")
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                self.stdout.write(f"Loading fixture: {options['fixture']}")
+                call_command('loaddata', options['fixture'], verbosity=0)
+                report = self.run(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+            # Entries cached for the test database must not outlive it
+            bump_catalog_version()
+            invalidate_chord_catalog()
+        report['meta']['fixture'] = None if options['current_db'] else options['fixture']
+
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+        if baseline is not None:
+            regressions = compare_reports(baseline, report, threshold=options['threshold'])
+            for regression in regressions:
+                change = f" ({regression['change']:+.0%})" if regression['change'] is not None else ''
+                self.stdout.write(self.style.ERROR(
+                    f"REGRESSION {regression['view']} {regression['metric']}: "
+                    f"{regression['baseline']} -> {regression['current']}{change}"
+                ))
+            if regressions:
+                raise CommandError(f'{len(regressions)} regressions against {options["compare"]}')
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}"))
+
+    def run(self, options):
+        # Start from empty caches so the report doesn't depend on earlier runs
+        bump_catalog_version()
+        invalidate_chord_catalog()
+        cases = build_cases(views=options['views'], roots=options['roots'], max_cases=options['max_cases'])
+        self.stdout.write(f"Benchmarking {sum(len(view_cases) for view_cases in cases.values())} cases "
+                          f"x {options['repeat']} requests")
+
+        def progress(view, summary):
+            if not summary['requests']:
+                self.stdout.write(f'{view:24} no cases')
+                return
+            if 'p50_ms' not in summary:
+                self.stdout.write(f"{view:24} errors {summary['errors']}, no successful requests")
+                return
+            self.stdout.write(
+                f"{view:24} p50 {summary['p50_ms']:8.2f}ms  p95 {summary['p95_ms']:8.2f}ms  "
+                f"p99 {summary['p99_ms']:8.2f}ms  queries {summary['queries_mean']:6.1f} "
+                f"(max {summary['queries_max']})  peak {summary['peak_kb_max']:8.1f}KB  "
+                f"errors {summary['errors']}"
+            )
+
+        return run_benchmark(cases, repeat=options['repeat'], cold=options['cold'], progress=progress)
@@ -0,0 +1,31 @@
+"""
+Management command to compile the catalog into a binary snapshot.
+"""
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from positionfinder.catalog_snapshot import build_catalog_snapshot, get_snapshot_path
+
+
+class Command(BaseCommand):
+    help = ('Compiles roots, scales / arpeggios and chords with their positions into the '
+            'snapshot file workers map at startup (FRETBOARD_CATALOG_SNAPSHOT)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='Snapshot file (default: settings.FRETBOARD_CATALOG_SNAPSHOT)',
+        )
+
+    def handle(self, *args, **options):
+        path = options['output'] or get_snapshot_path()
+        if not path:
+            raise CommandError('FRETBOARD_CATALOG_SNAPSHOT is disabled, pass --output')
+        started = time.perf_counter()
+        counts = build_catalog_snapshot(path)
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {path} ({os.path.getsize(path) / 1024:.0f} KB) in {time.perf_counter() - started:.2f}s'))
+        for name, count in counts.items():
+            self.stdout.write(f'- {name}: {count}')
@@ -3,7 +3,7 @@ Management command to create V-System seventh chords.
 """
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from positionfinder.models_chords import ChordNotes, ChordPosition
+from positionfinder.models_chords import ChordNotes, ChordPosition, bulk_create_chords
 
 class Command(BaseCommand):
     help = 'Create V-System seventh chords'
@@ -64,7 +64,7 @@ class Command(BaseCommand):
                 ("d-e", ["dString", "gString", "bString", "eString"]),  # Middle 4 strings - Corrected range name
             ]
             
-            total_created = 0
+            chords = []
             
             # For each root note (0-11)
             for root in range(12):
@@ -78,157 +78,49 @@ class Command(BaseCommand):
                     for range_name, strings in string_sets:
                         # For V1 (close position)
                         if v_system in ['v1', 'all']:
-                            try:
-                                # Create V1 (close position) seventh chord
-                                # Sort notes to ensure they're in close position
-                                notes = [(root + interval) % 12 for interval in intervals]
-                                notes.sort()
-                                
-                                # Create chord in database
-                                chord = ChordNotes.objects.create(
-                                    category_id=3,  # Chords category
-                                    type_name='V1',
-                                    chord_name=chord_name,
-                                    range=range_name,
-                                    tonal_root=root,
-                                    first_note=notes[0],
-                                    first_note_string=strings[0],
-                                    second_note=notes[1],
-                                    second_note_string=strings[1],
-                                    third_note=notes[2],
-                                    third_note_string=strings[2],
-                                    fourth_note=notes[3],
-                                    fourth_note_string=strings[3],
-                                )
-                                
-                                # Create positions
-                                # self.create_positions(chord) # Position creation handled by model logic
-                                total_created += 1
-                                
-                            except Exception as e:
-                                self.stdout.write(self.style.ERROR(f"    Error creating V1 {chord_name} for root {root}: {e}"))
+                            # Create V1 (close position) seventh chord
+                            # Sort notes to ensure they're in close position
+                            notes = [(root + interval) % 12 for interval in intervals]
+                            notes.sort()
+                            chords.append(self.build_chord('V1', chord_name, range_name, root, notes, strings))
                         
                         # For V2 (drop-2)
                         if v_system in ['v2', 'all']:
-                            try:
-                                # Create V2 (drop-2) seventh chord
-                                notes = [(root + interval) % 12 for interval in intervals]
-                                notes.sort()  # Get in close position first
-                                
-                                # For drop-2, drop the second highest note
-                                drop_note = notes[2]  # The second highest note
-                                notes.remove(drop_note)
-                                # Insert at beginning to maintain sorted order
-                                notes.insert(0, (drop_note - 12) % 12)
-                                
-                                # Create chord in database
-                                chord = ChordNotes.objects.create(
-                                    category_id=3,  # Chords category
-                                    type_name='V2',
-                                    chord_name=chord_name,
-                                    range=range_name,
-                                    tonal_root=root,
-                                    first_note=notes[0],
-                                    first_note_string=strings[0],
-                                    second_note=notes[1],
-                                    second_note_string=strings[1],
-                                    third_note=notes[2],
-                                    third_note_string=strings[2],
-                                    fourth_note=notes[3],
-                                    fourth_note_string=strings[3],
-                                )
-                                
-                                # Create positions
-                                self.create_positions(chord)
-                                total_created += 1
-                                
-                            except Exception as e:
-                                self.stdout.write(self.style.ERROR(f"    Error creating V2 {chord_name} for root {root}: {e}"))
+                            # Create V2 (drop-2) seventh chord
+                            notes = [(root + interval) % 12 for interval in intervals]
+                            notes.sort()  # Get in close position first
+                            
+                            # For drop-2, drop the second highest note
+                            drop_note = notes[2]  # The second highest note
+                            notes.remove(drop_note)
+                            # Insert at beginning to maintain sorted order
+                            notes.insert(0, (drop_note - 12) % 12)
+                            chords.append(self.build_chord('V2', chord_name, range_name, root, notes, strings))
+            
+            # Insert all chords and their positions in one transaction
+            created_chords, created_positions = bulk_create_chords(chords)
+            total_created = len(created_chords)
+            self.stdout.write(f"Created {len(created_positions)} positions")
             
             self.stdout.write(self.style.SUCCESS(f"Successfully created {total_created} V-System seventh chords"))
             
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"Error: {e}"))
     
-    # def create_positions(self, chord):
-    #     """Create positions for a chord."""
-    #     # Create basic position (no transposition)
-    #     ChordPosition.objects.create(
-    #         notes_name_id=chord.id,
-    #         inversion_order='Basic Position',
-    #         first_note=0,
-    #         second_note=0,
-    #         third_note=0,
-    #         fourth_note=0,
-    #     )
-        
-    #     # Create first inversion
-    #     first_notes = self.calculate_intervals(chord)
-    #     ChordPosition.objects.create(
-    #         notes_name_id=chord.id,
-    #         inversion_order='First Inversion',
-    #         first_note=first_notes[0],
-    #         second_note=first_notes[1],
-    #         third_note=first_notes[2],
-    #         fourth_note=first_notes[3],
-    #     )
-        
-    #     # Create second inversion
-    #     second_notes = [
-    #         first_notes[0] + first_notes[1],
-    #         first_notes[1] + first_notes[2],
-    #         first_notes[2] + first_notes[3],
-    #         first_notes[3] + first_notes[0]
-    #     ]
-    #     ChordPosition.objects.create(
-    #         notes_name_id=chord.id,
-    #         inversion_order='Second Inversion',
-    #         first_note=second_notes[0],
-    #         second_note=second_notes[1],
-    #         third_note=second_notes[2],
-    #         fourth_note=second_notes[3],
-    #     )
-        
-    #     # Create third inversion
-    #     third_notes = [
-    #         second_notes[0] + second_notes[1],
-    #         second_notes[1] + second_notes[2],
-    #         second_notes[2] + second_notes[3],
-    #         second_notes[3] + second_notes[0]
-    #     ]
-    #     ChordPosition.objects.create(
-    #         notes_name_id=chord.id,
-    #         inversion_order='Third Inversion',
-    #         first_note=third_notes[0],
-    #         second_note=third_notes[1],
-    #         third_note=third_notes[2],
-    #         fourth_note=third_notes[3],
-    #     )
-    
-    # def calculate_intervals(self, chord):
-    #     """Calculate the intervals between notes in a chord."""
-    #     # Get the notes
-    #     notes = [
-    #         chord.first_note,
-    #         chord.second_note,
-    #         chord.third_note,
-    #         chord.fourth_note
-    #     ]
-        
-    #     # Calculate intervals
-    #     intervals = []
-    #     for i in range(3):
-    #         interval = notes[i+1] - notes[i]
-    #         # If negative, add an octave
-    #         if interval < 0:
-    #             interval += 12
-    #         intervals.append(interval)
-        
-    #     # Last interval (from last note back to first)
-    #     interval = notes[0] - notes[3]
-    #     # If negative, add an octave
-    #     if interval < 0:
-    #         interval += 12
-    #     intervals.append(interval)
-        
-    #     return intervals
+    def build_chord(self, type_name, chord_name, range_name, root, notes, strings):
+        """Build an unsaved chord for bulk insertion."""
+        return ChordNotes(
+            category_id=3,  # Chords category
+            type_name=type_name,
+            chord_name=chord_name,
+            range=range_name,
+            tonal_root=root,
+            first_note=notes[0],
+            first_note_string=strings[0],
+            second_note=notes[1],
+            second_note_string=strings[1],
+            third_note=notes[2],
+            third_note_string=strings[2],
+            fourth_note=notes[3],
+            fourth_note_string=strings[3],
+        )
@@ -0,0 +1,37 @@
+"""
+Management command to stream the catalog to a JSONL file.
+"""
+import sys
+
+from django.core.management.base import BaseCommand
+from positionfinder.catalog_sync import export_catalog, CATALOG_MODEL_NAMES
+
+DEFAULT_OUTPUT = 'positionfinder/fixtures/catalog.jsonl'
+
+
+class Command(BaseCommand):
+    help = ('Exports categories, roots, scales / arpeggios and chords with their positions '
+            'as JSON lines keyed by natural keys (see import_catalog)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=DEFAULT_OUTPUT,
+            help=f'Output file, - for stdout (default: {DEFAULT_OUTPUT})',
+        )
+        parser.add_argument(
+            '--models',
+            nargs='+',
+            choices=CATALOG_MODEL_NAMES,
+            help='Only export these models',
+        )
+
+    def handle(self, *args, **options):
+        if options['output'] == '-':
+            export_catalog(sys.stdout, models=options['models'])
+            return
+        with open(options['output'], 'w') as f:
+            counts = export_catalog(f, models=options['models'])
+        self.stdout.write(self.style.SUCCESS(f"Exported catalog to {options['output']}"))
+        for name, count in counts.items():
+            self.stdout.write(f'- {name}: {count}')
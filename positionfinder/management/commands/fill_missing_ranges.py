@@ -2,7 +2,7 @@
 Fill in missing chord ranges by cloning and adapting existing chord data.
 """
 from django.core.management.base import BaseCommand
-from positionfinder.models_chords import ChordNotes, ChordPosition
+from positionfinder.models_chords import ChordNotes, ChordPosition, bulk_create_chords, bulk_copy_positions
 from django.db import transaction
 from django.db.models import Q
 import logging
@@ -71,6 +71,9 @@ class Command(BaseCommand):
         skipped_count = 0
         error_count = 0
         
+        # New chords with the id of the chord they are cloned from
+        pending = []
+        
         # Process in transaction
         with transaction.atomic():
             for chord_type, chord_name in chord_data:
@@ -160,54 +163,47 @@ class Command(BaseCommand):
                         fourth_string = source_chord.fourth_note_string
                     
                     if not dry_run:
-                        try:
-                            # Create new chord with adapted values
-                            new_chord = ChordNotes.objects.create(
-                                category_id=source_chord.category_id,
-                                ordering=source_chord.ordering,
-                                type_name=source_chord.type_name,
-                                chord_name=source_chord.chord_name,
-                                chord_ordering=source_chord.chord_ordering,
-                                range=missing_range,
-                                range_ordering=source_chord.range_ordering,
-                                tonal_root=source_chord.tonal_root,
-                                first_note=source_chord.first_note,
-                                first_note_string=first_string,
-                                second_note=source_chord.second_note,
-                                second_note_string=second_string,
-                                third_note=source_chord.third_note,
-                                third_note_string=third_string,
-                                fourth_note=source_chord.fourth_note,
-                                fourth_note_string=fourth_string,
-                                fifth_note=source_chord.fifth_note,
-                                fifth_note_string=source_chord.fifth_note_string,
-                                sixth_note=source_chord.sixth_note,
-                                sixth_note_string=source_chord.sixth_note_string
-                            )
-                            
-                            # Clone positions
-                            source_positions = ChordPosition.objects.filter(notes_name_id=source_chord.id)
-                            for pos in source_positions:
-                                ChordPosition.objects.create(
-                                    notes_name_id=new_chord.id,
-                                    inversion_order=pos.inversion_order,
-                                    first_note=pos.first_note,
-                                    second_note=pos.second_note,
-                                    third_note=pos.third_note,
-                                    fourth_note=pos.fourth_note,
-                                    fifth_note=pos.fifth_note,
-                                    sixth_note=pos.sixth_note
-                                )
-                            
-                            created_count += 1
-                            self.stdout.write(f"    ✅ Created {chord_type} {chord_name} for range {missing_range}")
-                        except Exception as e:
-                            error_count += 1
-                            self.stdout.write(f"    ❌ Error creating {chord_type} {chord_name} for range {missing_range}: {str(e)}")
+                        # Create new chord with adapted values, inserted in bulk below
+                        pending.append((ChordNotes(
+                            category_id=source_chord.category_id,
+                            ordering=source_chord.ordering,
+                            type_name=source_chord.type_name,
+                            chord_name=source_chord.chord_name,
+                            chord_ordering=source_chord.chord_ordering,
+                            range=missing_range,
+                            range_ordering=source_chord.range_ordering,
+                            tonal_root=source_chord.tonal_root,
+                            first_note=source_chord.first_note,
+                            first_note_string=first_string,
+                            second_note=source_chord.second_note,
+                            second_note_string=second_string,
+                            third_note=source_chord.third_note,
+                            third_note_string=third_string,
+                            fourth_note=source_chord.fourth_note,
+                            fourth_note_string=fourth_string,
+                            fifth_note=source_chord.fifth_note,
+                            fifth_note_string=source_chord.fifth_note_string,
+                            sixth_note=source_chord.sixth_note,
+                            sixth_note_string=source_chord.sixth_note_string
+                        ), source_chord.id))
                     else:
                         self.stdout.write(f"    (dry run) Would create {chord_type} {chord_name} for range {missing_range}")
                         created_count += 1
         
+            # Insert all new chords, then clone their positions, in bulk
+            if pending:
+                try:
+                    created_chords, _ = bulk_create_chords([chord for chord, _ in pending], with_positions=False)
+                    bulk_copy_positions([
+                        (chord, source_id) for chord, (_, source_id) in zip(created_chords, pending)
+                    ])
+                    created_count += len(created_chords)
+                    for chord in created_chords:
+                        self.stdout.write(f"    ✅ Created {chord.type_name} {chord.chord_name} for range {chord.range}")
+                except Exception as e:
+                    error_count += len(pending)
+                    self.stdout.write(f"    ❌ Error creating {len(pending)} chords: {str(e)}")
+        
         # Summary
         if dry_run:
             self.stdout.write(self.style.SUCCESS(f"Dry run complete. Would create {created_count} chords, skipped {skipped_count}, with {error_count} errors"))
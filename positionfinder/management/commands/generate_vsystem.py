@@ -34,8 +34,9 @@ class Command(BaseCommand):
         parser.add_argument(
             '--string-set',
             type=str,
-            default='e-b',
-            help='String set to use (e-b, d-E, g-A, e-E, highA-E, e-lowB, highA-lowB)',
+            default=None,
+            help='String set to use (e-b, d-E, g-A, e-E, highA-E, e-lowB, highA-lowB). '
+                 'Defaults to e-b, or to all string sets with --batch.',
         )
         
         parser.add_argument(
@@ -43,6 +44,18 @@ class Command(BaseCommand):
             action='store_true',
             help='Clean existing V-System chords before generating new ones',
         )
+        
+        parser.add_argument(
+            '--batch',
+            action='store_true',
+            help='Generate all missing voicings of roots x chord types x string sets in one bulk insert',
+        )
+        
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='With --batch, only report what would be created',
+        )
 
     def handle(self, *args, **options):
         v_system = options['v_system'].lower()
@@ -50,15 +63,25 @@ class Command(BaseCommand):
         chord_type = options['chord_type']
         string_set = options['string_set']
         clean = options['clean']
+        batch = options['batch']
+        dry_run = batch and options['dry_run']
         
         # Clean existing V-System chords if requested
-        if clean:
+        if clean and dry_run:
+            self.stdout.write(self.style.WARNING('--clean is ignored in a dry run'))
+        elif clean:
             self.stdout.write('Cleaning existing V-System chords...')
             with transaction.atomic():
                 # Delete positions first (due to foreign key)
                 deleted, _ = ChordNotes.objects.filter(type_name__in=['V1', 'V2']).delete()
                 self.stdout.write(f'Deleted {deleted} existing V-System chords')
         
+        if batch:
+            self.handle_batch(v_system, root, chord_type, string_set, dry_run)
+            return
+        
+        string_set = string_set or 'e-b'
+        
         # Initialize the voicing system
         voicing_system = VoicingSystem()
         
@@ -103,11 +126,13 @@ class Command(BaseCommand):
                 self.stdout.write(f'Generating V1 voicings for all roots and chord types with string_set={string_set}')
                 try:
                     chords = []
-                    for chord_type in voicing_system.chord_types:
-                        generated = voicing_system.generate_all_roots_v1(chord_type, string_set)
-                        # Filter None values (failed creations)
-                        generated = [c for c in generated if c is not None]
-                        chords.extend(generated)
+                    # One transaction for all chord types, each type is a single bulk insert
+                    with transaction.atomic():
+                        for chord_type in voicing_system.chord_types:
+                            generated = voicing_system.generate_all_roots_v1(chord_type, string_set)
+                            # Filter None values (failed creations)
+                            generated = [c for c in generated if c is not None]
+                            chords.extend(generated)
                     self.stdout.write(f'Created {len(chords)} V1 chords')
                 except Exception as e:
                     self.stdout.write(self.style.ERROR(f'Error generating V1 voicings: {e}'))
@@ -152,13 +177,46 @@ class Command(BaseCommand):
                 self.stdout.write(f'Generating V2 voicings for all roots and chord types with string_set={string_set}')
                 try:
                     chords = []
-                    for chord_type in voicing_system.chord_types:
-                        generated = voicing_system.generate_all_roots_v2(chord_type, string_set)
-                        # Filter None values (failed creations)
-                        generated = [c for c in generated if c is not None]
-                        chords.extend(generated)
+                    # One transaction for all chord types, each type is a single bulk insert
+                    with transaction.atomic():
+                        for chord_type in voicing_system.chord_types:
+                            generated = voicing_system.generate_all_roots_v2(chord_type, string_set)
+                            # Filter None values (failed creations)
+                            generated = [c for c in generated if c is not None]
+                            chords.extend(generated)
                     self.stdout.write(f'Created {len(chords)} V2 chords')
                 except Exception as e:
                     self.stdout.write(self.style.ERROR(f'Error generating V2 voicings: {e}'))
                 
         self.stdout.write(self.style.SUCCESS('Done!'))
+    
+    def handle_batch(self, v_system, root, chord_type, string_set, dry_run):
+        """Generate the requested voicings in one batch and report counts and timing."""
+        type_names = {'v1': ('V1',), 'v2': ('V2',), 'all': ('V1', 'V2')}.get(v_system)
+        if type_names is None:
+            self.stdout.write(self.style.ERROR(f'Unknown V-System: {v_system}'))
+            return
+        
+        voicing_system = VoicingSystem()
+        try:
+            report = voicing_system.generate_batch(
+                roots=None if root is None else [root],
+                chord_types=None if chord_type is None else [chord_type],
+                string_set_keys=None if string_set is None else [string_set],
+                type_names=type_names,
+                dry_run=dry_run,
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Error generating voicings: {e}'))
+            return
+        
+        self.stdout.write(
+            f"Built {report['built']} voicings in {report['build_time']:.3f}s "
+            f"({report['skipped']} skipped for 8-string sets)"
+        )
+        self.stdout.write(f"{report['existing']} already exist ({report['dedupe_time']:.3f}s)")
+        action = 'Would create' if dry_run else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {report['created']} chords with {report['positions']} positions "
+            f"in {report['insert_time']:.3f}s"
+        ))
@@ -0,0 +1,67 @@
+"""
+Management command to apply a JSONL catalog export to the database.
+"""
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from positionfinder.catalog_snapshot import build_catalog_snapshot, get_snapshot_path
+from positionfinder.catalog_sync import import_catalog
+
+DEFAULT_INPUT = 'positionfinder/fixtures/catalog.jsonl'
+
+
+class Command(BaseCommand):
+    help = ('Brings the catalog in line with a JSONL export (see export_catalog), '
+            'writing only new, changed and removed rows')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input',
+            nargs='?',
+            default=DEFAULT_INPUT,
+            help=f'Catalog file (default: {DEFAULT_INPUT})',
+        )
+        parser.add_argument(
+            '--keep-missing',
+            action='store_true',
+            help="Don't delete rows that are not in the file",
+        )
+        parser.add_argument(
+            '--delete-duplicates',
+            action='store_true',
+            help='Delete rows repeating the natural key of another row',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the changes',
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options['input']):
+            raise CommandError(f"Catalog file not found: {options['input']}")
+        started = time.perf_counter()
+        try:
+            with open(options['input']) as f:
+                report = import_catalog(f, delete=not options['keep_missing'], dry_run=options['dry_run'],
+                                        delete_duplicates=options['delete_duplicates'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        prefix = 'Would apply' if options['dry_run'] else 'Applied'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {options['input']} in {time.perf_counter() - started:.2f}s"))
+        for name, counts in report.items():
+            self.stdout.write(
+                f"- {name}: {counts['created']} created, {counts['updated']} updated, "
+                f"{counts['deleted']} deleted, {counts['unchanged']} unchanged, "
+                f"{counts['duplicates']} duplicates, "
+                f"{counts['positions_replaced']} position lists replaced"
+            )
+
+        # Keep an existing catalog snapshot in line with the database
+        snapshot_path = get_snapshot_path()
+        if not options['dry_run'] and snapshot_path and os.path.exists(snapshot_path):
+            build_catalog_snapshot(snapshot_path)
+            self.stdout.write(f'Rebuilt catalog snapshot {snapshot_path}')
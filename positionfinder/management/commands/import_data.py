@@ -4,16 +4,30 @@ from django.core.management import call_command
 import json
 import os
 
-from positionfinder.models import Notes;
+from positionfinder.models import CatalogRevision, Notes;
 from positionfinder.positions import NotesPosition;
 from positionfinder.models_chords import ChordNotes, ChordPosition;
+from positionfinder.cache_utils import bump_catalog_version
+from positionfinder.chord_catalog import invalidate_chord_catalog
 
 
 class Command(BaseCommand):
     args = ''
     help = 'Loads the initial data in to database'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--catalog',
+            action='store_true',
+            help='Apply positionfinder/fixtures/catalog.jsonl as a diff instead of flushing the database',
+        )
+
     def handle(self, *args, **options):
+        if options['catalog']:
+            # Only writes what changed and keeps users, sessions and primary keys
+            call_command('import_catalog', stdout=self.stdout)
+            result = {'message': "Successfully applied catalog"}
+            return json.dumps(result)
         # Your Code
         # Flush the database to remove all data, including content types
         self.stdout.write("Flushing the database...")
@@ -23,5 +37,10 @@ class Command(BaseCommand):
         merged = 'positionfinder/fixtures/databasedump.json'
         self.stdout.write(f"Loading fixture: {merged}")
         call_command('loaddata', merged)
+        # flush doesn't send delete signals, so expire every cached entry at once
+        bump_catalog_version()
+        CatalogRevision.bump()
+        invalidate_chord_catalog()
+        self.stdout.write("Cache invalidated.")
         result = {'message': "Successfully Loading initial data"}
         return json.dumps(result)
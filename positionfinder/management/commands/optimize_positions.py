@@ -1,16 +1,24 @@
 from django.core.management.base import BaseCommand
-from positionfinder.optimized_positions import create_optimized_positions, update_specific_scale_positions
+from positionfinder.optimized_positions import (
+    SYSTEMS, DEFAULT_SYSTEM, create_optimized_positions, update_specific_scale_positions,
+)
 from positionfinder.models import Notes, NotesCategory
 from positionfinder.positions import NotesPosition
 
 class Command(BaseCommand):
-    help = 'Creates or updates optimized scale positions for better playability'
+    help = 'Computes scale positions (CAGED, 3-notes-per-string or single-octave boxes) from the scale intervals'
 
     def add_arguments(self, parser):
         parser.add_argument(
             '--scale',
             help='Specific scale to optimize (e.g., "Major")',
         )
+        parser.add_argument(
+            '--system',
+            choices=SYSTEMS,
+            default=DEFAULT_SYSTEM,
+            help=f'Fingering system to compute (default {DEFAULT_SYSTEM})',
+        )
         parser.add_argument(
             '--list',
             action='store_true',
@@ -40,26 +48,15 @@ class Command(BaseCommand):
             scale_name = options['scale']
             self.stdout.write(self.style.SUCCESS(f'Optimizing positions for {scale_name} scale'))
             
-            # Get scale from database
-            try:
-                scale = Notes.objects.get(note_name=scale_name, category__category_name='Scales')
-                # Call the update function for this specific scale
-                from positionfinder.optimized_positions import SCALE_POSITIONS
-                if scale_name in SCALE_POSITIONS:
-                    success = update_specific_scale_positions(scale_name, SCALE_POSITIONS[scale_name])
-                    if success:
-                        self.stdout.write(self.style.SUCCESS(f'Successfully updated positions for {scale_name}'))
-                    else:
-                        self.stdout.write(self.style.ERROR(f'Failed to update positions for {scale_name}'))
-                else:
-                    self.stdout.write(self.style.ERROR(f'No optimized positions found for {scale_name}'))
-            except Notes.DoesNotExist:
+            if update_specific_scale_positions(scale_name, system=options['system']):
+                self.stdout.write(self.style.SUCCESS(f'Successfully updated positions for {scale_name}'))
+            else:
                 self.stdout.write(self.style.ERROR(f'Scale {scale_name} not found'))
         else:
             # Optimize all scales
-            self.stdout.write(self.style.SUCCESS('Creating optimized positions for all scales'))
-            create_optimized_positions()
-            self.stdout.write(self.style.SUCCESS('Successfully created optimized positions'))
+            self.stdout.write(self.style.SUCCESS(f"Computing {options['system']} positions for all scales"))
+            count = create_optimized_positions(options['system'])
+            self.stdout.write(self.style.SUCCESS(f'Successfully created {count} positions'))
             
             # Count positions
             self.count_positions()
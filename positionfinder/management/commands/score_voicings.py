@@ -0,0 +1,26 @@
+"""
+Management command to store the difficulty scores of every chord voicing.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from positionfinder.voicing_difficulty import update_voicing_scores
+
+
+class Command(BaseCommand):
+    help = ('Scores fret span, string span, finger count and position height of every '
+            'inversion in all twelve keys and stores them as VoicingScores')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chords',
+            nargs='+',
+            type=int,
+            help='Only rescore these ChordNotes ids',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = update_voicing_scores(options['chords'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {count} voicing scores in {time.perf_counter() - started:.2f}s'))
@@ -0,0 +1,65 @@
+"""
+Management command to validate every chord of the catalog in one pass.
+"""
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from positionfinder.catalog_validation import validate_catalog, RULES
+
+
+class Command(BaseCommand):
+    help = ('Checks note ranges, string assignments, duplicate strings, note and inversion '
+            'counts, range coverage per chord type and playability of all chords at once')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rules',
+            nargs='+',
+            choices=list(RULES),
+            help='Only run these rules',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Processes for the playability check (default: CPU count)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the full report as JSON to this file',
+        )
+        parser.add_argument(
+            '--verbose-issues',
+            action='store_true',
+            help='List every issue, not just the counts',
+        )
+        parser.add_argument(
+            '--fail-on-issues',
+            action='store_true',
+            help='Exit with an error if any rule found issues',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        report = validate_catalog(rules=options['rules'], workers=options['workers'])
+        self.stdout.write(
+            f"Checked {report['chords']} chords and {report['positions']} inversions "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        for rule, count in report['counts'].items():
+            style = self.style.SUCCESS if not count else self.style.WARNING
+            self.stdout.write(style(f'- {rule}: {count} issues'))
+            if options['verbose_issues']:
+                for issue in report['issues'][rule]:
+                    self.stdout.write(
+                        f"    #{issue['chord_id']} {issue['type_name']} {issue['chord_name']} "
+                        f"({issue['range']}): {issue['message']}"
+                    )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report saved to {options['output']}"))
+        if options['fail_on_issues'] and not report['valid']:
+            raise CommandError('Catalog validation found issues')
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from positionfinder.scale_cache import warm_scale_json_cache
+from positionfinder.cache_utils import bump_catalog_version
+from positionfinder.models import Notes
+
+class Command(BaseCommand):
+    help = 'Renders the scale/arpeggio position JSON of every Notes x Root into the cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--notes',
+            type=int,
+            nargs='+',
+            help='Only warm these Notes IDs',
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Expire all cached entries before warming',
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            bump_catalog_version()
+            self.stdout.write('Expired all cached catalog entries')
+
+        notes = None
+        if options['notes']:
+            notes = Notes.objects.filter(pk__in=options['notes'])
+
+        written = warm_scale_json_cache(notes=notes)
+        self.stdout.write(self.style.SUCCESS(f'Cached {written} scale position entries'))
@@ -0,0 +1,171 @@
+"""
+Menu index.
+
+Everything the unified menu shows, including the chord name -> range ->
+inversion tree its AJAX follow-up calls walk (ChordNamesView,
+ChordRangesView, ChordPositionsView), loaded in a handful of queries once
+per catalog version. The index is plain data: it is stored in the shared
+cache so other processes skip the queries, and memoized in this process so
+a menu render doesn't touch the database or the cache backend's
+serialization more than once per version.
+"""
+import re
+import threading
+
+from .cache_utils import get_catalog_version, get_or_set
+from .catalog_snapshot import get_catalog_snapshot
+from .models import Notes, Root
+from .models_chords import ChordNotes, ChordPosition
+
+MENU_INDEX_NAMESPACE = 'menu_index'
+
+SCALE_CATEGORY_ID = 1
+ARPEGGIO_CATEGORY_ID = 2
+
+STANDARD_CHORD_TYPES = ['Triads', 'Spread Triads']
+
+
+def natural_sort_key(s):
+    """Sort key ordering V2 before V10."""
+    return [int(text) if text.isdigit() else text.lower()
+            for text in re.split('([0-9]+)', s)]
+
+
+def chord_type_options(type_names):
+    """
+    Split chord type names into standard and V-System types.
+
+    Args:
+        type_names: Distinct ChordNotes.type_name values
+
+    Returns:
+        Dictionary with ordered 'standard_types' and 'v_system_types'
+    """
+    standard_types = [t for t in STANDARD_CHORD_TYPES if t in type_names]
+    if 'Triads' not in standard_types:  # Fallback
+        standard_types.insert(0, 'Triads')
+
+    # Check if it looks like a V-System type
+    v_system_types = {t for t in type_names if t and t.startswith('V') and t[1:].isdigit()}
+    return {
+        'standard_types': standard_types,
+        'v_system_types': sorted(v_system_types, key=natural_sort_key),
+    }
+
+
+class MenuIndex:
+    """
+    Snapshot of the menu options and chord selection tree.
+
+    Lookups return the same rows, in the same order, as the ORM queries the
+    menu context processor and chord menu API views used to run.
+    """
+
+    def __init__(self, roots, notes, chords, default_chord, positions):
+        """
+        Args:
+            roots: Root value dicts (id, name, pitch) ordered by pitch and name
+            notes: Notes value dicts (id, category_id, note_name) ordered by
+                ordering and note_name
+            chords: (id, type_name, chord_name, range) rows ordered by
+                range_ordering
+            default_chord: (id, type_name, chord_name) of the first chord in
+                the default ChordNotes ordering, None without chords
+            positions: (notes_name_id, inversion_order) rows ordered by
+                inversion_order
+        """
+        self.version = None
+        self.root_options = roots
+        self.scale_options = [note for note in notes if note['category_id'] == SCALE_CATEGORY_ID]
+        self.arpeggio_options = [note for note in notes if note['category_id'] == ARPEGGIO_CATEGORY_ID]
+        self.default_chord = default_chord
+
+        self.chord_names = {}
+        self.ranges = {}
+        for chord_id, type_name, chord_name, range_name in chords:
+            self.chord_names.setdefault(type_name, set()).add(chord_name)
+            self.ranges.setdefault((type_name, chord_name), []).append({'id': chord_id, 'range': range_name})
+        self.all_chord_names = sorted({name for names in self.chord_names.values() for name in names})
+        self.chord_names = {type_name: sorted(names) for type_name, names in self.chord_names.items()}
+        self.chord_type_options = chord_type_options(self.chord_names)
+
+        self.positions = {}
+        for chord_id, inversion_order in positions:
+            self.positions.setdefault(chord_id, []).append({'inversion_order': inversion_order})
+
+    @classmethod
+    def load(cls):
+        """
+        Build the index from the catalog snapshot, or from the database in
+        five queries when there is no current snapshot.
+        """
+        snapshot = get_catalog_snapshot()
+        if snapshot is not None:
+            return cls.from_snapshot(snapshot)
+        roots = list(Root.objects.order_by('pitch', 'name').values('id', 'name', 'pitch'))
+        notes = list(Notes.objects.filter(
+            category_id__in=[SCALE_CATEGORY_ID, ARPEGGIO_CATEGORY_ID]
+        ).order_by('ordering', 'note_name').values('id', 'category_id', 'note_name'))
+        chords = list(ChordNotes.objects.order_by('range_ordering', 'pk').values_list(
+            'id', 'type_name', 'chord_name', 'range'
+        ))
+        default_chord = ChordNotes.objects.values_list('id', 'type_name', 'chord_name').first()
+        positions = list(ChordPosition.objects.order_by('inversion_order', 'pk').values_list(
+            'notes_name_id', 'inversion_order'
+        ))
+        return cls(roots, notes, chords, default_chord, positions)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Build the index from a CatalogSnapshot, using its stored row orders."""
+        roots = [dict(zip(('id', 'name', 'pitch'), row)) for row in snapshot.rows('root', ['id', 'name', 'pitch'])]
+        notes = [
+            dict(zip(('id', 'category_id', 'note_name'), row))
+            for row in snapshot.rows('notes', ['id', 'category_id', 'note_name'])
+            if row[1] in (SCALE_CATEGORY_ID, ARPEGGIO_CATEGORY_ID)
+        ]
+        chords = snapshot.rows('chordnotes', ['id', 'type_name', 'chord_name', 'range'], order='menu')
+        default_chords = snapshot.rows('chordnotes', ['id', 'type_name', 'chord_name'], order='default')
+        positions = snapshot.rows('chordposition', ['notes_name_id', 'inversion_order'], order='menu')
+        return cls(roots, notes, chords, default_chords[0] if default_chords else None, positions)
+
+    def get_chord_names(self, type_name):
+        """Return the sorted chord names of a chord type."""
+        return list(self.chord_names.get(type_name, []))
+
+    def get_ranges(self, type_name, chord_name):
+        """Return {'id', 'range'} dicts of a chord, ordered by range_ordering."""
+        return list(self.ranges.get((type_name, chord_name), []))
+
+    def get_positions(self, chord_id):
+        """Return {'inversion_order'} dicts of a chord, ordered by inversion name."""
+        return list(self.positions.get(chord_id, []))
+
+
+_menu_index = None
+_menu_index_lock = threading.Lock()
+
+
+def _load_menu_index(version):
+    index = MenuIndex.load()
+    index.version = version
+    return index
+
+
+def get_menu_index():
+    """
+    Return the menu index of the current catalog version.
+
+    A stale index (the catalog version changed) is replaced by the one in the
+    shared cache, or rebuilt from the database and stored there.
+    """
+    global _menu_index
+    version = get_catalog_version()
+    index = _menu_index
+    if index is None or index.version != version:
+        with _menu_index_lock:
+            index = _menu_index
+            if index is None or index.version != version:
+                index = get_or_set(MENU_INDEX_NAMESPACE, None, lambda: _load_menu_index(version))
+                _menu_index = index
+    return index
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+NOTES_FIELDS = (
+    'first_note', 'second_note', 'third_note', 'fourth_note', 'fifth_note', 'sixth_note',
+    'seventh_note', 'eigth_note', 'ninth_note', 'tenth_note', 'eleventh_note', 'twelth_note',
+)
+CHORD_NOTES_FIELDS = NOTES_FIELDS[:6]
+
+
+def _mask(obj, fields):
+    mask = 0
+    for field in fields:
+        note = getattr(obj, field)
+        if note is not None:
+            mask |= 1 << (note % 12)
+    return mask
+
+
+def backfill_pitch_class_set(apps, schema_editor):
+    for model_name, fields in (('Notes', NOTES_FIELDS), ('ChordNotes', CHORD_NOTES_FIELDS)):
+        model = apps.get_model('positionfinder', model_name)
+        rows = list(model.objects.only('id', *fields))
+        for row in rows:
+            row.pitch_class_set = _mask(row, fields)
+        model.objects.bulk_update(rows, ['pitch_class_set'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('positionfinder', '0023_root_display_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notes',
+            name='pitch_class_set',
+            field=models.IntegerField(db_index=True, default=0, editable=False, help_text='12-bit mask of the pitch classes, maintained on save'),
+        ),
+        migrations.AddField(
+            model_name='chordnotes',
+            name='pitch_class_set',
+            field=models.IntegerField(db_index=True, default=0, editable=False, help_text='12-bit mask of the pitch classes, maintained on save'),
+        ),
+        migrations.RunPython(backfill_pitch_class_set, migrations.RunPython.noop),
+    ]
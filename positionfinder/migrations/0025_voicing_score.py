@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('positionfinder', '0024_pitch_class_set'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoicingScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('root_pitch', models.PositiveSmallIntegerField(help_text='pitch class of the root, 0-11')),
+                ('fret_span', models.PositiveSmallIntegerField(help_text='highest minus lowest fret')),
+                ('string_span', models.PositiveSmallIntegerField(help_text='strings from the lowest to the highest used string')),
+                ('finger_count', models.PositiveSmallIntegerField(help_text='distinct frets to fret')),
+                ('position_height', models.PositiveSmallIntegerField(help_text='lowest fret of the voicing')),
+                ('difficulty', models.FloatField(db_index=True)),
+                ('position', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='positionfinder.chordposition')),
+            ],
+            options={
+                'verbose_name': 'Voicing Score',
+                'verbose_name_plural': 'Voicing Scores',
+                'ordering': ['position', 'root_pitch'],
+                'unique_together': {('position', 'root_pitch')},
+            },
+        ),
+    ]
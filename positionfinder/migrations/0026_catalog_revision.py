@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('positionfinder', '0025_voicing_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('revision', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'catalog revision',
+                'verbose_name_plural': 'catalog revisions',
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.utils.translation import gettext_lazy as _
 from django.db import models
 from .notes_choices import ChordChoicesField
+from .pitch_class_set import pitch_class_mask
 
 class Root(models.Model):
     name = models.CharField(max_length=30)
@@ -47,6 +48,19 @@ class Notes(models.Model):
     tenth_note = models.IntegerField(null=True, blank=True)
     eleventh_note = models.IntegerField(null=True, blank=True)
     twelth_note = models.IntegerField(null=True, blank=True)
+    pitch_class_set = models.IntegerField(
+        default=0, db_index=True, editable=False,
+        help_text='12-bit mask of the pitch classes, maintained on save')
+
+    NOTE_FIELDS = (
+        'first_note', 'second_note', 'third_note', 'fourth_note', 'fifth_note', 'sixth_note',
+        'seventh_note', 'eigth_note', 'ninth_note', 'tenth_note', 'eleventh_note', 'twelth_note',
+    )
+
+    def update_pitch_class_set(self):
+        """Recompute pitch_class_set from the note fields."""
+        self.pitch_class_set = pitch_class_mask(getattr(self, field) for field in self.NOTE_FIELDS)
+        return self.pitch_class_set
 
     def __str__(self):
         return '%s : %s' % (self.category, self.note_name)
@@ -55,3 +69,23 @@ class Notes(models.Model):
         ordering = ['category', 'ordering', 'note_name']
         verbose_name = u'Tones for Scale'
         verbose_name_plural = u'Tones for Scales'
+
+class CatalogRevision(models.Model):
+    """
+    Single row counting catalog writes, persisted with the catalog.
+
+    Catalog snapshots record the revision they were built at, so a process
+    starting after an in-place edit sees the snapshot is stale even though
+    the row counts didn't change.
+    """
+    revision = models.BigIntegerField(default=0)
+
+    @classmethod
+    def bump(cls):
+        """Count a catalog write."""
+        if not cls.objects.filter(pk=1).update(revision=models.F('revision') + 1):
+            cls.objects.get_or_create(pk=1, defaults={'revision': 1})
+
+    class Meta:
+        verbose_name = u'catalog revision'
+        verbose_name_plural = u'catalog revisions'
@@ -1,11 +1,13 @@
 from django.utils.translation import gettext_lazy as _
-from django.db import models
+from django.db import models, transaction
 
-from .models import NotesCategory
+from .models import CatalogRevision, NotesCategory
 from .string_choices import StringChoicesField
 from .chord_position_choices import ChordInversionChoicesField
 from .string_range_choices import StringRangeChoicesField
 from .notes_choices import NotesChoicesField, ChordChoicesField
+from .cache_utils import bump_catalog_version
+from .pitch_class_set import pitch_class_mask
 
 def create_eight_string_ranges(chord_id):
     chord = ChordNotes.objects.get(id=chord_id)
@@ -108,9 +110,95 @@ def create_eight_string_ranges(chord_id):
         # Create positions for seventh chord
         if created_e_lowB_seventh: create_base_position(e_lowB_seventh.id)
 
+def _interval_up(lower, upper):
+    # Interval from lower to upper, adjusting for octave crossings
+    interval = upper - lower
+    while interval < 0:
+        interval += 12
+    return interval
+
+def fourthnote_inversions(w, x, y, z):
+    """
+    Compute the inversion offsets of a four note chord.
+
+    Args:
+        w, x, y, z: Intervals between adjacent chord notes (last one wraps to the first)
+
+    Returns:
+        List of (inversion name, offsets) for the first to third inversion
+    """
+    return [
+        ('First Inversion', (w, x, y, z)),
+        ('Second Inversion', (w+x, x+y, y+z, z+w)),
+        ('Third Inversion', (w+x+y, x+y+z, y+z+w, z+w+x)),
+    ]
+
+def triad_inversions(w, x, y):
+    """
+    Compute the inversion offsets of a triad.
+
+    Args:
+        w, x, y: Intervals between adjacent chord notes (last one wraps to the first)
+
+    Returns:
+        List of (inversion name, offsets) for the first and second inversion
+    """
+    return [
+        ('First Inversion', (w, x, y)),
+        ('Second Inversion', (w+x, x+y, y+w)),
+    ]
+
+def _position_rows(chord_id, inversions):
+    fields = ['first_note', 'second_note', 'third_note', 'fourth_note']
+    return [
+        ChordPosition(notes_name_id=chord_id, inversion_order=inversion_order,
+                      **dict(zip(fields, offsets)))
+        for inversion_order, offsets in inversions
+    ]
+
+def build_base_positions(chord):
+    """
+    Compute base position and inversions of a chord without saving them.
+
+    Args:
+        chord: ChordNotes instance (its id may still be unset)
+
+    Returns:
+        List of unsaved ChordPosition rows in creation order, empty if the
+        chord's notes don't form a triad or four note chord
+    """
+    notes = (chord.first_note, chord.second_note, chord.third_note, chord.fourth_note)
+
+    # V1 chords always have 4 notes (they are 7th or extended chords), even if
+    # some are duplicated. This ensures consistent voicing across the V-System
+    is_four_note = not None in notes and (chord.type_name == 'V1' or chord.fifth_note is None)
+    if chord.type_name == 'V1' and not is_four_note:
+        return []
+
+    if is_four_note:
+        w = _interval_up(chord.first_note, chord.second_note)
+        x = _interval_up(chord.second_note, chord.third_note)
+        y = _interval_up(chord.third_note, chord.fourth_note)
+        z = _interval_up(chord.fourth_note, chord.first_note)
+        inversions = [('Basic Position', (0, 0, 0, 0))] + fourthnote_inversions(w, x, y, z)
+    elif not None in notes[:3] and chord.fourth_note is None:
+        w = _interval_up(chord.first_note, chord.second_note)
+        x = _interval_up(chord.second_note, chord.third_note)
+        y = _interval_up(chord.third_note, chord.first_note)
+        inversions = [('Basic Position', (0, 0, 0))] + triad_inversions(w, x, y)
+    else:
+        return []
+    return _position_rows(chord.id, inversions)
+
+def _chord_data_bulk_changed():
+    # bulk_create sends no post_save signals, so expire the caches here
+    from .chord_catalog import invalidate_chord_catalog
+    invalidate_chord_catalog()
+    bump_catalog_version()
+    CatalogRevision.bump()
+
 def create_fourthnote_positions(w,x,y,z,chord_id):
     chord = ChordNotes.objects.get(id=chord_id)
-    created_positions = []
     
     # Check if positions already exist to avoid duplicates
     existing_count = ChordPosition.objects.filter(
@@ -119,47 +207,16 @@ def create_fourthnote_positions(w,x,y,z,chord_id):
     ).count()
     
     if existing_count > 0:
-        return created_positions
-    
+        return []
     
-    #First Inversion
-    first_inv = ChordPosition.objects.create(
-        notes_name_id=chord.id,
-        inversion_order='First Inversion',
-        first_note=w,
-        second_note=x,
-        third_note=y,
-        fourth_note=z,
+    created_positions = ChordPosition.objects.bulk_create(
+        _position_rows(chord.id, fourthnote_inversions(w, x, y, z))
     )
-    created_positions.append(first_inv)
-    
-    #Second Inversion
-    second_inv = ChordPosition.objects.create(
-        notes_name_id=chord.id,
-        inversion_order='Second Inversion',
-        first_note=w+x,
-        second_note=x+y,
-        third_note=y+z,
-        fourth_note=z+w,
-    )
-    created_positions.append(second_inv)
-    
-    #Third Inversion
-    third_inv = ChordPosition.objects.create(
-        notes_name_id=chord.id,
-        inversion_order='Third Inversion',
-        first_note=w+x+y,
-        second_note=x+y+z,
-        third_note=y+z+w,
-        fourth_note=z+w+x,
-    )
-    created_positions.append(third_inv)
-    
+    _chord_data_bulk_changed()
     return created_positions
 
 def create_triad_positions(w,x,y,chord_id):
     chord = ChordNotes.objects.get(id=chord_id)
-    created_positions = []
     
     # Check if positions already exist to avoid duplicates
     existing_count = ChordPosition.objects.filter(
@@ -168,29 +225,12 @@ def create_triad_positions(w,x,y,chord_id):
     ).count()
     
     if existing_count > 0:
-        return created_positions
-    
+        return []
     
-    #First Inversion
-    first_inv = ChordPosition.objects.create(
-        notes_name_id=chord.id,
-        inversion_order='First Inversion',
-        first_note=w,
-        second_note=x,
-        third_note=y,
+    created_positions = ChordPosition.objects.bulk_create(
+        _position_rows(chord.id, triad_inversions(w, x, y))
     )
-    created_positions.append(first_inv)
-    
-    #Second Inversion
-    second_inv = ChordPosition.objects.create(
-        notes_name_id=chord.id,
-        inversion_order='Second Inversion',
-        first_note=w+x,
-        second_note=x+y,
-        third_note=y+w,
-    )
-    created_positions.append(second_inv)
-    
+    _chord_data_bulk_changed()
     return created_positions
 
 def create_base_position(id):
@@ -204,110 +244,106 @@ def create_base_position(id):
         List of created positions or None if positions already exist
     """
     chord = ChordNotes.objects.get(id=id)
-    created_positions = []
     
     # First, check if positions already exist to avoid duplicates
-    existing_positions = ChordPosition.objects.filter(notes_name_id=id).count()
-    if existing_positions > 0:
+    if ChordPosition.objects.filter(notes_name_id=id).exists():
         return None
     
-    # For V1 chords, all chords should have 4 notes, even if some are duplicated
-    # This ensures consistent voicing across the V-System
-    if chord.type_name == 'V1':
-        # V1 chords always have 4 notes (they are 7th or extended chords)
-        if None in (chord.first_note, chord.second_note, chord.third_note, chord.fourth_note):
-            return None
-        
-        base_position = ChordPosition.objects.create(
-            notes_name_id=chord.id,
-            inversion_order='Basic Position',
-            first_note=0,
-            second_note=0,
-            third_note=0,
-            fourth_note=0,
-        )
-        created_positions.append(base_position)
-        
-        # Calculate intervals between notes (adjusting for octave crossings)
-        w = chord.second_note - chord.first_note
-        while w < 0:
-            w += 12
-        x = chord.third_note - chord.second_note
-        while x < 0:
-            x += 12
-        y = chord.fourth_note - chord.third_note
-        while y < 0:
-            y += 12
-        z = chord.first_note - chord.fourth_note
-        while z < 0:
-            z += 12
-            
-        inversions = create_fourthnote_positions(w, x, y, z, id)
-        created_positions.extend(inversions)
-        
-        return created_positions
-    
-    # For other chord types, check if it's a seventh chord (four notes)
-    elif not None in (chord.first_note, chord.second_note, chord.third_note, chord.fourth_note) and chord.fifth_note is None:
-        base_position = ChordPosition.objects.create(
-            notes_name_id=chord.id,
-            inversion_order='Basic Position',
-            first_note=0,
-            second_note=0,
-            third_note=0,
-            fourth_note=0,
-        )
-        created_positions.append(base_position)
-        
-        # Calculate intervals between notes (adjusting for octave crossings)
-        w = chord.second_note - chord.first_note
-        while w < 0:
-            w += 12
-        x = chord.third_note - chord.second_note
-        while x < 0:
-            x += 12
-        y = chord.fourth_note - chord.third_note
-        while y < 0:
-            y += 12
-        z = chord.first_note - chord.fourth_note
-        while z < 0:
-            z += 12
-            
-        inversions = create_fourthnote_positions(w, x, y, z, id)
-        created_positions.extend(inversions)
-        
-        return created_positions
-    
-    # Check if this is a triad (three notes only)
-    elif not None in (chord.first_note, chord.second_note, chord.third_note) and chord.fourth_note is None:
-        base_position = ChordPosition.objects.create(
-            notes_name_id=chord.id,
-            inversion_order='Basic Position',
-            first_note=0,
-            second_note=0,
-            third_note=0
-        )
-        created_positions.append(base_position)
-        
-        # Calculate intervals between notes (adjusting for octave crossings)
-        w = chord.second_note - chord.first_note
-        while w < 0:
-            w += 12
-        x = chord.third_note - chord.second_note
-        while x < 0:
-            x += 12
-        y = chord.first_note - chord.third_note
-        while y < 0:
-            y += 12
-            
-        inversions = create_triad_positions(w, x, y, id)
-        created_positions.extend(inversions)
-        
-        return created_positions
-    
-    # If notes aren't properly defined, print a warning
-    else:
+    positions = build_base_positions(chord)
+    if not positions:
+        # Notes aren't properly defined
         return None
+    
+    created_positions = ChordPosition.objects.bulk_create(positions)
+    _chord_data_bulk_changed()
+    return created_positions
+
+def bulk_create_base_positions(chords, batch_size=500):
+    """
+    Create base positions and inversions for many chords at once.
+
+    All positions are computed in memory and written with bulk_create in
+    one transaction; chords that already have positions are skipped (one
+    query for all of them).
+
+    Args:
+        chords: Saved ChordNotes instances
+        batch_size: Rows per INSERT statement
+
+    Returns:
+        List of created ChordPosition rows
+    """
+    chords = [chord for chord in chords if chord.pk is not None]
+    if not chords:
+        return []
+    with transaction.atomic():
+        existing = set(ChordPosition.objects.filter(
+            notes_name_id__in=[chord.pk for chord in chords]
+        ).order_by().values_list('notes_name_id', flat=True))
+        positions = []
+        for chord in chords:
+            if chord.pk not in existing:
+                positions.extend(build_base_positions(chord))
+                # Never create positions twice for a chord listed twice
+                existing.add(chord.pk)
+        created_positions = ChordPosition.objects.bulk_create(positions, batch_size=batch_size)
+    _chord_data_bulk_changed()
+    return created_positions
+
+def bulk_copy_positions(chord_pairs, batch_size=500):
+    """
+    Copy the positions of source chords onto other chords in one transaction.
+
+    Args:
+        chord_pairs: List of (saved target ChordNotes, source chord id)
+        batch_size: Rows per INSERT statement
+
+    Returns:
+        List of created ChordPosition rows
+    """
+    source_ids = {source_id for _, source_id in chord_pairs}
+    source_positions = {}
+    for position in ChordPosition.objects.filter(notes_name_id__in=source_ids).order_by('notes_name_id', 'pk'):
+        source_positions.setdefault(position.notes_name_id, []).append(position)
+
+    fields = ['first_note', 'second_note', 'third_note', 'fourth_note', 'fifth_note', 'sixth_note']
+    positions = [
+        ChordPosition(notes_name_id=target.pk, inversion_order=position.inversion_order,
+                      **{field: getattr(position, field) for field in fields})
+        for target, source_id in chord_pairs
+        for position in source_positions.get(source_id, [])
+    ]
+    with transaction.atomic():
+        created_positions = ChordPosition.objects.bulk_create(positions, batch_size=batch_size)
+    _chord_data_bulk_changed()
+    return created_positions
+
+def bulk_create_chords(chords, with_positions=True, batch_size=500):
+    """
+    Insert many chords, and optionally their positions, in one transaction.
+
+    Unlike ChordNotes.save this doesn't generate chord variants; notes are
+    validated and range specific strings applied the same way.
+
+    Args:
+        chords: Unsaved ChordNotes instances
+        with_positions: Also create base positions and inversions
+        batch_size: Rows per INSERT statement
+
+    Returns:
+        Tuple (created chords, created positions)
+    """
+    for chord in chords:
+        chord._validate_chord_notes()
+        chord._apply_range_strings()
+        chord.update_pitch_class_set()
+    with transaction.atomic():
+        created_chords = ChordNotes.objects.bulk_create(chords, batch_size=batch_size)
+        created_positions = []
+        if with_positions:
+            created_positions = bulk_create_base_positions(created_chords, batch_size=batch_size)
+    _chord_data_bulk_changed()
+    return created_chords, created_positions
 
 def create_chord(id):
     chord = ChordNotes.objects.get(id=id)
@@ -600,8 +636,13 @@ class ChordNotes(models.Model):
                                    null=True, blank=True)
     sixth_note_string = StringChoicesField(_("String for Note"),
                                            null=True, blank=True)
+    pitch_class_set = models.IntegerField(
+        default=0, db_index=True, editable=False,
+        help_text='12-bit mask of the pitch classes, maintained on save')
     # Add fields to match database schema based on IntegrityError
 
+    NOTE_FIELDS = ('first_note', 'second_note', 'third_note', 'fourth_note', 'fifth_note', 'sixth_note')
+
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -612,11 +653,7 @@ class ChordNotes(models.Model):
         self._validate_chord_notes()
 
         # Set string assignments for V1 chords if creating with specific ranges
-        if self.type_name == 'V1' and self.range == 'e - d':
-            self.first_note_string = 'dString'
-            self.second_note_string = 'gString'
-            self.third_note_string = 'bString'
-            self.fourth_note_string = 'eString'
+        self._apply_range_strings()
         
         # Store initial data before saving to detect changes later
         initial_data = {}
@@ -772,6 +809,21 @@ class ChordNotes(models.Model):
                 minor7b5.fourth_note = (self.fourth_note - 1) % 12
                 minor7b5.save()
 
+    def update_pitch_class_set(self):
+        """Recompute pitch_class_set from the note fields."""
+        self.pitch_class_set = pitch_class_mask(getattr(self, field) for field in self.NOTE_FIELDS)
+        return self.pitch_class_set
+
+    def _apply_range_strings(self):
+        """
+        Applies the fixed string assignments of ranges that require them.
+        """
+        if self.type_name == 'V1' and self.range == 'e - d':
+            self.first_note_string = 'dString'
+            self.second_note_string = 'gString'
+            self.third_note_string = 'bString'
+            self.fourth_note_string = 'eString'
+
     def _validate_chord_notes(self):
         """
         Validates that the notes assigned to the chord are within the allowed range (0-11).
@@ -820,3 +872,30 @@ class ChordPosition(models.Model):
         verbose_name = _("Chord Position")
         verbose_name_plural = _("Chord Positions")
         ordering = ['notes_name']
+
+class VoicingScore(models.Model):
+    """
+    Precomputed difficulty of one inversion in one key.
+
+    Derived data: written by voicing_difficulty.update_voicing_scores, one
+    row per ChordPosition and root pitch class.
+    """
+    position = models.ForeignKey(
+        ChordPosition,
+        on_delete=models.CASCADE,
+        related_name='scores')
+    root_pitch = models.PositiveSmallIntegerField(help_text='pitch class of the root, 0-11')
+    fret_span = models.PositiveSmallIntegerField(help_text='highest minus lowest fret')
+    string_span = models.PositiveSmallIntegerField(help_text='strings from the lowest to the highest used string')
+    finger_count = models.PositiveSmallIntegerField(help_text='distinct frets to fret')
+    position_height = models.PositiveSmallIntegerField(help_text='lowest fret of the voicing')
+    difficulty = models.FloatField(db_index=True)
+
+    def __str__(self):
+        return f"{self.position_id} @ {self.root_pitch}: {self.difficulty}"
+
+    class Meta:
+        verbose_name = _("Voicing Score")
+        verbose_name_plural = _("Voicing Scores")
+        unique_together = ('position', 'root_pitch')
+        ordering = ['position', 'root_pitch']
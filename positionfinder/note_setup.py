@@ -1,6 +1,7 @@
 from django.forms.models import model_to_dict
-from .models import Notes, Root
+from .models import Notes
 from .models_chords import ChordNotes
+from .root_note_setup import get_root_name
 from .template_notes import NOTES, NOTES_SHARP, OCTAVES, SHARP_NOTES
 
 ''' notes_notes from Field '''
@@ -44,25 +45,31 @@ def all_notes_append(root, all_notes, notes_notes):
     return all_notes_notes
 
 # Create your views here.
-def get_notes_tones(notes_options_id, root, tonal_root, root_id):
+# (theory: the request's TheoryContext, saves the Root and Notes lookups)
+def get_notes_tones(notes_options_id, root, tonal_root, root_id, theory=None):
     tonal_root = int(tonal_root) + int(root)
-    selected_root_name = Root.objects.get(pk=root_id).name
+    selected_root_name = get_root_name(root_id, theory)
     if tonal_root > 12:
         root -= 12
     all_notes = get_tonal_all_notes_append(tonal_root, selected_root_name)
     
-    # Try to get from Notes model first
-    try:
-        notes = Notes.objects.get(pk=notes_options_id)
-    except Notes.DoesNotExist:
-        # If not found, try to get from ChordNotes model (for arpeggios)
-        try:
-            notes = ChordNotes.objects.get(pk=notes_options_id)
-        except ChordNotes.DoesNotExist:
-            # If not found in either model, return empty list
+    if theory is not None:
+        notes_notes = theory.intervals
+        if notes_notes is None:
             return []
-    
-    notes_notes = build_notes(notes)
+    else:
+        # Try to get from Notes model first
+        try:
+            notes = Notes.objects.get(pk=notes_options_id)
+        except Notes.DoesNotExist:
+            # If not found, try to get from ChordNotes model (for arpeggios)
+            try:
+                notes = ChordNotes.objects.get(pk=notes_options_id)
+            except ChordNotes.DoesNotExist:
+                # If not found in either model, return empty list
+                return []
+        notes_notes = build_notes(notes)
+
     # Picking out every note of range
     all_notes_notes = all_notes_append(root, all_notes, notes_notes)
     notes_note_list = []
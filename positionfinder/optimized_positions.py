@@ -1,413 +1,277 @@
 """
-Optimized positions for scales and chords in 6-string and 8-string configurations.
-Focused on playability, ergonomics, and musicality.
+Computed fingering positions for scales.
+
+A NotesPosition is a window of frets for a root of C (pitch class 0);
+parse_notes_position moves it to the selected root, so one set of rows
+serves all twelve roots. Instead of hardcoding those windows, they are
+derived from every scale's intervals for a fingering system:
+
+- caged: the five CAGED shapes, windows around the root of the C, A, G, E
+  and D chord shapes
+- 3nps: three notes per string (two for pentatonics, three and two
+  alternating for hexatonic scales), one position starting on every scale
+  degree of the lowest string
+- box: single-octave boxes from the root on the three lowest strings
+
+Windows are computed on the six-string fretboard, so the stored positions
+fit both string configurations. NotesPosition rows are derived data:
+regenerate_positions (``manage.py optimize_positions``) rebuilds them from
+the Notes rows at any time.
 """
+import numpy
 from django.db import transaction
-from .models import Notes, NotesCategory
+
+from .cache_utils import bump_catalog_version
+from .fretboard_model import SIX_STRING_FRETBOARD, OPEN_STRING_PITCHES, MIN_FRET, MAX_FRET
+from .models import CatalogRevision, Notes, NotesCategory
+from .note_setup import build_notes
 from .positions import NotesPosition
 
-# Define optimized position patterns
-MAJOR_SCALE_POSITIONS = [
-    # Position 1 - Open position (most common)
-    "0,2,4,5,7,9,11",
-    
-    # Position 2 - 2nd position (starts with index finger on 2nd fret)
-    "2,4,5,7,9,11,12",
-    
-    # Position 3 - 4th position
-    "4,5,7,9,11,12,14",
-    
-    # Position 4 - 5th position
-    "5,7,9,11,12,14,16",
-    
-    # Position 5 - 7th position
-    "7,9,11,12,14,16,17",
-    
-    # Position 6 - 9th position
-    "9,11,12,14,16,17,19",
-    
-    # Position 7 - 12th position (octave)
-    "12,14,16,17,19,21,23",
-]
-
-# Extended positions for 8-string (add lower and higher positions)
-MAJOR_SCALE_8STRING_POSITIONS = MAJOR_SCALE_POSITIONS + [
-    # Position 8 - Lower extension (utilizing low B string)
-    "-2,0,2,4,5,7,9",
-    
-    # Position 9 - Higher extension (utilizing high A string)
-    "14,16,17,19,21,23,24",
-]
-
-# Define optimized position patterns for other common scales
-MINOR_SCALE_POSITIONS = [
-    # Position 1 - Open position
-    "0,2,3,5,7,8,10",
-    
-    # Position 2 - 2nd position
-    "2,3,5,7,8,10,12",
-    
-    # Position 3 - 3rd position
-    "3,5,7,8,10,12,14",
-    
-    # Position 4 - 5th position
-    "5,7,8,10,12,14,15",
-    
-    # Position 5 - 7th position
-    "7,8,10,12,14,15,17",
-    
-    # Position 6 - 8th position
-    "8,10,12,14,15,17,19",
-    
-    # Position 7 - 12th position (octave)
-    "12,14,15,17,19,20,22",
-]
-
-# Minor positions for 8-string
-MINOR_SCALE_8STRING_POSITIONS = MINOR_SCALE_POSITIONS + [
-    # Position 8 - Lower extension
-    "-3,-1,0,2,3,5,7",
-    
-    # Position 9 - Higher extension
-    "15,17,19,20,22,24,26",
-]
-
-# Positions for other common scales (pentatonic, blues, etc.)
-PENTATONIC_MAJOR_POSITIONS = [
-    # Position 1 - Open position
-    "0,2,4,7,9",
-    
-    # Position 2 - 2nd position
-    "2,4,7,9,12",
-    
-    # Position 3 - 4th position
-    "4,7,9,12,14",
-    
-    # Position 4 - 7th position
-    "7,9,12,14,16",
-    
-    # Position 5 - 9th position
-    "9,12,14,16,19",
-    
-    # Position 6 - 12th position (octave)
-    "12,14,16,19,21",
-]
-
-PENTATONIC_MINOR_POSITIONS = [
-    # Position 1 - Open position
-    "0,3,5,7,10",
-    
-    # Position 2 - 3rd position
-    "3,5,7,10,12",
-    
-    # Position 3 - 5th position
-    "5,7,10,12,15",
-    
-    # Position 4 - 7th position
-    "7,10,12,15,17",
-    
-    # Position 5 - 10th position
-    "10,12,15,17,19",
-    
-    # Position 6 - 12th position (octave)
-    "12,15,17,19,22",
-]
-
-BLUES_SCALE_POSITIONS = [
-    # Position 1 - Open position
-    "0,3,5,6,7,10",
-    
-    # Position 2 - 3rd position
-    "3,5,6,7,10,12",
-    
-    # Position 3 - 5th position
-    "5,6,7,10,12,15",
-    
-    # Position 4 - 7th position
-    "7,10,12,13,15,17",
-    
-    # Position 5 - 10th position
-    "10,12,13,15,17,19",
-    
-    # Position 6 - 12th position (octave)
-    "12,15,17,18,19,22",
-]
-
-# Positions for modes
-DORIAN_POSITIONS = [
-    # Position 1 - Open position
-    "0,2,3,5,7,9,10",
-    
-    # Position 2 - 2nd position
-    "2,3,5,7,9,10,12",
-    
-    # Position 3 - 3rd position
-    "3,5,7,9,10,12,14",
-    
-    # Position 4 - 5th position
-    "5,7,9,10,12,14,15",
-    
-    # Position 5 - 7th position
-    "7,9,10,12,14,15,17",
-    
-    # Position 6 - 9th position
-    "9,10,12,14,15,17,19",
-    
-    # Position 7 - 12th position (octave)
-    "12,14,15,17,19,21,22",
-]
-
-PHRYGIAN_POSITIONS = [
-    # Position 1 - Open position
-    "0,1,3,5,7,8,10",
-    
-    # Position 2 - 1st position
-    "1,3,5,7,8,10,12",
-    
-    # Position 3 - 3rd position
-    "3,5,7,8,10,12,13",
-    
-    # Position 4 - 5th position
-    "5,7,8,10,12,13,15",
-    
-    # Position 5 - 7th position
-    "7,8,10,12,13,15,17",
-    
-    # Position 6 - 8th position
-    "8,10,12,13,15,17,19",
-    
-    # Position 7 - 12th position (octave)
-    "12,13,15,17,19,20,22",
-]
-
-LYDIAN_POSITIONS = [
-    # Position 1 - Open position
-    "0,2,4,6,7,9,11",
-    
-    # Position 2 - 2nd position
-    "2,4,6,7,9,11,12",
-    
-    # Position 3 - 4th position
-    "4,6,7,9,11,12,14",
-    
-    # Position 4 - 6th position
-    "6,7,9,11,12,14,16",
-    
-    # Position 5 - 7th position
-    "7,9,11,12,14,16,18",
-    
-    # Position 6 - 9th position
-    "9,11,12,14,16,18,19",
-    
-    # Position 7 - 12th position (octave)
-    "12,14,16,18,19,21,23",
-]
-
-MIXOLYDIAN_POSITIONS = [
-    # Position 1 - Open position
-    "0,2,4,5,7,9,10",
-    
-    # Position 2 - 2nd position
-    "2,4,5,7,9,10,12",
-    
-    # Position 3 - 4th position
-    "4,5,7,9,10,12,14",
-    
-    # Position 4 - 5th position
-    "5,7,9,10,12,14,16",
-    
-    # Position 5 - 7th position
-    "7,9,10,12,14,16,17",
-    
-    # Position 6 - 9th position
-    "9,10,12,14,16,17,19",
-    
-    # Position 7 - 12th position (octave)
-    "12,14,16,17,19,21,22",
-]
-
-LOCRIAN_POSITIONS = [
-    # Position 1 - Open position
-    "0,1,3,5,6,8,10",
-    
-    # Position 2 - 1st position
-    "1,3,5,6,8,10,12",
-    
-    # Position 3 - 3rd position
-    "3,5,6,8,10,12,13",
-    
-    # Position 4 - 5th position
-    "5,6,8,10,12,13,15",
-    
-    # Position 5 - 6th position
-    "6,8,10,12,13,15,17",
-    
-    # Position 6 - 8th position
-    "8,10,12,13,15,17,18",
-    
-    # Position 7 - 12th position (octave)
-    "12,13,15,17,18,20,22",
-]
-
-# Jazz and exotic scales
-MELODIC_MINOR_POSITIONS = [
-    # Position 1 - Open position
-    "0,2,3,5,7,9,11",
-    
-    # Position 2 - 2nd position
-    "2,3,5,7,9,11,12",
-    
-    # Position 3 - 3rd position
-    "3,5,7,9,11,12,14",
-    
-    # Position 4 - 5th position
-    "5,7,9,11,12,14,15",
-    
-    # Position 5 - 7th position
-    "7,9,11,12,14,15,17",
-    
-    # Position 6 - 9th position
-    "9,11,12,14,15,17,19",
-    
-    # Position 7 - 12th position (octave)
-    "12,14,15,17,19,21,23",
-]
-
-HARMONIC_MINOR_POSITIONS = [
-    # Position 1 - Open position
-    "0,2,3,5,7,8,11",
-    
-    # Position 2 - 2nd position
-    "2,3,5,7,8,11,12",
-    
-    # Position 3 - 3rd position
-    "3,5,7,8,11,12,14",
-    
-    # Position 4 - 5th position
-    "5,7,8,11,12,14,15",
-    
-    # Position 5 - 7th position
-    "7,8,11,12,14,15,17",
-    
-    # Position 6 - 8th position
-    "8,11,12,14,15,17,19",
-    
-    # Position 7 - 12th position (octave)
-    "12,14,15,17,19,20,23",
-]
-
-# Dictionary mapping scale names to position patterns
-SCALE_POSITIONS = {
-    "Major": MAJOR_SCALE_POSITIONS,
-    "Minor": MINOR_SCALE_POSITIONS,
-    "Pentatonic Major": PENTATONIC_MAJOR_POSITIONS,
-    "Pentatonic Minor": PENTATONIC_MINOR_POSITIONS,
-    "Blues": BLUES_SCALE_POSITIONS,
-    "Dorian": DORIAN_POSITIONS,
-    "Phrygian": PHRYGIAN_POSITIONS,
-    "Lydian": LYDIAN_POSITIONS,
-    "Mixolydian": MIXOLYDIAN_POSITIONS,
-    "Locrian": LOCRIAN_POSITIONS,
-    "Melodic Minor": MELODIC_MINOR_POSITIONS,
-    "Harmonic Minor": HARMONIC_MINOR_POSITIONS,
+SYSTEMS = ('caged', '3nps', 'box')
+DEFAULT_SYSTEM = 'caged'
+
+# Strings from the lowest to the highest sounding one
+STRINGS_LOW_TO_HIGH = sorted(SIX_STRING_FRETBOARD.strings, key=OPEN_STRING_PITCHES.get)
+OPEN_PITCHES = numpy.array([OPEN_STRING_PITCHES[string] for string in STRINGS_LOW_TO_HIGH])
+
+# CAGED shape -> (string holding the shape's root, lowest and highest fret
+# of the window relative to that root)
+CAGED_SHAPES = {
+    'C': ('AString', -3, 1),
+    'A': ('AString', -1, 2),
+    'G': ('ELowString', -4, 0),
+    'E': ('ELowString', -1, 2),
+    'D': ('dString', -1, 3),
 }
 
-# 8-string extensions (only for scales that need special handling)
-SCALE_POSITIONS_8STRING = {
-    "Major": MAJOR_SCALE_8STRING_POSITIONS,
-    "Minor": MINOR_SCALE_8STRING_POSITIONS,
+# Notes per string of 3nps positions, repeated from the lowest string.
+# Pentatonics (SMALL_SCALE_SIZE notes or fewer) are played two notes per
+# string. Three notes of a hexatonic scale (blues, whole tone) span more
+# than the fourth between strings, so every position would drift up the
+# neck; alternating three and two keeps them within a hand span.
+NOTES_PER_STRING = (3,)
+SMALL_SCALE_NOTES_PER_STRING = (2,)
+HEXATONIC_NOTES_PER_STRING = (3, 2)
+SMALL_SCALE_SIZE = 5
+HEXATONIC_SCALE_SIZE = 6
+
+
+def string_note_counts(count):
+    """Return the notes per string pattern of 3nps positions of a scale of count notes."""
+    if count <= SMALL_SCALE_SIZE:
+        return SMALL_SCALE_NOTES_PER_STRING
+    if count == HEXATONIC_SCALE_SIZE:
+        return HEXATONIC_NOTES_PER_STRING
+    return NOTES_PER_STRING
+
+# Single-octave boxes start on these strings and reach this far above the root
+BOX_STRINGS = ('ELowString', 'AString', 'dString')
+BOX_REACH = 3
+
+
+def scale_intervals(intervals):
+    """Return the pitch classes of intervals, ascending and without duplicates."""
+    return sorted({interval % 12 for interval in intervals})
+
+
+def root_fret(string, pitch_class=0):
+    """Return the lowest fret (from MIN_FRET) sounding a pitch class on a string."""
+    fret = (pitch_class - OPEN_STRING_PITCHES[string]) % 12
+    return fret + 12 if fret < MIN_FRET else fret
+
+
+def fit_window(low, high):
+    """
+    Move a window onto the fretboard by octaves, clipping what still sticks out.
+
+    Returns:
+        (low, high) tuple, None if nothing of the window is left
+    """
+    if low < MIN_FRET:
+        low, high = low + 12, high + 12
+    if high > MAX_FRET and low - 12 >= MIN_FRET:
+        low, high = low - 12, high - 12
+    low, high = max(low, MIN_FRET), min(high, MAX_FRET)
+    return (low, high) if low <= high else None
+
+
+def caged_windows(intervals):
+    """Windows of the five CAGED shapes."""
+    return [
+        (root_fret(string) + low, root_fret(string) + high)
+        for string, low, high in CAGED_SHAPES.values()
+    ]
+
+
+def three_notes_per_string_windows(intervals):
+    """Windows of the 3-notes-per-string positions, one per scale degree."""
+    pitch_classes = numpy.array(intervals)
+    count = len(intervals)
+    pattern = string_note_counts(count)
+    # String of every note of a position, from the lowest string up
+    strings = numpy.repeat(numpy.arange(len(OPEN_PITCHES)),
+                           [pattern[string % len(pattern)] for string in range(len(OPEN_PITCHES))])
+    degrees = numpy.arange(count)
+    # Degree k starts on the lowest string; note j of the position is scale
+    # note k + j, ascending
+    steps = degrees[:, None] + numpy.arange(len(strings))[None, :]
+    first_frets = numpy.array([root_fret(STRINGS_LOW_TO_HIGH[0], pitch_class) for pitch_class in intervals])
+    bases = OPEN_PITCHES[0] + first_frets - pitch_classes
+    pitches = bases[:, None] + pitch_classes[steps % count] + 12 * (steps // count)
+    frets = pitches - OPEN_PITCHES[strings][None, :]
+    return list(zip(frets.min(axis=1).tolist(), frets.max(axis=1).tolist()))
+
+
+def box_windows(intervals):
+    """Windows of the single-octave boxes from every root on the BOX_STRINGS."""
+    windows = []
+    for string in BOX_STRINGS:
+        start = STRINGS_LOW_TO_HIGH.index(string)
+        for fret in range(root_fret(string), MAX_FRET - BOX_REACH + 1, 12):
+            root = OPEN_STRING_PITCHES[string] + fret
+            current, used = start, []
+            # Stay on a string while the note is within reach, then move up
+            for pitch in [root + interval for interval in intervals] + [root + 12]:
+                while pitch - OPEN_PITCHES[current] > fret + BOX_REACH and current + 1 < len(OPEN_PITCHES):
+                    current += 1
+                used.append(pitch - OPEN_PITCHES[current])
+            windows.append((min(used), max(used)))
+    return windows
+
+
+SYSTEM_WINDOWS = {
+    'caged': caged_windows,
+    '3nps': three_notes_per_string_windows,
+    'box': box_windows,
 }
 
-def create_optimized_positions():
+
+def fingering_windows(intervals, system=DEFAULT_SYSTEM):
+    """
+    Compute the position windows of a scale for a root of C.
+
+    Args:
+        intervals: Intervals of the scale
+        system: One of SYSTEMS
+
+    Returns:
+        positions x 2 integer array of (lowest, highest) fret, ordered along
+        the neck, trimmed to frets that hold a scale note
+
+    Raises:
+        ValueError: If the system is unknown
+    """
+    if system not in SYSTEM_WINDOWS:
+        raise ValueError(f"Unknown fingering system '{system}', expected one of {', '.join(SYSTEMS)}")
+    intervals = scale_intervals(intervals)
+    if not intervals:
+        return numpy.zeros((0, 2), dtype=int)
+    # Frets holding any scale note on any string
+    has_note = numpy.isin(SIX_STRING_FRETBOARD.pitch_classes, intervals).any(axis=0)
+    windows = set()
+    for window in SYSTEM_WINDOWS[system](intervals):
+        window = fit_window(*window)
+        if window is None:
+            continue
+        columns = numpy.nonzero(has_note[window[0] - MIN_FRET:window[1] - MIN_FRET + 1])[0]
+        if len(columns):
+            windows.add((window[0] + int(columns[0]), window[0] + int(columns[-1])))
+    return numpy.array(sorted(windows), dtype=int).reshape(-1, 2)
+
+
+def compute_fingering_positions(notes, system=DEFAULT_SYSTEM):
+    """
+    Compute the windows of many scales in one run.
+
+    Scales sharing an interval set are computed once.
+
+    Args:
+        notes: Iterable of Notes rows
+        system: One of SYSTEMS
+
+    Returns:
+        Dict Notes id -> positions x 2 array from fingering_windows
+    """
+    by_intervals = {}
+    positions = {}
+    for note in notes:
+        intervals = tuple(scale_intervals(build_notes(note)))
+        if intervals not in by_intervals:
+            by_intervals[intervals] = fingering_windows(intervals, system)
+        positions[note.id] = by_intervals[intervals]
+    return positions
+
+
+def window_position(low, high):
+    """Serialize a window into the NotesPosition format ('2,3,4,5')."""
+    return ','.join(str(fret) for fret in range(low, high + 1))
+
+
+def regenerate_positions(notes, system=DEFAULT_SYSTEM, batch_size=500):
     """
-    Create optimized positions for all scales in the database.
+    Replace the NotesPositions of scales with computed ones.
+
+    Args:
+        notes: Notes rows to regenerate
+        system: One of SYSTEMS
+        batch_size: Rows per bulk insert
+
+    Returns:
+        Number of NotesPosition rows written
     """
+    notes = list(notes)
+    positions = compute_fingering_positions(notes, system)
+    rows = [
+        NotesPosition(notes_name=note, position_order=order, position=window_position(low, high))
+        for note in notes
+        for order, (low, high) in enumerate(positions[note.id].tolist(), start=1)
+    ]
     with transaction.atomic():
-        # Get scales category
-        scales_category = NotesCategory.objects.get(category_name='Scales')
-        
-        # Get all scales
-        scales = Notes.objects.filter(category=scales_category)
-        
-        # Clear existing positions
-        NotesPosition.objects.filter(notes_name__category=scales_category).delete()
-        
-        # Create new optimized positions
-        for scale in scales:
-            scale_name = scale.note_name
-            
-            # Check if we have optimized positions for this scale
-            if scale_name in SCALE_POSITIONS:
-                positions = SCALE_POSITIONS[scale_name]
-                
-                # Create positions
-                for i, position in enumerate(positions, 1):
-                    NotesPosition.objects.create(
-                        notes_name=scale,
-                        position_order=i,
-                        position=position
-                    )
-                    
-                # Check if we need to add 8-string specific positions
-                if scale_name in SCALE_POSITIONS_8STRING and len(SCALE_POSITIONS_8STRING[scale_name]) > len(positions):
-                    # Add the additional 8-string positions
-                    extended_positions = SCALE_POSITIONS_8STRING[scale_name][len(positions):]
-                    for i, position in enumerate(extended_positions, len(positions) + 1):
-                        NotesPosition.objects.create(
-                            notes_name=scale,
-                            position_order=i,
-                            position=position
-                        )
-            else:
-                # For scales without specific optimized positions, create default positions
-                # based on the Major scale pattern but adjusted for the scale's intervals
-                
-                # Get scale intervals
-                intervals = []
-                for i in range(1, 13):
-                    note_attr = f'note_{i}' if i > 1 else 'first_note'
-                    note_val = getattr(scale, note_attr, None)
-                    if note_val is not None:
-                        intervals.append(note_val)
-                
-                # Create positions based on standard patterns but adjusted for this scale
-                for i, base_position in enumerate(MAJOR_SCALE_POSITIONS, 1):
-                    # Start with the base fret
-                    base_fret = int(base_position.split(',')[0])
-                    
-                    # Create a position string using this scale's intervals
-                    position_values = [str(base_fret + interval) for interval in intervals]
-                    position_string = ','.join(position_values)
-                    
-                    NotesPosition.objects.create(
-                        notes_name=scale,
-                        position_order=i,
-                        position=position_string
-                    )
-
-def update_specific_scale_positions(scale_name, positions):
+        NotesPosition.objects.filter(notes_name__in=notes).delete()
+        NotesPosition.objects.bulk_create(rows, batch_size=batch_size)
+    # bulk_create sends no post_save signals
+    bump_catalog_version()
+    CatalogRevision.bump()
+    return len(rows)
+
+
+def create_optimized_positions(system=DEFAULT_SYSTEM):
+    """
+    Create computed positions for all scales in the database.
+
+    Returns:
+        Number of NotesPosition rows written
+    """
+    scales_category = NotesCategory.objects.get(category_name='Scales')
+    return regenerate_positions(Notes.objects.filter(category=scales_category), system)
+
+
+def update_specific_scale_positions(scale_name, positions=None, system=DEFAULT_SYSTEM):
     """
     Update positions for a specific scale.
-    
+
     Args:
         scale_name: Name of the scale to update
-        positions: List of position strings
+        positions: List of position strings, None to compute them for system
+        system: Fingering system to compute the positions for
     """
+    try:
+        scale = Notes.objects.get(note_name=scale_name, category__category_name='Scales')
+    except Notes.DoesNotExist:
+        return False
+    if positions is None:
+        regenerate_positions([scale], system)
+        return True
+
     with transaction.atomic():
-        try:
-            scale = Notes.objects.get(note_name=scale_name, category__category_name='Scales')
-            
-            # Clear existing positions
-            NotesPosition.objects.filter(notes_name=scale).delete()
-            
-            # Create new positions
-            for i, position in enumerate(positions, 1):
-                NotesPosition.objects.create(
-                    notes_name=scale,
-                    position_order=i,
-                    position=position
-                )
-            
-            return True
-        except Notes.DoesNotExist:
-            return False
+        # Clear existing positions
+        NotesPosition.objects.filter(notes_name=scale).delete()
+
+        # Create new positions
+        for i, position in enumerate(positions, 1):
+            NotesPosition.objects.create(
+                notes_name=scale,
+                position_order=i,
+                position=position
+            )
+    return True
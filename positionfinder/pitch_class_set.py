@@ -0,0 +1,122 @@
+"""
+12-bit pitch-class sets for chords and scales.
+
+Notes and ChordNotes keep their intervals in one nullable column per note.
+Both models also store them as a denormalized ``pitch_class_set`` bitmask
+(bit n set when pitch class n occurs), which makes reverse lookups possible
+in SQL: "every chord containing these notes" and "every scale with these
+notes in any key" become indexed lookups instead of loading and scanning
+every row.
+"""
+
+PITCH_CLASSES = 12
+FULL_MASK = (1 << PITCH_CLASSES) - 1
+
+# Above this many candidate values containment is checked with a bitwise AND
+# instead of an indexed IN lookup
+MAX_IN_VALUES = 512
+
+
+def pitch_class_mask(notes):
+    """
+    Build the bitmask of a collection of notes.
+
+    Args:
+        notes: Iterable of note values, None entries are ignored
+
+    Returns:
+        int: Bitmask with bit ``note % 12`` set for every note
+    """
+    mask = 0
+    for note in notes:
+        if note is not None:
+            mask |= 1 << (int(note) % PITCH_CLASSES)
+    return mask
+
+
+def mask_pitch_classes(mask):
+    """Return the sorted pitch classes contained in ``mask``."""
+    return [pc for pc in range(PITCH_CLASSES) if mask >> pc & 1]
+
+
+def rotate_mask(mask, semitones):
+    """
+    Transpose a pitch-class set.
+
+    Args:
+        mask: Pitch-class bitmask
+        semitones: Transposition interval, negative values transpose down
+
+    Returns:
+        int: Bitmask of the set transposed by ``semitones``
+    """
+    semitones %= PITCH_CLASSES
+    return ((mask << semitones) | (mask >> (PITCH_CLASSES - semitones))) & FULL_MASK
+
+
+def transpositions(mask):
+    """Return {semitones: rotated mask} for all 12 transpositions of ``mask``."""
+    return {semitones: rotate_mask(mask, semitones) for semitones in range(PITCH_CLASSES)}
+
+
+def superset_masks(mask):
+    """Return every 12-bit mask containing all pitch classes of ``mask``."""
+    free = FULL_MASK & ~mask
+    supersets = []
+    subset = free
+    while True:
+        supersets.append(mask | subset)
+        if not subset:
+            return supersets
+        subset = (subset - 1) & free
+
+
+def filter_containing(queryset, notes, transpose=False):
+    """
+    Restrict a Notes or ChordNotes queryset to rows containing ``notes``.
+
+    Args:
+        queryset: Notes or ChordNotes queryset
+        notes: Pitch classes that must all occur
+        transpose: Also match rows containing a transposition of ``notes``
+
+    Returns:
+        Filtered queryset
+    """
+    mask = pitch_class_mask(notes)
+    masks = set(transpositions(mask).values()) if transpose else {mask}
+    candidates = set()
+    for required in masks:
+        if len(candidates) + (1 << (PITCH_CLASSES - bin(required).count('1'))) > MAX_IN_VALUES:
+            break
+        candidates.update(superset_masks(required))
+    else:
+        return queryset.filter(pitch_class_set__in=candidates)
+
+    # Only a few notes given, the candidate list would be most of the table
+    from django.db.models import F, Q
+    condition = Q()
+    for index, required in enumerate(masks):
+        alias = f'_pcs_and_{index}'
+        queryset = queryset.alias(**{alias: F('pitch_class_set').bitand(required)})
+        condition |= Q(**{alias: required})
+    return queryset.filter(condition)
+
+
+def filter_matching(queryset, notes, transpose=False):
+    """
+    Restrict a Notes or ChordNotes queryset to rows with exactly ``notes``.
+
+    Args:
+        queryset: Notes or ChordNotes queryset
+        notes: Pitch classes of the set
+        transpose: Match the set in any key (e.g. every scale with the
+            pitch classes of C Dorian, in whichever mode or key it is stored)
+
+    Returns:
+        Filtered queryset
+    """
+    mask = pitch_class_mask(notes)
+    if transpose:
+        return queryset.filter(pitch_class_set__in=set(transpositions(mask).values()))
+    return queryset.filter(pitch_class_set=mask)
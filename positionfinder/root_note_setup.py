@@ -1,9 +1,12 @@
 from .models import Root
 from .template_notes import NOTES, NOTES_SHARP, OCTAVES, SHARP_NOTES
 
-def all_notes_append(tonal_root, root_id):
+def get_root_name(root_id, theory=None):
+    return theory.root_name if theory is not None else Root.objects.get(pk=root_id).name
+
+def all_notes_append(tonal_root, root_id, theory=None):
     all_notes = []
-    selected_root_name = Root.objects.get(pk=root_id).name
+    selected_root_name = get_root_name(root_id, theory)
     if tonal_root in SHARP_NOTES or "#" in selected_root_name:
         for x in OCTAVES:
             for y in NOTES_SHARP:
@@ -22,12 +25,13 @@ def root_pitch_list_append(root):
     return root_pitch_list
 
 # Get every possible RootNote from Pitch
-def get_root_note(root, tonal_root, root_id):
+# (theory: the request's TheoryContext, saves the Root lookup)
+def get_root_note(root, tonal_root, root_id, theory=None):
     notes_note_list = []
     tonal_root = int(tonal_root) + int(root)
     if tonal_root > 12:
         tonal_root -= 12
-    all_notes = all_notes_append(tonal_root, root_id)
+    all_notes = all_notes_append(tonal_root, root_id, theory)
     root_pitch_list = root_pitch_list_append(root)
     for x in root_pitch_list:
         notes_notes = all_notes[x]
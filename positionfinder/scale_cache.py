@@ -0,0 +1,95 @@
+"""
+Warm cache of rendered scale and arpeggio position JSON.
+
+Every Notes row x Root pair renders to exactly one scale_json_data string,
+so the whole catalog can be rendered ahead of time (``manage.py
+warm_scale_cache``) and scale/arpeggio pages only have to read it. Entries
+are versioned cache keys (see cache_utils), so they expire whenever the
+catalog version is bumped; a miss falls back to live computation and stores
+the result.
+"""
+from .cache_utils import get_cache, get_catalog_version, get_or_set, make_cache_key
+from .models import Notes, Root
+
+SCALE_JSON_NAMESPACE = 'scale_json'
+# String configurations arpeggio positions are generated for
+STRING_COUNTS = (6, 8)
+
+
+def scale_json_params(category_id, notes_options_id, root_id, tonal_root=0, string_count=None):
+    """Return the cache parameters of one rendered position JSON."""
+    params = {
+        'category': category_id,
+        'notes': notes_options_id,
+        'root': root_id,
+        'tonal_root': tonal_root,
+    }
+    # Generated arpeggio positions depend on the string configuration
+    if string_count is not None:
+        params['strings'] = string_count
+    return params
+
+
+def get_or_build_scale_json(category_id, notes_options_id, root_id, tonal_root, build, string_count=None):
+    """
+    Return the cached position JSON, computing and storing it on a miss.
+
+    Args:
+        category_id: Category of the view rendering the positions
+        notes_options_id: ID of the Notes row
+        root_id: ID of the Root row
+        tonal_root: Tonal root offset
+        build: Callable returning the JSON string when it isn't cached
+        string_count: String configuration the positions are generated for,
+            None when they don't depend on it
+
+    Returns:
+        JSON string for the template
+    """
+    return get_or_set(
+        SCALE_JSON_NAMESPACE,
+        scale_json_params(category_id, notes_options_id, root_id, tonal_root, string_count),
+        build
+    )
+
+
+def warm_scale_json_cache(roots=None, notes=None):
+    """
+    Render and store the position JSON of every Notes row x Root.
+
+    Args:
+        roots: Roots to render, defaults to all
+        notes: Notes rows to render, defaults to all
+
+    Returns:
+        Number of entries written
+    """
+    # Imported here, the views import this module
+    from .views_scale import ScaleView
+    from .views_arpeggio import ArpeggioView
+
+    views = {2: ArpeggioView()}
+    scale_view = ScaleView()
+    roots = list(Root.objects.all() if roots is None else roots)
+    notes = Notes.objects.all() if notes is None else notes
+    cache = get_cache()
+    version = get_catalog_version()
+    written = 0
+    for note in notes:
+        view = views.get(note.category_id, scale_view)
+        string_counts = STRING_COUNTS if view.category_id == 2 else (None,)
+        for root in roots:
+            tonal_root = 0
+            for string_count in string_counts:
+                data = view.compute_position_json(
+                    note.note_name, root.id, root.pitch, tonal_root, root.name, note.id,
+                    string_count=string_count
+                )
+                key = make_cache_key(
+                    SCALE_JSON_NAMESPACE,
+                    scale_json_params(view.category_id, note.id, root.id, tonal_root, string_count),
+                    version
+                )
+                cache.set(key, data, None)
+                written += 1
+    return written
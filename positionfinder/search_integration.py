@@ -9,6 +9,18 @@ import importlib
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+def _get_page_params(request):
+    """Return (offset, limit) from the request, limit None for all results."""
+    try:
+        offset = max(int(request.GET.get('offset', 0)), 0)
+    except (TypeError, ValueError):
+        offset = 0
+    try:
+        limit = max(int(request.GET['limit']), 0)
+    except (KeyError, TypeError, ValueError):
+        limit = None
+    return offset, limit
+
 def integrated_search_json(request, original_search_function):
     """
     A wrapper for the search_json function that enhances chord search results
@@ -41,7 +53,7 @@ def integrated_search_json(request, original_search_function):
     # For chord searches, enhance with our improved search
     if is_chord_query:
         # Import here to avoid circular imports
-        from .improved_chord_search import improved_search_chords
+        from .improved_chord_search import search_chord_ids, hydrate_chord_results
         
         # Process with our improved search
         response = original_search_function(request)
@@ -49,8 +61,12 @@ def integrated_search_json(request, original_search_function):
         # Get the response data
         response_data = response.data if hasattr(response, 'data') else response.content
         
-        # Replace chord results with our improved results
-        chord_results = improved_search_chords(query)
+        # Replace chord results with our improved results, only the requested
+        # page (?limit=&offset=) is hydrated
+        chord_ids, root_note = search_chord_ids(query)
+        offset, limit = _get_page_params(request)
+        end = offset + limit if limit is not None else None
+        chord_results = hydrate_chord_results(chord_ids[offset:end], root_note=root_note)
         
         # Convert to the expected format
         formatted_results = []
@@ -65,6 +81,7 @@ def integrated_search_json(request, original_search_function):
         # Update the response
         if hasattr(response, 'data'):
             response.data['chord_results'] = formatted_results
+            response.data['chord_results_total'] = len(chord_ids)
             response.data['total_results'] = (
                 len(response.data.get('scale_results', [])) + 
                 len(response.data.get('arpeggio_results', [])) + 
@@ -75,6 +92,7 @@ def integrated_search_json(request, original_search_function):
             import json
             data = json.loads(response.content)
             data['chord_results'] = formatted_results
+            data['chord_results_total'] = len(chord_ids)
             data['total_results'] = (
                 len(data.get('scale_results', [])) + 
                 len(data.get('arpeggio_results', [])) + 
@@ -2,6 +2,8 @@ import difflib
 import logging
 import re
 
+from positionfinder.instrumentation import instrumented
+
 # Reduce logging to WARNING or ERROR for search logic bugfixing
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
@@ -37,6 +39,8 @@ ROOT_NAME_TO_ID = {
     'B': 17,
 }
 
+ROOT_ID_TO_NAME = {root_id: name for name, root_id in ROOT_NAME_TO_ID.items()}
+
 def get_root_id_from_name(note_name):
     """
     Given a note name (e.g., 'Eb', 'C#', 'F'), return the mapped root ID according to the user's custom logic.
@@ -120,6 +124,7 @@ def best_fuzzy_match(query, choices, cutoff=0.7, case_sensitive=True):
     return best
 
 
+@instrumented('parse_query')
 def parse_query(user_query):
     """
     Parse and normalize the user query, applying fuzzy matching and sensible defaults.
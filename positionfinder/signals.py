@@ -0,0 +1,54 @@
+"""
+Signal handlers that keep caches in sync with the database.
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import CatalogRevision, Notes, Root
+from .positions import NotesPosition
+from .models_chords import ChordNotes, ChordPosition, VoicingScore
+from .chord_catalog import invalidate_chord_catalog
+from .cache_utils import bump_catalog_version
+
+
+@receiver(pre_save, sender=Notes)
+@receiver(pre_save, sender=ChordNotes)
+def sync_pitch_class_set(sender, instance, **kwargs):
+    """Keep the denormalized pitch_class_set in sync, fixture (raw) loads included."""
+    instance.update_pitch_class_set()
+
+
+@receiver(post_save, sender=ChordNotes)
+@receiver(post_save, sender=ChordPosition)
+def drop_voicing_scores(sender, instance, created, **kwargs):
+    """Drop the stored scores of an edited voicing, the catalog scores it until score_voicings runs."""
+    if created:
+        return
+    scores = VoicingScore.objects.filter(
+        position__notes_name=instance) if sender is ChordNotes else instance.scores.all()
+    scores.delete()
+
+
+@receiver(post_save, sender=ChordNotes)
+@receiver(post_delete, sender=ChordNotes)
+@receiver(post_save, sender=ChordPosition)
+@receiver(post_delete, sender=ChordPosition)
+def chord_data_changed(sender, **kwargs):
+    """Drop the chord catalog whenever a chord or one of its positions changes."""
+    invalidate_chord_catalog()
+
+
+@receiver(post_save, sender=Notes)
+@receiver(post_delete, sender=Notes)
+@receiver(post_save, sender=NotesPosition)
+@receiver(post_delete, sender=NotesPosition)
+@receiver(post_save, sender=Root)
+@receiver(post_delete, sender=Root)
+@receiver(post_save, sender=ChordNotes)
+@receiver(post_delete, sender=ChordNotes)
+@receiver(post_save, sender=ChordPosition)
+@receiver(post_delete, sender=ChordPosition)
+def catalog_data_changed(sender, **kwargs):
+    """Expire every versioned cache entry and catalog snapshot whenever catalog data changes."""
+    bump_catalog_version()
+    CatalogRevision.bump()
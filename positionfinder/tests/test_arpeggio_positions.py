@@ -0,0 +1,86 @@
+"""
+Arpeggio Position Tests
+
+Ensures generated arpeggio positions hold every arpeggio note within a
+playable window, are memoized per string configuration, and fill the
+arpeggio page and API when an arpeggio has no stored positions.
+"""
+import json
+
+from django.test import TestCase, SimpleTestCase, RequestFactory
+from positionfinder.models import Notes, NotesCategory, Root
+from positionfinder.positions import NotesPosition
+from positionfinder.fretboard_model import get_fretboard
+from positionfinder.arpeggio_positions import WINDOW_WIDTHS, MAX_OVERLAP, get_arpeggio_positions
+from positionfinder.views_arpeggio import ArpeggioView
+
+
+class GeneratedPositionsTestCase(SimpleTestCase):
+    def test_windows_hold_the_arpeggio(self):
+        for string_count in (6, 8):
+            fretboard = get_fretboard(string_count)
+            positions = get_arpeggio_positions((0, 3, 7, 10), 9, string_count)
+            self.assertTrue(positions)
+            self.assertEqual([position.position_order for position in positions],
+                             list(range(1, len(positions) + 1)))
+            for position in positions:
+                self.assertLess(position.stretch, max(WINDOW_WIDTHS))
+                self.assertEqual(position.stretch, position.frets[-1] - position.frets[0])
+                columns = [fret - 1 for fret in position.frets]
+                self.assertEqual(set(fretboard.pitch_classes[:, columns].ravel().tolist()) & {9, 0, 4, 7},
+                                 {9, 0, 4, 7})
+            # Ordered along the neck, barely overlapping
+            for lower, upper in zip(positions, positions[1:]):
+                self.assertLess(lower.frets[0], upper.frets[0])
+                self.assertLessEqual(len(set(lower.frets) & set(upper.frets)), MAX_OVERLAP)
+
+    def test_memoized(self):
+        self.assertIs(get_arpeggio_positions((0, 4, 7), 2, 6), get_arpeggio_positions((0, 4, 7), 2, 6))
+        self.assertEqual(get_arpeggio_positions((), 0, 6), ())
+
+
+class ArpeggioPageTestCase(TestCase):
+    def setUp(self):
+        NotesCategory.objects.create(id=2, category_name='Arpeggios')
+        self.arpeggio = Notes.objects.create(category_id=2, note_name='Major 7', first_note=0, second_note=4,
+                                             third_note=7, fourth_note=11)
+        self.root = Root.objects.create(name='D', pitch=2)
+
+    def get_context(self, string_config='six-string', **query):
+        view = ArpeggioView()
+        request = RequestFactory().get('/', {'models_select': 2, 'notes_options_select': self.arpeggio.id,
+                                             'root': self.root.id, **query})
+        request.COOKIES['stringConfig'] = string_config
+        request.session = {}
+        return view.get_context(request, view.process_request(request))
+
+    def test_generated_positions(self):
+        context = self.get_context()
+        generated = get_arpeggio_positions((0, 4, 7, 11), 2, 6)
+        self.assertEqual(context['position_options'], list(generated))
+        positions = json.loads(context['scale_json_data'])
+        self.assertEqual([key for key in positions if key.isdigit()],
+                         ['0'] + [str(position.position_order) for position in generated])
+
+        selected = generated[1]
+        context = self.get_context(position_select=selected.position_order)
+        self.assertEqual(context['position'], list(selected.frets))
+        self.assertEqual(context['selected_position'], str(selected.position_order))
+
+        eight = self.get_context('eight-string')
+        self.assertEqual(eight['position_options'], list(get_arpeggio_positions((0, 4, 7, 11), 2, 8)))
+        self.assertIn('highAString', json.loads(eight['scale_json_data'])['1'])
+
+    def test_stored_positions_win(self):
+        stored = NotesPosition.objects.create(notes_name=self.arpeggio, position_order=1, position='0,1,2,3')
+        context = self.get_context(position_select=stored.pk)
+        self.assertEqual(context['position_options'], [stored])
+        self.assertEqual(context['position'], [2, 3, 4, 5])
+
+    def test_api_positions(self):
+        response = self.client.get('/api/arpeggio-positions/', {
+            'notes_id': self.arpeggio.id, 'root_pitch': 2, 'string_count': 8})
+        positions = response.json()['positions']
+        self.assertEqual(positions[0], {'position_order': 0})
+        self.assertEqual([position['frets'] for position in positions[1:]],
+                         [list(position.frets) for position in get_arpeggio_positions((0, 4, 7, 11), 2, 8)])
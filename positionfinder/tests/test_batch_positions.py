@@ -0,0 +1,93 @@
+"""
+Batch Positions Tests
+
+Ensures the batch endpoint returns the same position dicts as the single
+item lookups, shares work between items and reports bad items one by one.
+"""
+import json
+
+from django.test import TestCase
+from positionfinder.models import Notes, NotesCategory, Root
+from positionfinder.models_chords import ChordNotes
+from positionfinder.positions import NotesPosition
+from positionfinder.chord_catalog import get_chord_catalog
+from positionfinder.views_scale import ScaleView
+from positionfinder.batch_positions import MAX_BATCH_ITEMS, resolve_batch
+
+
+class BatchPositionsTestCase(TestCase):
+    def setUp(self):
+        NotesCategory.objects.create(id=1, category_name='Scales')
+        chords = NotesCategory.objects.create(id=3, category_name='Chords')
+        self.scale = Notes.objects.create(category_id=1, note_name='Major', first_note=0, second_note=2,
+                                          third_note=4, fourth_note=5, fifth_note=7, sixth_note=9,
+                                          seventh_note=11)
+        NotesPosition.objects.create(notes_name=self.scale, position_order=1, position='1,2,3,4')
+        self.chord = ChordNotes.objects.create(
+            category=chords, type_name='Triads', chord_name='Major', range='e - g',
+            first_note=0, first_note_string='gString',
+            second_note=4, second_note_string='bString',
+            third_note=7, third_note_string='eString',
+        )
+        self.c = Root.objects.create(name='C', pitch=0)
+        self.g = Root.objects.create(name='G', pitch=7)
+
+    def post(self, items, **data):
+        return self.client.post('/api/batch-positions/', json.dumps({'items': items, **data}),
+                                content_type='application/json')
+
+    def test_matches_single_lookups(self):
+        items = [
+            {'root': self.g.id, 'type': 'Triads', 'chord': 'Major', 'range': 'e - g',
+             'inversion': 'Basic Position'},
+            {'root': self.g.id, 'type': 'Triads', 'chord': 'Major'},
+            {'root': self.c.id, 'scale': self.scale.id, 'position': 1},
+        ]
+        response = self.post(items)
+        self.assertEqual(response.status_code, 200)
+        basic, every, scale = response.json()['results']
+
+        inversions = [position.inversion_order for position in get_chord_catalog().get_positions(self.chord.id)]
+        expected = get_chord_catalog().get_inversion_data(inversions, 'Major', 'e - g', 'Triads', 7, 0, 'G')
+        self.assertEqual(every['positions'], json.loads(json.dumps(expected)))
+        self.assertEqual(basic['positions'], {'Basic Position': every['positions']['Basic Position']})
+        self.assertEqual(basic['root'], ['G', 7])
+
+        page = json.loads(ScaleView().compute_position_json('Major', self.c.id, 0, 0, 'C', self.scale.id))
+        self.assertEqual(scale['positions'], {'1': page['1']})
+        self.assertEqual((scale['name'], scale['root']), ('Major', page['root']))
+
+    def test_shared_work(self):
+        items = [{'root': self.c.id, 'type': 'Triads', 'chord': 'Major', 'inversion': inversion}
+                 for inversion in ('Basic Position', 'First Inversion', 'Second Inversion')]
+        items += [{'root': self.c.id, 'scale': self.scale.id, 'position': position} for position in (0, 1)]
+        resolve_batch(items)
+        # Roots and scales; chords come from the catalog, scale JSON from the cache
+        with self.assertNumQueries(2):
+            results = resolve_batch(items * 4)
+        self.assertEqual(len(results), 20)
+        self.assertFalse(any('error' in result for result in results))
+
+    def test_bad_items(self):
+        results = self.post([
+            {'root': 999, 'scale': self.scale.id},
+            {'root': self.c.id, 'scale': self.scale.id, 'position': 7},
+            {'root': self.c.id, 'type': 'Triads', 'chord': 'Sus9'},
+            {'root': self.c.id, 'type': 'Triads', 'chord': 'Major', 'inversion': 'Third Inversion'},
+            {'root': 'C'},
+            {'root': self.c.id, 'type': 'Triads', 'chord': 'Major', 'range': ['e - g']},
+            {'root': self.c.id, 'type': 'Triads', 'chord': 'Major', 'inversion': {}},
+            {'root': self.c.id, 'scale': self.scale.id},
+        ]).json()['results']
+        self.assertEqual([result.get('error') for result in results], [
+            'Unknown root 999', 'Unknown position 7', 'Unknown chord Triads Sus9',
+            'Unknown inversion Third Inversion', 'root must be an id', 'range must be a string',
+            'inversion must be a string', None,
+        ])
+        self.assertEqual(self.post({'root': self.c.id}).status_code, 400)
+        self.assertEqual(self.post([{'root': self.c.id, 'scale': self.scale.id}] * (MAX_BATCH_ITEMS + 1)).status_code,
+                         400)
+        self.assertEqual(self.post([], string_count=7).status_code, 400)
+        response = self.client.post('/api/batch-positions/', json.dumps([{'root': self.c.id}]),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,64 @@
+"""
+Benchmark Tests
+
+Ensures the benchmark sweep covers the catalog, produces a complete report
+and that report comparison flags regressions only.
+"""
+
+from django.test import TestCase
+from positionfinder.models import Notes, NotesCategory, Root
+from positionfinder.models_chords import ChordNotes
+from positionfinder.benchmark import build_cases, run_benchmark, compare_reports
+
+
+class BenchmarkTestCase(TestCase):
+    def setUp(self):
+        scales = NotesCategory.objects.create(id=1, category_name='Scales')
+        chords = NotesCategory.objects.create(id=3, category_name='Chords')
+        Root.objects.create(name='C', pitch=0)
+        Root.objects.create(name='D', pitch=2)
+        Notes.objects.create(category=scales, note_name='Major', first_note=0, second_note=2, third_note=4)
+        ChordNotes.objects.create(
+            category=chords, type_name='Triads', chord_name='Major', range='e - g',
+            first_note=0, first_note_string='gString',
+            second_note=4, second_note_string='bString',
+            third_note=7, third_note_string='eString',
+        )
+
+    def test_sweep_and_report(self):
+        cases = build_cases()
+        self.assertEqual(len(cases['scales']), 2)
+        self.assertEqual(len(cases['chords']), 2)
+        self.assertEqual(cases['chords'][0].params['note_range'], 'e - g')
+        self.assertEqual(len(cases['search_json']), 4)
+        self.assertEqual(len(build_cases(roots=[Root.objects.first().id], max_cases=1)['search_json']), 1)
+
+        report = run_benchmark(build_cases(views=['chords', 'api:chord_names']), repeat=2)
+        self.assertEqual(set(report['views']), {'chords', 'api:chord_names'})
+        chords = report['views']['chords']
+        self.assertEqual((chords['cases'], chords['requests'], chords['errors']), (2, 4, 0))
+        self.assertLessEqual(chords['p50_ms'], chords['p99_ms'])
+        self.assertGreater(chords['peak_kb_max'], 0)
+
+    def test_errors_left_out_of_latencies(self):
+        cases = build_cases(views=['chords'])
+        missing = cases['chords'][0]._replace(path='/missing/')
+        chords = run_benchmark({'chords': [missing, cases['chords'][1]]}, repeat=2)['views']['chords']
+        self.assertEqual((chords['cases'], chords['requests'], chords['errors']), (2, 4, 2))
+
+        report = run_benchmark({'missing': [missing]}, repeat=1)
+        self.assertEqual(report['views']['missing'], {'cases': 1, 'requests': 1, 'errors': 1})
+
+    def test_compare_reports(self):
+        baseline = {'views': {'chords': {'p50_ms': 10.0, 'p95_ms': 20.0, 'p99_ms': 30.0, 'queries_max': 5, 'peak_kb_max': 100.0}}}
+        current = {'views': {
+            'chords': {'p50_ms': 10.5, 'p95_ms': 40.0, 'p99_ms': 30.4, 'queries_max': 6, 'peak_kb_max': 90.0},
+            'scales': {'p50_ms': 99.0},
+        }}
+        regressions = compare_reports(baseline, current)
+        self.assertEqual([(r['view'], r['metric']) for r in regressions], [('chords', 'p95_ms'), ('chords', 'queries_max')])
+        current['views']['chords']['errors'] = 1
+        baseline['views']['chords']['errors'] = 0
+        self.assertIn(('chords', 'errors'), [(r['view'], r['metric']) for r in compare_reports(baseline, current)])
+        self.assertEqual(regressions[0]['change'], 1.0)
+        self.assertEqual(compare_reports(baseline, baseline), [])
@@ -0,0 +1,78 @@
+"""
+Bulk Position Tests
+
+Ensures chords and positions inserted in bulk match the ones created one by
+one through ChordNotes.save, keep their inversion order and expire the
+chord catalog.
+"""
+
+from django.test import TestCase
+from positionfinder.models import NotesCategory
+from positionfinder.models_chords import (
+    ChordNotes, ChordPosition, bulk_create_chords, bulk_create_base_positions, bulk_copy_positions,
+)
+from positionfinder.chord_catalog import get_chord_catalog
+
+
+def position_values(chord):
+    return list(ChordPosition.objects.filter(notes_name_id=chord.id).order_by('pk').values_list(
+        'inversion_order', 'first_note', 'second_note', 'third_note', 'fourth_note'
+    ))
+
+
+class BulkPositionsTestCase(TestCase):
+    def setUp(self):
+        self.category = NotesCategory.objects.create(category_name='Chords')
+
+    def make_chord(self, chord_name, notes, type_name='V2', chord_range='e - A'):
+        fields = dict(
+            category=self.category, type_name=type_name, chord_name=chord_name,
+            range=chord_range, tonal_root=0,
+        )
+        for name, note in zip(('first_note', 'second_note', 'third_note', 'fourth_note'), notes):
+            fields[name] = note
+        if len(notes) == 3:
+            fields['fourth_note'] = None
+        return ChordNotes(**fields)
+
+    def test_bulk_positions_match_save(self):
+        specs = [('Minor 7', [0, 7, 10, 3]), ('Dominant 7', [0, 7, 10, 4])]
+        saved = []
+        for chord_name, notes in specs:
+            chord = self.make_chord(chord_name, notes)
+            chord.save()
+            saved.append(chord)
+
+        created, positions = bulk_create_chords(
+            [self.make_chord(chord_name, notes, chord_range='b - E') for chord_name, notes in specs]
+        )
+        self.assertEqual(len(positions), 8)
+        for one_by_one, bulk in zip(saved, created):
+            self.assertEqual(position_values(bulk), position_values(one_by_one))
+            self.assertEqual(
+                [row[0] for row in position_values(bulk)],
+                ['Basic Position', 'First Inversion', 'Second Inversion', 'Third Inversion'],
+            )
+
+    def test_triads_and_existing_positions(self):
+        triad = self.make_chord('Major', [0, 4, 7], type_name='Triads', chord_range='e - g')
+        (triad,), positions = bulk_create_chords([triad])
+        self.assertEqual(
+            [row[0] for row in position_values(triad)],
+            ['Basic Position', 'First Inversion', 'Second Inversion'],
+        )
+        self.assertEqual(bulk_create_base_positions([triad, triad]), [])
+        self.assertEqual(len(position_values(triad)), len(positions))
+
+    def test_copied_positions_and_catalog_refresh(self):
+        source = self.make_chord('Minor 7', [0, 7, 10, 3])
+        source.save()
+        self.assertEqual(len(get_chord_catalog().chords), 1)
+
+        (target,), _ = bulk_create_chords(
+            [self.make_chord('Minor 7', [0, 7, 10, 3], chord_range='b - E')], with_positions=False
+        )
+        self.assertEqual(position_values(target), [])
+        bulk_copy_positions([(target, source.id)])
+        self.assertEqual(position_values(target), position_values(source))
+        self.assertEqual(len(get_chord_catalog().get_positions(target.id)), 4)
@@ -0,0 +1,146 @@
+"""
+Versioned Cache Tests
+
+Ensures cache keys are stable and versioned, and that views opted in through
+versioned_cache are served from the cache until catalog data changes.
+"""
+
+import json
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import Client, TestCase, RequestFactory
+from positionfinder.models import Notes, NotesCategory, Root
+from positionfinder.positions import NotesPosition
+from positionfinder.cache_utils import (
+    CATALOG_VERSION_KEY, make_cache_key, get_cache, get_catalog_version, bump_catalog_version, get_or_set,
+    versioned_cache,
+)
+
+
+class VersionedCacheTestCase(TestCase):
+    def setUp(self):
+        bump_catalog_version()
+        self.factory = RequestFactory()
+
+    def test_keys_are_normalized_and_versioned(self):
+        key = make_cache_key('api:test', {'b': '2', 'a': ['1', '3']})
+        self.assertEqual(key, make_cache_key('api:test', [('a', '1'), ('a', '3'), ('b', 2)]))
+        self.assertNotEqual(key, make_cache_key('api:other', {'b': '2', 'a': ['1', '3']}))
+        self.assertIn(f':{get_catalog_version()}:api:test:', key)
+
+        bump_catalog_version()
+        self.assertNotEqual(key, make_cache_key('api:test', {'b': '2', 'a': ['1', '3']}))
+
+    def test_view_is_cached_per_params_and_cookie(self):
+        calls = []
+
+        @versioned_cache('test:view', cookies=('stringConfig',))
+        def view(request):
+            calls.append(request.GET.get('q'))
+            return HttpResponse(f"{request.GET.get('q')}-{len(calls)}")
+
+        first = view(self.factory.get('/', {'q': 'a', 'x': '1'}))
+        again = view(self.factory.get('/', {'x': '1', 'q': 'a'}))
+        self.assertEqual((first['X-Cache'], again['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(again.content, b'a-1')
+
+        other = self.factory.get('/', {'q': 'a', 'x': '1'})
+        other.COOKIES['stringConfig'] = 'eight-string'
+        self.assertEqual(view(other).content, b'a-2')
+        self.assertEqual(view(self.factory.post('/', {'q': 'a'})).status_code, 200)
+        self.assertEqual(len(calls), 3)
+
+    def test_api_endpoint_expires_with_catalog_changes(self):
+        category = NotesCategory.objects.create(category_name='Scales')
+        scale = Notes.objects.create(category=category, note_name='Major', first_note=0, second_note=2)
+        NotesPosition.objects.create(notes_name=scale, position_order=1, position='1,2,3,4')
+
+        url = f'/api/scale-positions/?notes_id={scale.id}'
+        first = self.client.get(url, HTTP_ACCEPT='application/json')
+        cached = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        self.assertEqual(json.loads(cached.content), json.loads(first.content))
+
+        NotesPosition.objects.create(notes_name=scale, position_order=2, position='5,6,7,8')
+        refreshed = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(refreshed['X-Cache'], 'MISS')
+        self.assertEqual(len(json.loads(refreshed.content)['positions']), 3)
+
+    @mock.patch('positionfinder.cache_utils.is_shared_cache', return_value=True)
+    def test_conditional_get(self, shared):
+        calls = []
+
+        @versioned_cache('test:etag', cookies=('stringConfig',))
+        def view(request):
+            calls.append(1)
+            return HttpResponse('body')
+
+        first = view(self.factory.get('/', {'q': 'a'}))
+        etag = first['ETag']
+        self.assertEqual(view(self.factory.get('/', {'q': 'a'}))['ETag'], etag)
+        self.assertIn('Cookie', first['Vary'])
+
+        not_modified = view(self.factory.get('/', {'q': 'a'}, HTTP_IF_NONE_MATCH=f'"other", W/{etag}'))
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+        self.assertEqual(view(self.factory.get('/', {'q': 'b'}, HTTP_IF_NONE_MATCH=etag)).status_code, 200)
+        self.assertEqual(len(calls), 2)
+
+        bump_catalog_version()
+        changed = view(self.factory.get('/', {'q': 'a'}, HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+        # Per-process versions differ between workers, no ETags
+        shared.return_value = False
+        response = view(self.factory.get('/', {'q': 'c'}, HTTP_IF_NONE_MATCH='*'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+    @mock.patch('positionfinder.cache_utils.is_shared_cache', return_value=True)
+    def test_api_answers_304(self, shared):
+        for url in ('/api/chord-types/', '/api/identify/?eString=3'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_pages_are_rendered_per_client(self):
+        scales = NotesCategory.objects.create(id=1, category_name='Scales')
+        scale = Notes.objects.create(category=scales, note_name='Major', first_note=0, second_note=2)
+        root = Root.objects.create(name='C', pitch=0)
+        page = f'/?models_select=1&notes_options_select={scale.id}&root={root.id}'
+        first, second = Client(), Client()
+        first.get(page)
+        response = second.get(page)
+        self.assertNotIn('X-Cache', response)
+        self.assertIn('csrftoken', response.cookies)
+        self.assertNotEqual(first.cookies['csrftoken'].value, second.cookies['csrftoken'].value)
+
+    def test_entries_expire_without_a_shared_backend(self):
+        # locmem is per process, bumps made elsewhere never reach it
+        cache = get_cache()
+        key = make_cache_key('test:expiry', {'q': 1})
+        get_or_set('test:expiry', {'q': 1}, lambda: 'value')
+        for cache_key in (key, CATALOG_VERSION_KEY):
+            self.assertIsNotNone(cache._expire_info[cache.make_key(cache_key)])
+
+    @mock.patch('positionfinder.cache_utils.is_shared_cache', return_value=True)
+    def test_pages_answer_304_per_client(self, shared):
+        scales = NotesCategory.objects.create(id=1, category_name='Scales')
+        scale = Notes.objects.create(category=scales, note_name='Major', first_note=0, second_note=2)
+        root = Root.objects.create(name='C', pitch=0)
+        page = f'/?models_select=1&notes_options_select={scale.id}&root={root.id}'
+        first, second = Client(), Client()
+        first.get(page)
+        response = first.get(page)
+        etag = response['ETag']
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(first.get(page, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Another client's page holds another CSRF token
+        second.get(page)
+        self.assertEqual(second.get(page, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        # Requests writing the session always render
+        self.assertEqual(first.get(page + '&optimized=1', HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -0,0 +1,147 @@
+"""
+Catalog Snapshot Tests
+
+Ensures the indexes loaded from a prebuilt catalog snapshot match the ones
+built from the database, without queries, and that a missing, corrupt or
+stale snapshot falls back to the database.
+"""
+import os
+import tempfile
+
+from django.test import TestCase, override_settings
+from positionfinder.models import Notes, NotesCategory, Root
+from positionfinder.models_chords import ChordNotes
+from positionfinder.positions import NotesPosition
+from positionfinder.cache_utils import CATALOG_VERSION_KEY, bump_catalog_version, get_cache
+from positionfinder.catalog_snapshot import (
+    build_catalog_snapshot, get_catalog_snapshot, reset_catalog_snapshot, CatalogSnapshot,
+)
+from positionfinder.chord_catalog import ChordCatalog
+from positionfinder.chord_identification import IdentificationIndex
+from positionfinder.get_position_dict_scales import get_scale_pitch_positions
+from positionfinder.menu_index import MenuIndex
+
+
+class CatalogSnapshotTestCase(TestCase):
+    def setUp(self):
+        scales = NotesCategory.objects.create(id=1, category_name='Scales')
+        arpeggios = NotesCategory.objects.create(id=2, category_name='Arpeggios')
+        chords = NotesCategory.objects.create(id=3, category_name='Chords')
+        for name, pitch in (('C', 0), ('Db', 1), ('C#', 1), ('G', 7)):
+            Root.objects.create(name=name, display_name=name if '#' in name else None, pitch=pitch)
+        major = Notes.objects.create(category=scales, note_name='Major', ordering=1, first_note=0, second_note=2,
+                                     third_note=4, fourth_note=5, fifth_note=7, sixth_note=9, seventh_note=11)
+        Notes.objects.create(category=arpeggios, note_name='Major Triad', first_note=0, second_note=4, third_note=7)
+        NotesPosition.objects.create(notes_name=major, position_order=2, position='4,5,6,7')
+        NotesPosition.objects.create(notes_name=major, position_order=1, position='1,2,3,4')
+        for chord_name, notes in (('Major', (0, 4, 7)), ('Minor', (0, 3, 7))):
+            for range_name, strings, range_ordering in (('e - g', ('gString', 'bString', 'eString'), 1),
+                                                         ('b - d', ('dString', 'gString', 'bString'), 2)):
+                ChordNotes.objects.create(
+                    category=chords, type_name='Triads', chord_name=chord_name, range=range_name,
+                    range_ordering=range_ordering,
+                    first_note=notes[0], first_note_string=strings[0],
+                    second_note=notes[1], second_note_string=strings[1],
+                    third_note=notes[2], third_note_string=strings[2],
+                )
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'catalog.snapshot')
+        settings_override = override_settings(FRETBOARD_CATALOG_SNAPSHOT=self.path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_catalog_snapshot()
+        self.addCleanup(reset_catalog_snapshot)
+
+    def load_all(self):
+        catalog = ChordCatalog.load()
+        menu = MenuIndex.load()
+        identification = IdentificationIndex.load()
+        return {
+            'chords': catalog.chords,
+            'positions': catalog.positions,
+            'ranges': catalog.ranges,
+            'menu': {name: value for name, value in vars(menu).items() if name != 'version'},
+            'voicings': {shape: [(entry.chord.id, entry.inversion) for entry in entries]
+                         for shape, entries in identification.voicings.items()},
+            'notes': identification.notes,
+            'roots': identification.roots,
+            'scale': get_scale_pitch_positions('Major', None, 2, 0, 'D'),
+        }
+
+    def test_snapshot_matches_database(self):
+        self.assertIsNone(get_catalog_snapshot())
+        expected = self.load_all()
+
+        counts = build_catalog_snapshot()
+        self.assertEqual(counts['chordnotes'], 4)
+        reset_catalog_snapshot()
+        snapshot = get_catalog_snapshot()
+        self.assertIsInstance(snapshot, CatalogSnapshot)
+        self.assertEqual(snapshot.column('root', 'display_name'), [None, 'C#', None, None])
+        with self.assertNumQueries(0):
+            loaded = self.load_all()
+        self.assertEqual(loaded, expected)
+        self.assertEqual(len(snapshot.voicing_shapes()), sum(len(rows) for rows in expected['positions'].values()))
+
+    def test_stale_snapshot(self):
+        build_catalog_snapshot()
+        reset_catalog_snapshot()
+        self.assertIsNotNone(get_catalog_snapshot())
+
+        # Catalog edits bump the catalog version, the snapshot is dropped
+        Root.objects.create(name='D', pitch=2)
+        self.assertIsNone(get_catalog_snapshot())
+        self.assertIn('D', [root['name'] for root in MenuIndex.load().root_options])
+
+        # A fresh process finds the database no longer matches the file
+        reset_catalog_snapshot()
+        self.assertIsNone(get_catalog_snapshot())
+
+    def test_snapshot_survives_version_changes(self):
+        build_catalog_snapshot()
+        reset_catalog_snapshot()
+        snapshot = get_catalog_snapshot()
+        self.assertIsNotNone(snapshot)
+
+        # The version key expired or was bumped without a catalog change
+        get_cache().delete(CATALOG_VERSION_KEY)
+        self.assertIs(get_catalog_snapshot(), snapshot)
+        bump_catalog_version()
+        self.assertIs(get_catalog_snapshot(), snapshot)
+
+        # After an edit the rebuilt file is picked up again
+        Root.objects.create(name='D', pitch=2)
+        self.assertIsNone(get_catalog_snapshot())
+        build_catalog_snapshot()
+        bump_catalog_version()
+        rebuilt = get_catalog_snapshot()
+        self.assertIsNotNone(rebuilt)
+        self.assertIn('D', rebuilt.column('root', 'name'))
+
+    def test_in_place_edits_make_snapshot_stale(self):
+        build_catalog_snapshot()
+        major = Notes.objects.get(note_name='Major')
+        major.note_name = 'Ionian'
+        major.save()
+        position = NotesPosition.objects.get(position_order=1)
+        position.position = '1,2,3'
+        position.save()
+
+        # A fresh process, counts and checksums are unchanged
+        bump_catalog_version()
+        reset_catalog_snapshot()
+        self.assertIsNone(get_catalog_snapshot())
+        self.assertEqual([note['note_name'] for note in MenuIndex.load().scale_options], ['Ionian'])
+
+    def test_invalid_snapshot(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a snapshot')
+        self.assertIsNone(get_catalog_snapshot())
+
+        bump_catalog_version()
+        with override_settings(FRETBOARD_CATALOG_SNAPSHOT=''):
+            with self.assertRaises(ValueError):
+                build_catalog_snapshot()
+            self.assertIsNone(get_catalog_snapshot())
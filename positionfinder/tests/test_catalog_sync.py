@@ -0,0 +1,152 @@
+"""
+Catalog Sync Tests
+
+Ensures the JSONL catalog export round-trips and that importing it only
+writes the difference against the database.
+"""
+
+import io
+import json
+
+from django.test import TestCase
+from positionfinder.models import Notes, NotesCategory, Root
+from positionfinder.positions import NotesPosition
+from positionfinder.models_chords import ChordNotes, ChordPosition
+from positionfinder.catalog_sync import export_catalog, import_catalog, read_catalog
+
+
+def export():
+    stream = io.StringIO()
+    export_catalog(stream)
+    return stream.getvalue()
+
+
+def edit(catalog, change):
+    """Apply change(record) to every record, dropping records it returns None for."""
+    lines = catalog.splitlines()
+    records = [change(json.loads(line)) for line in lines[1:]]
+    return '\n'.join([lines[0]] + [json.dumps(record) for record in records if record is not None])
+
+
+class CatalogSyncTestCase(TestCase):
+    def setUp(self):
+        scales = NotesCategory.objects.create(id=1, category_name='Scales')
+        chords = NotesCategory.objects.create(id=3, category_name='Chords')
+        Root.objects.create(id=1, name='C', pitch=0)
+        major = Notes.objects.create(category=scales, note_name='Major', first_note=0, second_note=2, third_note=4)
+        NotesPosition.objects.create(notes_name=major, position_order=1, position='1,2,3')
+        NotesPosition.objects.create(notes_name=major, position_order=2, position='4,5,6')
+        for chord_name in ('Major', 'Minor'):
+            ChordNotes.objects.create(
+                category=chords, type_name='Triads', chord_name=chord_name, range='e - g',
+                first_note=0, first_note_string='gString',
+                second_note=4 if chord_name == 'Major' else 3, second_note_string='bString',
+                third_note=7, third_note_string='eString',
+            )
+        self.catalog = export()
+
+    def test_export_format(self):
+        header, records = read_catalog(self.catalog.splitlines())
+        self.assertEqual(header['models'], ['notescategory', 'root', 'notes', 'chordnotes'])
+        self.assertEqual(records['root'][('C',)], {'model': 'root', 'key': ['C'], 'fields': {'pitch': 0}, 'pk': 1})
+        major = records['notes'][('Scales', 'Major')]
+        self.assertNotIn('pk', major)
+        self.assertEqual(major['positions'], [{'position_order': 1, 'position': '1,2,3'},
+                                              {'position_order': 2, 'position': '4,5,6'}])
+        chord = records['chordnotes'][('Triads', 'Minor', 'e - g', 0)]
+        self.assertEqual(chord['fields']['category'], 'Chords')
+        self.assertEqual(len(chord['positions']), 3)
+        with self.assertRaises(ValueError):
+            read_catalog(['{"format": "other"}'])
+
+    def test_unchanged_import_writes_nothing(self):
+        with self.assertNumQueries(12):
+            report = import_catalog(io.StringIO(self.catalog))
+        self.assertEqual(report['chordnotes'], {'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 2,
+                                                'duplicates': 0, 'positions_replaced': 0})
+
+    def test_fresh_import(self):
+        for model in (ChordNotes, Notes, Root, NotesCategory):
+            model.objects.all().delete()
+        import_catalog(io.StringIO(self.catalog))
+        self.assertEqual(export(), self.catalog)
+        self.assertEqual(list(NotesCategory.objects.values_list('id', flat=True)), [1, 3])
+        self.assertEqual(Notes.objects.get().pitch_class_set, 0b10101)
+
+    def test_diff_import(self):
+        minor = ChordNotes.objects.get(chord_name='Minor')
+        major_pk = ChordNotes.objects.get(chord_name='Major').pk
+
+        def change(record):
+            if record['key'] == ['Triads', 'Minor', 'e - g', 0]:
+                return None
+            if record['key'] == ['Triads', 'Major', 'e - g', 0]:
+                record['fields']['ordering'] = 5
+            if record['key'] == ['Scales', 'Major']:
+                record['positions'] = record['positions'][:1]
+            return record
+
+        catalog = edit(self.catalog, change)
+        dry_run = import_catalog(io.StringIO(catalog), dry_run=True)
+        self.assertTrue(ChordNotes.objects.filter(pk=minor.pk).exists())
+
+        report = import_catalog(io.StringIO(catalog))
+        self.assertEqual(report, dry_run)
+        self.assertEqual(report['chordnotes'], {'created': 0, 'updated': 1, 'deleted': 1, 'unchanged': 0,
+                                                'duplicates': 0, 'positions_replaced': 0})
+        self.assertEqual(report['notes']['positions_replaced'], 1)
+        self.assertFalse(ChordPosition.objects.filter(notes_name_id=minor.pk).exists())
+        self.assertEqual(ChordNotes.objects.get(pk=major_pk).ordering, 5)
+        self.assertEqual(NotesPosition.objects.count(), 1)
+
+        # Kept rows stay put
+        self.assertEqual(import_catalog(io.StringIO(catalog), delete=False)['chordnotes']['unchanged'], 1)
+
+    def test_multi_root_chords_round_trip(self):
+        major = ChordNotes.objects.get(chord_name='Major')
+        ChordNotes.objects.create(
+            category=major.category, type_name='Triads', chord_name='Major', range='e - g', tonal_root=5,
+            first_note=0, first_note_string='gString', second_note=4, second_note_string='bString',
+            third_note=7, third_note_string='eString',
+        )
+        catalog = export()
+        _, records = read_catalog(catalog.splitlines())
+        self.assertEqual(set(records['chordnotes']), {('Triads', 'Major', 'e - g', 0),
+                                                      ('Triads', 'Major', 'e - g', 5),
+                                                      ('Triads', 'Minor', 'e - g', 0)})
+        report = import_catalog(io.StringIO(catalog))
+        self.assertEqual(report['chordnotes']['unchanged'], 3)
+        self.assertEqual(sorted(ChordNotes.objects.filter(chord_name='Major').values_list('tonal_root', flat=True)),
+                         [0, 5])
+        self.assertEqual(export(), catalog)
+
+        for model in (ChordNotes, Notes, Root, NotesCategory):
+            model.objects.all().delete()
+        import_catalog(io.StringIO(catalog))
+        self.assertEqual(export(), catalog)
+
+    def test_duplicates_need_flag(self):
+        major = ChordNotes.objects.get(chord_name='Major')
+        major.pk = None
+        major.save()
+        report = import_catalog(io.StringIO(self.catalog))
+        self.assertEqual((report['chordnotes']['deleted'], report['chordnotes']['duplicates']), (0, 1))
+        self.assertEqual(ChordNotes.objects.filter(chord_name='Major').count(), 2)
+
+        report = import_catalog(io.StringIO(self.catalog), delete_duplicates=True)
+        self.assertEqual(report['chordnotes']['deleted'], 1)
+        self.assertEqual(ChordNotes.objects.filter(chord_name='Major').count(), 1)
+
+        with self.assertRaises(ValueError):
+            read_catalog(self.catalog.splitlines() + self.catalog.splitlines()[-1:])
+
+    def test_version_1_keys(self):
+        def legacy(record):
+            if record['model'] == 'chordnotes':
+                record['fields']['tonal_root'] = record['key'].pop()
+            return record
+
+        catalog = edit(self.catalog, legacy).replace('"version": 2', '"version": 1', 1)
+        _, records = read_catalog(catalog.splitlines())
+        self.assertIn(('Triads', 'Major', 'e - g', 0), records['chordnotes'])
+        self.assertEqual(import_catalog(io.StringIO(catalog))['chordnotes']['unchanged'], 2)
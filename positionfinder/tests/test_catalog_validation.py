@@ -0,0 +1,96 @@
+"""
+Catalog Validation Tests
+
+Ensures every rule of the whole-catalog validation engine flags the chords
+it should, and that the playability check gives the same answer in-process
+and across a process pool.
+"""
+
+import numpy
+from django.test import TestCase, SimpleTestCase
+from positionfinder.models import NotesCategory
+from positionfinder.models_chords import ChordNotes, ChordPosition
+from positionfinder.catalog_validation import (
+    CatalogArrays, validate_catalog, min_fret_spans, check_playability, STRING_NAMES,
+)
+from positionfinder.chord_validation import validate_chord_notes
+
+
+def issue_keys(report, rule):
+    return [(issue['chord_id'], issue['message']) for issue in report['issues'][rule]]
+
+
+class MinFretSpanTestCase(SimpleTestCase):
+    def test_spans(self):
+        g, b, e = (STRING_NAMES.index(string) for string in ('gString', 'bString', 'eString'))
+        strings = numpy.array([[g, b, e, -1, -1, -1], [e, -1, -1, -1, -1, -1]])
+        # C E G on g, b, e: C major triad shape, and a single note
+        relative = numpy.array([[0, 4, 7, -1, -1, -1], [0, -1, -1, -1, -1, -1]])
+        spans = min_fret_spans(relative, strings)
+        self.assertEqual(spans.shape, (2, 12))
+        # In C: g string fret 5, b string fret 5, e string fret 3
+        self.assertEqual(spans[0, 0], 2)
+        self.assertEqual(spans[1].tolist(), [0] * 12)
+
+
+class CatalogValidationTestCase(TestCase):
+    def setUp(self):
+        chords = NotesCategory.objects.create(id=3, category_name='Chords')
+        self.good = ChordNotes.objects.create(
+            category=chords, type_name='Triads', chord_name='Major', range='e - g',
+            first_note=0, first_note_string='gString',
+            second_note=4, second_note_string='bString',
+            third_note=7, third_note_string='eString',
+        )
+        ChordNotes.objects.create(
+            category=chords, type_name='Triads', chord_name='Major', range='b - d',
+            first_note=0, first_note_string='dString',
+            second_note=4, second_note_string='gString',
+            third_note=7, third_note_string='bString',
+        )
+        # Written without save() checks or positions
+        self.broken, = ChordNotes.objects.bulk_create([
+            ChordNotes(category=chords, type_name='Triads', chord_name='Minor', range='e - g',
+                       first_note=0, first_note_string='gString',
+                       second_note=15, second_note_string='gString',
+                       third_note=7, third_note_string=None,
+                       fourth_note=10, fourth_note_string='zString'),
+        ])
+        ChordPosition.objects.create(notes_name=self.broken, inversion_order='First Inversion',
+                                     first_note=12, second_note=0, third_note=0)
+
+    def test_rules(self):
+        report = validate_catalog(workers=1)
+        self.assertEqual(report['chords'], 3)
+        self.assertFalse(report['valid'])
+        broken = self.broken.id
+
+        self.assertEqual(issue_keys(report, 'note_range'), [(broken, 'Second note is 15, outside 0-11')])
+        self.assertEqual(issue_keys(report, 'string_assignment'), [
+            (broken, 'Third note has no string assignment'),
+            (broken, 'Fourth note is on unknown string zString'),
+        ])
+        self.assertEqual(issue_keys(report, 'duplicate_strings'),
+                         [(broken, 'Duplicate string assignments: gString')])
+        self.assertEqual(issue_keys(report, 'note_count'), [(broken, 'Triad chord Minor has 4 notes instead of 3')])
+        self.assertEqual(issue_keys(report, 'inversion_count'), [
+            (broken, '1 inversions stored, expected 4'),
+            (broken, '1 inversions leave notes without an offset'),
+            (broken, 'The first stored inversion (First Inversion) is not the basic position'),
+        ])
+        self.assertEqual(issue_keys(report, 'range_coverage'),
+                         [(broken, 'Missing ranges of its type: b - d')])
+        self.assertNotIn(self.good.id, [chord_id for rule in report['issues'] for chord_id, _ in
+                                        issue_keys(report, rule)])
+
+        # The per-chord validation agrees on the shared checks
+        single = validate_chord_notes(broken)
+        self.assertIn('Third note has no string assignment', single['issues'])
+        self.assertIn('Duplicate string assignments found', single['issues'])
+
+    def test_playability_process_pool(self):
+        arrays = CatalogArrays.load()
+        in_process = check_playability(arrays, workers=1)
+        pooled = check_playability(arrays, workers=2, chunk_size=2)
+        self.assertEqual(pooled, in_process)
+        self.assertEqual(validate_catalog(rules=['playability'], workers=1)['counts'], {'playability': len(in_process)})
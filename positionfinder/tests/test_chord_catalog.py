@@ -0,0 +1,86 @@
+"""
+Chord Catalog Tests
+
+Ensures the in-process chord catalog returns the same voicings as the
+ORM-backed get_position_dict and is refreshed when chord data changes.
+"""
+
+from django.test import TestCase
+from positionfinder.models import NotesCategory
+from positionfinder.models_chords import ChordNotes, ChordPosition
+from positionfinder.get_position_dict_chords import get_position_dict
+from positionfinder.chord_catalog import get_chord_catalog, invalidate_chord_catalog
+
+
+class ChordCatalogTestCase(TestCase):
+    def setUp(self):
+        invalidate_chord_catalog()
+        self.category = NotesCategory.objects.create(category_name='Chords')
+        self.major = ChordNotes.objects.create(
+            category=self.category,
+            type_name='Triads',
+            chord_name='Major',
+            range='e - g',
+            tonal_root=0,
+            first_note=0, first_note_string='gString',
+            second_note=4, second_note_string='bString',
+            third_note=7, third_note_string='eString',
+        )
+        ChordNotes.objects.create(
+            category=self.category,
+            type_name='Triads',
+            chord_name='Major',
+            range='b - d',
+            tonal_root=0,
+            first_note=0, first_note_string='dString',
+            second_note=4, second_note_string='gString',
+            third_note=7, third_note_string='bString',
+        )
+
+    def test_voicings_match_get_position_dict(self):
+        catalog = get_chord_catalog()
+        for range_name in ('e - g', 'b - d'):
+            for inversion in ('Basic Position', 'First Inversion', 'Second Inversion'):
+                for root_pitch, root_name in ((0, 'C'), (1, 'C#'), (3, 'Eb'), (11, 'B')):
+                    self.assertEqual(
+                        catalog.get_position_dict(inversion, 'Major', range_name, 'Triads',
+                                                  root_pitch, 0, root_name),
+                        get_position_dict(inversion, 'Major', range_name, 'Triads',
+                                          root_pitch, 0, root_name),
+                    )
+
+    def test_chord_json_data_needs_no_queries(self):
+        catalog = get_chord_catalog()
+        chord = catalog.find_chord('Triads', 'Major', 'e - g')
+        inversions = [p.inversion_order for p in catalog.get_positions(chord.id)]
+        with self.assertNumQueries(0):
+            data = catalog.get_chord_json_data(
+                inversions, 'Major', ['e - g', 'b - d'], 'Triads', 7, 0, 'G'
+            )
+        self.assertEqual(set(data), {'e - g', 'b - d'})
+        self.assertEqual(data['e - g']['Basic Position']['gString'][0], 'g2')
+        self.assertEqual(len(data['b - d']), 3)
+
+    def test_missing_voicing_returns_empty_dict(self):
+        catalog = get_chord_catalog()
+        self.assertEqual(catalog.get_position_dict('Third Inversion', 'Major', 'e - g', 'Triads', 0, 0, 'C'), {})
+        self.assertEqual(catalog.get_position_dict('Basic Position', 'Minor', 'e - g', 'Triads', 0, 0, 'C'), {})
+
+    def test_find_chord_fallbacks(self):
+        catalog = get_chord_catalog()
+        self.assertEqual(catalog.find_chord('Triads', 'Major', 'e - g').id, self.major.id)
+        self.assertEqual(catalog.find_chord('Triads', 'Major', 'g - E').chord_name, 'Major')
+        self.assertEqual(catalog.find_chord('V9', 'Unknown', 'e - g').type_name, 'Triads')
+
+    def test_catalog_rebuilds_after_chord_change(self):
+        before = get_chord_catalog()
+        self.assertEqual(before.find_chord('Triads', 'Major', 'e - g').notes[1], 4)
+
+        self.major.second_note = 3
+        self.major.save()
+        after = get_chord_catalog()
+        self.assertIsNot(before, after)
+        self.assertEqual(after.find_chord('Triads', 'Major', 'e - g').notes[1], 3)
+
+        ChordPosition.objects.filter(notes_name=self.major).delete()
+        self.assertEqual(get_chord_catalog().get_positions(self.major.id), [])
@@ -0,0 +1,65 @@
+"""
+Chord Identification Tests
+
+Ensures fretted notes are named as the stored voicings, chord qualities,
+scales and arpeggios they match, in every key.
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+from positionfinder.models import Notes, NotesCategory, Root
+from positionfinder.models_chords import ChordNotes
+from positionfinder.cache_utils import bump_catalog_version
+from positionfinder.chord_identification import identify, parse_fretted_notes
+
+
+class ChordIdentificationTestCase(TestCase):
+    def setUp(self):
+        bump_catalog_version()
+        scales = NotesCategory.objects.create(id=1, category_name='Scales')
+        arpeggios = NotesCategory.objects.create(id=2, category_name='Arpeggios')
+        chords = NotesCategory.objects.create(id=3, category_name='Chords')
+        for name, pitch in (('C', 0), ('C#', 1), ('Db', 1), ('F', 5), ('G', 7), ('A', 9)):
+            Root.objects.create(name=name, pitch=pitch)
+        Notes.objects.create(category=scales, note_name='Major', first_note=0, second_note=2, third_note=4,
+                             fourth_note=5, fifth_note=7, sixth_note=9, seventh_note=11)
+        Notes.objects.create(category=arpeggios, note_name='Major Triad', first_note=0, second_note=4, third_note=7)
+        # Creating a triad also stores its root position and inversions
+        self.triad = ChordNotes.objects.create(
+            category=chords, type_name='Triads', chord_name='Major', range='e - g',
+            first_note=0, first_note_string='gString',
+            second_note=4, second_note_string='bString',
+            third_note=7, third_note_string='eString',
+        )
+
+    def test_identify_voicing(self):
+        # G C E on g, b and e strings: C major, second inversion
+        result = identify({'gString': 12, 'bString': 13, 'eString': 12, 'dString': 'x'}, string_count=6)
+        self.assertEqual(result['pitch_classes'], [0, 4, 7])
+        self.assertEqual([(v['chord_id'], v['inversion'], v['root']['names']) for v in result['voicings']],
+                         [(self.triad.id, 'Second Inversion', ['C'])])
+        self.assertTrue(result['voicings'][0]['url'].startswith(reverse('fretboard') + '?'))
+        self.assertIn('note_range=e+-+g', result['voicings'][0]['url'])
+        self.assertEqual([(c['chord_name'], c['inversion'], c['bass']['names']) for c in result['chords']],
+                         [('Major', 'Second Inversion', ['G'])])
+
+        # Scales are only rooted on played notes, F major isn't offered
+        self.assertEqual([(s['name'], s['root']['names'], s['exact']) for s in result['scales']],
+                         [('Major', ['C'], False), ('Major', ['G'], False)])
+        self.assertEqual([(a['name'], a['exact']) for a in result['arpeggios']], [('Major Triad', True)])
+
+    def test_identify_transposed(self):
+        # C# E# G# on other strings: no stored voicing, but still a C# major chord
+        result = identify({'ELowString': 9, 'AString': 8, 'dString': 6})
+        self.assertEqual(result['voicings'], [])
+        self.assertEqual([(c['chord_name'], c['root']['names'], c['inversion']) for c in result['chords']],
+                         [('Major', ['C#', 'Db'], 'Basic Position')])
+        self.assertEqual(identify({'eString': 1}, limit=0)['scales'], [])
+
+    def test_parse_fretted_notes(self):
+        self.assertEqual(parse_fretted_notes({'eString': 0, 'ELowString': '3', 'bString': ''}),
+                         [('ELowString', 7), ('eString', 28)])
+        with self.assertRaises(ValueError):
+            parse_fretted_notes({'lowBString': 2}, string_count=6)
+        with self.assertRaises(ValueError):
+            parse_fretted_notes({'eString': 30})
@@ -0,0 +1,53 @@
+"""
+Chord Result Hydration Tests
+
+Ensures chord search results are hydrated with a constant number of queries
+and that limits, offsets and pages slice the same sorted result list.
+"""
+
+from django.test import TestCase
+from positionfinder.models import NotesCategory
+from positionfinder.models_chords import ChordNotes
+from positionfinder.cache_utils import bump_catalog_version
+from positionfinder.chord_catalog import get_chord_catalog
+from positionfinder.improved_chord_search import (
+    improved_search_chords, iter_improved_chord_results, process_improved_chord_results,
+)
+
+
+class ChordResultHydrationTestCase(TestCase):
+    def setUp(self):
+        bump_catalog_version()
+        category = NotesCategory.objects.create(category_name='Chords')
+        for type_name in ('V4', 'Triads', 'V2', 'Spread Triads', 'V3'):
+            for chord_range in ('e - g', 'b - d', 'g - A'):
+                ChordNotes.objects.create(
+                    category=category, type_name=type_name, chord_name='Major', range=chord_range, tonal_root=11,
+                    first_note=0, first_note_string='gString',
+                    second_note=4, second_note_string='bString',
+                    third_note=7, third_note_string='eString',
+                )
+        get_chord_catalog()
+
+    def test_constant_queries(self):
+        # Parse, sort on (id, type, range) rows, load the page
+        with self.assertNumQueries(4):
+            results = improved_search_chords('major')
+        self.assertEqual(len(results), 15)
+        self.assertEqual([result['type'] for result in results[:3]], ['Spread Triads'] * 3)
+        self.assertEqual([result['type'] for result in results[3:6]], ['V2'] * 3)
+        self.assertEqual(results[0]['positions'], ['Basic Position', 'First Inversion', 'Second Inversion'])
+        # parse_query defaults the root to C
+        self.assertEqual(results[0]['name'], 'C Major')
+        self.assertEqual(results[0]['category'], 'Chords')
+
+    def test_pagination(self):
+        results = improved_search_chords('major')
+        self.assertEqual(improved_search_chords('major', limit=4, offset=2), results[2:6])
+        self.assertEqual([result for page in iter_improved_chord_results('major', page_size=4) for result in page],
+                         results)
+        self.assertEqual([len(page) for page in iter_improved_chord_results('major', page_size=4)], [4, 4, 4, 3])
+        # Without a root in the query the chord's tonal root is shown
+        processed = process_improved_chord_results(ChordNotes.objects.all(), limit=2, offset=1)
+        self.assertEqual([(result['id'], result['name']) for result in processed],
+                         [(result['id'], 'G Major') for result in results[1:3]])
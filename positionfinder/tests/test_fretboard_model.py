@@ -0,0 +1,81 @@
+"""
+Fretboard Model Tests
+
+Ensures the integer fretboard model matches STRING_NOTE_OPTIONS and that the
+integer scale pipeline serializes to the legacy tone format.
+"""
+
+from django.test import SimpleTestCase
+from positionfinder.template_notes import NOTES, NOTES_SHARP, STRING_NOTE_OPTIONS
+from positionfinder.fretboard_model import (
+    SIX_STRING_FRETBOARD, EIGHT_STRING_FRETBOARD, get_fretboard, spell_tone, tone_to_pitch,
+)
+from positionfinder.get_position_dict_scales import (
+    build_scale_pitch_positions, serialize_pitch_positions, get_transposable_positions,
+    get_transposable_pitch_positions,
+)
+
+
+class FretboardModelTestCase(SimpleTestCase):
+    def test_model_matches_string_note_options(self):
+        self.assertEqual(list(EIGHT_STRING_FRETBOARD.strings), list(STRING_NOTE_OPTIONS))
+        for string, options in STRING_NOTE_OPTIONS.items():
+            for names, use_sharps in ((NOTES, False), (NOTES_SHARP, True)):
+                for pitch_class, name in enumerate(names):
+                    info = options[0][name][0]
+                    pitches = EIGHT_STRING_FRETBOARD.pitches_for_pitch_class(string, pitch_class)
+                    self.assertEqual(list(EIGHT_STRING_FRETBOARD.frets_for_pitch_class(string, pitch_class)), info['fret'])
+                    self.assertEqual([spell_tone(pitch, use_sharps) for pitch in pitches], info['tone'])
+
+    def test_pitch_grid_and_reverse_index(self):
+        self.assertEqual(SIX_STRING_FRETBOARD.pitches.shape, (6, 17))
+        self.assertEqual(EIGHT_STRING_FRETBOARD.pitches.shape, (8, 17))
+        self.assertIs(get_fretboard(6), SIX_STRING_FRETBOARD)
+        self.assertEqual(EIGHT_STRING_FRETBOARD.pitch('ELowString', 5), tone_to_pitch('a0'))
+        self.assertEqual(
+            SIX_STRING_FRETBOARD.locate(tone_to_pitch('a2')),
+            (('eString', 5), ('bString', 10), ('gString', 14)),
+        )
+        self.assertIn(('highAString', 17), EIGHT_STRING_FRETBOARD.locate(tone_to_pitch('d4')))
+
+    def test_tone_round_trip(self):
+        self.assertEqual(tone_to_pitch('c0'), 0)
+        self.assertEqual(tone_to_pitch('gs2'), tone_to_pitch('ab2'))
+        self.assertEqual(spell_tone(tone_to_pitch('gs2'), False), 'ab2')
+        self.assertIsNone(tone_to_pitch('h2'))
+
+    def test_pitch_positions_serialize_like_tone_positions(self):
+        # C major triad, position frets 1-4
+        positions = build_scale_pitch_positions([0, 4, 7], [('1', [1, 2, 3, 4])])
+        data = serialize_pitch_positions(positions, False)
+        self.assertEqual(data['1']['bString'], [{'tones': ['c2']}])
+        self.assertEqual(data['1']['eString'], [{'tones': ['g2']}])
+        self.assertEqual(data['1']['gString'], [{'tones': []}])
+        self.assertEqual(data['0']['ELowString'], [{'tones': ['c1', 'e1', 'g0', 'g1']}])
+        self.assertEqual(
+            get_transposable_pitch_positions(2, positions),
+            get_transposable_positions(2, data),
+        )
+
+    def test_vectorized_positions_match_tone_lookup(self):
+        # Reference: the STRING_NOTE_OPTIONS walk the builder replaced
+        def reference(note_names, frets):
+            result = {}
+            for string, options in STRING_NOTE_OPTIONS.items():
+                tones = []
+                for note in note_names:
+                    info = options[0][note][0]
+                    for fret, tone in zip(info['fret'], info['tone']):
+                        if (frets is None or fret in frets) and tone not in tones:
+                            tones.append(tone)
+                result[string] = [{'tones': tones}]
+            return result
+
+        pitch_classes = [2, 4, 6, 7, 9, 11, 1, 2]  # D major, root repeated
+        note_names = [NOTES_SHARP[pitch_class] for pitch_class in pitch_classes]
+        position_lists = [('1', [0, 1, 2, 3, 4]), ('2', [7, 8, 9, 10]), ('3', [14, 15, 16, 17, 18])]
+        data = serialize_pitch_positions(build_scale_pitch_positions(pitch_classes, position_lists), True)
+        self.assertEqual(list(data), ['0', '1', '2', '3'])
+        self.assertEqual(data['0'], reference(note_names, None))
+        for key, frets in position_lists:
+            self.assertEqual(data[key], reference(note_names, frets))
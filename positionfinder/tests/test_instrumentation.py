@@ -0,0 +1,74 @@
+"""
+Instrumentation Tests
+
+Ensures the instrumentation middleware reports queries, cache lookups and
+spans in a Server-Timing header and the stats endpoint, and stays out of
+the way when disabled.
+"""
+
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase, Client, override_settings
+from positionfinder.models import Notes, NotesCategory
+from positionfinder.positions import NotesPosition
+from positionfinder.cache_utils import bump_catalog_version
+from positionfinder.instrumentation import instrumented, stats, _current, RequestMetrics
+
+
+@instrumented('outer')
+def recursive(n):
+    return recursive(n - 1) if n else 0
+
+
+class InstrumentationTestCase(TestCase):
+    def setUp(self):
+        bump_catalog_version()
+        stats.clear()
+        category = NotesCategory.objects.create(category_name='Scales')
+        self.scale = Notes.objects.create(category=category, note_name='Major', first_note=0, second_note=2)
+        NotesPosition.objects.create(notes_name=self.scale, position_order=1, position='1,2,3,4')
+
+    def get_positions(self, client):
+        return client.get('/api/scale-positions/', {'notes_id': self.scale.id}, HTTP_ACCEPT='application/json')
+
+    @override_settings(FRETBOARD_INSTRUMENTATION=True)
+    def test_server_timing_and_stats(self):
+        client = Client()
+        miss = self.get_positions(client)
+        hit = self.get_positions(client)
+        self.assertRegex(miss['Server-Timing'], r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="[1-9]\d* queries", cache;desc="0 hits, 1 misses"')
+        self.assertIn('db;dur=0.00;desc="0 queries", cache;desc="1 hits, 0 misses"', hit['Server-Timing'])
+
+        # Only staff users see the stats, wherever the request comes from
+        self.assertEqual(client.get('/_stats/').status_code, 404)
+        client.force_login(User.objects.create_user('staff', is_staff=True))
+        views = json.loads(client.get('/_stats/', REMOTE_ADDR='10.0.0.1').content)['views']
+        self.assertEqual(views['api:ajax_scale_positions']['requests'], 2)
+        self.assertEqual(views['api:ajax_scale_positions']['cache_hit_rate'], 0.5)
+
+        # Only a POST clears the samples
+        client.get('/_stats/', {'reset': 1})
+        self.assertIn('api:ajax_scale_positions', json.loads(client.get('/_stats/').content)['views'])
+        client.post('/_stats/')
+        self.assertNotIn('api:ajax_scale_positions', json.loads(client.get('/_stats/').content)['views'])
+
+    @override_settings(FRETBOARD_INSTRUMENTATION=True, DEBUG=True)
+    def test_stats_with_debug(self):
+        self.get_positions(Client())
+        self.assertEqual(Client().get('/_stats/').status_code, 200)
+
+    def test_disabled_by_default(self):
+        response = self.get_positions(Client())
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(Client().get('/_stats/').status_code, 404)
+
+    def test_nested_spans_counted_once(self):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            recursive(3)
+        finally:
+            _current.reset(token)
+        self.assertEqual(list(metrics.spans), ['outer'])
+        self.assertEqual(metrics.depth, {'outer': 0})
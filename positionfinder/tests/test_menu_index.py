@@ -0,0 +1,64 @@
+"""
+Menu Index Tests
+
+Ensures the unified menu and the chord menu API views are served from the
+menu index without database queries, and that the index follows catalog
+changes.
+"""
+
+from django.test import TestCase, RequestFactory
+from positionfinder.models import Notes, NotesCategory, Root
+from positionfinder.models_chords import ChordNotes
+from positionfinder.context_processors import unified_menu_context
+from positionfinder.menu_index import get_menu_index, chord_type_options
+from positionfinder.cache_utils import bump_catalog_version
+
+
+class MenuIndexTestCase(TestCase):
+    def setUp(self):
+        bump_catalog_version()
+        scales = NotesCategory.objects.create(id=1, category_name='Scales')
+        NotesCategory.objects.create(id=2, category_name='Arpeggios')
+        chords = NotesCategory.objects.create(id=3, category_name='Chords')
+        Root.objects.create(name='C', pitch=0)
+        Notes.objects.create(category=scales, note_name='Major', first_note=0)
+        self.chord = ChordNotes.objects.create(
+            category=chords, type_name='Triads', chord_name='Major', range='e - g',
+            first_note=0, first_note_string='gString',
+            second_note=4, second_note_string='bString',
+            third_note=7, third_note_string='eString',
+        )
+
+    def test_menu_context_without_queries(self):
+        get_menu_index()
+        with self.assertNumQueries(0):
+            context = unified_menu_context(RequestFactory().get('/'))
+        self.assertEqual([option['name'] for option in context['unified_menu_root_options']], ['C'])
+        self.assertEqual([option['note_name'] for option in context['unified_menu_scale_options']], ['Major'])
+        self.assertEqual(context['unified_menu_arpeggio_options'], [])
+        self.assertEqual(context['unified_menu_chord_type_options']['standard_types'], ['Triads'])
+
+    def test_menu_api_follow_up_calls(self):
+        get_menu_index()
+        with self.assertNumQueries(0):
+            names = self.client.get('/api/chord-names/', {'type_name': 'Triads'}).json()
+            ranges = self.client.get('/api/chord-ranges/', {'type_name': 'Triads', 'chord_name': 'Major'}).json()
+            positions = self.client.get('/api/chord-positions/', {'chord_notes_id': self.chord.id}).json()
+        self.assertEqual(names['chord_names'], [{'chord_name': 'Major'}])
+        self.assertEqual(ranges['ranges'], [{'id': self.chord.id, 'range': 'e - g'}])
+        self.assertEqual(
+            [position['inversion_order'] for position in positions['positions']],
+            ['Basic Position', 'First Inversion', 'Second Inversion'],
+        )
+
+    def test_index_follows_catalog_changes(self):
+        self.assertEqual(get_menu_index().get_chord_names('Triads'), ['Major'])
+        ChordNotes.objects.create(
+            category_id=3, type_name='Triads', chord_name='Minor', range='e - g',
+            first_note=0, second_note=3, third_note=7,
+        )
+        self.assertEqual(get_menu_index().get_chord_names('Triads'), ['Major', 'Minor'])
+
+    def test_chord_type_options_natural_sort(self):
+        options = chord_type_options(['V10', 'V2', 'Spread Triads', 'Triads', 'Other'])
+        self.assertEqual(options, {'standard_types': ['Triads', 'Spread Triads'], 'v_system_types': ['V2', 'V10']})
@@ -0,0 +1,97 @@
+"""
+Fingering System Tests
+
+Ensures the computed CAGED, 3-notes-per-string and box windows are playable
+for any interval set, and that regenerating NotesPositions from them
+replaces the stored rows and expires cached pages.
+"""
+from io import StringIO
+
+import numpy
+from django.core.management import call_command
+from django.test import TestCase, SimpleTestCase
+from positionfinder.models import Notes, NotesCategory
+from positionfinder.positions import NotesPosition
+from positionfinder.cache_utils import get_catalog_version
+from positionfinder.fretboard_model import SIX_STRING_FRETBOARD, MIN_FRET
+from positionfinder.get_position import parse_notes_position
+from positionfinder.optimized_positions import (
+    SYSTEMS, fingering_windows, compute_fingering_positions, regenerate_positions, three_notes_per_string_windows,
+)
+
+MAJOR = (0, 2, 4, 5, 7, 9, 11)
+MINOR_PENTATONIC = (0, 3, 5, 7, 10)
+
+
+def notes_per_string(intervals, low, high):
+    """Scale notes on every string within a window."""
+    columns = slice(low - MIN_FRET, high - MIN_FRET + 1)
+    return numpy.isin(SIX_STRING_FRETBOARD.pitch_classes[:, columns], intervals).sum(axis=1).tolist()
+
+
+class FingeringWindowsTestCase(SimpleTestCase):
+    def test_caged_shapes(self):
+        # C shape (moved up an octave), A, G, E and D shape of C major
+        self.assertEqual(fingering_windows(MAJOR, 'caged').tolist(),
+                         [[2, 5], [4, 8], [7, 10], [9, 13], [12, 16]])
+
+    def test_three_notes_per_string(self):
+        windows = fingering_windows(MAJOR, '3nps')
+        self.assertEqual(len(windows), len(MAJOR))
+        for low, high in windows.tolist()[:-1]:
+            self.assertTrue(all(count >= 3 for count in notes_per_string(MAJOR, low, high)))
+        # Pentatonics are played two notes per string
+        for low, high in fingering_windows(MINOR_PENTATONIC, '3nps').tolist():
+            self.assertLessEqual(high - low, 4)
+
+    def test_hexatonic_windows_stay_in_reach(self):
+        # Blues, whole tone, augmented, major hexatonic
+        for intervals in ((0, 3, 5, 6, 7, 10), (0, 2, 4, 6, 8, 10), (0, 3, 4, 7, 8, 11), (0, 2, 4, 7, 9, 11)):
+            windows = three_notes_per_string_windows(list(intervals))
+            self.assertEqual(len(windows), 6)
+            for low, high in windows:
+                self.assertLessEqual(high - low, 6, intervals)
+
+    def test_windows_hold_the_scale(self):
+        for system in SYSTEMS:
+            for intervals in (MAJOR, MINOR_PENTATONIC, (0, 2, 4, 6, 8, 10)):
+                windows = fingering_windows(intervals, system)
+                self.assertEqual(windows.tolist(), sorted(windows.tolist()))
+                for low, high in windows.tolist():
+                    self.assertGreaterEqual(low, MIN_FRET)
+                    columns = SIX_STRING_FRETBOARD.pitch_classes[:, low - MIN_FRET:high - MIN_FRET + 1]
+                    self.assertTrue(set(intervals) <= set(columns.ravel().tolist()))
+
+    def test_unknown_system(self):
+        with self.assertRaises(ValueError):
+            fingering_windows(MAJOR, 'open')
+
+
+class RegeneratePositionsTestCase(TestCase):
+    def setUp(self):
+        scales = NotesCategory.objects.create(category_name='Scales')
+        self.major = Notes.objects.create(category=scales, note_name='Major', first_note=0, second_note=2,
+                                          third_note=4, fourth_note=5, fifth_note=7, sixth_note=9,
+                                          seventh_note=11)
+        self.ionian = Notes.objects.create(category=scales, note_name='Ionian', first_note=0, second_note=2,
+                                           third_note=4, fourth_note=5, fifth_note=7, sixth_note=9,
+                                           seventh_note=11)
+        NotesPosition.objects.create(notes_name=self.major, position_order=1, position='0,2,4,5,7,9,11')
+
+    def test_regenerate(self):
+        positions = compute_fingering_positions([self.major, self.ionian], '3nps')
+        self.assertIs(positions[self.major.id], positions[self.ionian.id])
+
+        version = get_catalog_version()
+        self.assertEqual(regenerate_positions([self.major]), 5)
+        self.assertNotEqual(get_catalog_version(), version)
+        stored = list(NotesPosition.objects.filter(notes_name=self.major))
+        self.assertEqual([(position.position_order, position.position) for position in stored][:2],
+                         [(1, '2,3,4,5'), (2, '4,5,6,7,8')])
+        # Stored for C, moved to the selected root when rendered
+        self.assertEqual(parse_notes_position(stored[0].position, 7), [9, 10, 11, 12])
+
+    def test_command(self):
+        call_command('optimize_positions', system='box', stdout=StringIO())
+        self.assertEqual(NotesPosition.objects.filter(notes_name=self.ionian).count(),
+                         len(fingering_windows(MAJOR, 'box')))
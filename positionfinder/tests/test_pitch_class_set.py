@@ -0,0 +1,78 @@
+"""
+Pitch-Class Set Tests
+
+Ensures the denormalized pitch_class_set column stays in sync with the note
+fields and that the containment / transposition lookups built on it match.
+"""
+
+from django.core import serializers
+from django.test import TestCase, SimpleTestCase
+from positionfinder.models import Notes, NotesCategory
+from positionfinder.models_chords import ChordNotes, bulk_create_chords
+from positionfinder.pitch_class_set import (
+    pitch_class_mask, mask_pitch_classes, rotate_mask, superset_masks,
+    filter_containing, filter_matching,
+)
+
+
+class PitchClassMaskTestCase(SimpleTestCase):
+    def test_mask_helpers(self):
+        major = pitch_class_mask([0, 4, 7, None, 12])
+        self.assertEqual(major, 0b10010001)
+        self.assertEqual(mask_pitch_classes(major), [0, 4, 7])
+        self.assertEqual(mask_pitch_classes(rotate_mask(major, 7)), [2, 7, 11])
+        self.assertEqual(rotate_mask(major, -12), major)
+        self.assertEqual(mask_pitch_classes(rotate_mask(major, -1)), [3, 6, 11])
+
+        supersets = superset_masks(pitch_class_mask(range(10)))
+        self.assertEqual(len(supersets), 4)
+        self.assertTrue(all(mask & 0b1111111111 == 0b1111111111 for mask in supersets))
+
+
+class PitchClassSetTestCase(TestCase):
+    def setUp(self):
+        self.scales = NotesCategory.objects.create(category_name='Scales')
+        self.chords = NotesCategory.objects.create(category_name='Chords')
+        self.major = Notes.objects.create(category=self.scales, note_name='Major', first_note=0, second_note=2,
+                                          third_note=4, fourth_note=5, fifth_note=7, sixth_note=9, seventh_note=11)
+        self.dorian = Notes.objects.create(category=self.scales, note_name='Dorian', first_note=0, second_note=2,
+                                           third_note=3, fourth_note=5, fifth_note=7, sixth_note=9, seventh_note=10)
+        self.pentatonic = Notes.objects.create(category=self.scales, note_name='Minor Pentatonic', first_note=0,
+                                               second_note=3, third_note=5, fourth_note=7, fifth_note=10)
+
+    def test_maintained_on_save(self):
+        self.assertEqual(self.major.pitch_class_set, pitch_class_mask([0, 2, 4, 5, 7, 9, 11]))
+        self.major.seventh_note = 10
+        self.major.save()
+        self.major.refresh_from_db()
+        self.assertEqual(self.major.pitch_class_set, pitch_class_mask([0, 2, 4, 5, 7, 9, 10]))
+
+        chord = ChordNotes.objects.create(category=self.chords, type_name='V2', chord_name='Minor 7',
+                                          first_note=0, second_note=3, third_note=7, fourth_note=10)
+        self.assertEqual(ChordNotes.objects.get(pk=chord.pk).pitch_class_set, pitch_class_mask([0, 3, 7, 10]))
+
+        bulk, _ = bulk_create_chords([ChordNotes(category=self.chords, type_name='V2', chord_name='Major',
+                                                 first_note=0, second_note=4, third_note=7)], with_positions=False)
+        self.assertEqual(ChordNotes.objects.get(pk=bulk[0].pk).pitch_class_set, pitch_class_mask([0, 4, 7]))
+
+    def test_fixture_load(self):
+        data = serializers.serialize('json', [self.pentatonic], fields=['category', 'note_name', 'first_note',
+                                                                         'second_note', 'third_note'])
+        Notes.objects.filter(pk=self.pentatonic.pk).update(pitch_class_set=0)
+        for obj in serializers.deserialize('json', data):
+            obj.save()
+        self.assertEqual(Notes.objects.get(pk=self.pentatonic.pk).pitch_class_set, pitch_class_mask([0, 3, 5]))
+
+    def test_lookups(self):
+        scales = Notes.objects.order_by('note_name')
+        names = lambda queryset: [notes.note_name for notes in queryset]
+
+        self.assertEqual(names(filter_containing(scales, [3, 10])), ['Dorian', 'Minor Pentatonic'])
+        self.assertEqual(names(filter_containing(scales, [0, 3, 5, 7, 10])), ['Dorian', 'Minor Pentatonic'])
+        # E G A B D is the minor pentatonic a fourth up
+        self.assertEqual(names(filter_containing(scales, [4, 7, 9, 11, 2], transpose=True)),
+                         ['Dorian', 'Major', 'Minor Pentatonic'])
+        self.assertEqual(names(filter_matching(scales, [0, 2, 4, 5, 7, 9, 11])), ['Major'])
+        # D Dorian has the pitch classes of C major, so both match in any key
+        self.assertEqual(names(filter_matching(scales, [2, 4, 5, 7, 9, 11, 0], transpose=True)), ['Dorian', 'Major'])
+        self.assertEqual(names(filter_matching(scales, [0, 4, 7], transpose=True)), [])
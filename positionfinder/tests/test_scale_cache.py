@@ -0,0 +1,59 @@
+"""
+Scale Cache Tests
+
+Ensures warmed scale_json_data matches live computation, is served without
+database queries and expires when the underlying rows change.
+"""
+
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from positionfinder.models import Notes, NotesCategory, Root
+from positionfinder.positions import NotesPosition
+from positionfinder.views_scale import ScaleView
+from positionfinder.cache_utils import bump_catalog_version
+
+
+class ScaleCacheTestCase(TestCase):
+    def setUp(self):
+        bump_catalog_version()
+        self.category = NotesCategory.objects.create(category_name='Scales')
+        self.scale = Notes.objects.create(
+            category=self.category, note_name='Major Pentatonic',
+            first_note=0, second_note=2, third_note=4, fourth_note=7, fifth_note=9,
+        )
+        self.position = NotesPosition.objects.create(notes_name=self.scale, position_order=1, position='0,1,2,3')
+        NotesPosition.objects.create(notes_name=self.scale, position_order=2, position='4,5,6,7')
+        self.root = Root.objects.create(name='D', pitch=2)
+        self.view = ScaleView()
+
+    def build(self):
+        return self.view.build_position_json(
+            self.scale.note_name, self.root.id, self.root.pitch, 0, self.root.name, self.scale.id
+        )
+
+    def compute(self):
+        return self.view.compute_position_json(
+            self.scale.note_name, self.root.id, self.root.pitch, 0, self.root.name, self.scale.id
+        )
+
+    def test_warm_cache_serves_without_queries(self):
+        call_command('warm_scale_cache', stdout=StringIO())
+        with self.assertNumQueries(0):
+            data = self.build()
+        self.assertEqual(data, self.compute())
+
+    def test_miss_falls_back_to_live_computation(self):
+        self.assertEqual(self.build(), self.compute())
+        with self.assertNumQueries(0):
+            self.build()
+
+    def test_position_change_expires_cache(self):
+        before = json.loads(self.build())
+        self.position.position = '7,8,9,10'
+        self.position.save()
+        after = json.loads(self.build())
+        self.assertNotEqual(before, after)
+        self.assertEqual(after, json.loads(self.compute()))
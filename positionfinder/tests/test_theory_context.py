@@ -0,0 +1,59 @@
+"""
+Theory Context Tests
+
+Ensures the request-scoped theory context derives the same tones, tensions,
+note names and root octaves as the standalone helpers, and that a scale
+page looks its rows up a fixed number of times.
+"""
+from django.test import TestCase, RequestFactory
+from positionfinder.models import Notes, NotesCategory, Root
+from positionfinder.positions import NotesPosition
+from positionfinder.note_setup import get_notes_tones
+from positionfinder.root_note_setup import get_root_note
+from positionfinder.functionality_tones_setup import (
+    get_functionality_tones, get_functionality_pitches, get_functionality_note_names,
+)
+from positionfinder.theory_context import TheoryContext
+from positionfinder.views_scale import ScaleView
+
+
+class TheoryContextTestCase(TestCase):
+    def setUp(self):
+        scales = NotesCategory.objects.create(id=1, category_name='Scales')
+        self.scale = Notes.objects.create(category=scales, note_name='Major', first_note=0, second_note=2,
+                                          third_note=4, fourth_note=5, fifth_note=7, sixth_note=9, seventh_note=11)
+        self.position = NotesPosition.objects.create(notes_name=self.scale, position_order=1, position='1,2,3,4')
+        self.root = Root.objects.create(name='F#', pitch=6)
+
+    def test_matches_helpers(self):
+        with self.assertNumQueries(2):
+            theory = TheoryContext.load(self.scale.id, self.root.id)
+        with self.assertNumQueries(0):
+            derived = (theory.tones, theory.tensions, theory.tension_pitches, theory.note_names, theory.root_notes)
+        self.assertEqual(derived, (
+            get_notes_tones(self.scale.id, 6, 0, self.root.id),
+            get_functionality_tones(self.scale.id, 6),
+            get_functionality_pitches(self.scale.id, 6),
+            get_functionality_note_names(self.scale.id, 6, 0, self.root.id),
+            get_root_note(6, 0, self.root.id),
+        ))
+        self.assertIn('fs2', theory.tones)
+
+        missing = TheoryContext.load(0, self.root.id)
+        self.assertIsNone(missing.notes)
+        self.assertEqual((missing.tones, missing.tensions, missing.note_names), ([], [], []))
+
+    def test_scale_page_queries(self):
+        view = ScaleView()
+        request = RequestFactory().get('/', {'notes_options_select': self.scale.id, 'root': self.root.id,
+                                             'position_select': self.position.id})
+        request.session = {}
+        params = view.process_request(request)
+        expected = view.get_context(request, params)
+        # Root, notes, categories and positions; the scale JSON is cached
+        with self.assertNumQueries(4):
+            context = view.get_context(request, params)
+        self.assertEqual(context['selected_notes_name'], 'Major')
+        self.assertEqual(context['position'], [7, 8, 9, 10])
+        for key in ('tones', 'tensions', 'tension_pitches', 'note_names', 'root', 'scale_json_data'):
+            self.assertEqual(context[key], expected[key])
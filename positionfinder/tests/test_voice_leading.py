@@ -0,0 +1,94 @@
+"""
+Voice Leading Tests
+
+Ensures the solver plays the frets the chord pages show, finds the
+progression with the least movement (checked against brute force) and
+honours the type, string and fret constraints.
+"""
+import itertools
+import json
+
+import numpy
+from django.test import TestCase
+from positionfinder.models import NotesCategory, Root
+from positionfinder.models_chords import ChordNotes
+from positionfinder.chord_catalog import get_chord_catalog
+from positionfinder.fretboard_model import OPEN_STRING_PITCHES, tone_to_pitch
+from positionfinder.voicing_difficulty import STRING_NAMES
+from positionfinder.voice_leading import HAND_WEIGHT, get_voicing_index, solve_voice_leading
+
+
+class VoiceLeadingTestCase(TestCase):
+    def setUp(self):
+        chords = NotesCategory.objects.create(id=3, category_name='Chords')
+        for chord_name, third in (('Major', 4), ('Minor', 3)):
+            for type_name, strings in (('Triads', ('gString', 'bString', 'eString')),
+                                       ('Spread Triads', ('AString', 'gString', 'bString'))):
+                ChordNotes.objects.create(
+                    category=chords, type_name=type_name, chord_name=chord_name, range=' - '.join(strings),
+                    first_note=0, first_note_string=strings[0],
+                    second_note=third, second_note_string=strings[1],
+                    third_note=7, third_note_string=strings[2],
+                )
+        self.c = Root.objects.create(name='C', pitch=0)
+        self.a = Root.objects.create(name='A', pitch=9)
+
+    def test_frets_match_chord_pages(self):
+        index = get_voicing_index()
+        catalog = get_chord_catalog()
+        for row, record in enumerate(index.records):
+            chord = catalog.by_id[record.chord_id]
+            position_dict = catalog.get_position_dict(record.inversion, chord.chord_name, chord.range,
+                                                      chord.type_name, 9, chord.tonal_root, 'A')
+            shown = {string: tone_to_pitch(notes[0]) - OPEN_STRING_PITCHES[string]
+                     for string, notes in position_dict.items() if string != 'assigned_strings'}
+            frets = {STRING_NAMES[string]: fret for string, fret in
+                     zip(index.string_indexes[row].tolist(), index.frets[row, 9].tolist()) if string >= 0}
+            self.assertEqual(shown, frets)
+
+    def test_least_movement(self):
+        progression = [(0, 'Major'), (9, 'Minor'), (5, 'Major'), (7, 'Major')]
+        solution = solve_voice_leading(progression)
+        index = get_voicing_index()
+        candidates = [index.candidates(name, root) for root, name in progression]
+
+        def movement(a, root_a, b, root_b):
+            return (numpy.abs(index.voices[a, root_a, :3] - index.voices[b, root_b, :3]).sum()
+                    + HAND_WEIGHT * abs(index.lowest[a, root_a] - index.lowest[b, root_b]))
+
+        best = min(
+            sum(movement(path[i], progression[i][0], path[i + 1], progression[i + 1][0]) for i in range(3))
+            for path in itertools.product(*candidates)
+        )
+        self.assertAlmostEqual(solution['movement'], best)
+        self.assertAlmostEqual(sum(voicing['movement'] for voicing in solution['voicings']), best)
+        self.assertEqual([voicing['chord_name'] for voicing in solution['voicings']],
+                         ['Major', 'Minor', 'Major', 'Major'])
+
+    def test_constraints(self):
+        progression = [(0, 'Major'), (9, 'Minor')] * 8
+        solution = solve_voice_leading(progression, types=['Spread Triads'], max_fret=12)
+        self.assertEqual(len(solution['voicings']), 16)
+        for voicing in solution['voicings']:
+            self.assertEqual(voicing['type_name'], 'Spread Triads')
+            self.assertLessEqual(max(voicing['frets'].values()), 12)
+
+        top_strings = ['gString', 'bString', 'eString']
+        solution = solve_voice_leading(progression, strings=top_strings)
+        self.assertTrue(all(set(voicing['frets']) <= set(top_strings) for voicing in solution['voicings']))
+        with self.assertRaises(ValueError):
+            solve_voice_leading([(0, 'Major')], types=['V2'])
+
+    def test_api(self):
+        response = self.client.post('/api/voice-leading/', json.dumps({
+            'chords': [{'root': self.c.id, 'chord': 'Major'}, {'root': self.a.id, 'chord': 'Minor'}],
+            'types': ['Triads'],
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([voicing['type_name'] for voicing in response.json()['voicings']], ['Triads', 'Triads'])
+        response = self.client.post('/api/voice-leading/', json.dumps({
+            'chords': [{'root': 999, 'chord': 'Major'}]}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/voice-leading/', json.dumps([{'root': self.c.id, 'chord': 'Major'}]),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
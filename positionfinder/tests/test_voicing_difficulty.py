@@ -0,0 +1,105 @@
+"""
+Voicing Difficulty Tests
+
+Ensures the vectorized scores describe the frets the chord pages show, are
+stored and served from the chord catalog, and drive the inversion ordering
+of ChordView and the chord positions API.
+"""
+import numpy
+from django.test import TestCase, SimpleTestCase, RequestFactory
+from positionfinder.models import NotesCategory, Root
+from positionfinder.models_chords import ChordNotes, ChordPosition, VoicingScore
+from positionfinder.chord_catalog import get_chord_catalog, ChordCatalog
+from positionfinder.views_chords import ChordView
+from positionfinder.voicing_difficulty import (
+    STRING_NAMES, DifficultyScore, voicing_frets, score_frets, rank_by_difficulty, update_voicing_scores,
+)
+
+
+class ScoreFretsTestCase(SimpleTestCase):
+    def test_c_major_on_top_strings(self):
+        g, b, e = (STRING_NAMES.index(string) for string in ('gString', 'bString', 'eString'))
+        strings = numpy.array([[g, b, e, -1, -1, -1]])
+        frets = voicing_frets(numpy.array([[0, 4, 7, -1, -1, -1]]), strings)
+        # In C: g string fret 5, b string fret 5, e string fret 3
+        self.assertEqual(frets[0, 0].tolist(), [5, 5, 3, -1, -1, -1])
+        scores = score_frets(frets, strings)
+        self.assertEqual([scores[name][0, 0] for name in ('fret_span', 'string_span', 'finger_count',
+                                                          'position_height')], [2, 3, 2, 3])
+
+    def test_skipped_strings_cost(self):
+        b, e = STRING_NAMES.index('bString'), STRING_NAMES.index('eString')
+        d = STRING_NAMES.index('dString')
+        close = numpy.array([[b, e, -1, -1, -1, -1]])
+        wide = numpy.array([[d, e, -1, -1, -1, -1]])
+        # Same pitch classes in every key, the wide voicing skips two strings
+        relative = numpy.array([[0, 7, -1, -1, -1, -1]])
+        close_scores = score_frets(voicing_frets(relative, close), close)
+        wide_scores = score_frets(voicing_frets(relative, wide), wide)
+        self.assertEqual(close_scores['string_span'][0, 0], 2)
+        self.assertEqual(wide_scores['string_span'][0, 0], 4)
+
+    def test_rank_by_difficulty(self):
+        easy, hard = DifficultyScore(0, 1, 1, 1, 1.0), DifficultyScore(4, 3, 3, 1, 6.5)
+        items, scores = ['hard', 'missing', 'easy'], [hard, None, easy]
+        self.assertEqual(rank_by_difficulty(items, scores), ['easy', 'hard', 'missing'])
+        self.assertEqual(rank_by_difficulty(items, scores, max_difficulty=5, sort=False), ['easy'])
+
+
+class VoicingScoreTestCase(TestCase):
+    def setUp(self):
+        chords = NotesCategory.objects.create(id=3, category_name='Chords')
+        self.root = Root.objects.create(name='C', pitch=0)
+        self.chord = ChordNotes.objects.create(
+            category=chords, type_name='Triads', chord_name='Major', range='e - g',
+            first_note=0, first_note_string='gString',
+            second_note=4, second_note_string='bString',
+            third_note=7, third_note_string='eString',
+        )
+
+    def test_stored_scores_match_catalog(self):
+        computed = ChordCatalog.load().scores
+        self.assertEqual(update_voicing_scores(), 12 * ChordPosition.objects.count())
+        catalog = get_chord_catalog()
+        self.assertEqual(catalog.scores, computed)
+        basic = ChordPosition.objects.filter(notes_name=self.chord).order_by('pk').first()
+        stored = VoicingScore.objects.get(position=basic, root_pitch=0)
+        self.assertEqual((stored.fret_span, stored.string_span, stored.finger_count, stored.position_height),
+                         (2, 3, 2, 3))
+        self.assertEqual(catalog.get_inversion_scores(self.chord.id, ['Basic Position', 'Third Inversion'], 12),
+                         [computed[basic.id][0], None])
+
+        # Editing a chord drops its stored scores, the catalog rescores it
+        self.chord.third_note_string = 'dString'
+        self.chord.save()
+        self.assertFalse(VoicingScore.objects.filter(position__notes_name=self.chord).exists())
+        self.assertNotEqual(get_chord_catalog().scores[basic.id], computed[basic.id])
+
+    def test_chord_view_orders_inversions(self):
+        update_voicing_scores()
+        view = ChordView()
+        request = RequestFactory().get('/', {'root': self.root.id, 'inversion_sort': 'difficulty'})
+        request.session = {}
+        context = view.get_context(request)
+        difficulty = context['position_difficulty']
+        names = [position.inversion_order for position in context['position_options']]
+        self.assertEqual(sorted(difficulty), sorted(names))
+        self.assertEqual(names, sorted(names, key=lambda name: difficulty[name]['difficulty']))
+
+        easiest = difficulty[names[0]]['difficulty']
+        request = RequestFactory().get('/', {'root': self.root.id, 'max_difficulty': easiest})
+        request.session = {}
+        context = view.get_context(request)
+        self.assertEqual([position.inversion_order for position in context['position_options']],
+                         [name for name in difficulty if difficulty[name]['difficulty'] <= easiest])
+
+    def test_positions_api(self):
+        response = self.client.get('/api/chord-positions/', {
+            'chord_notes_id': self.chord.id, 'root_pitch': 0, 'sort': 'difficulty'})
+        positions = response.json()['positions']
+        self.assertEqual(len(positions), 3)
+        difficulties = [position['difficulty']['difficulty'] for position in positions]
+        self.assertEqual(difficulties, sorted(difficulties))
+        response = self.client.get('/api/chord-positions/', {
+            'chord_notes_id': self.chord.id, 'max_difficulty': 'hard'})
+        self.assertEqual(response.status_code, 400)
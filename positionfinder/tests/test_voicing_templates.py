@@ -0,0 +1,65 @@
+"""
+Voicing Template Tests
+
+Checks that root-independent voicing templates transpose to the expected
+note names, tensions and root flags for every key.
+"""
+
+from django.test import SimpleTestCase
+from positionfinder.voicing_templates import VoicingTemplate, get_voicing_template
+from positionfinder.get_position_dict_chords import build_position_dict
+
+MAJOR_TRIAD = ((0, 4, 7, None, None, None),
+               ('gString', 'bString', 'eString', None, None, None))
+
+
+class VoicingTemplateTestCase(SimpleTestCase):
+    def test_root_relative_data_is_computed_once(self):
+        template = VoicingTemplate(*MAJOR_TRIAD, (0, 0, 0, None, None, None))
+        self.assertEqual(template.notes, (
+            ('gString', 0, 'R', True),
+            ('bString', 4, '3', False),
+            ('eString', 7, '5', False),
+        ))
+
+    def test_transpose_to_every_key(self):
+        template = VoicingTemplate(*MAJOR_TRIAD, (0, 0, 0, None, None, None))
+        c_major = template.transpose(0, False)
+        self.assertEqual(c_major['gString'], ['c2', 'R', True, True])
+        self.assertEqual(c_major['bString'], ['e2', '3', True, False])
+        self.assertEqual(c_major['eString'], ['g2', '5', True, False])
+        self.assertEqual(c_major['assigned_strings'], ['gString', 'bString', 'eString'])
+
+        self.assertEqual(template.transpose(1, True)['gString'][0], 'cs2')
+        self.assertEqual(template.transpose(1, False)['gString'][0], 'db2')
+        for root_pitch in range(12):
+            position = template.transpose(root_pitch, False)
+            self.assertEqual([position[s][1] for s in position['assigned_strings']], ['R', '3', '5'])
+
+    def test_transpositions_are_copies(self):
+        template = VoicingTemplate(*MAJOR_TRIAD, (0, 0, 0, None, None, None))
+        first = template.transpose(7, False)
+        first['gString'][3] = False
+        first['assigned_strings'].append('dString')
+        second = template.transpose(7, False)
+        self.assertTrue(second['gString'][3])
+        self.assertEqual(second['assigned_strings'], ['gString', 'bString', 'eString'])
+
+    def test_wide_voicing_uses_alternate_octave(self):
+        # A on the e string sits at fret 5, C on the g string at fret 5,
+        # E on the b string at fret 5: compact, so default octave is used
+        compact = build_position_dict([0, 4, 9, None, None, None], list(MAJOR_TRIAD[1]),
+                                      [0, 0, 0, None, None, None], 0, 0, 'C')
+        self.assertEqual(compact['eString'][0], 'a2')
+        # C on the g string (fret 5), b string (fret 1) and e string (fret 8):
+        # the 7 fret jump forces the upper octave where one exists
+        wide = build_position_dict([0, 0, 0, None, None, None], list(MAJOR_TRIAD[1]),
+                                   [0, 0, 0, None, None, None], 0, 0, 'C')
+        self.assertEqual(wide['gString'][0], 'c3')
+        self.assertEqual(wide['bString'][0], 'c3')
+        self.assertEqual(wide['eString'][0], 'c3')
+
+    def test_identical_voicings_share_a_template(self):
+        offsets = (0, 0, 0, None, None, None)
+        self.assertIs(get_voicing_template(*MAJOR_TRIAD, offsets),
+                      get_voicing_template(*MAJOR_TRIAD, offsets))
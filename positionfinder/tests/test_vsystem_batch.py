@@ -0,0 +1,57 @@
+"""
+V-System Batch Tests
+
+Ensures the batch generator builds the same voicings as the one-by-one
+builders, skips voicings that already exist and writes nothing in a dry run.
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from positionfinder.models import NotesCategory
+from positionfinder.models_chords import ChordNotes, ChordPosition
+from positionfinder.v_system_generator import VoicingSystem, VOICING_KEY_FIELDS
+
+
+def voicing_key(chord):
+    return tuple(getattr(chord, field) for field in VOICING_KEY_FIELDS)
+
+
+class VoicingBatchTestCase(TestCase):
+    def setUp(self):
+        NotesCategory.objects.create(id=1, category_name='Chords')
+        self.system = VoicingSystem()
+
+    def test_batch_matches_single_builders(self):
+        chords, skipped = self.system.build_batch(string_set_keys=['e-b', 'highA-E'])
+        self.assertEqual(skipped, 12 * len(self.system.chord_types) * 2)
+        expected = [
+            build(root, chord_type, 'e-b')
+            for build in (self.system.build_v1_chord, self.system.build_v2_chord)
+            for chord_type in self.system.chord_types
+            for root in range(12)
+        ]
+        self.assertEqual([voicing_key(chord) for chord in chords], [voicing_key(chord) for chord in expected])
+
+    def test_generate_batch_dedupes_and_dry_run(self):
+        self.system.generate_v2_voicing(2, 'Minor 7', 'd-E')
+        options = dict(chord_types=['Minor 7', 'Major'], string_set_keys=['d-E'])
+
+        report = self.system.generate_batch(dry_run=True, **options)
+        self.assertEqual((report['built'], report['existing'], report['created']), (48, 1, 47))
+        # V1 positions need four notes, so only the V2 triads get positions
+        self.assertEqual(report['positions'], 23 * 4 + 12 * 3)
+        self.assertEqual(ChordNotes.objects.count(), 1)
+
+        report = self.system.generate_batch(**options)
+        self.assertEqual(report['created'], 47)
+        self.assertEqual(ChordNotes.objects.count(), 48)
+        self.assertEqual(ChordPosition.objects.count(), 4 + report['positions'])
+        self.assertEqual(self.system.generate_batch(**options)['created'], 0)
+
+    def test_command_batch_dry_run(self):
+        out = StringIO()
+        call_command('generate_vsystem', '--batch', '--dry-run', '--v-system', 'v1', '--root', '0', stdout=out)
+        self.assertIn(f'Would create {len(self.system.chord_types) * 4} chords', out.getvalue())
+        self.assertEqual(ChordNotes.objects.count(), 0)
@@ -0,0 +1,87 @@
+"""
+Request-scoped theory context.
+
+A scale or arpeggio page derives its tones, tensions, note names and root
+octaves from a single Notes row and a single Root row. TheoryContext looks
+both up once per request and computes every derived list once; the helpers
+in note_setup, functionality_tones_setup and root_note_setup accept it as
+their ``theory`` argument instead of fetching the rows again.
+"""
+from functools import cached_property
+
+from .models import Root
+from .note_setup import build_notes, get_notes_tones
+from .root_note_setup import get_root_note
+from .functionality_tones_setup import (
+    get_notes_object, get_functionality_tones, get_functionality_pitches, get_functionality_note_names,
+)
+
+
+class TheoryContext:
+    """
+    The selected notes and root of a request, with everything derived from them.
+
+    Attributes:
+        notes: The Notes (or, for arpeggios, ChordNotes) row, None if missing
+        root: The selected Root
+        tonal_root: Tonal root offset the lists are built for
+    """
+
+    def __init__(self, notes, root, tonal_root=0):
+        self.notes = notes
+        self.root = root
+        self.tonal_root = tonal_root
+
+    @classmethod
+    def load(cls, notes_options_id, root_id, tonal_root=0):
+        """
+        Fetch the rows of a request: one query for the root, one (two for
+        ChordNotes ids) for the notes.
+
+        Raises:
+            Root.DoesNotExist: If there is no such root
+        """
+        root = Root.objects.get(pk=root_id)
+        return cls(get_notes_object(notes_options_id), root, tonal_root)
+
+    @property
+    def notes_id(self):
+        return self.notes.pk if self.notes is not None else None
+
+    @property
+    def root_id(self):
+        return self.root.pk
+
+    @property
+    def root_pitch(self):
+        return self.root.pitch
+
+    @property
+    def root_name(self):
+        return self.root.name
+
+    @cached_property
+    def intervals(self):
+        """Intervals of the notes (see note_setup.build_notes), None without notes."""
+        return build_notes(self.notes) if self.notes is not None else None
+
+    @cached_property
+    def tones(self):
+        return get_notes_tones(self.notes_id, self.root_pitch, self.tonal_root, self.root_id, theory=self)
+
+    @cached_property
+    def tensions(self):
+        return get_functionality_tones(self.notes_id, self.root_pitch, theory=self)
+
+    @cached_property
+    def tension_pitches(self):
+        return get_functionality_pitches(self.notes_id, self.root_pitch, theory=self)
+
+    @cached_property
+    def note_names(self):
+        return get_functionality_note_names(self.notes_id, self.root_pitch, self.tonal_root, self.root_id, theory=self)
+
+    @cached_property
+    def root_notes(self):
+        """Spelled root note of every octave (root_note_setup.get_root_note)."""
+        return get_root_note(self.root_pitch, self.tonal_root, self.root_id, theory=self)
@@ -2,10 +2,22 @@
 Ted Greene's V-System implementation for the fretboard position finder.
 This module provides functions to generate chord voicings following Ted Greene's V-System taxonomy.
 """
+import time
+
+import numpy as np
 from django.db import transaction
-from .models_chords import ChordNotes, ChordPosition, create_base_position
+from .models_chords import (
+    ChordNotes, ChordPosition, create_base_position, bulk_create_chords, build_base_positions,
+)
 from .notes_choices import NOTES_CHOICES
 
+# Fields identifying a generated voicing, used to skip existing rows
+VOICING_KEY_FIELDS = (
+    'type_name', 'chord_name', 'range', 'tonal_root',
+    'first_note', 'second_note', 'third_note', 'fourth_note',
+)
+
+
 class VoicingSystem:
     """Implementation of Ted Greene's V-System voicing classification."""
     
@@ -58,8 +70,8 @@ class VoicingSystem:
             "Augmented": [0, 4, 8],         # Root, Major 3rd, Augmented 5th
         }
 
-    def generate_v1_voicing(self, root_note, chord_type, string_set_key="e-b"):
-        """Generate a V-1 (close position) voicing for a given chord.
+    def build_v1_chord(self, root_note, chord_type, string_set_key="e-b"):
+        """Build an unsaved V-1 (close position) chord.
         
         Args:
             root_note (int): Root note value (0-11, where 0=C, 1=C#, etc.)
@@ -67,7 +79,7 @@ class VoicingSystem:
             string_set_key (str): Key for the string set to use (default: "e-b")
             
         Returns:
-            ChordNotes: The created chord notes object
+            ChordNotes: Unsaved chord, or None for 8-string sets
         """
         if chord_type not in self.chord_types:
             raise ValueError(f"Unsupported chord type: {chord_type}")
@@ -94,67 +106,10 @@ class VoicingSystem:
         if len(sorted_notes) > len(strings):
             raise ValueError(f"Not enough strings ({len(strings)}) for chord with {len(sorted_notes)} notes")
             
-        # Print for debugging
-        
-        # Now create the chord
-        with transaction.atomic():
-            try:
-                # Check if using 8-string ranges - they have character length issues
-                if "highA" in string_set_key or "lowB" in string_set_key:
-                    return None
-                
-                if len(sorted_notes) == 3:  # Triad
-                    chord = ChordNotes.objects.create(
-                        category_id=self.category_id,
-                        type_name="V1",  # V-1 voicing type
-                        chord_name=chord_type,
-                        range=string_set_key,  # Use string set key as range name
-                        tonal_root=root_note,
-                        first_note=sorted_notes[0],
-                        first_note_string=strings[0],
-                        second_note=sorted_notes[1],
-                        second_note_string=strings[1],
-                        third_note=sorted_notes[2],
-                        third_note_string=strings[2],
-                        # No need for fourth_note for triads
-                    )
-                    
-                elif len(sorted_notes) == 4:  # Seventh chord
-                    chord = ChordNotes.objects.create(
-                        category_id=self.category_id,
-                        type_name="V1",  # V-1 voicing type
-                        chord_name=chord_type,
-                        range=string_set_key,  # Use string set key as range name
-                        tonal_root=root_note,
-                        first_note=sorted_notes[0],
-                        first_note_string=strings[0],
-                        second_note=sorted_notes[1],
-                        second_note_string=strings[1],
-                        third_note=sorted_notes[2],
-                        third_note_string=strings[2],
-                        fourth_note=sorted_notes[3],
-                        fourth_note_string=strings[3],
-                    )
-                else:
-                    raise ValueError(f"Unsupported number of notes: {len(sorted_notes)}")
-                
-                try:
-                    # Skip 8-string range creation - set an attribute to prevent it
-                    chord.skip_eight_string = True
-                    
-                    # Create positions for the chord
-                    create_base_position(chord.id)
-                    
-                    return chord
-                except Exception as e:
-                    # Try to continue even if position creation fails
-                    return chord
-                
-            except Exception as e:
-                raise
-            
-    def generate_v2_voicing(self, root_note, chord_type, string_set_key="e-b"):
-        """Generate a V-2 voicing (drop-2) for a given chord.
+        return self._build_chord("V1", root_note, chord_type, string_set_key, sorted_notes, strings)
+
+    def build_v2_chord(self, root_note, chord_type, string_set_key="e-b"):
+        """Build an unsaved V-2 (drop-2) chord.
         
         Args:
             root_note (int): Root note value (0-11, where 0=C, 1=C#, etc.)
@@ -162,7 +117,7 @@ class VoicingSystem:
             string_set_key (str): Key for the string set to use (default: "e-b")
             
         Returns:
-            ChordNotes: The created chord notes object
+            ChordNotes: Unsaved chord, or None for 8-string sets
         """
         if chord_type not in self.chord_types:
             raise ValueError(f"Unsupported chord type: {chord_type}")
@@ -188,8 +143,6 @@ class VoicingSystem:
         sorted_notes = sorted(original_notes)
         drop2_notes = sorted_notes.copy()
         
-        # Print for debugging
-        
         # If it's a seventh chord (4 notes)
         if len(drop2_notes) == 4:
             # The second highest note is at index 2
@@ -206,73 +159,92 @@ class VoicingSystem:
             drop2_notes.remove(drop_note)
             drop2_notes.insert(0, (drop_note - 12) % 12)  # Insert at beginning
             
-        # Print for debugging
+        return self._build_chord("V2", root_note, chord_type, string_set_key, drop2_notes, strings)
+
+    def _build_chord(self, type_name, root_note, chord_type, string_set_key, notes, strings):
+        # Check if using 8-string ranges - they have character length issues
+        if "highA" in string_set_key or "lowB" in string_set_key:
+            return None
         
-        # Now create the chord
+        if len(notes) not in (3, 4):
+            raise ValueError(f"Unsupported number of notes: {len(notes)}")
+        
+        fields = ['first_note', 'second_note', 'third_note', 'fourth_note']
+        values = {}
+        for field, note, string in zip(fields, notes, strings):
+            values[field] = note
+            values[f'{field}_string'] = string
+        # No fourth_note for triads
+        return ChordNotes(
+            category_id=self.category_id,
+            type_name=type_name,  # V-1 / V-2 voicing type
+            chord_name=chord_type,
+            range=string_set_key,  # Use string set key as range name
+            tonal_root=root_note,
+            **values
+        )
+
+    def _save_chord(self, chord):
+        if chord is None:
+            return None
         with transaction.atomic():
+            chord.save()
             try:
-                # Check if using 8-string ranges - they have character length issues
-                if "highA" in string_set_key or "lowB" in string_set_key:
-                    return None
-                
-                if len(drop2_notes) == 3:  # Triad
-                    chord = ChordNotes.objects.create(
-                        category_id=self.category_id,
-                        type_name="V2",  # V-2 voicing type
-                        chord_name=chord_type,
-                        range=string_set_key,  # Use string set key as range name
-                        tonal_root=root_note,
-                        first_note=drop2_notes[0],
-                        first_note_string=strings[0],
-                        second_note=drop2_notes[1],
-                        second_note_string=strings[1],
-                        third_note=drop2_notes[2],
-                        third_note_string=strings[2],
-                        # No need for fourth_note for triads
-                    )
-                    
-                elif len(drop2_notes) == 4:  # Seventh chord
-                    chord = ChordNotes.objects.create(
-                        category_id=self.category_id,
-                        type_name="V2",  # V-2 voicing type
-                        chord_name=chord_type,
-                        range=string_set_key,  # Use string set key as range name
-                        tonal_root=root_note,
-                        first_note=drop2_notes[0],
-                        first_note_string=strings[0],
-                        second_note=drop2_notes[1],
-                        second_note_string=strings[1],
-                        third_note=drop2_notes[2],
-                        third_note_string=strings[2],
-                        fourth_note=drop2_notes[3],
-                        fourth_note_string=strings[3],
-                    )
-                    
-                else:
-                    raise ValueError(f"Unsupported number of notes: {len(drop2_notes)}")
-                
-                try:
-                    # Skip 8-string range creation - set an attribute to prevent it
-                    chord.skip_eight_string = True
-                    
-                    # Create positions for the chord
-                    create_base_position(chord.id)
-                    
-                    return chord
-                except Exception as e:
-                    # Try to continue even if position creation fails
-                    return chord
+                # Skip 8-string range creation - set an attribute to prevent it
+                chord.skip_eight_string = True
                 
+                # Create positions for the chord
+                create_base_position(chord.id)
             except Exception as e:
-                raise
+                # Try to continue even if position creation fails
+                pass
+            return chord
+
+    def generate_v1_voicing(self, root_note, chord_type, string_set_key="e-b"):
+        """Generate a V-1 (close position) voicing for a given chord.
+        
+        Args:
+            root_note (int): Root note value (0-11, where 0=C, 1=C#, etc.)
+            chord_type (str): Type of chord (e.g., "Major 7", "Dominant 7")
+            string_set_key (str): Key for the string set to use (default: "e-b")
+            
+        Returns:
+            ChordNotes: The created chord notes object
+        """
+        return self._save_chord(self.build_v1_chord(root_note, chord_type, string_set_key))
+            
+    def generate_v2_voicing(self, root_note, chord_type, string_set_key="e-b"):
+        """Generate a V-2 voicing (drop-2) for a given chord.
+        
+        Args:
+            root_note (int): Root note value (0-11, where 0=C, 1=C#, etc.)
+            chord_type (str): Type of chord (e.g., "Major 7", "Dominant 7")
+            string_set_key (str): Key for the string set to use (default: "e-b")
+            
+        Returns:
+            ChordNotes: The created chord notes object
+        """
+        return self._save_chord(self.build_v2_chord(root_note, chord_type, string_set_key))
+
+    def bulk_generate(self, chords):
+        """Insert built chords and their positions in one transaction.
+        
+        Args:
+            chords (list): Unsaved ChordNotes from build_v1_chord / build_v2_chord
+                (None entries are kept in the result, like the generate_* methods)
+            
+        Returns:
+            list: The created ChordNotes objects, None where nothing was built
+        """
+        bulk_create_chords([chord for chord in chords if chord is not None])
+        return chords
             
     def generate_all_roots_v1(self, chord_type="Major 7", string_set_key="e-b"):
         """Generate V-1 voicings for all root notes (0-11) of a given chord type."""
         chords = []
         for root_note in range(12):  # Only 12 chromatic roots
-            chord = self.generate_v1_voicing(root_note, chord_type, string_set_key)
-            chords.append(chord)
-        return chords
+            chords.append(self.build_v1_chord(root_note, chord_type, string_set_key))
+        return self.bulk_generate(chords)
 
     def generate_all_roots_v2(self, chord_type="Major 7", string_set_key="e-b"):
         """Generate V-2 voicings for all root notes of a given chord type, covering C0 to D4."""
@@ -280,9 +252,8 @@ class VoicingSystem:
         for midi_note in range(12, 63):  # 12 to 62 inclusive
             root = midi_note % 12
             octave = midi_note // 12
-            chord = self.generate_v2_voicing(root, chord_type, string_set_key)
-            chords.append(chord)
-        return chords
+            chords.append(self.build_v2_chord(root, chord_type, string_set_key))
+        return self.bulk_generate(chords)
         
     def generate_all_types_v1(self, root_note=0, string_set_key="e-b"):
         """Generate V-1 voicings for all chord types with a given root note.
@@ -296,9 +267,8 @@ class VoicingSystem:
         """
         chords = []
         for chord_type in self.chord_types:
-            chord = self.generate_v1_voicing(root_note, chord_type, string_set_key)
-            chords.append(chord)
-        return chords
+            chords.append(self.build_v1_chord(root_note, chord_type, string_set_key))
+        return self.bulk_generate(chords)
 
     def generate_all_types_v2(self, root_note=0, string_set_key="e-b"):
         """Generate V-2 voicings for all chord types with a given root note.
@@ -312,6 +282,119 @@ class VoicingSystem:
         """
         chords = []
         for chord_type in self.chord_types:
-            chord = self.generate_v2_voicing(root_note, chord_type, string_set_key)
-            chords.append(chord)
-        return chords
+            chords.append(self.build_v2_chord(root_note, chord_type, string_set_key))
+        return self.bulk_generate(chords)
+
+    def voicing_matrix(self, chord_type, type_name):
+        """Compute the voicing of a chord type for all 12 roots at once.
+        
+        Args:
+            chord_type (str): Type of chord (e.g., "Major 7", "Dominant 7")
+            type_name (str): "V1" (close position) or "V2" (drop-2)
+            
+        Returns:
+            numpy.ndarray: 12 x n array of notes (bass to treble), row i has root i
+        """
+        if chord_type not in self.chord_types:
+            raise ValueError(f"Unsupported chord type: {chord_type}")
+        intervals = np.array(self.chord_types[chord_type])
+        notes = np.sort((np.arange(12)[:, None] + intervals) % 12, axis=1)
+        if type_name == "V2":
+            # Drop the second highest note an octave, it becomes the bass note
+            drop = notes.shape[1] - 2
+            notes = np.concatenate([notes[:, drop:drop + 1], np.delete(notes, drop, axis=1)], axis=1)
+        elif type_name != "V1":
+            raise ValueError(f"Unsupported voicing system: {type_name}")
+        return notes
+
+    def build_batch(self, roots=None, chord_types=None, string_set_keys=None, type_names=("V1", "V2")):
+        """Build every voicing of roots x chord types x string sets x V-systems.
+        
+        Args:
+            roots (list): Root notes (default: all 12)
+            chord_types (list): Chord types (default: all)
+            string_set_keys (list): String sets (default: all)
+            type_names (tuple): V-systems to build (default: V1 and V2)
+            
+        Returns:
+            tuple: (unsaved ChordNotes list, number of combinations skipped
+                because 8-string sets can't be stored)
+        """
+        roots = list(range(12)) if roots is None else list(roots)
+        chord_types = list(self.chord_types) if chord_types is None else list(chord_types)
+        string_set_keys = list(self.string_sets) if string_set_keys is None else list(string_set_keys)
+        for string_set_key in string_set_keys:
+            if string_set_key not in self.string_sets:
+                raise ValueError(f"Unsupported string set: {string_set_key}")
+
+        chords = []
+        skipped = 0
+        for type_name in type_names:
+            for chord_type in chord_types:
+                matrix = self.voicing_matrix(chord_type, type_name)
+                for string_set_key in string_set_keys:
+                    strings = self.string_sets[string_set_key]
+                    for root_note in roots:
+                        chord = self._build_chord(
+                            type_name, root_note, chord_type, string_set_key,
+                            matrix[root_note % 12].tolist(), strings
+                        )
+                        if chord is None:
+                            skipped += 1
+                        else:
+                            chords.append(chord)
+        return chords, skipped
+
+    def existing_voicing_keys(self, type_names=("V1", "V2")):
+        """Return the keys (VOICING_KEY_FIELDS) of voicings already stored, in one query."""
+        return set(ChordNotes.objects.filter(
+            category_id=self.category_id, type_name__in=type_names
+        ).order_by().values_list(*VOICING_KEY_FIELDS))
+
+    def generate_batch(self, roots=None, chord_types=None, string_set_keys=None,
+                       type_names=("V1", "V2"), dry_run=False, batch_size=500):
+        """Generate all missing voicings of the given combinations in bulk.
+        
+        The voicings are computed in memory, deduplicated against the stored
+        rows (one query) and against each other, then inserted with their
+        positions in one transaction.
+        
+        Args:
+            roots (list): Root notes (default: all 12)
+            chord_types (list): Chord types (default: all)
+            string_set_keys (list): String sets (default: all)
+            type_names (tuple): V-systems to generate (default: V1 and V2)
+            dry_run (bool): Only compute and count, don't write anything
+            batch_size (int): Rows per INSERT statement
+            
+        Returns:
+            dict: Counts (built, skipped, existing, created, positions) and
+                timings in seconds (build, dedupe, insert)
+        """
+        report = {}
+        started = time.perf_counter()
+        chords, report['skipped'] = self.build_batch(roots, chord_types, string_set_keys, type_names)
+        report['built'] = len(chords)
+        report['build_time'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        seen = self.existing_voicing_keys(type_names)
+        new_chords = []
+        for chord in chords:
+            key = tuple(getattr(chord, field) for field in VOICING_KEY_FIELDS)
+            if key not in seen:
+                seen.add(key)
+                new_chords.append(chord)
+        report['existing'] = len(chords) - len(new_chords)
+        report['dedupe_time'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if dry_run:
+            report['created'] = len(new_chords)
+            report['positions'] = sum(len(build_base_positions(chord)) for chord in new_chords)
+        else:
+            created, positions = bulk_create_chords(new_chords, batch_size=batch_size) if new_chords else ([], [])
+            report['created'] = len(created)
+            report['positions'] = len(positions)
+        report['insert_time'] = time.perf_counter() - started
+        return report
@@ -1,6 +1,7 @@
 from django.http import HttpRequest
 from .models import Notes, NotesCategory
 from .views_base import MusicalTheoryView
+from .cache_utils import conditional_page
 
 
 class ArpeggioView(MusicalTheoryView):
@@ -42,6 +43,8 @@ class ArpeggioView(MusicalTheoryView):
         return params
 
 
+@conditional_page('page:arpeggios', cookies=('stringConfig',), session_keys=('use_optimized_chord_view',),
+                  bypass_params=('optimized',))
 def fretboard_arpeggio_view(request: HttpRequest):
     """
     View function for displaying arpeggios on the fretboard
@@ -5,13 +5,17 @@ from django.utils.datastructures import MultiValueDictKeyError
 
 from .models import Notes, NotesCategory, Root
 from .positions import NotesPosition
-from .note_setup import get_notes_tones
 from .root_note_setup import get_root_note
-from .functionality_tones_setup import get_functionality_tones, get_functionality_pitches, get_functionality_note_names
-from .get_position import get_notes_position
+from .theory_context import TheoryContext
+from .arpeggio_positions import ArpeggioPosition, get_arpeggio_positions
+from .get_position import parse_notes_position
 from .template_notes import ALL_NOTES_POSITION
-from .get_position_dict_scales import get_scale_position_dict, get_transposable_positions, transpose_actual_position, re_ordering_positions
+from .get_position_dict_scales import (
+    get_scale_pitch_positions, get_transposable_pitch_positions, transpose_pitch_positions,
+    re_ordering_pitch_positions, serialize_pitch_positions, use_sharp_spelling,
+)
 from .views_helpers import get_common_context
+from .scale_cache import get_or_build_scale_json
 
 
 class MusicalTheoryView:
@@ -46,7 +50,8 @@ class MusicalTheoryView:
             'root_id': self._get_request_param(request, 'root', 1),
             'category_id': self._get_request_param(request, 'models_select', self.category_id),
             'position_id': self._get_request_param(request, 'position_select', '0'),
-            'notes_options_id': self._get_request_param(request, 'notes_options_select', None)
+            'notes_options_id': self._get_request_param(request, 'notes_options_select', None),
+            'string_count': self._get_string_count(request),
         }
         
         # Apply category-specific defaults
@@ -73,6 +78,10 @@ class MusicalTheoryView:
         except (MultiValueDictKeyError, KeyError):
             return default_value
     
+    def _get_string_count(self, request):
+        """Return the strings (6 or 8) of the stringConfig cookie"""
+        return 8 if request.COOKIES.get('stringConfig', 'six-string') == 'eight-string' else 6
+
     def apply_defaults(self, params):
         """
         Apply category-specific defaults to parameters
@@ -86,7 +95,7 @@ class MusicalTheoryView:
         # Override in subclasses
         return params
     
-    def get_position_data(self, notes_options_id, root_pitch, position_id='0'):
+    def get_position_data(self, notes_options_id, root_pitch, position_id='0', position_options=None):
         """
         Get position data based on notes options and root pitch
         
@@ -94,13 +103,19 @@ class MusicalTheoryView:
             notes_options_id: ID of the selected notes option
             root_pitch: Pitch of the selected root note
             position_id: Selected position ID, '0' for all notes
+            position_options: Already fetched NotesPositions (or generated
+                ArpeggioPositions) to look the position up in before querying it
         
         Returns:
             Position data for the template
         """
         try:
             if position_id != '0':
-                position = get_notes_position(position_id, root_pitch)
+                selected = self.find_position(position_id, position_options)
+                if isinstance(selected, ArpeggioPosition):
+                    position = list(selected.frets)
+                else:
+                    position = parse_notes_position(selected.position, root_pitch)
             else:
                 position = self.all_notes_position
         except ObjectDoesNotExist:
@@ -108,7 +123,46 @@ class MusicalTheoryView:
             
         return position
         
-    def build_position_json(self, selected_notes_name, selected_root_id, root_pitch, tonal_root, selected_root_name, notes_options_id):
+    def find_position(self, position_id, position_options=None):
+        """
+        Return the position of an ID, from position_options if it is there
+
+        Raises:
+            NotesPosition.DoesNotExist: If there is no such position
+        """
+        for option in position_options or ():
+            if str(option.pk) == str(position_id):
+                return option
+        return NotesPosition.objects.get(pk=position_id)
+
+    def build_position_json(self, selected_notes_name, selected_root_id, root_pitch, tonal_root, selected_root_name, notes_options_id, theory=None, string_count=None):
+        """
+        Return position JSON data for the template, from the warm cache if possible
+        
+        Args:
+            selected_notes_name: Name of the selected notes
+            selected_root_id: ID of the selected root
+            root_pitch: Pitch of the selected root note
+            tonal_root: Tonal root offset
+            selected_root_name: Name of the selected root
+            notes_options_id: ID of the selected notes option
+            theory: The request's TheoryContext, if there is one
+            string_count: String configuration to generate arpeggio
+                positions for, None for stored positions only
+        
+        Returns:
+            JSON data for positions
+        """
+        return get_or_build_scale_json(
+            self.category_id, notes_options_id, selected_root_id, tonal_root,
+            lambda: self.compute_position_json(
+                selected_notes_name, selected_root_id, root_pitch,
+                tonal_root, selected_root_name, notes_options_id, theory, string_count
+            ),
+            string_count
+        )
+    
+    def compute_position_json(self, selected_notes_name, selected_root_id, root_pitch, tonal_root, selected_root_name, notes_options_id, theory=None, string_count=None):
         """
         Build position JSON data for the template
         
@@ -119,32 +173,47 @@ class MusicalTheoryView:
             tonal_root: Tonal root offset
             selected_root_name: Name of the selected root
             notes_options_id: ID of the selected notes option
+            theory: The request's TheoryContext for this notes option and
+                root, saves the Notes / Root lookups
+            string_count: String configuration to generate arpeggio
+                positions for, None for stored positions only
         
         Returns:
             JSON data for positions
         """
-        position_json_data = get_scale_position_dict(
+        # Positions are built as integer pitches and only spelled at the end
+        pitch_positions = get_scale_pitch_positions(
             selected_notes_name, 
             selected_root_id, 
             root_pitch, 
             tonal_root, 
-            selected_root_name
+            selected_root_name,
+            string_count
         )
+        use_sharps = use_sharp_spelling(root_pitch, selected_root_name)
         
         # Process position data if we have more than one position and it's not an arpeggio
-        if len(position_json_data) > 1 and self.category_id != 2:
+        if len(pitch_positions) > 1 and self.category_id != 2:
             try:
-                x = Notes.objects.get(id=notes_options_id).note_name
-                y = len(NotesPosition.objects.all().filter(notes_name__note_name=x))
-                transposable_position = get_transposable_positions(y, position_json_data)
-                position_json_data = transpose_actual_position(position_json_data, transposable_position)
-                position_json_data = re_ordering_positions(position_json_data)
+                if theory is not None and isinstance(theory.notes, Notes):
+                    x = theory.notes.note_name
+                else:
+                    x = Notes.objects.get(id=notes_options_id).note_name
+                y = NotesPosition.objects.filter(notes_name__note_name=x).count()
+                transposable_position = get_transposable_pitch_positions(y, pitch_positions)
+                pitch_positions = transpose_pitch_positions(pitch_positions, transposable_position)
+                pitch_positions = re_ordering_pitch_positions(pitch_positions, use_sharps)
             except Notes.DoesNotExist:
                 # Skip position processing for arpeggios or if notes don't exist
                 pass
         
+        position_json_data = serialize_pitch_positions(pitch_positions, use_sharps)
+        
         # Add metadata to position data
-        selected_root_options = get_root_note(root_pitch, tonal_root, selected_root_id)
+        if theory is not None and theory.tonal_root == tonal_root:
+            selected_root_options = theory.root_notes
+        else:
+            selected_root_options = get_root_note(root_pitch, tonal_root, selected_root_id)
         position_json_data["name"] = selected_notes_name
         position_json_data["root"] = selected_root_options
         
@@ -167,62 +236,78 @@ class MusicalTheoryView:
         position_id = params['position_id']
         notes_options_id = params['notes_options_id']
         
-        # Get DB objects
-        root_obj = Root.objects.get(pk=root_id)
+        # Tonal root offset the page is built for
+        tonal_root = 0
+
+        # Selected notes and root with everything derived from them, fetched
+        # once for the whole request
+        theory = TheoryContext.load(notes_options_id, root_id, tonal_root)
+        root_obj = theory.root
         root_pitch = root_obj.pitch
         print(f"[ROOT DEBUG] Context root_id={root_id} -> Root: {root_obj} (pitch={root_pitch})")
         
+        categories = list(NotesCategory.objects.all())
+
         # For arpeggios (category_id=2), use Notes model with arpeggio category
         if int(category_id) == 2:
             # Find arpeggio category
-            arpeggio_category = NotesCategory.objects.filter(category_name__icontains='arpeggio').first()
+            arpeggio_category = next(
+                (category for category in categories if 'arpeggio' in category.category_name.lower()), None
+            )
             if arpeggio_category:
                 notes_options = Notes.objects.filter(category=arpeggio_category)
             else:
                 notes_options = Notes.objects.none()
-            position_options = []  # TODO: implement arpeggio positions
+            # Stored positions win, otherwise they are generated for the
+            # string configuration (memoized, see arpeggio_positions)
+            string_count = params.get('string_count', 6)
+            position_options = list(NotesPosition.objects.filter(notes_name=notes_options_id))
+            if not position_options and theory.intervals:
+                position_options = list(get_arpeggio_positions(tuple(theory.intervals), root_pitch % 12, string_count))
         else:
             # For scales and chords, use Notes
             notes_options = Notes.objects.filter(category_id=category_id)
-            position_options = NotesPosition.objects.filter(notes_name=notes_options_id)
-            
-            # Check if the requested position_id exists within the available options for the selected notes
-            # Fallback to 'All Notes' ('0') if the specific position doesn't exist to prevent DoesNotExist error
-            if position_id != '0' and not position_options.filter(pk=position_id).exists():
-                position_id = '0'
+            position_options = list(NotesPosition.objects.filter(notes_name=notes_options_id))
+            string_count = None
+
+        # Check if the requested position_id exists within the available options for the selected notes
+        # Fallback to 'All Notes' ('0') if the specific position doesn't exist to prevent DoesNotExist error
+        if position_id != '0' and not any(str(option.pk) == str(position_id) for option in position_options):
+            position_id = '0'
         
         # Calculate data for template
-        tonal_root = 0  # Default tonal root
-        tones = get_notes_tones(notes_options_id, root_pitch, tonal_root, root_id)
-        tensions = get_functionality_tones(notes_options_id, root_pitch)
-        root = get_root_note(root_pitch, tonal_root, root_id)
-        position = self.get_position_data(notes_options_id, root_pitch, position_id)
+        tones = theory.tones
+        tensions = theory.tensions
+        root = theory.root_notes
+        position = self.get_position_data(notes_options_id, root_pitch, position_id, position_options)
         
         # Common metadata
-        selected_category_name = NotesCategory.objects.get(pk=category_id).category_name
+        selected_category = next((category for category in categories if str(category.pk) == str(category_id)), None)
+        if selected_category is None:
+            raise NotesCategory.DoesNotExist(f'NotesCategory {category_id} does not exist.')
+        selected_category_name = selected_category.category_name
         selected_root_name = root_obj.name
         selected_root_id = root_obj.id
         
         # Format position name
         if position_id != '0':
-            selected_position_name = NotesPosition.objects.get(pk=position_id).position_order
+            selected_position_name = self.find_position(position_id, position_options).position_order
             selected_position_name = f'Position: {selected_position_name}'
         else:
             selected_position_name = 'All Notes'
             
         # Get the name of the selected notes - Use Notes model for all categories
-        try:
-            selected_notes_name = Notes.objects.get(pk=notes_options_id).note_name
-        except Notes.DoesNotExist:
-            # For arpeggios, try to lookup by ID directly in the get_scale_position_dict function
-            if int(category_id) == 2:
-                selected_notes_name = str(notes_options_id)  # Pass the ID directly to get_scale_position_dict
-            else:
-                selected_notes_name = "Unknown"
+        if isinstance(theory.notes, Notes):
+            selected_notes_name = theory.notes.note_name
+        # For arpeggios, try to lookup by ID directly in the get_scale_position_dict function
+        elif int(category_id) == 2:
+            selected_notes_name = str(notes_options_id)  # Pass the ID directly to get_scale_position_dict
+        else:
+            selected_notes_name = "Unknown"
         
         # Prepare functionality data
-        note_names = get_functionality_note_names(notes_options_id, root_pitch, tonal_root, root_id)
-        tension_pitches = get_functionality_pitches(notes_options_id, root_pitch)
+        note_names = theory.note_names
+        tension_pitches = theory.tension_pitches
         
         # Build JSON data
         tensions_json_data = {"tensions": tensions}
@@ -237,7 +322,9 @@ class MusicalTheoryView:
             root_pitch,
             tonal_root,
             selected_root_name,
-            notes_options_id
+            notes_options_id,
+            theory,
+            string_count
         )
         
         # String names (mirror-reversed for the template)
@@ -253,7 +340,7 @@ class MusicalTheoryView:
             'root_options': Root.objects.all(),
             'position_options': position_options,
             'position': position,
-            'category': NotesCategory.objects.all(),
+            'category': categories,
             'selected_category': int(category_id),
             'notes_options': notes_options,
             'selected_notes': int(notes_options_id),
@@ -266,6 +353,7 @@ class MusicalTheoryView:
             'selected_category_name': selected_category_name,
             'selected_notes_name': selected_notes_name,
             'string_names': string_names,
+            'theory': theory,
         }
         
         # Add common context from helper
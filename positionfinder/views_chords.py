@@ -7,14 +7,15 @@ from django.conf import settings
 
 # Model imports
 from .models import Root, NotesCategory
-from .models_chords import ChordNotes, ChordPosition
+from .models_chords import ChordNotes
 
 # Helper function imports
 from .root_chord_note_setup import get_root_note # Used in functional view, might not be needed directly in CBV context building
-from .get_position_dict_chords import get_position_dict
-from .note_validation import validate_and_filter_note_positions # Import validation function
 from .views_helpers import get_common_context # Use current helper function
 from .views_base import MusicalTheoryView # Import base class
+from .cache_utils import conditional_page, get_or_set
+from .chord_catalog import get_chord_catalog
+from .voicing_difficulty import rank_by_difficulty, parse_max_difficulty
 
 import re # Import regex for natural sorting
 
@@ -321,6 +322,12 @@ class ChordView(MusicalTheoryView):
         params['chord_select_name'] = self._get_request_param(request, 'chords_options_select', 'Major') # Default from functional view was Major
         params['selected_range'] = self._get_request_param(request, 'note_range', 'e - g') # Default range
         params['position_select'] = self._get_request_param(request, 'position_select', 'Root Position') # Default from functional view
+        # Optional inversion ordering / filtering by the stored difficulty scores
+        params['inversion_sort'] = self._get_request_param(request, 'inversion_sort')
+        try:
+            params['max_difficulty'] = parse_max_difficulty(self._get_request_param(request, 'max_difficulty'))
+        except ValueError:
+            params['max_difficulty'] = None
         
         # Check for string configuration (6 or 8 string)
         # First try to get from cookie
@@ -421,19 +428,9 @@ class ChordView(MusicalTheoryView):
             chord_name: The chord name
             is_six_string: If True, filter out 8-string specific ranges
         """
-        range_options_queryset = ChordNotes.objects.filter(
-            type_name=type_name,
-            chord_name=chord_name
-        ).order_by('ordering', 'range_ordering')
-        
-        # Filter out 8-string specific ranges if in 6-string mode
-        if is_six_string:
-            # Exclude ranges containing 'highA' or 'lowB'
-            range_options_queryset = range_options_queryset.exclude(
-                range__contains='highA'
-            ).exclude(
-                range__contains='lowB'
-            )
+        range_options_queryset = get_chord_catalog().get_range_options(
+            type_name, chord_name, is_six_string
+        )
 
         def get_sort_key(range_option):
             range_value = range_option.range
@@ -451,34 +448,19 @@ class ChordView(MusicalTheoryView):
         Generates the dictionary of inversion data for a specific range.
         Mirrors the inner loop (lines 407-428) of the functional view.
         """
-        range_data = {} # Holds data for all inversions within this range
         if not position_options:
              return {}
 
-        for position in position_options:
-            inversion_name = position.inversion_order
-            try:
-                # Get the position dictionary from the helper function
-                position_dict = get_position_dict(
-                    inversion_name,
-                    chord_name,
-                    current_range_value,
-                    type_name,
-                    root_pitch,
-                    tonal_root,
-                    selected_root_name
-                )
-
-                # Apply validation (ensure this function exists and is imported)
-                validated_position = validate_and_filter_note_positions(position_dict)
-
-                # Store validated data directly as an object, not wrapped in a list
-                range_data[inversion_name] = validated_position
-
-            except Exception as e:
-                range_data[inversion_name] = {} # Add empty dict placeholder on error
-
-        return range_data
+        inversion_names = [position.inversion_order for position in position_options]
+        return get_chord_catalog().get_inversion_data(
+            inversion_names,
+            chord_name,
+            current_range_value,
+            type_name,
+            root_pitch,
+            tonal_root,
+            selected_root_name
+        )
 
     # --- Main Context Building Method ---
     def get_context(self, request):
@@ -506,40 +488,38 @@ class ChordView(MusicalTheoryView):
 
         # Fetch the initial ChordNotes object based on selected type/name/range
         # This determines the initial tonal_root and the set of positions (inversions)
+        catalog = get_chord_catalog()
         try:
-            # Prioritize exact match for type, name, and selected range
-            initial_chord_object = ChordNotes.objects.filter(
-                type_name=type_id,
-                chord_name=chord_select_name,
-                range=selected_range_value
-            ).first()
-
-            # Fallback if no match for the specific range
-            if not initial_chord_object:
-                initial_chord_object = ChordNotes.objects.filter(
-                    type_name=type_id,
-                    chord_name=chord_select_name
-                ).first()
-
-            # Further fallback if still no match
+            # Exact match for type, name and selected range, falling back to
+            # any range of the chord, any chord of the type, then any chord
+            initial_chord_object = catalog.find_chord(type_id, chord_select_name, selected_range_value)
             if not initial_chord_object:
-                 initial_chord_object = ChordNotes.objects.filter(type_name=type_id).first()
-
-            # Ultimate fallback
-            if not initial_chord_object:
-                 initial_chord_object = ChordNotes.objects.first()
-                 if not initial_chord_object:
-                      raise Http404("No ChordNotes found in the database.") # Critical error if DB is empty
+                 raise Http404("No ChordNotes found in the database.") # Critical error if DB is empty
 
             tonal_root = initial_chord_object.tonal_root
             # Fetch position options (inversions) based on this initial object
-            position_options = list(ChordPosition.objects.filter(notes_name_id=initial_chord_object.id))
+            position_options = catalog.get_positions(initial_chord_object.id)
+            position_scores = catalog.get_inversion_scores(
+                initial_chord_object.id,
+                [position.inversion_order for position in position_options],
+                root_pitch
+            )
+            position_difficulty = {
+                position.inversion_order: score._asdict()
+                for position, score in zip(position_options, position_scores) if score
+            }
+            if params['inversion_sort'] == 'difficulty' or params['max_difficulty'] is not None:
+                position_options = rank_by_difficulty(
+                    position_options, position_scores, params['max_difficulty'],
+                    sort=params['inversion_sort'] == 'difficulty'
+                )
 
         except Exception as e:
             # Handle error gracefully, maybe set defaults or raise 404
             initial_chord_object = None
             tonal_root = 0
             position_options = []
+            position_difficulty = {}
             # Consider raising Http404 if essential data is missing
 
         # Get string config mode (6 or 8 string)
@@ -562,23 +542,26 @@ class ChordView(MusicalTheoryView):
             "note_range": selected_range_value # The initially selected range
         }
 
-        # Outer loop: Iterate through all available ranges for this chord
-        for range_option in range_options:
-            current_range_value = range_option.range
-            # Call helper to get inversion data for this specific range
-            # Pass the *consistent* position_options list and tonal_root
-            inversion_data_for_range = self.get_inversion_data_for_range(
-                position_options,
+        # Build the inversion data of every available range in one pass
+        # Pass the *consistent* position_options list and tonal_root
+        inversion_names = [position.inversion_order for position in position_options]
+        range_names = [range_option.range for range_option in range_options]
+        final_chord_json_data.update(get_or_set(
+            'chord_json',
+            # Lists joined, their order is the order of the JSON
+            [('inversions', '|'.join(inversion_names)), ('chord', chord_select_name),
+             ('ranges', '|'.join(range_names)), ('type', type_id), ('root_pitch', root_pitch),
+             ('tonal_root', tonal_root), ('root', selected_root_name)],
+            lambda: catalog.get_chord_json_data(
+                inversion_names,
                 chord_select_name,
-                current_range_value,
+                range_names,
                 type_id, # Use the selected type_id
                 root_pitch,
                 tonal_root, # Use the consistent tonal_root
                 selected_root_name
             )
-            # --- DEBUG: Log inversion data for this range ---
-            print(f"[VSystemDebug] Range: {current_range_value} inversion_data_for_range: {inversion_data_for_range}")
-            final_chord_json_data[current_range_value] = inversion_data_for_range
+        ))
 
         # --- DEBUG: Log final chord_json_data structure ---
         print(f"[VSystemDebug] final_chord_json_data: {json.dumps(final_chord_json_data, indent=2)}")
@@ -638,6 +621,7 @@ class ChordView(MusicalTheoryView):
             'selected_category': category_id,
             'category': category_objects,
             'position_options': position_options, # Pass the list of position objects
+            'position_difficulty': position_difficulty, # Inversion name -> difficulty scores in this key
             'range_options': range_options,
             'chord_type_options': type_options, # Use the key expected by the template
             'chord_json_data': json.dumps(final_chord_json_data),
@@ -782,6 +766,8 @@ class ChordView(MusicalTheoryView):
         print(f"DEBUG: Returning chord function: '{result}' for chord: '{chord_name}'")
         return result
 
+@conditional_page('page:chords', cookies=('stringConfig',), session_keys=('use_optimized_chord_view',),
+                  bypass_params=('optimized',))
 def fretboard_chords_view(request: HttpRequest):
     """
     View function for displaying chords on the fretboard using ChordView.
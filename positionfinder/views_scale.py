@@ -1,7 +1,9 @@
 from django.http import HttpRequest
 
 from .views_base import MusicalTheoryView
-from .models_chords import ChordNotes
+from .cache_utils import conditional_page
+from .models import Notes
+from .menu_index import get_menu_index
 
 
 class ScaleView(MusicalTheoryView):
@@ -41,15 +43,17 @@ class ScaleView(MusicalTheoryView):
         Returns:
             Updated context dictionary with scale-specific variables
         """
-        # Add chord name if available
-        try:
-            context['chord_name'] = context['notes_options'].get(pk=params['notes_options_id']).chords
-        except:
+        # Add chord name if available (the selected notes, if they are one of the options)
+        notes = context['theory'].notes
+        if isinstance(notes, Notes) and str(notes.category_id) == str(params['category_id']):
+            context['chord_name'] = notes.chords
+        else:
             context['chord_name'] = ''
             
         # Check for V1/V2 data existence for the unified menu
-        v1_data_exists = ChordNotes.objects.filter(type_name='V1').exists()
-        v2_data_exists = ChordNotes.objects.filter(type_name='V2').exists()
+        chord_types = get_menu_index().chord_names
+        v1_data_exists = 'V1' in chord_types
+        v2_data_exists = 'V2' in chord_types
         
         context['v1_data_exists'] = v1_data_exists
         context['v2_data_exists'] = v2_data_exists
@@ -57,6 +61,7 @@ class ScaleView(MusicalTheoryView):
         return context
 
 
+@conditional_page('page:scales', session_keys=('use_optimized_chord_view',), bypass_params=('optimized',))
 def fretboard_scale_view(request: HttpRequest):
     """
     View function for displaying scales on the fretboard
@@ -3,7 +3,7 @@ import logging
 import traceback
 from django.shortcuts import render
 from django.http import JsonResponse
-from django.db.models import Q
+from django.db.models import Q, prefetch_related_objects
 from django.db import connection
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
@@ -290,9 +290,13 @@ def process_chord_results(queryset, root_note=None):
     if prioritized:
         logger.debug(f"Prioritized e-string voicings: {len(prioritized)} matches.")
         chords_to_process = prioritized
+    # Positions from the chord catalog and categories in one query, not per chord
+    from .improved_chord_search import get_inversion_orders
+    prefetch_related_objects(chords_to_process, 'category')
+    inversion_orders = get_inversion_orders([chord.id for chord in chords_to_process])
     processed_results = []
     for chord in chords_to_process:
-        positions = list(ChordPosition.objects.filter(notes_name=chord).values_list('inversion_order', flat=True))
+        positions = inversion_orders[chord.id]
         notes = []
         for note_attr in ['first_note', 'second_note', 'third_note', 'fourth_note', 'fifth_note', 'sixth_note']:
             note_value = getattr(chord, note_attr, None)
@@ -0,0 +1,229 @@
+"""
+Voice-leading solver over the chord voicing catalog.
+
+Picks one voicing per chord of a progression so that the voices move as
+little as possible. Every ChordPosition is a candidate for its chord name,
+whatever its type (triads, spread triads, V-systems), range or inversion.
+
+The VoicingIndex holds, for every voicing in all twelve keys, the frets the
+chord pages show (voicing_difficulty.voicing_frets), the voices as sorted
+absolute pitches and the lowest fret, so solving a progression is a
+handful of numpy operations per chord change:
+
+    movement(a, b) = sum |voice_i(a) - voice_i(b)|
+                     + HAND_WEIGHT * |lowest fret(a) - lowest fret(b)|
+
+with voices paired from the lowest up (the top voice of a smaller voicing
+is repeated). A dynamic program over the candidate x candidate movement
+matrices finds the sequence with the least total movement.
+"""
+import threading
+from collections import namedtuple
+
+import numpy
+
+from .chord_catalog import get_chord_catalog
+from .fretboard_model import EIGHT_STRING_STRINGS, SIX_STRING_STRINGS
+from .instrumentation import instrumented
+from .voicing_difficulty import STRING_NAMES, OPEN_PITCHES, voicing_frets
+
+# Weight of moving the hand, per fret of the lowest fretted note
+HAND_WEIGHT = 0.5
+
+MAX_PROGRESSION_CHORDS = 64
+
+VoicingRecord = namedtuple('VoicingRecord', ['position_id', 'chord_id', 'type_name', 'chord_name', 'range',
+                                             'inversion'])
+
+_EXTRA_STRINGS = [string for string in EIGHT_STRING_STRINGS if string not in SIX_STRING_STRINGS]
+
+
+def string_mask(strings):
+    """Return the bitmask (bit = index into STRING_NAMES) of string names."""
+    mask = 0
+    for string in strings:
+        if string not in STRING_NAMES:
+            raise ValueError(f'Unknown string {string}')
+        mask |= 1 << STRING_NAMES.index(string)
+    return mask
+
+
+class VoicingIndex:
+    """
+    Fret and pitch vectors of every catalog voicing in every key.
+
+    Attributes:
+        records: VoicingRecord of every voicing
+        string_indexes: voicings x 6 indexes into STRING_NAMES, -1 unused
+        frets: voicings x 12 roots x 6 displayed frets, -1 unused
+        voices: voicings x 12 x 6 absolute pitches, ascending, padded with
+            the top voice
+        voice_counts: voicings array of notes per voicing
+        lowest, highest: voicings x 12 lowest / highest fret
+        string_masks: voicings array of used string bitmasks
+        by_chord_name: chord name -> array of voicing rows
+    """
+
+    def __init__(self, catalog):
+        self.records = []
+        rows = []
+        string_index = {string: index for index, string in enumerate(STRING_NAMES)}
+        for chord in catalog.chords:
+            for position in catalog.get_positions(chord.id):
+                self.records.append(VoicingRecord(position.id, chord.id, chord.type_name, chord.chord_name,
+                                                  chord.range, position.inversion_order))
+                rows.append((chord, position))
+
+        relative_pitches = numpy.full((len(rows), 6), -1)
+        self.string_indexes = numpy.full((len(rows), 6), -1)
+        for row, (chord, position) in enumerate(rows):
+            for column, (note, string, offset) in enumerate(zip(chord.notes, chord.strings, position.offsets)):
+                if note is not None and string in string_index:
+                    relative_pitches[row, column] = (note + (offset or 0)) % 12
+                    self.string_indexes[row, column] = string_index[string]
+
+        self.frets = voicing_frets(relative_pitches, self.string_indexes) if rows else numpy.zeros((0, 12, 6), int)
+        used = self.frets >= 0
+        pitches = numpy.where(used, OPEN_PITCHES[numpy.maximum(self.string_indexes, 0)][:, None, :] + self.frets,
+                              numpy.iinfo(int).max)
+        pitches.sort(axis=2)
+        self.voice_counts = (self.string_indexes >= 0).sum(axis=1)
+        top = numpy.take_along_axis(pitches, numpy.maximum(self.voice_counts - 1, 0)[:, None, None], axis=2)
+        self.voices = numpy.where(numpy.arange(6)[None, None, :] < self.voice_counts[:, None, None], pitches, top)
+        self.lowest = numpy.where(used, self.frets, numpy.iinfo(int).max).min(axis=2)
+        self.highest = self.frets.max(axis=2)
+        self.string_masks = numpy.array([
+            sum(1 << index for index in indexes if index >= 0) for indexes in self.string_indexes.tolist()
+        ], dtype=int)
+
+        by_chord_name = {}
+        for row, record in enumerate(self.records):
+            by_chord_name.setdefault(record.chord_name, []).append(row)
+        self.by_chord_name = {name: numpy.array(chord_rows) for name, chord_rows in by_chord_name.items()}
+
+    def candidates(self, chord_name, root_pitch, types=None, strings_mask=None, max_fret=None):
+        """
+        Return the voicing rows a chord may be played with.
+
+        Args:
+            chord_name: ChordNotes chord name
+            root_pitch: Root pitch (class)
+            types: Allowed type names (e.g. V-systems), None for all
+            strings_mask: Bitmask of the strings voicings may use, None for all
+            max_fret: Highest fret voicings may reach, None for no limit
+        """
+        rows = self.by_chord_name.get(chord_name)
+        if rows is None:
+            return numpy.zeros(0, dtype=int)
+        keep = numpy.ones(len(rows), dtype=bool)
+        if types is not None:
+            keep &= numpy.array([self.records[row].type_name in types for row in rows.tolist()], dtype=bool)
+        if strings_mask is not None:
+            keep &= (self.string_masks[rows] & ~strings_mask) == 0
+        if max_fret is not None:
+            keep &= self.highest[rows, root_pitch % 12] <= max_fret
+        return rows[keep]
+
+    def solve(self, chords, types=None, strings=None, max_fret=None, string_count=6):
+        """
+        Find the voicings of a progression with the least total movement.
+
+        Args:
+            chords: Sequence of (root pitch, chord name)
+            types: Allowed type names, None for all
+            strings: Strings voicings may use, None for every string of the
+                string configuration
+            max_fret: Highest fret voicings may reach
+            string_count: 6 or 8
+
+        Returns:
+            Dict with 'movement' (total) and 'voicings', one dict per chord
+            with the record fields, its 'frets' (string -> fret) and the
+            'movement' from the previous voicing
+
+        Raises:
+            ValueError: If a chord has no voicing satisfying the constraints,
+                or the progression is longer than MAX_PROGRESSION_CHORDS
+        """
+        if len(chords) > MAX_PROGRESSION_CHORDS:
+            raise ValueError(f'At most {MAX_PROGRESSION_CHORDS} chords per progression')
+        if isinstance(types, str):
+            types = [types]
+        if isinstance(strings, str):
+            strings = [strings]
+        if strings is None:
+            strings = SIX_STRING_STRINGS if int(string_count) == 6 else EIGHT_STRING_STRINGS
+        elif int(string_count) == 6:
+            strings = [string for string in strings if string not in _EXTRA_STRINGS]
+        mask = string_mask(strings)
+        types = set(types) if types is not None else None
+
+        steps = []
+        for root_pitch, chord_name in chords:
+            rows = self.candidates(chord_name, root_pitch, types, mask, max_fret)
+            if not len(rows):
+                raise ValueError(f'No voicing of {chord_name} satisfies the constraints')
+            steps.append((root_pitch % 12, rows))
+        if not steps:
+            return {'movement': 0, 'voicings': []}
+
+        width = max(int(self.voice_counts[rows].max()) for _, rows in steps)
+        cost = numpy.zeros(len(steps[0][1]))
+        back = []
+        for (previous_root, previous), (root, current) in zip(steps, steps[1:]):
+            # previous candidates x current candidates movement matrix
+            voices_a = self.voices[previous, previous_root, :width]
+            voices_b = self.voices[current, root, :width]
+            movement = numpy.abs(voices_a[:, None, :] - voices_b[None, :, :]).sum(axis=2)
+            movement = movement + HAND_WEIGHT * numpy.abs(
+                self.lowest[previous, previous_root][:, None] - self.lowest[current, root][None, :])
+            total = cost[:, None] + movement
+            best = total.argmin(axis=0)
+            back.append((best, movement[best, numpy.arange(len(current))]))
+            cost = total[best, numpy.arange(len(current))]
+
+        choice = int(cost.argmin())
+        picks = [choice]
+        moves = []
+        for best, movement in reversed(back):
+            moves.append(float(movement[picks[-1]]))
+            picks.append(int(best[picks[-1]]))
+        picks.reverse()
+        moves = [0.0] + list(reversed(moves))
+
+        voicings = []
+        for (root, rows), pick, move in zip(steps, picks, moves):
+            row = int(rows[pick])
+            frets = {
+                STRING_NAMES[string]: int(fret)
+                for string, fret in zip(self.string_indexes[row].tolist(), self.frets[row, root].tolist())
+                if string >= 0
+            }
+            voicings.append(dict(self.records[row]._asdict(), frets=frets, movement=round(move, 2)))
+        return {'movement': round(float(cost[choice]), 2), 'voicings': voicings}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_voicing_index():
+    """Return the voicing index of the current catalog version, building it if needed."""
+    global _index
+    catalog = get_chord_catalog()
+    index = _index
+    if index is None or index.version != catalog.version:
+        with _index_lock:
+            index = _index
+            if index is None or index.version != catalog.version:
+                index = VoicingIndex(catalog)
+                index.version = catalog.version
+                _index = index
+    return index
+
+
+@instrumented('voice_leading')
+def solve_voice_leading(chords, types=None, strings=None, max_fret=None, string_count=6):
+    """Solve a progression on the current catalog (see VoicingIndex.solve)."""
+    return get_voicing_index().solve(chords, types=types, strings=strings, max_fret=max_fret,
+                                     string_count=string_count)
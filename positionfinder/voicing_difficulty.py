@@ -0,0 +1,223 @@
+"""
+Vectorized voicing difficulty scores.
+
+Every inversion of every chord is scored in all twelve keys in one numpy
+pass, on the frets the chord pages actually show (the lowest fret of each
+note, moved up an octave like VoicingTemplate does when adjacent notes lie
+six or more frets apart):
+
+- fret_span: highest minus lowest fret
+- string_span: strings from the lowest to the highest used string, skipped
+  strings included
+- finger_count: distinct frets to hold down (notes on one fret share a
+  finger / barre)
+- position_height: lowest fret of the voicing
+- difficulty: weighted sum of the physical stretch (fret spacing shrinks up
+  the neck), skipped strings and fingers
+
+The scores are stored in VoicingScore (update_voicing_scores, the
+score_voicings command) and served from the chord catalog, so pages and the
+API sort or filter inversions without computing anything per request.
+"""
+from collections import namedtuple
+
+import numpy
+from django.db import transaction
+
+from .fretboard_model import OPEN_STRING_PITCHES, MIN_FRET, MAX_FRET
+from .models_chords import ChordNotes, ChordPosition, VoicingScore, _chord_data_bulk_changed
+
+STRING_NAMES = list(OPEN_STRING_PITCHES)
+OPEN_PITCHES = numpy.array([OPEN_STRING_PITCHES[string] for string in STRING_NAMES])
+# Rank of every string from the lowest to the highest sounding one
+STRING_RANKS = numpy.argsort(numpy.argsort(OPEN_PITCHES))
+
+# Difficulty = STRETCH_WEIGHT * stretch in first-fret widths
+#            + SKIP_WEIGHT * strings skipped between used strings
+#            + FINGER_WEIGHT * fingers needed
+STRETCH_WEIGHT = 1.0
+SKIP_WEIGHT = 0.5
+FINGER_WEIGHT = 0.5
+
+SCORE_FIELDS = ['fret_span', 'string_span', 'finger_count', 'position_height', 'difficulty']
+
+DifficultyScore = namedtuple('DifficultyScore', SCORE_FIELDS)
+
+
+def voicing_frets(relative_pitches, string_indexes):
+    """
+    Compute the displayed frets of voicings in every key.
+
+    Args:
+        relative_pitches: voicings x 6 pitch classes relative to the root, -1 unused
+        string_indexes: voicings x 6 indexes into STRING_NAMES, -1 unused
+
+    Returns:
+        voicings x 12 roots x 6 array of frets, -1 for unused notes
+    """
+    present = (relative_pitches >= 0) & (string_indexes >= 0)
+    open_pitch_classes = OPEN_PITCHES[numpy.maximum(string_indexes, 0)] % 12
+    roots = numpy.arange(12)
+    lowest = (relative_pitches[:, None, :] + roots[None, :, None] - open_pitch_classes[:, None, :]) % 12
+    lowest = numpy.where(lowest < MIN_FRET, lowest + 12, lowest)
+
+    # Move the used notes to the front (stable), so neighbours in note order
+    # are neighbours in the array, and look for jumps of six frets or more
+    order = numpy.argsort(~present, axis=1, kind='stable')
+    packed = numpy.take_along_axis(lowest, order[:, None, :], axis=2)
+    counts = present.sum(axis=1)
+    neighbours = numpy.arange(1, 6)[None, :] < counts[:, None]
+    jumps = (numpy.abs(numpy.diff(packed, axis=2)) >= 6) & neighbours[:, None, :]
+    octave_up = jumps.any(axis=2)[:, :, None] & (lowest + 12 <= MAX_FRET)
+    frets = numpy.where(octave_up, lowest + 12, lowest)
+    return numpy.where(present[:, None, :], frets, -1)
+
+
+def score_frets(frets, string_indexes):
+    """
+    Score voicings from their frets.
+
+    Args:
+        frets: voicings x 12 x 6 frets from voicing_frets, -1 unused
+        string_indexes: voicings x 6 indexes into STRING_NAMES, -1 unused
+
+    Returns:
+        Dict SCORE_FIELDS name -> voicings x 12 array (0 for empty voicings)
+    """
+    used = frets >= 0
+    any_used = used.any(axis=2)
+    highest = numpy.where(used, frets, -1).max(axis=2)
+    lowest = numpy.where(used, frets, MAX_FRET + 12).min(axis=2)
+    fret_span = numpy.where(any_used, highest - lowest, 0)
+    position_height = numpy.where(any_used, lowest, 0)
+
+    ranks = numpy.where(string_indexes >= 0, STRING_RANKS[numpy.maximum(string_indexes, 0)], -1)
+    ranks = numpy.broadcast_to(ranks[:, None, :], frets.shape)
+    high_rank = numpy.where(used, ranks, -1).max(axis=2)
+    low_rank = numpy.where(used, ranks, len(STRING_NAMES)).min(axis=2)
+    string_span = numpy.where(any_used, high_rank - low_rank + 1, 0)
+
+    # Distinct frets: count the steps of the sorted frets, unused ones sort last
+    ordered = numpy.sort(numpy.where(used, frets, MAX_FRET + 12), axis=2)
+    steps = (ordered[:, :, 1:] != ordered[:, :, :-1]) & (ordered[:, :, 1:] <= MAX_FRET)
+    finger_count = numpy.where(any_used, steps.sum(axis=2) + 1, 0)
+
+    # Distance of fret f from the nut is 1 - 2 ** (-f / 12) scale lengths
+    def distance(fret):
+        return 1 - numpy.exp2(-fret / 12)
+    stretch = (distance(highest) - distance(lowest)) / distance(1)
+    stretch = numpy.where(any_used, stretch, 0)
+    skipped = numpy.maximum(string_span - used.sum(axis=2), 0)
+    difficulty = numpy.round(
+        STRETCH_WEIGHT * stretch + SKIP_WEIGHT * skipped + FINGER_WEIGHT * finger_count, 2)
+    return {
+        'fret_span': fret_span,
+        'string_span': string_span,
+        'finger_count': finger_count,
+        'position_height': position_height,
+        'difficulty': difficulty,
+    }
+
+
+def score_voicings(chords, positions):
+    """
+    Score voicings in all twelve keys.
+
+    Args:
+        chords: Dict chord id -> (six note intervals, six string names)
+        positions: (position id, chord id, six inversion offsets) per voicing
+
+    Returns:
+        Dict position id -> tuple of 12 DifficultyScores, indexed by root pitch
+    """
+    if not positions:
+        return {}
+    string_index = {string: index for index, string in enumerate(STRING_NAMES)}
+    relative_pitches = numpy.full((len(positions), 6), -1)
+    string_indexes = numpy.full((len(positions), 6), -1)
+    for row, (_, chord_id, offsets) in enumerate(positions):
+        notes, strings = chords[chord_id]
+        for column, (note, string, offset) in enumerate(zip(notes, strings, offsets)):
+            if note is not None and string in string_index:
+                relative_pitches[row, column] = (note + (offset or 0)) % 12
+                string_indexes[row, column] = string_index[string]
+
+    scores = score_frets(voicing_frets(relative_pitches, string_indexes), string_indexes)
+    columns = [scores[name].tolist() for name in SCORE_FIELDS]
+    return {
+        position_id: tuple(DifficultyScore(*(column[row][root] for column in columns)) for root in range(12))
+        for row, (position_id, _, _) in enumerate(positions)
+    }
+
+
+def rank_by_difficulty(items, scores, max_difficulty=None, sort=True):
+    """
+    Order and filter items (inversions) by their difficulty.
+
+    Args:
+        items: Items to rank
+        scores: DifficultyScore (or None if unknown) of every item
+        max_difficulty: Drop items harder than this, and items without a score
+        sort: Order the items from easiest to hardest (stable, unscored last)
+
+    Returns:
+        List of the kept items
+    """
+    ranked = list(zip(items, scores))
+    if max_difficulty is not None:
+        ranked = [(item, score) for item, score in ranked
+                  if score is not None and score.difficulty <= max_difficulty]
+    if sort:
+        ranked.sort(key=lambda pair: (pair[1] is None, pair[1].difficulty if pair[1] else 0))
+    return [item for item, _ in ranked]
+
+
+def parse_max_difficulty(value):
+    """
+    Parse a max_difficulty request parameter.
+
+    Returns:
+        The limit as a float, None when the parameter is empty
+
+    Raises:
+        ValueError: If the value is not a number
+    """
+    if value in (None, ''):
+        return None
+    return float(value)
+
+
+def update_voicing_scores(chord_ids=None, batch_size=2000):
+    """
+    Recompute and store the VoicingScores of chords.
+
+    Args:
+        chord_ids: ChordNotes ids to rescore, None for the whole catalog
+        batch_size: Rows per bulk insert
+
+    Returns:
+        Number of VoicingScore rows written
+    """
+    chord_columns = ['id', *ChordNotes.NOTE_FIELDS, *(f'{field}_string' for field in ChordNotes.NOTE_FIELDS)]
+    chord_rows = ChordNotes.objects.order_by().values_list(*chord_columns)
+    position_rows = ChordPosition.objects.order_by('pk').values_list('id', 'notes_name_id', *ChordNotes.NOTE_FIELDS)
+    if chord_ids is not None:
+        chord_rows = chord_rows.filter(id__in=chord_ids)
+        position_rows = position_rows.filter(notes_name_id__in=chord_ids)
+    chords = {row[0]: (row[1:7], row[7:13]) for row in chord_rows}
+    positions = [(row[0], row[1], row[2:8]) for row in position_rows]
+    scores = score_voicings(chords, positions)
+
+    with transaction.atomic():
+        stale = VoicingScore.objects.all()
+        if chord_ids is not None:
+            stale = stale.filter(position__notes_name_id__in=chord_ids)
+        stale.delete()
+        VoicingScore.objects.bulk_create([
+            VoicingScore(position_id=position_id, root_pitch=root, **score._asdict())
+            for position_id, by_root in scores.items()
+            for root, score in enumerate(by_root)
+        ], batch_size=batch_size)
+    # bulk writes send no signals
+    _chord_data_bulk_changed()
+    return 12 * len(scores)
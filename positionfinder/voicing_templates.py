@@ -0,0 +1,119 @@
+"""
+Root-independent chord voicing templates.
+
+A voicing (ChordNotes intervals + string assignments + ChordPosition
+inversion offsets) always produces the same pitch classes, tensions and
+root flags relative to the chord root. VoicingTemplate computes those once;
+transposing to a concrete root is then a table lookup per note, and every
+(root pitch, spelling) result is memoized on the template.
+"""
+from functools import lru_cache
+
+from .template_notes import TENSIONS
+from .fretboard_model import EIGHT_STRING_FRETBOARD, spell_tone
+
+
+def _build_string_tables():
+    """
+    Build per-string lookup tables from the fretboard model.
+
+    Returns:
+        Dict string -> (flat table, sharp table); each table holds, per pitch
+        class, the tuple (lowest fret, default tone, alternate-octave tone).
+    """
+    tables = {}
+    for string in EIGHT_STRING_FRETBOARD.strings:
+        spelled = []
+        for use_sharps in (False, True):
+            table = []
+            for pitch_class in range(12):
+                pitches = EIGHT_STRING_FRETBOARD.pitches_for_pitch_class(string, pitch_class)
+                frets = EIGHT_STRING_FRETBOARD.frets_for_pitch_class(string, pitch_class)
+                tones = [spell_tone(pitch, use_sharps) for pitch in pitches]
+                table.append((frets[0], tones[0], tones[1] if len(tones) > 1 else tones[0]))
+            spelled.append(tuple(table))
+        tables[string] = tuple(spelled)
+    return tables
+
+
+STRING_TABLES = _build_string_tables()
+
+
+class VoicingTemplate:
+    """
+    Root-relative description of a single chord voicing.
+
+    Each entry of `notes` is (string, pitch class relative to the root,
+    tension label, is_root). Strings that are not on the fretboard are kept
+    out of the result, exactly like get_position_dict does.
+    """
+
+    def __init__(self, chord_notes, chord_strings, chord_offsets):
+        """
+        Args:
+            chord_notes: The six note intervals of a ChordNotes row (None if unused)
+            chord_strings: The six string assignments of a ChordNotes row
+            chord_offsets: The six inversion offsets of a ChordPosition row
+        """
+        notes = []
+        for note_value, string, offset in zip(chord_notes, chord_strings, chord_offsets):
+            if note_value is None:
+                continue
+            relative_pitch = (note_value + offset) % 12
+            notes.append((string, relative_pitch, TENSIONS[relative_pitch], relative_pitch == 0))
+        self.notes = tuple(notes)
+        self._transpositions = {}
+
+    def transpose(self, root_pitch, use_sharps):
+        """
+        Return the position dictionary of this voicing for a concrete root.
+
+        Args:
+            root_pitch: Pitch of the selected root (0-11)
+            use_sharps: Spell notes with sharps instead of flats
+
+        Returns:
+            Position dictionary keyed by string name plus 'assigned_strings'
+        """
+        key = (root_pitch % 12, bool(use_sharps))
+        position = self._transpositions.get(key)
+        if position is None:
+            position = self._build(*key)
+            self._transpositions[key] = position
+        # Hand out copies so callers can't alter the memoized result
+        return {string: list(value) for string, value in position.items()}
+
+    def _build(self, root_pitch, use_sharps):
+        lookups = []
+        for string, relative_pitch, tension, is_root in self.notes:
+            tables = STRING_TABLES.get(string)
+            entry = tables[use_sharps][(relative_pitch + root_pitch) % 12] if tables else None
+            lookups.append((string, entry, tension, is_root))
+
+        # Frets far apart on adjacent notes call for the alternate octave
+        frets = [entry[0] for _, entry, _, _ in lookups if entry]
+        needs_octave_adjustment = any(
+            abs(later - earlier) >= 6 for earlier, later in zip(frets, frets[1:])
+        )
+
+        position = {}
+        assigned_strings = []
+        for string, entry, tension, is_root in lookups:
+            if not entry:
+                continue
+            assigned_strings.append(string)
+            note_name = entry[2] if needs_octave_adjustment else entry[1]
+            position[string] = [note_name, tension, True, is_root]
+        position['assigned_strings'] = assigned_strings
+        return position
+
+
+@lru_cache(maxsize=4096)
+def get_voicing_template(chord_notes, chord_strings, chord_offsets):
+    """
+    Return the shared template for a voicing.
+
+    Args are tuples so identical voicings (e.g. the same shape on another
+    ChordNotes row) reuse one template across all roots.
+    """
+    return VoicingTemplate(chord_notes, chord_strings, chord_offsets)